@@ -0,0 +1,78 @@
+"""Benchmark validating, dumping and reading back a batch of payloads, one at a time and as a batch.
+
+Fields cycle through int, str, float and list[int] types, the lists holding `items` integers.
+
+Usage:
+    python benchmarks/batch_validation.py [--size 10000] [--fields 8] [--items 20] [--repeat 5]
+"""
+
+import argparse
+import collections.abc
+import json
+import time
+import typing
+import uuid
+
+from sthali_db.models import FieldSpecification, Models
+
+
+def best_of(repeat: int, function: collections.abc.Callable[[], typing.Any]) -> float:
+    """Return the best latency of the function in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return min(latencies) * 1e3
+
+
+def main(size: int, fields: int, items: int, repeat: int) -> None:
+    """Run the benchmark and print one row per operation."""
+    field_types = (int, str, float, list[int])
+    models = Models(
+        "benchmark",
+        [FieldSpecification(name=f"field_{index}", type=field_types[index % 4]) for index in range(fields)],
+    )
+    sample = {int: 1, str: "value", float: 1.5, list[int]: list(range(items))}
+    payloads = [{f"field_{index}": sample[field_types[index % 4]] for index in range(fields)} for _ in range(size)]
+    payloads_json = json.dumps(payloads).encode()
+    rows = [{"id": uuid.uuid4(), **payload} for payload in payloads]
+    create_model = models.create_model
+    response_model = models.response_model
+    instances = models.validate_many(payloads)
+
+    operations = {
+        "validate": (
+            lambda: [create_model(**payload) for payload in payloads],
+            lambda: models.validate_many(payloads),
+        ),
+        "validate json": (
+            lambda: [create_model.model_validate(payload) for payload in json.loads(payloads_json)],
+            lambda: models.validate_many(payloads_json),
+        ),
+        "dump": (
+            lambda: [instance.model_dump() for instance in instances],
+            lambda: models.dump_many(instances),
+        ),
+        "read validated": (
+            lambda: [response_model.model_validate(row) for row in rows],
+            lambda: models.validate_many(rows, response_model),
+        ),
+        "read trusted": (
+            lambda: [response_model.model_construct(**row) for row in rows],
+            lambda: models.construct_many(rows),
+        ),
+    }
+    print(f"{'operation':>16} {'per item (ms)':>14} {'batch (ms)':>12}")
+    for name, (per_item, batch) in operations.items():
+        print(f"{name:>16} {best_of(repeat, per_item):>14.1f} {best_of(repeat, batch):>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--fields", type=int, default=8)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+    main(arguments.size, arguments.fields, arguments.items, arguments.repeat)
@@ -0,0 +1,90 @@
+"""Benchmark the encoding and decoding throughput, and the encoded size, of every installed codec.
+
+The resources are encoded once as a whole TinyDB file, and once one by one as the SQLite and Redis clients store them.
+Throughputs are in resources per second. With `--plain` the resources hold JSON types only, without the UUID and
+datetime the JSON codecs tag.
+
+Usage:
+    python benchmarks/codec_throughput.py [--size 20000] [--repeat 5] [--plain]
+"""
+
+import argparse
+import collections.abc
+import datetime as dt
+import time
+import typing
+import uuid
+
+from sthali_db.codecs import CODECS, Codec, get_codec
+
+
+def best_of(repeat: int, function: collections.abc.Callable[[], typing.Any]) -> float:
+    """Return the best duration of the function in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def installed_codecs() -> list[Codec]:
+    """Return an instance of every codec whose library is installed."""
+    codecs = []
+    for name in CODECS:
+        codec = _instance(name)
+        if codec is None:
+            print(f"{name:>8} is not installed")
+        else:
+            codecs.append(codec)
+    return codecs
+
+
+def _instance(name: str) -> Codec | None:
+    try:
+        return get_codec(name)
+    except ImportError:
+        return None
+
+
+def main(size: int, repeat: int, plain: bool) -> None:  # noqa: FBT001
+    """Run the benchmark and print one row per codec."""
+    now = dt.datetime.now(dt.timezone.utc)
+    resources: list[dict[str, typing.Any]] = [
+        {
+            "resource_id": str(uuid.uuid4()),
+            "resource_obj": {
+                "name": f"name_{index}",
+                "age": index % 100,
+                "score": index / 7,
+                "active": index % 2 == 0,
+                "tags": ["tag_1", "tag_2"],
+            },
+        }
+        for index in range(size)
+    ]
+    if not plain:
+        for resource in resources:
+            resource["resource_obj"].update(owner=uuid.uuid4(), created=now)
+    table = {"benchmark": {str(index): resource for index, resource in enumerate(resources, 1)}}
+    print(f"{'codec':>8} {'file enc/s':>12} {'file dec/s':>12} {'file (KiB)':>11} {'row enc/s':>11} {'row dec/s':>11}")
+    for codec in installed_codecs():
+        encoded = codec.encode(table)
+        rows = [codec.encode(resource) for resource in resources]
+        file_encode = best_of(repeat, lambda codec=codec: codec.encode(table))
+        file_decode = best_of(repeat, lambda codec=codec, encoded=encoded: codec.decode(encoded))
+        row_encode = best_of(repeat, lambda codec=codec: [codec.encode(resource) for resource in resources])
+        row_decode = best_of(repeat, lambda codec=codec, rows=rows: [codec.decode(row) for row in rows])
+        print(
+            f"{codec.name:>8} {size / file_encode:>12,.0f} {size / file_decode:>12,.0f} {len(encoded) / 1024:>11,.0f} "
+            f"{size / row_encode:>11,.0f} {size / row_decode:>11,.0f}",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--plain", action="store_true")
+    arguments = parser.parse_args()
+    main(arguments.size, arguments.repeat, arguments.plain)
@@ -0,0 +1,191 @@
+"""Benchmark the CRUD operations of every client through the DB adapter, and write the results as JSON.
+
+For every client and table size, the table is filled with `insert_many`, then every operation is timed `--operations`
+times on random resources: select_one, partial and full update_one, insert_one, a select_many page near the end of
+the table, reached by a cursor, and delete_one of the inserted resources, so the table keeps its size. Each result
+holds the operations per second and the p50 and p99 latencies, in microseconds.
+
+The results are written to `--output`, or to stdout, as JSON, so runs can be diffed; with `--baseline`, the change of
+every p50 against an earlier run is printed to stderr. The Redis and Postgres clients need `--redis-url` and
+`--postgres-dsn`, and are skipped without them. `--options` gives client options as JSON, e.g.
+'{"tinydb": {"buffered": true}}'; unbuffered TinyDB rewrites its whole file on every write, so large sizes are slow.
+
+Usage:
+    python benchmarks/crud.py [--clients default sqlite] [--sizes 1000 10000 100000] [--operations 1000]
+        [--limit 100] [--options '{}'] [--redis-url URL] [--postgres-dsn DSN] [--output FILE] [--baseline FILE]
+"""
+
+import argparse
+import asyncio
+import collections.abc
+import datetime as dt
+import importlib.metadata
+import json
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import typing
+import uuid
+
+from sthali_db import DB, DBSpecification
+from sthali_db.clients.default import DefaultClient
+from sthali_db.db import ClientEnum
+from sthali_db.dependencies import PaginateParameters, encode_cursor
+
+FILL_BATCH_SIZE = 10_000
+
+
+def build_resource_obj(index: int) -> dict[str, typing.Any]:
+    """Build a resource object of a few typical fields."""
+    return {"name": f"resource {index}", "index": index, "score": index / 7, "tags": ["a", "b"], "active": True}
+
+
+def client_path(name: str, directory: str, arguments: argparse.Namespace) -> str | None:
+    """Return the path of the database of a client, or None if it can't be benchmarked."""
+    paths = {
+        "default": "",
+        "bitcask": directory,
+        "sqlite": f"{directory}/benchmark.sqlite",
+        "tinydb": f"{directory}/benchmark.json",
+        "redis": arguments.redis_url,
+        "postgres": arguments.postgres_dsn,
+    }
+    return paths.get(name, f"{directory}/benchmark.{name}")
+
+
+async def time_operation(
+    operation: collections.abc.Callable[[int], collections.abc.Awaitable[typing.Any]],
+    count: int,
+) -> dict[str, float]:
+    """Return the operations per second and the p50 and p99 latencies of `count` calls of the operation."""
+    latencies = []
+    for index in range(count):
+        start = time.perf_counter()
+        await operation(index)
+        latencies.append(time.perf_counter() - start)
+    quantiles = statistics.quantiles(latencies, n=100) if count > 1 else latencies * 99
+    return {
+        "ops_per_sec": count / sum(latencies),
+        "p50_us": quantiles[49] * 1e6,
+        "p99_us": quantiles[98] * 1e6,
+    }
+
+
+async def run_client(
+    db_spec: DBSpecification,
+    size: int,
+    operations: int,
+    limit: int,
+) -> dict[str, dict[str, float]]:
+    """Fill a table of the given size and return the timings of every operation."""
+    table = f"benchmark_{uuid.uuid4().hex[:8]}"
+    resource_ids = [uuid.uuid4() for _ in range(size)]
+    new_ids = [uuid.uuid4() for _ in range(operations)]
+    randomly = random.Random(size)  # noqa: S311
+    picked = [randomly.choice(resource_ids) for _ in range(operations)]
+    # the page holding the resources 90% of the way through the table, as deep pagination reaches it
+    deep_cursor = encode_cursor(sorted(resource_ids)[int(size * 0.9)]) if size else None
+    timings: dict[str, dict[str, float]] = {}
+    try:
+        async with DB(db_spec, table) as db:
+            for start in range(0, size, FILL_BATCH_SIZE):
+                batch = resource_ids[start : start + FILL_BATCH_SIZE]
+                await db.insert_many(
+                    {resource_id: build_resource_obj(start + index) for index, resource_id in enumerate(batch)},
+                )
+            timings["select_one"] = await time_operation(lambda index: db.select_one(picked[index]), operations)
+            timings["update_one_partial"] = await time_operation(
+                lambda index: db.update_one(picked[index], {"score": index}, partial=True),
+                operations,
+            )
+            timings["update_one_full"] = await time_operation(
+                lambda index: db.update_one(picked[index], build_resource_obj(index)),
+                operations,
+            )
+            timings["insert_one"] = await time_operation(
+                lambda index: db.insert_one(new_ids[index], build_resource_obj(index)),
+                operations,
+            )
+            timings["select_many_deep"] = await time_operation(
+                lambda _: db.select_many(PaginateParameters(limit=limit, cursor=deep_cursor)),
+                operations,
+            )
+            timings["delete_one"] = await time_operation(lambda index: db.delete_one(new_ids[index]), operations)
+            for start in range(0, size, FILL_BATCH_SIZE):
+                await db.delete_many(resource_ids[start : start + FILL_BATCH_SIZE])
+    finally:
+        DefaultClient.tables.pop(table, None)
+    return timings
+
+
+async def main(arguments: argparse.Namespace) -> dict[str, typing.Any]:
+    """Run the benchmark and return the results."""
+    results: list[dict[str, typing.Any]] = []
+    skipped: list[str] = []
+    options = json.loads(arguments.options)
+    for name in arguments.clients:
+        with tempfile.TemporaryDirectory() as directory:
+            path = client_path(name, directory, arguments)
+            if path is None:
+                skipped.append(name)
+                continue
+            db_spec = DBSpecification(path=path, client=name, options=options.get(name, {}))  # type: ignore[arg-type]
+            for size in arguments.sizes:
+                timings = await run_client(db_spec, size, arguments.operations, arguments.limit)
+                for operation, timing in timings.items():
+                    result = {"client": name, "size": size, "operation": operation, **timing}
+                    results.append(result)
+                    print(
+                        f"{name:>9} {size:>9} {operation:>19} {timing['ops_per_sec']:>12.0f} ops/s"
+                        f" {timing['p50_us']:>10.1f} us {timing['p99_us']:>10.1f} us",
+                        file=sys.stderr,
+                    )
+    return {
+        "metadata": {
+            "date": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sthali_db": importlib.metadata.version("sthali-db"),
+            "arguments": {key: value for key, value in vars(arguments).items() if key not in {"output", "baseline"}},
+            "skipped": skipped,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict[str, typing.Any], baseline: dict[str, typing.Any]) -> None:
+    """Print the change of every p50 latency against the baseline report."""
+    before = {(row["client"], row["size"], row["operation"]): row for row in baseline["results"]}
+    for row in report["results"]:
+        previous = before.get((row["client"], row["size"], row["operation"]))
+        if previous is not None:
+            change = row["p50_us"] / previous["p50_us"] - 1
+            print(
+                f"{row['client']:>9} {row['size']:>9} {row['operation']:>19} p50 {change:>+8.1%}",
+                file=sys.stderr,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", nargs="+", default=[client.value for client in ClientEnum])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--operations", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--options", default="{}")
+    parser.add_argument("--redis-url")
+    parser.add_argument("--postgres-dsn")
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--baseline", type=pathlib.Path)
+    arguments = parser.parse_args()
+    report = asyncio.run(main(arguments))
+    if arguments.baseline is not None:
+        compare(report, json.loads(arguments.baseline.read_text()))
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
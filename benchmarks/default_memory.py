@@ -0,0 +1,87 @@
+"""Benchmark the memory and deep-page latency of DefaultClient against a plain dict of dicts.
+
+Memory is the traced allocation per row while filling the store, excluding the resource IDs, which both hold. Page
+latency is the mean select_many time for a page near the end of the table.
+
+Usage:
+    python benchmarks/default_memory.py [--sizes 10000 100000] [--fields 8] [--pages 100]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import uuid
+
+from sthali_db.clients.default import DefaultClient
+from sthali_db.dependencies import PaginateParameters
+
+
+def build_resource_obj(index: int, fields: int) -> dict:
+    """Build a resource object, with freshly built keys as decoding a request body would."""
+    return {"".join(["field_", str(field)]): index * fields + field for field in range(fields)}
+
+
+def measure_dict(resource_ids: list[uuid.UUID], fields: int) -> float:
+    """Return the bytes per row of a dict of dicts."""
+    tracemalloc.start()
+    store = {}
+    for index, resource_id in enumerate(resource_ids):
+        store[resource_id] = build_resource_obj(index, fields)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(resource_ids)
+
+
+async def measure_client(client: DefaultClient, resource_ids: list[uuid.UUID], fields: int) -> float:
+    """Return the bytes per row of the DefaultClient store, filling it."""
+    tracemalloc.start()
+    for index, resource_id in enumerate(resource_ids):
+        await client.insert_one(resource_id, build_resource_obj(index, fields))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(resource_ids)
+
+
+def time_dict_page(store: dict, skip: int, pages: int) -> float:
+    """Return the mean latency in microseconds of a page built as the previous select_many did."""
+    start = time.perf_counter()
+    for _ in range(pages):
+        items = [{"id": k, **v} for k, v in store.items()]
+        items[skip : skip + 100]
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+async def time_client_page(client: DefaultClient, skip: int, pages: int) -> float:
+    """Return the mean select_many latency in microseconds."""
+    paginate_parameters = PaginateParameters(skip=skip, limit=100)
+    start = time.perf_counter()
+    for _ in range(pages):
+        await client.select_many(paginate_parameters)
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+async def main(sizes: list[int], fields: int, pages: int) -> None:
+    """Run the benchmark and print one row per table size."""
+    print(f"{'rows':>10} {'dict (B/row)':>14} {'client (B/row)':>16} {'dict page (us)':>16} {'client page (us)':>18}")
+    for size in sizes:
+        resource_ids = [uuid.uuid4() for _ in range(size)]
+        dict_bytes = measure_dict(resource_ids, fields)
+        client = DefaultClient("", f"benchmark_{size}")
+        client_bytes = await measure_client(client, resource_ids, fields)
+
+        store = {resource_id: build_resource_obj(index, fields) for index, resource_id in enumerate(resource_ids)}
+        skip = size - 100
+        dict_page = time_dict_page(store, skip, max(1, pages // 10))
+        client_page = await time_client_page(client, skip, pages)
+        print(f"{size:>10} {dict_bytes:>14.0f} {client_bytes:>16.0f} {dict_page:>16.1f} {client_page:>18.1f}")
+        DefaultClient.tables.pop(client.table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--fields", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=100)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.sizes, arguments.fields, arguments.pages))
@@ -0,0 +1,244 @@
+"""Load a table with concurrent tasks running a mix of operations through the DB adapter, and report the latencies.
+
+The table is filled with `--size` resources, then `--concurrency` tasks run operations picked at random from `--mix`
+for `--duration` seconds, on random resources of the table. Deleted resources are taken out of the table first, and
+inserted ones added once inserted, so the tasks race on them as clients would: a resource deleted while it's read
+answers 404, and a `--conflicts` fraction of the inserts reuse the ID of a resource of the table, answering 409.
+
+For every operation, the throughput, the p50, p95, p99 and max latencies, and the errors by status code are
+reported; along with the lag of the event loop, measured by a task sleeping every millisecond, which a client
+blocking the loop, e.g. on file I/O, makes grow. The report is written to `--output`, or to stdout, as JSON, and as a
+table to stderr.
+
+Usage:
+    python benchmarks/load.py [--client sqlite] [--path PATH] [--options '{}'] [--size 10000] [--concurrency 100]
+        [--duration 10] [--mix select_one=70,select_many=10,update_one=10,insert_one=5,delete_one=5]
+        [--conflicts 0.0] [--limit 100] [--seed 0] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import collections
+import collections.abc
+import datetime as dt
+import importlib.metadata
+import json
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import typing
+import uuid
+
+import fastapi
+
+from sthali_db import DB, DBSpecification
+from sthali_db.dependencies import PaginateParameters, encode_cursor
+
+FILL_BATCH_SIZE = 10_000
+LOOP_LAG_INTERVAL = 0.001
+OPERATIONS = ("select_one", "select_many", "update_one", "insert_one", "delete_one")
+
+
+class Load:
+    """The resources of the loaded table and the latencies and errors of the operations run on it."""
+
+    def __init__(self, db: DB, resource_ids: list[uuid.UUID], arguments: argparse.Namespace) -> None:
+        """Initialize the load of the table."""
+        self.db = db
+        self.resource_ids = resource_ids
+        self.arguments = arguments
+        self.random = random.Random(arguments.seed)  # noqa: S311
+        self.latencies: dict[str, list[float]] = collections.defaultdict(list)
+        self.errors: dict[str, collections.Counter[str]] = collections.defaultdict(collections.Counter)
+
+    def pick(self) -> uuid.UUID:
+        """Return the ID of a random resource of the table."""
+        return self.random.choice(self.resource_ids)
+
+    def take(self) -> uuid.UUID:
+        """Take the ID of a random resource out of the table, in constant time."""
+        index = self.random.randrange(len(self.resource_ids))
+        self.resource_ids[index], self.resource_ids[-1] = self.resource_ids[-1], self.resource_ids[index]
+        return self.resource_ids.pop()
+
+    async def select_one(self) -> None:
+        """Select a random resource."""
+        await self.db.select_one(self.pick())
+
+    async def select_many(self) -> None:
+        """Select a page of resources, starting at a random one."""
+        cursor = encode_cursor(self.pick()) if self.resource_ids else None
+        await self.db.select_many(PaginateParameters(limit=self.arguments.limit, cursor=cursor))
+
+    async def update_one(self) -> None:
+        """Update a field of a random resource."""
+        await self.db.update_one(self.pick(), {"score": self.random.random()}, partial=True)
+
+    async def insert_one(self) -> None:
+        """Insert a resource, of the ID of a resource of the table for a `--conflicts` fraction of the inserts."""
+        conflict = self.resource_ids and self.random.random() < self.arguments.conflicts
+        resource_id = self.pick() if conflict else uuid.uuid4()
+        await self.db.insert_one(resource_id, build_resource_obj(len(self.resource_ids)))
+        if not conflict:
+            self.resource_ids.append(resource_id)
+
+    async def delete_one(self) -> None:
+        """Delete a random resource."""
+        await self.db.delete_one(self.take())
+
+    async def worker(self, operations: list[str], weights: list[int], deadline: float) -> None:
+        """Run random operations until the deadline, recording their latencies and errors."""
+        while time.perf_counter() < deadline:
+            (operation,) = self.random.choices(operations, weights)
+            if not self.resource_ids and operation in {"select_one", "update_one", "delete_one"}:
+                operation = "insert_one"
+            start = time.perf_counter()
+            try:
+                await getattr(self, operation)()
+            except fastapi.HTTPException as exception:
+                self.errors[operation][str(exception.status_code)] += 1
+            except Exception as exception:  # noqa: BLE001
+                self.errors[operation][type(exception).__name__] += 1
+            self.latencies[operation].append(time.perf_counter() - start)
+            # a server yields between requests, and clients that never await would otherwise run one task at a time
+            await asyncio.sleep(0)
+
+
+def build_resource_obj(index: int) -> dict[str, typing.Any]:
+    """Build a resource object of a few typical fields."""
+    return {"name": f"resource {index}", "index": index, "score": index / 7, "tags": ["a", "b"], "active": True}
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Parse the mix of operations, e.g. 'select_one=90,insert_one=10', into their weights."""
+    weights = {}
+    for item in mix.split(","):
+        operation, _, weight = item.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            msg = f"unknown operation {operation!r}, not one of {', '.join(OPERATIONS)}"
+            raise argparse.ArgumentTypeError(msg)
+        weights[operation] = int(weight or 1)
+    return weights
+
+
+def summarize(latencies: list[float], errors: collections.Counter[str], duration: float) -> dict[str, typing.Any]:
+    """Return the throughput, the latency percentiles and the errors of the calls of an operation."""
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "count": len(latencies),
+        "ops_per_sec": len(latencies) / duration,
+        "p50_us": quantiles[49] * 1e6,
+        "p95_us": quantiles[94] * 1e6,
+        "p99_us": quantiles[98] * 1e6,
+        "max_us": max(latencies) * 1e6,
+        "errors": dict(errors),
+        "error_rate": sum(errors.values()) / len(latencies),
+    }
+
+
+async def measure_loop_lag(lags: list[float]) -> None:
+    """Record how late the event loop wakes up a task sleeping every LOOP_LAG_INTERVAL, until cancelled."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(time.perf_counter() - start - LOOP_LAG_INTERVAL)
+
+
+async def main(arguments: argparse.Namespace, path: str) -> dict[str, typing.Any]:
+    """Fill the table, run the load and return the report."""
+    options = json.loads(arguments.options)
+    db_spec = DBSpecification(path=path, client=arguments.client, options=options)  # type: ignore[arg-type]
+    table = f"load_{uuid.uuid4().hex[:8]}"
+    resource_ids = [uuid.uuid4() for _ in range(arguments.size)]
+    async with DB(db_spec, table) as db:
+        for start in range(0, arguments.size, FILL_BATCH_SIZE):
+            batch = resource_ids[start : start + FILL_BATCH_SIZE]
+            await db.insert_many(
+                {resource_id: build_resource_obj(start + index) for index, resource_id in enumerate(batch)},
+            )
+        load = Load(db, resource_ids, arguments)
+        lags: list[float] = []
+        monitor = asyncio.create_task(measure_loop_lag(lags))
+        start = time.perf_counter()
+        deadline = start + arguments.duration
+        await asyncio.gather(
+            *(
+                load.worker(list(arguments.mix), list(arguments.mix.values()), deadline)
+                for _ in range(arguments.concurrency)
+            ),
+        )
+        duration = time.perf_counter() - start
+        monitor.cancel()
+        await db.delete_many(load.resource_ids)
+    operations = {
+        operation: summarize(latencies, load.errors[operation], duration)
+        for operation, latencies in sorted(load.latencies.items())
+    }
+    every_latency = [latency for latencies in load.latencies.values() for latency in latencies]
+    lag_quantiles = statistics.quantiles(lags, n=100) if len(lags) > 1 else [0.0] * 99
+    return {
+        "metadata": {
+            "date": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sthali_db": importlib.metadata.version("sthali-db"),
+            "arguments": {key: value for key, value in vars(arguments).items() if key != "output"},
+        },
+        "duration": duration,
+        "total": summarize(every_latency, sum(load.errors.values(), collections.Counter()), duration),
+        "operations": operations,
+        "loop_lag": {"p99_us": lag_quantiles[98] * 1e6, "max_us": max(lags, default=0.0) * 1e6},
+    }
+
+
+def print_report(report: dict[str, typing.Any]) -> None:
+    """Print the report as a table."""
+    print(
+        f"{'':>12} {'ops/s':>10} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'max us':>10}  errors",
+        file=sys.stderr,
+    )
+    for operation, row in [*report["operations"].items(), ("total", report["total"])]:
+        errors = ", ".join(f"{status}: {count}" for status, count in sorted(row["errors"].items())) or "-"
+        print(
+            f"{operation:>12} {row['ops_per_sec']:>10.0f} {row['p50_us']:>10.1f} {row['p95_us']:>10.1f}"
+            f" {row['p99_us']:>10.1f} {row['max_us']:>10.1f}  {errors}",
+            file=sys.stderr,
+        )
+    lag = report["loop_lag"]
+    print(f"event loop lag: p99 {lag['p99_us']:.1f} us, max {lag['max_us']:.1f} us", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client", default="default")
+    parser.add_argument("--path", help="the path of the database, a new temporary one by default for file clients")
+    parser.add_argument("--options", default="{}")
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="select_one=70,select_many=10,update_one=10,insert_one=5,delete_one=5",
+    )
+    parser.add_argument("--conflicts", type=float, default=0.0)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=pathlib.Path)
+    arguments = parser.parse_args()
+    if arguments.path is None and arguments.client in {"redis", "postgres"}:
+        parser.error(f"--path is required for the {arguments.client} client")
+    with tempfile.TemporaryDirectory() as directory:
+        default_paths = {"default": "", "bitcask": directory, "tinydb": f"{directory}/load.json"}
+        path = arguments.path or default_paths.get(arguments.client, f"{directory}/load.{arguments.client}")
+        report = asyncio.run(main(arguments, path))
+    print_report(report)
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,72 @@
+"""Benchmark select_many ordered by a field, with and without a secondary index on it.
+
+Pages are read by following their cursors, so every page seeks past the previous one.
+
+Usage:
+    python benchmarks/order_by.py [--size 50000] [--limit 100] [--pages 20]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import uuid
+
+from sthali_db.clients import Base
+from sthali_db.clients.default import DefaultClient
+from sthali_db.clients.sqlite import SqliteClient
+from sthali_db.clients.tinydb import TinydbClient
+from sthali_db.dependencies import PaginateParameters
+from sthali_db.models import FieldSpecification
+
+
+def build_client(name: str, table: str, fields: list[FieldSpecification], directory: str) -> Base:
+    """Build the client of the given name, for a new table."""
+    if name == "sqlite":
+        return SqliteClient(f"{directory}/benchmark.sqlite", table, fields=fields)
+    if name == "tinydb":
+        return TinydbClient(":memory:", table, fields=fields)
+    return DefaultClient("", table, fields=fields)
+
+
+async def time_pages(client: Base, limit: int, pages: int) -> float:
+    """Return the mean ordered select_many latency in microseconds."""
+    paginate_parameters = PaginateParameters(limit=limit, order_by="score", direction="desc")
+    start = time.perf_counter()
+    for _ in range(pages):
+        page = await client.select_many(paginate_parameters)
+        paginate_parameters = PaginateParameters(
+            limit=limit,
+            order_by="score",
+            direction="desc",
+            cursor=page.cursor,
+        )
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+async def main(size: int, limit: int, pages: int) -> None:
+    """Run the benchmark and print one row per client."""
+    resources = {uuid.uuid4(): {"score": random.random(), "field": index} for index in range(size)}  # noqa: S311
+    print(f"{'client':>10} {'heap (us)':>12} {'indexed (us)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("default", "sqlite", "tinydb"):
+            latencies = []
+            for index in (False, True):
+                fields = [FieldSpecification(name="score", type=float, index=index)]
+                table = f"benchmark_{name}_{index}"
+                client = build_client(name, table, fields, directory)
+                await client.insert_many(resources)
+                latencies.append(await time_pages(client, limit, pages))
+                await client.aclose()
+                DefaultClient.tables.pop(table, None)
+            print(f"{name:>10} {latencies[0]:>12.1f} {latencies[1]:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.size, arguments.limit, arguments.pages))
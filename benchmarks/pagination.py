@@ -0,0 +1,54 @@
+"""Benchmark select_many for the first and a deep page, paging with skip and with a cursor.
+
+Usage:
+    python benchmarks/pagination.py [--size 50000] [--limit 100] [--pages 50]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+
+from sthali_db.clients import Base
+from sthali_db.clients.default import DefaultClient
+from sthali_db.clients.sqlite import SqliteClient
+from sthali_db.clients.tinydb import TinydbClient
+from sthali_db.dependencies import PaginateParameters, encode_cursor
+
+
+async def time_page(client: Base, paginate_parameters: PaginateParameters, pages: int) -> float:
+    """Return the mean select_many latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(pages):
+        await client.select_many(paginate_parameters)
+    return (time.perf_counter() - start) / pages * 1e6
+
+
+async def main(size: int, limit: int, pages: int) -> None:
+    """Run the benchmark and print one row per client."""
+    resources = {uuid.uuid4(): {"field": index} for index in range(size)}
+    last = sorted(resources)[size - limit - 1]
+    with tempfile.TemporaryDirectory() as directory:
+        clients: dict[str, Base] = {
+            "default": DefaultClient("", "benchmark"),
+            "sqlite": SqliteClient(f"{directory}/benchmark.sqlite", "benchmark"),
+            "tinydb": TinydbClient(":memory:", "benchmark"),
+        }
+        print(f"{'client':>10} {'first (us)':>12} {'skip (us)':>12} {'cursor (us)':>12}")
+        for name, client in clients.items():
+            await client.insert_many(resources)
+            first = await time_page(client, PaginateParameters(limit=limit), pages)
+            skip = await time_page(client, PaginateParameters(skip=size - limit, limit=limit), pages)
+            cursor = await time_page(client, PaginateParameters(limit=limit, cursor=encode_cursor(last)), pages)
+            print(f"{name:>10} {first:>12.1f} {skip:>12.1f} {cursor:>12.1f}")
+            await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.size, arguments.limit, arguments.pages))
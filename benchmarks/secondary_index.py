@@ -0,0 +1,66 @@
+"""Benchmark select_many filtered by equality on a field, with and without a secondary index on it.
+
+Every value of the filtered field is held by `size / cardinality` resources, all of them fitting in one page.
+
+Usage:
+    python benchmarks/secondary_index.py [--size 50000] [--cardinality 1000] [--lookups 50]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+
+from sthali_db.clients import Base
+from sthali_db.clients.default import DefaultClient
+from sthali_db.clients.sqlite import SqliteClient
+from sthali_db.clients.tinydb import TinydbClient
+from sthali_db.dependencies import FilterParameters, PaginateParameters, Predicate
+from sthali_db.models import FieldSpecification
+
+
+def build_client(name: str, table: str, fields: list[FieldSpecification], directory: str) -> Base:
+    """Build the client of the given name, for a new table."""
+    if name == "sqlite":
+        return SqliteClient(f"{directory}/benchmark.sqlite", table, fields=fields)
+    if name == "tinydb":
+        return TinydbClient(":memory:", table, fields=fields)
+    return DefaultClient("", table, fields=fields)
+
+
+async def time_lookup(client: Base, cardinality: int, lookups: int) -> float:
+    """Return the mean filtered select_many latency in microseconds."""
+    paginate_parameters = PaginateParameters(limit=1_000)
+    start = time.perf_counter()
+    for lookup in range(lookups):
+        predicate = Predicate(field="group", operator="eq", value=lookup * 7919 % cardinality)
+        await client.select_many(paginate_parameters, FilterParameters(predicates=[predicate]))
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+async def main(size: int, cardinality: int, lookups: int) -> None:
+    """Run the benchmark and print one row per client."""
+    resources = {uuid.uuid4(): {"group": index % cardinality, "field": index} for index in range(size)}
+    print(f"{'client':>10} {'scan (us)':>12} {'indexed (us)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("default", "sqlite", "tinydb"):
+            latencies = []
+            for index in (False, True):
+                fields = [FieldSpecification(name="group", type=int, index=index)]
+                table = f"benchmark_{name}_{index}"
+                client = build_client(name, table, fields, directory)
+                await client.insert_many(resources)
+                latencies.append(await time_lookup(client, cardinality, lookups))
+                await client.aclose()
+                DefaultClient.tables.pop(table, None)
+            print(f"{name:>10} {latencies[0]:>12.1f} {latencies[1]:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--cardinality", type=int, default=1_000)
+    parser.add_argument("--lookups", type=int, default=50)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.size, arguments.cardinality, arguments.lookups))
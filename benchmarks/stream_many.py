@@ -0,0 +1,92 @@
+"""Benchmark reading a whole table with stream_many, against offset pages of select_many.
+
+Offset pages skip every resource before them, so each is slower than the previous one; the stream seeks past the
+last resource of every batch instead. The peak memory allocated while reading is reported along with the time.
+
+Usage:
+    python benchmarks/stream_many.py [--size 50000] [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import collections.abc
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sthali_db.clients import Base
+from sthali_db.clients.default import DefaultClient
+from sthali_db.clients.sqlite import SqliteClient
+from sthali_db.clients.tinydb import TinydbClient
+from sthali_db.dependencies import PaginateParameters
+from sthali_db.models import FieldSpecification
+
+
+def build_client(name: str, table: str, fields: list[FieldSpecification], directory: str) -> Base:
+    """Build the client of the given name, for a new table."""
+    if name == "sqlite":
+        return SqliteClient(f"{directory}/benchmark.sqlite", table, fields=fields)
+    if name == "tinydb":
+        return TinydbClient(":memory:", table, fields=fields)
+    return DefaultClient("", table, fields=fields)
+
+
+async def read_offset_pages(client: Base, batch_size: int) -> int:
+    """Read every resource with offset pages, returning their number."""
+    count = skip = 0
+    while page := await client.select_many(PaginateParameters(skip=skip, limit=batch_size)):
+        count += len(page)
+        skip += batch_size
+    return count
+
+
+async def read_stream(client: Base, batch_size: int) -> int:
+    """Read every resource with stream_many, returning their number."""
+    count = 0
+    async for _ in client.stream_many(batch_size=batch_size):
+        count += 1
+    return count
+
+
+async def measure(
+    read: collections.abc.Callable[[Base, int], collections.abc.Awaitable[int]],
+    client: Base,
+    batch_size: int,
+) -> tuple[float, float]:
+    """Return the time in milliseconds and the peak memory in MiB of a read of the whole table.
+
+    The memory is traced on a second read, so that tracing doesn't slow the timed one down.
+    """
+    start = time.perf_counter()
+    await read(client, batch_size)
+    elapsed = (time.perf_counter() - start) * 1e3
+    tracemalloc.start()
+    await read(client, batch_size)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+async def main(size: int, batch_size: int) -> None:
+    """Run the benchmark and print one row per client."""
+    resources = {uuid.uuid4(): {"field": index, "name": f"resource {index}"} for index in range(size)}
+    print(f"{'client':>10} {'offset (ms)':>12} {'offset (MiB)':>13} {'stream (ms)':>12} {'stream (MiB)':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("default", "sqlite", "tinydb"):
+            table = f"benchmark_{name}"
+            client = build_client(name, table, [FieldSpecification(name="field", type=int)], directory)
+            await client.insert_many(resources)
+            offset = await measure(read_offset_pages, client, batch_size)
+            stream = await measure(read_stream, client, batch_size)
+            await client.aclose()
+            DefaultClient.tables.pop(table, None)
+            print(f"{name:>10} {offset[0]:>12.1f} {offset[1]:>13.2f} {stream[0]:>12.1f} {stream[1]:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.size, arguments.batch_size))
@@ -0,0 +1,86 @@
+"""Benchmark TinydbClient.select_one against a full-table search as the table grows.
+
+Uses an in-memory TinyDB so the numbers isolate lookup cost from JSON parsing and file I/O.
+
+Usage:
+    python benchmarks/tinydb_index.py [--sizes 1000 10000 50000] [--lookups 1000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import tinydb
+
+from sthali_db.clients.tinydb import TinydbClient
+
+
+def build_client(size: int) -> tuple[TinydbClient, list[uuid.UUID]]:
+    """Build an in-memory TinydbClient holding `size` resources.
+
+    Args:
+        size (int): The number of resources to insert.
+
+    Returns:
+        tuple[TinydbClient, list[uuid.UUID]]: The client and the inserted resource IDs.
+    """
+    resource_ids = [uuid.uuid4() for _ in range(size)]
+    client = TinydbClient(":memory:", "benchmark")
+    client.table.insert_multiple(
+        {"resource_id": str(resource_id), "resource_obj": {"field": index}}
+        for index, resource_id in enumerate(resource_ids)
+    )
+    return reopen(client), resource_ids
+
+
+def reopen(client: TinydbClient) -> TinydbClient:
+    """Rebuild the client index from its table, as opening the database would.
+
+    Args:
+        client (TinydbClient): The client to reopen.
+
+    Returns:
+        TinydbClient: The client with a freshly built index.
+    """
+    client._doc_ids = {document["resource_id"]: document.doc_id for document in client.table}  # noqa: SLF001
+    client._keys = sorted(client._doc_ids)  # noqa: SLF001
+    return client
+
+
+async def time_indexed(client: TinydbClient, resource_ids: list[uuid.UUID]) -> float:
+    """Return the mean select_one latency in microseconds."""
+    start = time.perf_counter()
+    for resource_id in resource_ids:
+        await client.select_one(resource_id)
+    return (time.perf_counter() - start) / len(resource_ids) * 1e6
+
+
+def time_search(client: TinydbClient, resource_ids: list[uuid.UUID]) -> float:
+    """Return the mean full-table search latency in microseconds."""
+    query = tinydb.Query()
+    start = time.perf_counter()
+    for resource_id in resource_ids:
+        client.table.clear_cache()
+        client.table.search(query.resource_id == str(resource_id))
+    return (time.perf_counter() - start) / len(resource_ids) * 1e6
+
+
+async def main(sizes: list[int], lookups: int) -> None:
+    """Run the benchmark and print one row per table size."""
+    print(f"{'rows':>10} {'indexed (us)':>14} {'search (us)':>14}")
+    for size in sizes:
+        client, resource_ids = build_client(size)
+        sample = random.choices(resource_ids, k=lookups)  # noqa: S311
+        indexed = await time_indexed(client, sample)
+        search = time_search(client, sample[: max(1, lookups // 10)])
+        print(f"{size:>10} {indexed:>14.1f} {search:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--lookups", type=int, default=1_000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.sizes, arguments.lookups))
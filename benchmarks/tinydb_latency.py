@@ -0,0 +1,97 @@
+"""Benchmark select_one tail latency while large TinyDB writes are being flushed.
+
+A writer repeatedly updates a resource in a large database file while readers call select_one on a small one every
+millisecond. Latency is measured from the time each read was due, so stalls of the event loop are included. The run is
+repeated with the blocking work executed inline on the event loop, as the clients used to, and in the thread pool.
+
+Usage:
+    python benchmarks/tinydb_latency.py [--rows 20000] [--writes 20] [--readers 8]
+"""
+
+import argparse
+import asyncio
+import pathlib
+import statistics
+import tempfile
+import time
+import typing
+import uuid
+
+from sthali_db.clients.tinydb import TinydbClient
+
+
+async def run_inline(func: typing.Callable[..., typing.Any], *args: typing.Any) -> typing.Any:
+    """Run a blocking call directly on the event loop."""
+    return func(*args)
+
+
+def open_client(path: pathlib.Path, rows: int, *, inline: bool) -> tuple[TinydbClient, uuid.UUID]:
+    """Create a database file holding `rows` resources and open a client on it.
+
+    Args:
+        path (pathlib.Path): The path to the database file.
+        rows (int): The number of resources to insert.
+        inline (bool): Whether the client runs blocking calls on the event loop.
+
+    Returns:
+        tuple[TinydbClient, uuid.UUID]: The client and the ID of one of its resources.
+    """
+    resource_ids = [uuid.uuid4() for _ in range(rows)]
+    seed = TinydbClient(str(path), "benchmark")
+    seed.table.insert_multiple(
+        {"resource_id": str(resource_id), "resource_obj": {"field": "x" * 100, "index": index}}
+        for index, resource_id in enumerate(resource_ids)
+    )
+    seed.db.close()
+    client = TinydbClient(str(path), "benchmark")
+    if inline:
+        client._run = run_inline  # type: ignore[method-assign]  # noqa: SLF001
+    return client, resource_ids[0]
+
+
+async def measure(directory: pathlib.Path, rows: int, writes: int, readers: int, *, inline: bool) -> list[float]:
+    """Return the select_one latencies, in milliseconds, observed while the writes run."""
+    large, large_id = open_client(directory / f"large-{inline}.json", rows, inline=inline)
+    small, small_id = open_client(directory / f"small-{inline}.json", 100, inline=inline)
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def write() -> None:
+        await asyncio.sleep(0.01)
+        for index in range(writes):
+            await large.update_one(large_id, {"index": index}, partial=True)
+        done.set()
+
+    async def read() -> None:
+        due = time.perf_counter()
+        while not done.is_set():
+            due += 1e-3
+            await asyncio.sleep(max(0, due - time.perf_counter()))
+            await small.select_one(small_id)
+            latencies.append((time.perf_counter() - due) * 1e3)
+            due = max(due, time.perf_counter())
+
+    await asyncio.gather(write(), *(read() for _ in range(readers)))
+    await large.aclose()
+    await small.aclose()
+    return latencies
+
+
+async def main(rows: int, writes: int, readers: int) -> None:
+    """Run the benchmark and print the latency distribution for each mode."""
+    print(f"{'mode':>10} {'reads':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, inline in (("inline", True), ("executor", False)):
+            latencies = await measure(pathlib.Path(directory), rows, writes, readers, inline=inline)
+            quantiles = statistics.quantiles(latencies, n=100)
+            p50, p99 = quantiles[49], quantiles[98]
+            print(f"{mode:>10} {len(latencies):>8} {p50:>10.2f} {p99:>10.2f} {max(latencies):>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=8)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.writes, arguments.readers))
@@ -1,15 +1,21 @@
 """This module provides the necessary components for interacting with the database."""
 
-from .db import DB, DBSpecification
-from .dependencies import PaginateParameters
+from .db import DB, CacheSpecification, DBSpecification, MetricsSpecification, WriteBehindSpecification
+from .dependencies import FilterParameters, Page, PaginateParameters, Predicate
 from .models import FieldSpecification, Models
 from .types import Types
 
 __all__ = [
     "DB",
+    "CacheSpecification",
     "DBSpecification",
     "FieldSpecification",
+    "FilterParameters",
+    "MetricsSpecification",
     "Models",
+    "Page",
     "PaginateParameters",
+    "Predicate",
     "Types",
+    "WriteBehindSpecification",
 ]
@@ -0,0 +1,313 @@
+"""This module provides a read-through cache in front of a database client.
+
+Classes:
+    CachedClient(client: Base): A class representing a read-through cache in front of a database client.
+"""
+
+import collections
+import collections.abc
+import copy
+import time
+
+import fastapi
+
+from . import dependencies
+from .clients import STREAM_BATCH_SIZE, Base, Partial, ResourceId, ResourceObj
+
+
+class CachedClient(Base):
+    """A class representing a read-through cache in front of a database client.
+
+    Resources read by `select_one` and `select_by_ids` are kept in a least recently used cache of at most `max_size`
+    resources, each for at most `ttl` seconds. Writes through this client invalidate the resources they write, so its
+    reads see them; writes through other clients are seen once the cached resources expire. The cache holds its own
+    copies of the resources and returns new copies, so callers may mutate what they get back.
+
+    Every other call is forwarded to the client as it is.
+
+    Attributes:
+        client (Base): The client the cache is in front of.
+        max_size (int): The maximum number of cached resources.
+        ttl (float | None): The number of seconds a resource stays cached, or None if it doesn't expire.
+        hits (int): The number of resources read from the cache.
+        misses (int): The number of resources read from the client, expired ones included.
+        evictions (int): The number of resources dropped to make room for others.
+
+    Args:
+        client (Base): The client the cache is in front of.
+        max_size (int): The maximum number of cached resources. Defaults to 1024.
+        ttl (float | None): The number of seconds a resource stays cached. Defaults to 60.
+    """
+
+    def __init__(self, client: Base, *, max_size: int = 1024, ttl: float | None = 60.0) -> None:
+        """Initialize a CachedClient instance.
+
+        Args:
+            client (Base): The client the cache is in front of.
+            max_size (int): The maximum number of cached resources. Defaults to 1024.
+            ttl (float | None): The number of seconds a resource stays cached. Defaults to 60.
+        """
+        super().__init__(client.path, client.table, fields=client.fields)
+        self.client = client
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: collections.OrderedDict[ResourceId, tuple[float, ResourceObj]] = collections.OrderedDict()
+        # bumped by every invalidation, so that a read started before a write doesn't cache what it read
+        self._generation = 0
+
+    def _get(self, resource_id: ResourceId) -> ResourceObj | None:
+        """Returns a copy of a cached resource, counting a hit or a miss.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+
+        Returns:
+            ResourceObj | None: The resource object containing the ID, or None if it isn't cached or has expired.
+        """
+        entry = self._entries.get(resource_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[resource_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(resource_id)
+        self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def _put(self, resource_id: ResourceId, resource_obj: ResourceObj, generation: int) -> None:
+        """Caches a copy of a resource read by the client, evicting the least recently used resources if full.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            resource_obj (ResourceObj): The resource object containing the ID.
+            generation (int): The generation of the cache when the resource was read, so that it isn't cached if a
+                write was made meanwhile.
+        """
+        if generation != self._generation or not self.max_size:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[resource_id] = (expires, copy.deepcopy(resource_obj))
+        self._entries.move_to_end(resource_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, resource_ids: list[ResourceId] | None = None) -> None:
+        """Drops resources from the cache.
+
+        Args:
+            resource_ids (list[ResourceId] | None): The IDs of the resources. Defaults to None, which drops every
+                resource.
+        """
+        self._generation += 1
+        if resource_ids is None:
+            self._entries.clear()
+        else:
+            for resource_id in resource_ids:
+                self._entries.pop(resource_id, None)
+
+    async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        """Inserts a resource object in the database.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be inserted.
+            resource_obj (ResourceObj): The resource object to be inserted.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource already exists in the database.
+        """
+        return await self.client.insert_one(resource_id, resource_obj)
+
+    async def select_one(self, resource_id: ResourceId) -> ResourceObj:
+        """Retrieves a resource from the cache, or from the database if it isn't cached.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be retrieved.
+
+        Returns:
+            ResourceObj: The retrieved resource object.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        resource_obj = self._get(resource_id)
+        if resource_obj is None:
+            generation = self._generation
+            resource_obj = await self.client.select_one(resource_id)
+            self._put(resource_id, resource_obj, generation)
+        return resource_obj
+
+    async def update_one(
+        self,
+        resource_id: ResourceId,
+        resource_obj: ResourceObj,
+        partial: Partial = None,
+    ) -> ResourceObj:
+        """Updates a resource in the database based on the given ID, and drops it from the cache.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be updated.
+            resource_obj (ResourceObj): The resource object to be updated.
+            partial (Partial): Whether to perform a partial update or replace the entire resource object.
+                Defaults to None.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        self.invalidate([resource_id])
+        try:
+            return await self.client.update_one(resource_id, resource_obj, partial)
+        finally:
+            self.invalidate([resource_id])
+
+    async def delete_one(self, resource_id: ResourceId) -> None:
+        """Deletes a resource from the database based on the given resource ID, and drops it from the cache.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be deleted.
+
+        Returns:
+            None
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        self.invalidate([resource_id])
+        try:
+            await self.client.delete_one(resource_id)
+        finally:
+            self.invalidate([resource_id])
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        return await self.client.select_many(paginate_parameters, filter_parameters)
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        return await self.client.insert_many(resources)
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the cache, and the ones not cached from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        results: list[ResourceObj | fastapi.HTTPException | None] = [
+            self._get(resource_id) for resource_id in resource_ids
+        ]
+        missing = [resource_id for resource_id, result in zip(resource_ids, results, strict=True) if result is None]
+        if missing:
+            generation = self._generation
+            fetched = iter(await self.client.select_by_ids(missing))
+            for position, result in enumerate(results):
+                if result is None:
+                    results[position] = resource_obj = next(fetched)
+                    if not isinstance(resource_obj, fastapi.HTTPException):
+                        self._put(resource_ids[position], resource_obj, generation)
+        return results  # type: ignore
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs, and drops them from the cache.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        self.invalidate(list(resources))
+        try:
+            return await self.client.update_many(resources, partial)
+        finally:
+            self.invalidate(list(resources))
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database, and drops them from the cache.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        self.invalidate(resource_ids)
+        try:
+            return await self.client.delete_many(resource_ids)
+        finally:
+            self.invalidate(resource_ids)
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, uncached.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        async for resource_obj in self.client.stream_many(filter_parameters, batch_size=batch_size):
+            yield resource_obj
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the secondary indexes of the client from the stored resources.
+
+        Returns:
+            None
+        """
+        await self.client.rebuild_indexes()
+
+    async def aclose(self) -> None:
+        """Drops every cached resource and releases the resources held by the client.
+
+        Returns:
+            None
+        """
+        self.invalidate()
+        await self.client.aclose()
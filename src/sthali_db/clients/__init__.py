@@ -5,11 +5,22 @@ Constants:
     ResourceId(uuid.UUID): The unique identifier of the resource.
     ResourceObj(dict[str, typing.Any]): The resource object.
     Partial(bool | None): Perform a partial update.
+    STREAM_BATCH_SIZE(int): The default number of resources `stream_many` reads at once.
 
 Classes:
+    SortedIndex: A class representing the values of a field in order, with the resource IDs holding them.
     Base(path: str, table: ResourceTable): Base client class for interacting with a database.
+
+Functions:
+    index_key: Returns the key a value is kept by in a hash index.
 """
 
+import asyncio
+import bisect
+import collections.abc
+import concurrent.futures
+import http
+import json
 import typing
 import uuid
 
@@ -17,6 +28,7 @@ import fastapi
 import pydantic
 
 from .. import dependencies
+from ..models import FieldSpecification
 
 ResourceTable = typing.Annotated[str, pydantic.Field(description="The name of the table in the database")]
 ResourceId = typing.Annotated[
@@ -27,6 +39,122 @@ ResourceObj = typing.Annotated[
 ]
 Partial = typing.Annotated[bool | None, pydantic.Field(description="Perform a partial update")]
 
+T = typing.TypeVar("T")
+K = typing.TypeVar("K")
+
+RANGE_OPERATORS = frozenset({"eq", "lt", "le", "gt", "ge"})
+STREAM_BATCH_SIZE = 500
+
+
+def index_key(value: typing.Any) -> typing.Any:
+    """Returns the key a value is kept by in a hash index, since lists and dicts can't be hashed.
+
+    Args:
+        value (typing.Any): The value.
+
+    Returns:
+        typing.Any: The value, or the JSON of a list or dict.
+    """
+    if isinstance(value, list | dict):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def _first(entry: tuple[typing.Any, typing.Any]) -> typing.Any:
+    """Returns the order key of an entry of a sorted index."""
+    return entry[0]
+
+
+class SortedIndex(typing.Generic[K]):
+    """A class representing the values of a field in order, with the resource IDs holding them.
+
+    Entries are `(order_key(value), resource_id)` tuples kept in a sorted list, so a range of values, or the page of
+    an ordered select, is found by bisecting it and read in O(log n + k).
+
+    Attributes:
+        entries (list[tuple[tuple[int, typing.Any], K]]): The entries, sorted.
+
+    Args:
+        items (collections.abc.Iterable[tuple[typing.Any, K]]): The values and resource IDs to index. Defaults to none.
+    """
+
+    __slots__ = ("entries",)
+
+    def __init__(self, items: collections.abc.Iterable[tuple[typing.Any, K]] = ()) -> None:
+        """Initialize a SortedIndex instance.
+
+        Args:
+            items (collections.abc.Iterable[tuple[typing.Any, K]]): The values and resource IDs to index.
+                Defaults to none.
+        """
+        self.entries = sorted((dependencies.order_key(value), resource_id) for value, resource_id in items)
+
+    def add(self, value: typing.Any, resource_id: K) -> None:
+        """Adds the value of a resource.
+
+        Args:
+            value (typing.Any): The value.
+            resource_id (K): The ID of the resource.
+        """
+        bisect.insort(self.entries, (dependencies.order_key(value), resource_id))
+
+    def discard(self, value: typing.Any, resource_id: K) -> None:
+        """Removes the value of a resource, if it is indexed.
+
+        Args:
+            value (typing.Any): The value.
+            resource_id (K): The ID of the resource.
+        """
+        entry = (dependencies.order_key(value), resource_id)
+        position = bisect.bisect_left(self.entries, entry)
+        if position < len(self.entries) and self.entries[position] == entry:
+            del self.entries[position]
+
+    def scan(
+        self,
+        predicates: list[dependencies.Predicate],
+        position: tuple[tuple[int, typing.Any], K] | None = None,
+        *,
+        descending: bool = False,
+    ) -> collections.abc.Iterator[K]:
+        """Iterates over the resource IDs in order, within the range the predicates on the field bound.
+
+        Only "eq", "lt", "le", "gt" and "ge" predicates with a number or string value bound the range, as the other
+        predicates don't order values the way `order_key` does; the range holds every value they may match.
+
+        Args:
+            predicates (list[Predicate]): The predicates on the field.
+            position (tuple[tuple[int, typing.Any], K] | None): The entry to start after, in the given direction.
+                Defaults to None.
+            descending (bool): Whether to iterate in descending order. Defaults to False.
+
+        Returns:
+            collections.abc.Iterator[K]: The resource IDs.
+        """
+        entries = self.entries
+        low, high = 0, len(entries)
+        for predicate in predicates:
+            key = dependencies.order_key(predicate.value)
+            if predicate.operator not in RANGE_OPERATORS or key[0] > 1:
+                continue
+            if predicate.operator in {"eq", "gt", "ge"}:
+                find = bisect.bisect_right if predicate.operator == "gt" else bisect.bisect_left
+                low = max(low, find(entries, key, key=_first))
+            else:
+                low = max(low, bisect.bisect_left(entries, (key[0],), key=_first))
+            if predicate.operator in {"eq", "lt", "le"}:
+                find = bisect.bisect_left if predicate.operator == "lt" else bisect.bisect_right
+                high = min(high, find(entries, key, key=_first))
+            else:
+                high = min(high, bisect.bisect_left(entries, (key[0] + 1,), key=_first))
+        if position is not None:
+            if descending:
+                high = min(high, bisect.bisect_left(entries, position))
+            else:
+                low = max(low, bisect.bisect_right(entries, position))
+        indexes = range(high - 1, low - 1, -1) if descending else range(low, high)
+        return (entries[index][1] for index in indexes)
+
 
 class Base:
     """Base client class for interacting with a database.
@@ -37,10 +165,14 @@ class Base:
     Attributes:
         exception (fastapi.HTTPException): The exception module to be used for raising HTTP exceptions.
         status (fastapi.status): The status module to be used for HTTP status codes.
+        executor (concurrent.futures.Executor | None): The executor blocking calls are run in. Defaults to None,
+            which uses the event loop's default executor.
+        indexes (list[str]): The names of the fields with a secondary index.
 
     Args:
         path (str): The path to the database.
         table (ResourceTable): The name of the table in the database.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
 
     Methods:
         insert_one(resource_id: ResourceId, resource_obj: ResourceObj): Inserts a resource object in the database.
@@ -51,22 +183,142 @@ class Base:
             the database based on the given ID. Returns ResourceObj.
         delete_one(resource_id: ResourceId): Deletes a resource from the database based on the given resource ID.
             Returns None.
-        select_many(paginate_parameters: dependencies.PaginateParameters): Retrieves multiple resources from the
-            database based on the given pagination parameters. Returns list[ResourceObj].
+        select_many(paginate_parameters: dependencies.PaginateParameters, filter_parameters:
+            dependencies.FilterParameters | None = None): Retrieves multiple resources from the database based on the
+            given pagination and filter parameters. Returns Page.
+        insert_many(resources: dict[ResourceId, ResourceObj]): Inserts resource objects in the database. Returns
+            list[ResourceObj | fastapi.HTTPException].
+        select_by_ids(resource_ids: list[ResourceId]): Retrieves the resources of the given IDs from the database.
+            Returns list[ResourceObj | fastapi.HTTPException].
+        update_many(resources: dict[ResourceId, ResourceObj], partial: Partial = None): Updates resources in the
+            database based on the given IDs. Returns list[ResourceObj | fastapi.HTTPException].
+        delete_many(resource_ids: list[ResourceId]): Deletes the resources of the given IDs from the database. Returns
+            list[fastapi.HTTPException | None].
+        stream_many(filter_parameters: dependencies.FilterParameters | None = None, batch_size: int =
+            STREAM_BATCH_SIZE): Iterates over the resources of the database matching the given filter parameters.
+            Returns collections.abc.AsyncIterator[ResourceObj].
+        rebuild_indexes(): Rebuilds the secondary indexes from the stored resources. Returns None.
+        aclose(): Releases the resources held by the client. Returns None.
+
+    Fields specified with `index=True` have a secondary index, kept consistent by every write, so that "eq" and "in"
+    filters on them look the matching resources up instead of scanning the table, and range filters and pages ordered
+    by them seek to their first resource.
+
+    The bulk methods don't raise for a single resource: their result has one item per given resource, in the given
+    order, holding either the result for that resource or the exception `*_one` would have raised for it. The default
+    implementations call the `*_one` methods one by one, and clients override them to do the work in fewer round
+    trips.
     """
 
     exception = fastapi.HTTPException
     status = fastapi.status
+    executor: concurrent.futures.Executor | None = None
 
-    def __init__(self, path: str, table: ResourceTable) -> None:
+    def __init__(self, path: str, table: ResourceTable, *, fields: list[FieldSpecification] | None = None) -> None:
         """Initialize the Base class.
 
         Args:
             path (str): The path to the database.
             table (ResourceTable): The name of the table in the database.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
         """
         self.path = path
         self.table = table
+        self.fields = fields or []
+        self.indexes = [field.name for field in self.fields if field.index]
+
+    async def _run(self, func: collections.abc.Callable[..., T], *args: typing.Any) -> T:
+        """Runs a blocking call in the client's executor, so it doesn't block the event loop.
+
+        Args:
+            func (collections.abc.Callable[..., T]): The blocking callable.
+            *args (typing.Any): The positional arguments for the callable.
+
+        Returns:
+            T: The value returned by the callable.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _result(self, awaitable: collections.abc.Awaitable[T]) -> T | fastapi.HTTPException:
+        """Awaits a call, returning the exception it raises instead of raising it.
+
+        Args:
+            awaitable (collections.abc.Awaitable[T]): The call.
+
+        Returns:
+            T | fastapi.HTTPException: The value returned by the call, or the exception it raised.
+        """
+        try:
+            return await awaitable
+        except self.exception as exception:
+            return exception
+
+    def _predicates(self, filter_parameters: dependencies.FilterParameters | None) -> list[dependencies.Predicate]:
+        """Checks the filter parameters against the fields specification, converting their values to the field types.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters.
+
+        Returns:
+            list[Predicate]: The predicates, with converted values.
+
+        Raises:
+            self.exception: If a field is not in the fields specification, or a value is not valid for its field.
+        """
+        if filter_parameters is None:
+            return []
+        try:
+            return filter_parameters.bind(self.fields)
+        except ValueError as exception:
+            raise self.exception(http.HTTPStatus.UNPROCESSABLE_ENTITY, str(exception)) from exception
+
+    def _order_by(self, paginate_parameters: dependencies.PaginateParameters) -> str | None:
+        """Checks the field the resources are ordered by against the fields specification.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+
+        Returns:
+            str | None: The name of the field, or None if resources are ordered by ID.
+
+        Raises:
+            self.exception: If the field is not in the fields specification.
+        """
+        order_by = paginate_parameters.order_by
+        if order_by is not None and order_by not in {field.name for field in self.fields}:
+            raise self.exception(http.HTTPStatus.UNPROCESSABLE_ENTITY, f"unknown field {order_by!r}")
+        return order_by
+
+    def _range(self, predicates: list[dependencies.Predicate]) -> str | None:
+        """Finds an indexed field whose values some predicates bound, so that a sorted index can answer them.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            str | None: The name of the field of the first "lt", "le", "gt" or "ge" predicate on an indexed field, or
+                None if there is none.
+        """
+        for predicate in predicates:
+            if predicate.field in self.indexes and predicate.operator in RANGE_OPERATORS - {"eq"}:
+                return predicate.field
+        return None
+
+    def _lookup(self, predicates: list[dependencies.Predicate]) -> tuple[str, list[typing.Any]] | None:
+        """Finds a predicate that can be answered by a secondary index.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            tuple[str, list[typing.Any]] | None: The name of the indexed field and the values it is equal to, of the
+                first "eq" or "in" predicate on an indexed field, or None if there is none.
+        """
+        for predicate in predicates:
+            if predicate.field in self.indexes and predicate.operator in {"eq", "in"}:
+                return predicate.field, predicate.value if predicate.operator == "in" else [predicate.value]
+        return None
 
     async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
         """Inserts a resource object in the database.
@@ -133,13 +385,128 @@ class Base:
         """
         raise NotImplementedError
 
-    async def select_many(self, paginate_parameters: dependencies.PaginateParameters) -> list[ResourceObj]:
-        """Retrieves multiple resources from the database based on the given pagination parameters.
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        The filter is evaluated by the database, before pagination.
 
         Args:
             paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
 
         Returns:
-            list[ResourceObj]: A list of objects representing the retrieved resources.
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
         """
         raise NotImplementedError
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        return [
+            await self._result(self.insert_one(resource_id, resource_obj))
+            for resource_id, resource_obj in resources.items()
+        ]
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return [await self._result(self.select_one(resource_id)) for resource_id in resource_ids]
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        return [
+            await self._result(self.update_one(resource_id, resource_obj, partial))
+            for resource_id, resource_obj in resources.items()
+        ]
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        return [await self._result(self.delete_one(resource_id)) for resource_id in resource_ids]
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        Resources are read `batch_size` at a time, so a whole table is read with constant memory, and every batch
+        seeks past the previous one instead of skipping it. A resource written while the iteration is running may or
+        may not be seen by it.
+
+        The default implementation follows the cursors of `select_many`, a page per batch.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        paginate_parameters = dependencies.PaginateParameters(limit=batch_size)
+        while True:
+            page = await self.select_many(paginate_parameters, filter_parameters)
+            for resource_obj in page:
+                yield resource_obj
+            if page.cursor is None:
+                return
+            paginate_parameters = dependencies.PaginateParameters(limit=batch_size, cursor=page.cursor)
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the secondary indexes from the stored resources, e.g. after indexing a field of existing data.
+
+        The default implementation keeps no index and does nothing.
+
+        Returns:
+            None
+        """
+
+    async def aclose(self) -> None:
+        """Releases the resources held by the client, writing out anything still buffered.
+
+        The default implementation holds nothing and does nothing.
+
+        Returns:
+            None
+        """
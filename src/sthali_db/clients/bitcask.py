@@ -0,0 +1,1039 @@
+"""This module provides the client class for interacting with an append-only log of resources, in the Bitcask way."""
+
+import bisect
+import collections.abc
+import concurrent.futures
+import functools
+import itertools
+import logging
+import os
+import pathlib
+import struct
+import threading
+import typing
+import uuid
+import zlib
+
+import fastapi
+
+from ..codecs import Codec, get_codec
+from ..registry import registry
+from . import (
+    STREAM_BATCH_SIZE,
+    Base,
+    FieldSpecification,
+    Partial,
+    ResourceId,
+    ResourceObj,
+    SortedIndex,
+    dependencies,
+    index_key,
+)
+
+logger = logging.getLogger(__name__)
+
+# a record is a CRC32 of the rest of it, the resource ID, a tombstone flag, the size of the value, then the value
+_CRC = struct.Struct("<I")
+_HEADER = struct.Struct("<16sBI")
+HEADER_SIZE = _CRC.size + _HEADER.size
+# a hint is the resource ID, the tombstone flag, the offset and the size of the value of a record
+_HINT = struct.Struct("<16sBQI")
+
+Segment = tuple[int, int]
+
+
+class Entry(typing.NamedTuple):
+    """The position of the latest value of a resource in the segment files.
+
+    Attributes:
+        segment (Segment): The number and version of the segment.
+        offset (int): The offset of the value in the segment.
+        size (int): The size of the value.
+    """
+
+    segment: Segment
+    offset: int
+    size: int
+
+
+def _record(key: uuid.UUID, value: bytes | None) -> bytes:
+    """Returns the record of a value, or of a tombstone if the value is None.
+
+    Args:
+        key (uuid.UUID): The ID of the resource.
+        value (bytes | None): The encoded value.
+
+    Returns:
+        bytes: The record.
+    """
+    body = _HEADER.pack(key.bytes, value is None, len(value or b"")) + (value or b"")
+    return _CRC.pack(zlib.crc32(body)) + body
+
+
+def _pread(handle: typing.BinaryIO, size: int, offset: int) -> bytes:
+    """Reads bytes at an offset of a file, without moving its position where the platform allows it.
+
+    Args:
+        handle (typing.BinaryIO): The file.
+        size (int): The number of bytes.
+        offset (int): The offset.
+
+    Returns:
+        bytes: The bytes read.
+    """
+    if hasattr(os, "pread"):
+        return os.pread(handle.fileno(), size, offset)
+    handle.seek(offset)  # pragma: no cover
+    return handle.read(size)  # pragma: no cover
+
+
+class Store:
+    """A class representing the segment files of a table, with the in-memory index of their latest records.
+
+    Every write appends records to the active segment, with a single write call, and points the index, the keydir,
+    from each written resource ID to the offset of its value, so a read is a single positioned read. Once the active
+    segment reaches `max_segment_size` bytes it is closed, its hint file is written, and a new one is opened.
+
+    Closed segments never change. Once the records they hold that are superseded or deleted make up `compact_ratio` of
+    their size, they are compacted in a background thread: their latest records are copied to a new segment, numbered
+    after them, and they are removed, oldest first, so a crash at any point leaves segments replaying to the same data.
+
+    A hint file holds the resource ID and position of every record of its segment, without the values, so opening the
+    store reads the hint files instead of the segments. A segment without one, such as the last one after a crash, is
+    replayed, dropping the torn records at its end.
+
+    Every method but `compact` expects the caller to hold `lock`.
+
+    Args:
+        directory (pathlib.Path): The directory of the segment files, created if it doesn't exist.
+        codec (Codec): The codec of the values.
+        max_segment_size (int): The size in bytes past which the active segment is closed.
+        compact_ratio (float): The share of stale bytes in the closed segments past which they are compacted.
+        sync (bool): Whether every write is flushed to the disk before it returns.
+
+    Attributes:
+        keydir (dict[uuid.UUID, Entry]): The position of the latest value of every resource.
+        keys (list[uuid.UUID]): The resource IDs, sorted.
+        values (dict[str, dict[typing.Any, set[uuid.UUID]]]): The IDs of the resources holding every value of an
+            indexed field, by field, kept by the clients of the table.
+        sorted (dict[str, SortedIndex[uuid.UUID]]): The sorted values of every indexed field, by field, kept by the
+            clients of the table.
+        lock (threading.RLock): The lock serialising the operations on the store.
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        *,
+        codec: Codec,
+        max_segment_size: int,
+        compact_ratio: float,
+        sync: bool,
+    ) -> None:
+        """Initialize a Store instance, loading the index from the hint files and segments of the directory.
+
+        Args:
+            directory (pathlib.Path): The directory of the segment files, created if it doesn't exist.
+            codec (Codec): The codec of the values.
+            max_segment_size (int): The size in bytes past which the active segment is closed.
+            compact_ratio (float): The share of stale bytes in the closed segments past which they are compacted.
+            sync (bool): Whether every write is flushed to the disk before it returns.
+        """
+        self.directory = directory
+        self.codec = codec
+        self.max_segment_size = max_segment_size
+        self.compact_ratio = compact_ratio
+        self.sync = sync
+        self.lock = threading.RLock()
+        self.keydir: dict[uuid.UUID, Entry] = {}
+        self.keys: list[uuid.UUID] = []
+        self.values: dict[str, dict[typing.Any, set[uuid.UUID]]] = {}
+        self.sorted: dict[str, SortedIndex[uuid.UUID]] = {}
+        self.files: dict[Segment, typing.BinaryIO] = {}
+        self.sizes: dict[Segment, int] = {}
+        self.stale: dict[Segment, int] = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(1, "sthali-db-bitcask-compaction")
+        self._compaction: concurrent.futures.Future[None] | None = None
+        self._compacting = threading.Lock()
+        self._hints = bytearray()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        for path in directory.glob("*.compact"):
+            path.unlink()
+        segments = sorted(self._segment(path) for path in directory.glob("*.data"))
+        for segment in segments:
+            self._load(segment)
+        self.keys = sorted(self.keydir)
+        # the last segment may be torn, so writes go to a new one rather than after it
+        self.active: Segment = (segments[-1][0] + 1 if segments else 0, 0)
+        self._writer = self._path(self.active, ".data").open("ab")
+        self._open(self.active, 0)
+        self._maybe_compact()
+
+    def _path(self, segment: Segment, suffix: str) -> pathlib.Path:
+        return self.directory / f"{segment[0]:010d}-{segment[1]:05d}{suffix}"
+
+    @staticmethod
+    def _segment(path: pathlib.Path) -> Segment:
+        number, version = path.stem.split("-")
+        return int(number), int(version)
+
+    def _open(self, segment: Segment, size: int) -> None:
+        self.files[segment] = self._path(segment, ".data").open("rb")
+        self.sizes[segment] = size
+        self.stale.setdefault(segment, 0)
+
+    def _apply(self, segment: Segment, key: uuid.UUID, tombstone: int, offset: int, size: int) -> None:
+        """Applies a record to the keydir, counting the bytes it makes stale.
+
+        Args:
+            segment (Segment): The segment of the record.
+            key (uuid.UUID): The ID of the resource.
+            tombstone (int): Whether the record is a tombstone.
+            offset (int): The offset of the value of the record.
+            size (int): The size of the value of the record.
+        """
+        previous = self.keydir.pop(key, None)
+        if previous is not None:
+            self.stale[previous.segment] += HEADER_SIZE + previous.size
+        if tombstone:
+            self.stale[segment] += HEADER_SIZE
+        else:
+            self.keydir[key] = Entry(segment, offset, size)
+
+    def _load(self, segment: Segment) -> None:
+        """Loads the records of a segment into the keydir, from its hint file if it has one.
+
+        Args:
+            segment (Segment): The segment.
+        """
+        self.stale[segment] = 0
+        hint_path = self._path(segment, ".hint")
+        hints = hint_path.read_bytes() if hint_path.exists() else b""
+        if hints and len(hints) % _HINT.size == 0:
+            for key, tombstone, offset, size in _HINT.iter_unpack(hints):
+                self._apply(segment, uuid.UUID(bytes=key), tombstone, offset, size)
+            self._open(segment, self._path(segment, ".data").stat().st_size)
+            return
+        hints = self._replay(segment)
+        self._write_hints(segment, hints)
+        self._open(segment, self._path(segment, ".data").stat().st_size)
+
+    def _replay(self, segment: Segment) -> bytearray:
+        """Reads the records of a segment into the keydir, truncating it at the first torn record.
+
+        Args:
+            segment (Segment): The segment.
+
+        Returns:
+            bytearray: The hints of the records read.
+        """
+        hints = bytearray()
+        path = self._path(segment, ".data")
+        offset = 0
+        with path.open("rb") as handle:
+            while len(header := handle.read(HEADER_SIZE)) == HEADER_SIZE:
+                (crc,) = _CRC.unpack_from(header)
+                key, tombstone, size = _HEADER.unpack_from(header, _CRC.size)
+                value = handle.read(size)
+                if len(value) < size or zlib.crc32(header[_CRC.size :] + value) != crc:
+                    break
+                self._apply(segment, uuid.UUID(bytes=key), tombstone, offset + HEADER_SIZE, size)
+                hints += _HINT.pack(key, tombstone, offset + HEADER_SIZE, size)
+                offset += HEADER_SIZE + size
+        if offset < path.stat().st_size:
+            with path.open("r+b") as handle:
+                handle.truncate(offset)
+        return hints
+
+    def _write_hints(self, segment: Segment, hints: bytes) -> None:
+        """Writes the hint file of a segment, replacing it atomically.
+
+        Args:
+            segment (Segment): The segment.
+            hints (bytes): The hints of its records.
+        """
+        temporary = self._path(segment, ".hint.compact")
+        with temporary.open("wb") as handle:
+            handle.write(hints)
+            handle.flush()
+            os.fsync(handle.fileno())
+        temporary.replace(self._path(segment, ".hint"))
+
+    def read(self, entry: Entry) -> ResourceObj:
+        """Reads the value at a position.
+
+        Args:
+            entry (Entry): The position.
+
+        Returns:
+            ResourceObj: The value.
+        """
+        return self.codec.decode(_pread(self.files[entry.segment], entry.size, entry.offset))
+
+    def get(self, key: uuid.UUID) -> ResourceObj | None:
+        """Reads the latest value of a resource.
+
+        Args:
+            key (uuid.UUID): The ID of the resource.
+
+        Returns:
+            ResourceObj | None: The value, or None if the resource doesn't exist.
+        """
+        entry = self.keydir.get(key)
+        return None if entry is None else self.read(entry)
+
+    def get_many(self, keys: collections.abc.Iterable[uuid.UUID]) -> dict[uuid.UUID, ResourceObj]:
+        """Reads the latest values of resources in the order of the segments, skipping the ones not found.
+
+        Args:
+            keys (collections.abc.Iterable[uuid.UUID]): The IDs of the resources.
+
+        Returns:
+            dict[uuid.UUID, ResourceObj]: The values, by resource ID.
+        """
+        entries = sorted((entry, key) for key in keys if (entry := self.keydir.get(key)) is not None)
+        return {key: self.read(entry) for entry, key in entries}
+
+    def iter_many(
+        self,
+        keys: collections.abc.Iterable[uuid.UUID],
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.Iterator[tuple[uuid.UUID, ResourceObj]]:
+        """Reads the latest values of resources in batches, so that only one batch of them is held at a time.
+
+        Args:
+            keys (collections.abc.Iterable[uuid.UUID]): The IDs of the resources.
+            batch_size (int): The number of values read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            tuple[uuid.UUID, ResourceObj]: The ID and value of every resource found, batch by batch.
+        """
+        keys = iter(keys)
+        while batch := list(itertools.islice(keys, batch_size)):
+            yield from self.get_many(batch).items()
+
+    def write(self, items: list[tuple[uuid.UUID, ResourceObj | None]]) -> None:
+        """Appends the records of values, or of tombstones for the None ones, with a single write.
+
+        Args:
+            items (list[tuple[uuid.UUID, ResourceObj | None]]): The IDs of the resources and their values.
+        """
+        if not items:
+            return
+        records = [(key, _record(key, None if value is None else self.codec.encode(value))) for key, value in items]
+        self._writer.write(b"".join(record for _, record in records))
+        self._writer.flush()
+        if self.sync:
+            os.fsync(self._writer.fileno())
+        offset = self.sizes[self.active]
+        for key, record in records:
+            tombstone, size = _HEADER.unpack_from(record, _CRC.size)[1:]
+            if tombstone and key in self.keydir:
+                del self.keys[bisect.bisect_left(self.keys, key)]
+            elif not tombstone and key not in self.keydir:
+                bisect.insort(self.keys, key)
+            self._apply(self.active, key, tombstone, offset + HEADER_SIZE, size)
+            self._hints += _HINT.pack(key.bytes, tombstone, offset + HEADER_SIZE, size)
+            offset += len(record)
+        self.sizes[self.active] = offset
+        if offset >= self.max_segment_size:
+            self._roll()
+
+    def _roll(self) -> None:
+        """Closes the active segment, writing its hint file, and opens a new one."""
+        self._writer.close()
+        self._write_hints(self.active, self._hints)
+        self._hints = bytearray()
+        self.active = (self.active[0] + 1, 0)
+        self._writer = self._path(self.active, ".data").open("ab")
+        self._open(self.active, 0)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Schedules a compaction of the closed segments if enough of them is stale."""
+        closed = [segment for segment in self.sizes if segment != self.active]
+        size = sum(self.sizes[segment] for segment in closed)
+        stale = sum(self.stale[segment] for segment in closed)
+        running = self._compaction is not None and not self._compaction.done()
+        if size and stale >= self.compact_ratio * size and not running:
+            self._compaction = self.executor.submit(self.compact)
+            self._compaction.add_done_callback(self._compacted)
+
+    def _compacted(self, future: concurrent.futures.Future[None]) -> None:
+        """Logs the exception a background compaction failed with, as nothing awaits it.
+
+        Args:
+            future (concurrent.futures.Future[None]): The future of the compaction.
+        """
+        if not future.cancelled() and (exception := future.exception()) is not None:
+            logger.error("compacting %s failed", self.directory, exc_info=exception)
+
+    def compact(self) -> None:
+        """Rewrites the latest records of the closed segments into a single new segment, and removes them.
+
+        The values are copied without holding the lock, so reads and writes go on meanwhile; a resource written
+        during the copy keeps its newer value. Compactions run one at a time.
+        """
+        with self._compacting:
+            self._compact()
+
+    def _compact(self) -> None:
+        with self.lock:
+            segments = sorted(segment for segment in self.sizes if segment != self.active)
+            if not segments:
+                return
+            closed = set(segments)
+            live = sorted((entry, key) for key, entry in self.keydir.items() if entry.segment in closed)
+        # numbered after the segments it replaces and before the active one, so replaying them all stays correct
+        target = (segments[-1][0], segments[-1][1] + 1)
+        temporary = self._path(target, ".data.compact")
+        moved: list[tuple[uuid.UUID, Entry, Entry]] = []
+        hints = bytearray()
+        offset = 0
+        handles = {segment: self._path(segment, ".data").open("rb") for segment in segments}
+        try:
+            with temporary.open("wb") as output:
+                for entry, key in live:
+                    record = _record(key, _pread(handles[entry.segment], entry.size, entry.offset))
+                    output.write(record)
+                    moved.append((key, entry, Entry(target, offset + HEADER_SIZE, entry.size)))
+                    hints += _HINT.pack(key.bytes, 0, offset + HEADER_SIZE, entry.size)
+                    offset += len(record)
+                output.flush()
+                os.fsync(output.fileno())
+        finally:
+            for handle in handles.values():
+                handle.close()
+        self._write_hints(target, hints)
+        with self.lock:
+            temporary.replace(self._path(target, ".data"))
+            self.stale[target] = 0
+            for key, previous, entry in moved:
+                if self.keydir.get(key) == previous:
+                    self.keydir[key] = entry
+                else:
+                    self.stale[target] += HEADER_SIZE + entry.size
+            self._open(target, offset)
+            # oldest first, so that a tombstone is never removed before the values it deletes
+            for segment in segments:
+                self.files.pop(segment).close()
+                del self.sizes[segment], self.stale[segment]
+                self._path(segment, ".data").unlink()
+                self._path(segment, ".hint").unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Waits for a running compaction, writes the hint file of the active segment and closes the files."""
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            self._writer.close()
+            if self.sizes[self.active]:
+                self._write_hints(self.active, self._hints)
+            for handle in self.files.values():
+                handle.close()
+            if not self.sizes[self.active]:
+                self._path(self.active, ".data").unlink()
+
+
+def _open(directory: pathlib.Path, **options: typing.Any) -> Store:
+    """Opens the store of a table.
+
+    Args:
+        directory (pathlib.Path): The directory of the segment files of the table.
+        **options (typing.Any): The options of the store.
+
+    Returns:
+        Store: The store.
+    """
+    return Store(directory, **options)
+
+
+class BitcaskClient(Base):
+    """A class representing an append-only log client for database operations, in the Bitcask way.
+
+    The resources of a table are appended to segment files in a directory of their own, `path/table_name`: every
+    insert, update and delete appends one record, with one sequential write, and never rewrites earlier ones. An
+    in-memory hash index from every resource ID to the offset of its latest value, and the sorted resource IDs, are
+    kept in step, so `select_one` is a single positioned read and a page is found by bisecting the sorted IDs. Bulk
+    writes append all their records with a single write.
+
+    Superseded and deleted values are reclaimed by a background compaction of the closed segments, and hint files
+    holding the offsets of their records let a restart rebuild the index without reading the values. See `Store`.
+
+    Indexed fields have an in-memory hash index and a sorted index, like the TinyDB client's, built by reading every
+    value, a batch at a time, when the first client indexing them is created. They are kept with the store, so every
+    client of the table reads and updates the same ones.
+
+    The values are written with a codec, JSON by default; any codec works, as the values are not queried on disk.
+
+    The clients of a table share its store, kept in the registry of the process until the last of them is closed, so
+    the segments are opened and loaded once. The first client of a table decides the options of its store.
+
+    Every operation runs in a thread pool to keep the event loop free, and is serialised by the lock of the store.
+
+    Args:
+        path (str): The path to the directory of the database.
+        table_name (str): The name of the table in the database.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+        codec (str): The name of the codec of the values, one of "json", "orjson" and "msgpack". Defaults to "json".
+        max_segment_size (int): The size in bytes past which a segment is closed. Defaults to 64 MiB.
+        compact_ratio (float): The share of stale bytes in the closed segments past which they are compacted.
+            Defaults to 0.5.
+        sync (bool): Whether every write is flushed to the disk before it returns. Defaults to False, which leaves
+            it to the operating system, so a crash of the machine may lose the last writes.
+        max_workers (int | None): The size of the client's thread pool. Defaults to None, which uses the event loop's
+            default executor.
+
+    Attributes:
+        store (Store): The segment files of the table.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str,
+        table_name: str,
+        *,
+        fields: list[FieldSpecification] | None = None,
+        codec: str = "json",
+        max_segment_size: int = 64 * 1024 * 1024,
+        compact_ratio: float = 0.5,
+        sync: bool = False,
+        max_workers: int | None = None,
+    ) -> None:
+        """Initialize the BitcaskClient class.
+
+        Args:
+            path (str): The path to the directory of the database.
+            table_name (str): The name of the table in the database.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+            codec (str): The name of the codec of the values. Defaults to "json".
+            max_segment_size (int): The size in bytes past which a segment is closed. Defaults to 64 MiB.
+            compact_ratio (float): The share of stale bytes in the closed segments past which they are compacted.
+                Defaults to 0.5.
+            sync (bool): Whether every write is flushed to the disk before it returns. Defaults to False.
+            max_workers (int | None): The size of the client's thread pool. Defaults to None, which uses the event
+                loop's default executor.
+
+        Raises:
+            ValueError: If there is no codec of that name.
+            ImportError: If the library of the codec is not installed.
+        """
+        super().__init__(path, table_name, fields=fields)
+        self.executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers, "sthali-db-bitcask") if max_workers else None
+        )
+        directory = pathlib.Path(path).resolve() / table_name
+        self._registry_key = ("bitcask", str(directory))
+        self._closed = False
+        self.store: Store = registry.acquire(
+            self._registry_key,
+            functools.partial(
+                _open,
+                directory,
+                codec=get_codec(codec),
+                max_segment_size=max_segment_size,
+                compact_ratio=compact_ratio,
+                sync=sync,
+            ),
+        )
+        self._lock = self.store.lock
+        # the indexes are mutated in place, never replaced, so these are the ones every client of the table holds
+        self._values = self.store.values
+        self._sorted = self.store.sorted
+        with self._lock:
+            # the fields indexed by this client and not by the previous clients of the table are indexed now
+            if missing := [name for name in self.indexes if name not in self._values]:
+                self._values.update({name: {} for name in missing})
+                self._sorted.update({name: SortedIndex() for name in missing})
+                for key, resource_obj in self.store.iter_many(self.store.keys):
+                    self._index_fields(key, resource_obj, missing)
+
+    async def aclose(self) -> None:
+        """Releases the store of the table, closing it if no other client uses it, and the client's thread pool.
+
+        Returns:
+            None
+        """
+        if self._closed:
+            return
+        self._closed = True
+        store = registry.release(self._registry_key)
+        if store is not None:
+            await self._run(store.close)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    async def compact(self) -> None:
+        """Compacts the closed segments of the table now, rather than once enough of them is stale.
+
+        Returns:
+            None
+        """
+        await self._run(self.store.compact)
+
+    def _index_fields(self, key: uuid.UUID, resource_obj: ResourceObj, names: list[str] | None = None) -> None:
+        """Adds a resource to the indexes of the indexed fields.
+
+        Args:
+            key (uuid.UUID): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+            names (list[str] | None): The fields. Defaults to None, every indexed field of the table.
+        """
+        for name in self._values if names is None else names:
+            self._values[name].setdefault(index_key(resource_obj.get(name)), set()).add(key)
+            self._sorted[name].add(resource_obj.get(name), key)
+
+    def _unindex_fields(self, key: uuid.UUID, resource_obj: ResourceObj) -> None:
+        """Removes a resource from the indexes of the indexed fields.
+
+        Args:
+            key (uuid.UUID): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+        """
+        for name, index in self._values.items():
+            value = index_key(resource_obj.get(name))
+            keys = index.get(value, set())
+            keys.discard(key)
+            if not keys:
+                index.pop(value, None)
+            self._sorted[name].discard(resource_obj.get(name), key)
+
+    def _rebuild_indexes(self) -> None:
+        """Builds the indexes of the indexed fields of the table from the values of the store."""
+        with self._lock:
+            names = [*self._values, *(name for name in self.indexes if name not in self._values)]
+            self._values.clear()
+            self._values.update({name: {} for name in names})
+            self._sorted.clear()
+            self._sorted.update({name: SortedIndex() for name in names})
+            if self._values:
+                for key, resource_obj in self.store.iter_many(self.store.keys):
+                    self._index_fields(key, resource_obj)
+
+    def _get(self, resource_id: ResourceId) -> ResourceObj:
+        """Retrieves a resource from the database based on the given resource ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to retrieve.
+
+        Returns:
+            ResourceObj: The retrieved resource.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        resource_obj = self.store.get(resource_id)
+        if resource_obj is None:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return resource_obj
+
+    def _insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        with self._lock:
+            if resource_id in self.store.keydir:
+                raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+            self.store.write([(resource_id, resource_obj)])
+            self._index_fields(resource_id, resource_obj)
+            return {"id": resource_id, **resource_obj}
+
+    def _select_one(self, resource_id: ResourceId) -> ResourceObj:
+        with self._lock:
+            return {"id": resource_id, **self._get(resource_id)}
+
+    def _update_one(self, resource_id: ResourceId, resource_obj: ResourceObj, partial: Partial) -> ResourceObj:
+        with self._lock:
+            if partial or self._values:
+                _resource_obj = self._get(resource_id)
+                self._unindex_fields(resource_id, _resource_obj)
+                resource_obj = {**_resource_obj, **resource_obj} if partial else resource_obj
+            elif resource_id not in self.store.keydir:
+                raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            self.store.write([(resource_id, resource_obj)])
+            self._index_fields(resource_id, resource_obj)
+            return {"id": resource_id, **resource_obj}
+
+    def _delete_one(self, resource_id: ResourceId) -> None:
+        with self._lock:
+            if self._values:
+                self._unindex_fields(resource_id, self._get(resource_id))
+            elif resource_id not in self.store.keydir:
+                raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            self.store.write([(resource_id, None)])
+
+    def _insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            new = {key: resource_obj for key, resource_obj in resources.items() if key not in self.store.keydir}
+            self.store.write(list(new.items()))
+            for key, resource_obj in new.items():
+                self._index_fields(key, resource_obj)
+            return [
+                {"id": resource_id, **resource_obj}
+                if resource_id in new
+                else self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+                for resource_id, resource_obj in resources.items()
+            ]
+
+    def _select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            found = self.store.get_many(resource_ids)
+            return [
+                {"id": resource_id, **found[resource_id]}
+                if resource_id in found
+                else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for resource_id in resource_ids
+            ]
+
+    def _update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            if partial or self._values:
+                current = self.store.get_many(resources)
+                for key, resource_obj in current.items():
+                    self._unindex_fields(key, resource_obj)
+                updated = {
+                    key: {**current[key], **resource_obj} if partial else resource_obj
+                    for key, resource_obj in resources.items()
+                    if key in current
+                }
+            else:
+                updated = {key: resource_obj for key, resource_obj in resources.items() if key in self.store.keydir}
+            self.store.write(list(updated.items()))
+            for key, resource_obj in updated.items():
+                self._index_fields(key, resource_obj)
+            return [
+                {"id": resource_id, **updated[resource_id]}
+                if resource_id in updated
+                else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for resource_id in resources
+            ]
+
+    def _delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        with self._lock:
+            if self._values:
+                for key, resource_obj in self.store.get_many(resource_ids).items():
+                    self._unindex_fields(key, resource_obj)
+            found = list(dict.fromkeys(key for key in resource_ids if key in self.store.keydir))
+            self.store.write([(key, None) for key in found])
+            deleted = set(found)
+            return [
+                None if resource_id in deleted else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for resource_id in resource_ids
+            ]
+
+    @staticmethod
+    def _matcher(predicates: list[dependencies.Predicate]) -> collections.abc.Callable[[ResourceObj], bool]:
+        """Compiles predicates into a function telling whether a resource object satisfies all of them.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            collections.abc.Callable[[ResourceObj], bool]: The function, which takes a resource object.
+        """
+        checks = [
+            (predicate.field, dependencies.OPERATORS[predicate.operator], predicate.value) for predicate in predicates
+        ]
+
+        def match(resource_obj: ResourceObj) -> bool:
+            return all(evaluate(resource_obj.get(field), argument) for field, evaluate, argument in checks)
+
+        return match
+
+    def _candidates(self, predicates: list[dependencies.Predicate]) -> list[uuid.UUID] | None:
+        """Returns the IDs of the resources the predicates may match, as the indexes narrow them down.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            list[uuid.UUID] | None: The resource IDs, sorted, or None if no index narrows them down.
+        """
+        if (lookup := self._lookup(predicates)) is not None:
+            name, values = lookup
+            index = self._values[name]
+            return sorted(set().union(*(index.get(index_key(value), ()) for value in values)))
+        if (name := self._range(predicates)) is not None:
+            return sorted(self._sorted[name].scan([predicate for predicate in predicates if predicate.field == name]))
+        return None
+
+    def _filter_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        keys: list[uuid.UUID],
+    ) -> dependencies.Page:
+        skip, limit = paginate_parameters.skip, paginate_parameters.limit
+        after = paginate_parameters.after
+        keys = keys[bisect.bisect_right(keys, after) if after else 0 :]
+        if not predicates:
+            values = self.store.get_many(keys[skip : skip + limit])
+            return paginate_parameters.page([{"id": key, **values[key]} for key in keys[skip : skip + limit]])
+        match = self._matcher(predicates)
+        matching: list[tuple[uuid.UUID, ResourceObj]] = []
+        # the values are read in batches, until the page is full or the resources are exhausted
+        for start in range(0, len(keys), max(skip + limit, 64)):
+            batch = keys[start : start + max(skip + limit, 64)]
+            values = self.store.get_many(batch)
+            matching.extend((key, values[key]) for key in batch if match(values[key]))
+            if len(matching) >= skip + limit:
+                break
+        return paginate_parameters.page(
+            [{"id": key, **resource_obj} for key, resource_obj in matching[skip : skip + limit]],
+        )
+
+    def _top_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        keys: list[uuid.UUID],
+    ) -> dependencies.Page:
+        order_by = typing.cast("str", paginate_parameters.order_by)
+        match = self._matcher(predicates)
+        # only the values ordered by are kept while the resources are read, and the page is read again
+        top = paginate_parameters.top(
+            {"id": key, order_by: resource_obj.get(order_by)}
+            for key, resource_obj in self.store.iter_many(keys)
+            if match(resource_obj)
+        )
+        values = self.store.get_many(item["id"] for item in top)
+        return dependencies.Page([{"id": item["id"], **values[item["id"]]} for item in top], top.cursor)
+
+    def _scan_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+    ) -> dependencies.Page:
+        order_by = typing.cast("str", paginate_parameters.order_by)
+        skip, limit = paginate_parameters.skip, paginate_parameters.limit
+        scan = self._sorted[order_by].scan(
+            [predicate for predicate in predicates if predicate.field == order_by],
+            paginate_parameters.position,
+            descending=paginate_parameters.descending,
+        )
+        match = self._matcher(predicates)
+        matching: list[tuple[uuid.UUID, ResourceObj]] = []
+        # the values are read in batches, until the page is full or the range is exhausted
+        while len(matching) < skip + limit and (keys := list(itertools.islice(scan, max(skip + limit, 64)))):
+            values = self.store.get_many(keys)
+            matching.extend((key, values[key]) for key in keys if match(values[key]))
+        return paginate_parameters.page(
+            [{"id": key, **resource_obj} for key, resource_obj in matching[skip : skip + limit]],
+        )
+
+    def _stream_keys(self, predicates: list[dependencies.Predicate]) -> list[uuid.UUID] | None:
+        with self._lock:
+            return self._candidates(predicates)
+
+    def _stream_batch(
+        self,
+        keys: list[uuid.UUID] | None,
+        after: uuid.UUID | None,
+        batch_size: int,
+        match: collections.abc.Callable[[ResourceObj], bool],
+    ) -> tuple[list[ResourceObj], uuid.UUID | None]:
+        with self._lock:
+            keys = self.store.keys if keys is None else keys
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            batch = keys[start : start + batch_size]
+            values = self.store.get_many(batch)
+        resource_objs = [{"id": key, **values[key]} for key in batch if key in values and match(values[key])]
+        return resource_objs, batch[-1] if batch else None
+
+    def _select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+    ) -> dependencies.Page:
+        with self._lock:
+            order_by = paginate_parameters.order_by
+            if order_by is not None and self._lookup(predicates) is None and order_by in self._sorted:
+                return self._scan_many(paginate_parameters, predicates)
+            keys = self._candidates(predicates)
+            if order_by is not None:
+                return self._top_many(paginate_parameters, predicates, self.store.keys if keys is None else keys)
+            return self._filter_many(paginate_parameters, predicates, self.store.keys if keys is None else keys)
+
+    async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        """Inserts a resource object in the database, appending a single record.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be inserted.
+            resource_obj (ResourceObj): The resource object to be inserted.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource already exists in the database.
+        """
+        return await self._run(self._insert_one, resource_id, resource_obj)
+
+    async def select_one(self, resource_id: ResourceId) -> ResourceObj:
+        """Retrieves a resource from the database based on the given ID, with a single positioned read.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be retrieved.
+
+        Returns:
+            ResourceObj: The retrieved resource object.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        return await self._run(self._select_one, resource_id)
+
+    async def update_one(
+        self,
+        resource_id: ResourceId,
+        resource_obj: ResourceObj,
+        partial: Partial = None,
+    ) -> ResourceObj:
+        """Updates a resource in the database based on the given ID, appending a single record.
+
+        A full update of a table without indexed fields doesn't read the previous value.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be updated.
+            resource_obj (ResourceObj): The resource object to be updated.
+            partial (Partial): Whether to perform a partial update or replace the entire resource object.
+                Defaults to None.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        return await self._run(self._update_one, resource_id, resource_obj, partial)
+
+    async def delete_one(self, resource_id: ResourceId) -> None:
+        """Deletes a resource from the database based on the given resource ID, appending a tombstone record.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be deleted.
+
+        Returns:
+            None
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        await self._run(self._delete_one, resource_id)
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        Without a filter, only the values of the page are read. A filter reads the values in batches, in ID order,
+        until the page is full, unless it filters an indexed field by equality or range, in which case only the
+        values the indexes look up are read.
+
+        Pages ordered by an indexed field are read from its sorted index. Ordered by another field, the first
+        `skip + limit` matching resources are selected with a bounded heap, after reading every value.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        predicates = self._predicates(filter_parameters)
+        self._order_by(paginate_parameters)
+        return await self._run(self._select_many, paginate_parameters, predicates)
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database, appending their records with a single write.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        return await self._run(self._insert_many, resources)
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database, reading them in the order of the segments.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return await self._run(self._select_by_ids, resource_ids)
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs, appending their records with a single write.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        return await self._run(self._update_many, resources, partial)
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database, appending their tombstones with a single write.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        return await self._run(self._delete_many, resource_ids)
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        The sorted resource IDs, or the ones the indexes look up, are walked lazily: every batch bisects them past
+        the last resource of the previous one, and reads only the values of the batch.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        predicates = self._predicates(filter_parameters)
+        match = self._matcher(predicates)
+        keys = await self._run(self._stream_keys, predicates)
+        after = None
+        while True:
+            resource_objs, after = await self._run(self._stream_batch, keys, after, batch_size, match)
+            if after is None:
+                return
+            for resource_obj in resource_objs:
+                yield resource_obj
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the indexes of the indexed fields from the values of the store.
+
+        Returns:
+            None
+        """
+        await self._run(self._rebuild_indexes)
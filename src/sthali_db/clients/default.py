@@ -1,23 +1,283 @@
 """This module provides the client class for interacting with a virtual database.
 
 Classes:
+    Table: A class representing the in-memory store of a table.
     DefaultClient(_: str, table: str): A class representing a virtual DB client for database operations.
 """
 
+import asyncio
+import bisect
+import collections.abc
+import functools
+import itertools
+import pathlib
+import sys
 import typing
 
-from . import Base, Partial, ResourceId, ResourceObj, dependencies
+import fastapi
+
+from ..codecs import get_codec
+from ..snapshot import Snapshot, SnapshotRows, write_snapshot
+from . import (
+    STREAM_BATCH_SIZE,
+    Base,
+    FieldSpecification,
+    Partial,
+    ResourceId,
+    ResourceObj,
+    SortedIndex,
+    dependencies,
+    index_key,
+)
+
+MISSING = object()
+
+
+class Table:
+    """A class representing the in-memory store of a table.
+
+    Rows are stored as tuples of values, aligned to a list of column names shared by every row of the table, instead
+    of a dict per row. Columns are added as new keys are seen, and keys a row doesn't have are stored as `MISSING`, or
+    left out when trailing. Resource IDs are kept in a sorted list, so a page is a slice of that list.
+
+    Indexed columns have a hash index from each of their values to the resource IDs of the rows holding it, and a
+    sorted index of their values, updated along with the rows. A missing value is indexed as None.
+
+    Attributes:
+        columns (list[str]): The interned names of the columns.
+        positions (dict[str, int]): The position of every column in the rows.
+        rows (dict[ResourceId, tuple[typing.Any, ...]]): The rows of the table by resource ID.
+        keys (list[ResourceId]): The resource IDs of the table, sorted.
+        indexes (dict[str, dict[typing.Any, set[ResourceId]]]): The resource IDs by value, of every indexed column.
+        sorted_indexes (dict[str, SortedIndex[ResourceId]]): The values in order, of every indexed column.
+        version (int): The number of writes made to the table, so that a snapshot can tell whether it changed.
+    """
+
+    __slots__ = ("columns", "indexes", "keys", "positions", "rows", "sorted_indexes", "version")
+
+    def __init__(self) -> None:
+        """Initialize an empty Table instance."""
+        self.columns: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.rows: dict[ResourceId, tuple[typing.Any, ...]] = {}
+        self.keys: list[ResourceId] = []
+        self.indexes: dict[str, dict[typing.Any, set[ResourceId]]] = {}
+        self.sorted_indexes: dict[str, SortedIndex[ResourceId]] = {}
+        self.version = 0
+
+    @classmethod
+    def restore(cls, snapshot: Snapshot) -> "Table":
+        """Restores a table from a snapshot, its rows decoded on first access.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+
+        Returns:
+            Table: The table.
+        """
+        table = cls()
+        table.rows = SnapshotRows(snapshot, lambda data: table.pack(snapshot.codec.decode(data)))
+        table.keys = list(snapshot.keys)
+        return table
+
+    def pack(self, resource_obj: ResourceObj) -> tuple[typing.Any, ...]:
+        """Converts a resource object into a row, adding the columns of its new keys.
+
+        Args:
+            resource_obj (ResourceObj): The resource object.
+
+        Returns:
+            tuple[typing.Any, ...]: The row.
+        """
+        for key in resource_obj:
+            if key not in self.positions:
+                self.positions[key] = len(self.columns)
+                self.columns.append(sys.intern(key))
+        row = [MISSING] * (max(map(self.positions.__getitem__, resource_obj), default=-1) + 1)
+        for key, value in resource_obj.items():
+            row[self.positions[key]] = value
+        return tuple(row)
+
+    def unpack(self, row: tuple[typing.Any, ...]) -> ResourceObj:
+        """Converts a row into a resource object.
+
+        Args:
+            row (tuple[typing.Any, ...]): The row.
+
+        Returns:
+            ResourceObj: A new resource object.
+        """
+        return {column: value for column, value in zip(self.columns, row, strict=False) if value is not MISSING}
+
+    def matcher(
+        self,
+        predicates: list[dependencies.Predicate],
+    ) -> collections.abc.Callable[[tuple[typing.Any, ...]], bool]:
+        """Compiles predicates into a function telling whether a row satisfies all of them.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            collections.abc.Callable[[tuple[typing.Any, ...]], bool]: The function, which takes a row.
+        """
+        # a field without a column is missing from every row, so it is given a position past the end of them
+        checks = [
+            (
+                self.positions.get(predicate.field, sys.maxsize),
+                dependencies.OPERATORS[predicate.operator],
+                predicate.value,
+            )
+            for predicate in predicates
+        ]
+
+        def match(row: tuple[typing.Any, ...]) -> bool:
+            for position, evaluate, argument in checks:
+                value = row[position] if position < len(row) else None
+                if not evaluate(None if value is MISSING else value, argument):
+                    return False
+            return True
+
+        return match
+
+    def value(self, row: tuple[typing.Any, ...], column: str) -> typing.Any:
+        """Returns the value of a column in a row, None if it is missing.
+
+        Args:
+            row (tuple[typing.Any, ...]): The row.
+            column (str): The name of the column.
+
+        Returns:
+            typing.Any: The value.
+        """
+        position = self.positions.get(column, sys.maxsize)
+        value = row[position] if position < len(row) else None
+        return None if value is MISSING else value
+
+    def _index(self, resource_id: ResourceId, row: tuple[typing.Any, ...]) -> None:
+        """Adds a row to the indexes.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            row (tuple[typing.Any, ...]): The row.
+        """
+        for column, index in self.indexes.items():
+            value = self.value(row, column)
+            index.setdefault(index_key(value), set()).add(resource_id)
+            self.sorted_indexes[column].add(value, resource_id)
+
+    def _unindex(self, resource_id: ResourceId, row: tuple[typing.Any, ...]) -> None:
+        """Removes a row from the indexes.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            row (tuple[typing.Any, ...]): The row.
+        """
+        for column, index in self.indexes.items():
+            value = self.value(row, column)
+            key = index_key(value)
+            index[key].discard(resource_id)
+            if not index[key]:
+                del index[key]
+            self.sorted_indexes[column].discard(value, resource_id)
+
+    def add_index(self, column: str) -> None:
+        """Indexes a column, if it isn't indexed yet.
+
+        Args:
+            column (str): The name of the column.
+        """
+        if column not in self.indexes:
+            self.indexes[column] = {}
+            self.rebuild_index(column)
+
+    def rebuild_index(self, column: str) -> None:
+        """Rebuilds the indexes of a column from the rows.
+
+        Args:
+            column (str): The name of the column.
+        """
+        index: dict[typing.Any, set[ResourceId]] = {}
+        values = [(self.value(row, column), resource_id) for resource_id, row in self.rows.items()]
+        for value, resource_id in values:
+            index.setdefault(index_key(value), set()).add(resource_id)
+        self.indexes[column] = index
+        self.sorted_indexes[column] = SortedIndex(values)
+
+    def lookup(self, column: str, values: list[typing.Any]) -> list[ResourceId]:
+        """Looks up the rows holding any of the given values in an indexed column.
+
+        Args:
+            column (str): The name of the column.
+            values (list[typing.Any]): The values.
+
+        Returns:
+            list[ResourceId]: The resource IDs of the rows, sorted.
+        """
+        index = self.indexes[column]
+        return sorted(set().union(*(index.get(index_key(value), ()) for value in values)))
+
+    def __setitem__(self, resource_id: ResourceId, resource_obj: ResourceObj) -> None:
+        """Stores a resource object.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+        """
+        self.version += 1
+        previous = self.rows.get(resource_id)
+        if previous is None:
+            bisect.insort(self.keys, resource_id)
+        elif self.indexes:
+            self._unindex(resource_id, previous)
+        row = self.rows[resource_id] = self.pack(resource_obj)
+        if self.indexes:
+            self._index(resource_id, row)
+
+    def pop(self, resource_id: ResourceId) -> None:
+        """Removes a resource object, if it is stored.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+        """
+        row = self.rows.pop(resource_id, None)
+        if row is not None:
+            self.version += 1
+            del self.keys[bisect.bisect_left(self.keys, resource_id)]
+            if self.indexes:
+                self._unindex(resource_id, row)
 
 
 class DefaultClient(Base):
     """A class representing a virtual DB client for database operations.
 
+    Every table has a store of its own, shared by the clients of that table, with a hash index and a sorted index of
+    every indexed field.
+
+    With a `snapshot_dir`, the store is snapshotted to `snapshot_dir/table.snapshot`: on `snapshot()`, on `aclose()`
+    if it changed, and, with a `snapshot_interval`, that many seconds after a write. A snapshot is a binary file of the
+    sorted resource IDs, the offsets of the resources and the resources encoded with the codec. The rows are captured
+    on the event loop, which only copies references, and encoded and written in a thread, to a temporary file renamed
+    over the snapshot, so a crash never leaves a partial one.
+
+    The first client of a table with a snapshot restores it: the file is memory-mapped, only the resource IDs are
+    read, and every resource is decoded on first access, so the table serves reads as soon as it is created.
+    Resources never read are copied from the mapped file as they are by the next snapshot. Indexed fields need every
+    resource, so their indexes decode them all.
+
     Attributes:
-        db (typing.ClassVar[dict[ResourceId, ResourceObj]]): A dictionary representing the database.
+        tables (typing.ClassVar[dict[str, Table]]): The store of every table, by table name.
+        snapshot_path (pathlib.Path | None): The path to the snapshot of the table, if it is snapshotted.
 
     Args:
         _ (str): A placeholder argument.
         table (str): The name of the table.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+        snapshot_dir (str | None): The directory of the snapshots. Defaults to None, which doesn't snapshot.
+        snapshot_interval (float | None): The number of seconds between a write and the snapshot taking it.
+            Defaults to None, which only snapshots on `snapshot()` and `aclose()`.
+        codec (str): The name of the codec of the snapshots, one of "json", "orjson" and "msgpack". Defaults to
+            "json".
 
     Raises:
         self.exception: If the resource is not found in the database.
@@ -31,23 +291,131 @@ class DefaultClient(Base):
             the database based on the given ID. Returns ResourceObj.
         delete_one(resource_id: ResourceId): Deletes a resource from the database based on the given resource ID.
             Returns None.
-        select_many(paginate_parameters: dependencies.PaginateParameters): Retrieves multiple resources from the
-            database based on the given pagination parameters. Returns list[ResourceObj].
+        select_many(paginate_parameters: dependencies.PaginateParameters, filter_parameters:
+            dependencies.FilterParameters | None = None): Retrieves multiple resources from the database based on the
+            given pagination and filter parameters. Returns Page.
+        insert_many(resources: dict[ResourceId, ResourceObj]): Inserts resource objects in the database. Returns
+            list[ResourceObj | fastapi.HTTPException].
+        select_by_ids(resource_ids: list[ResourceId]): Retrieves the resources of the given IDs from the database.
+            Returns list[ResourceObj | fastapi.HTTPException].
+        update_many(resources: dict[ResourceId, ResourceObj], partial: Partial = None): Updates resources in the
+            database based on the given IDs. Returns list[ResourceObj | fastapi.HTTPException].
+        delete_many(resource_ids: list[ResourceId]): Deletes the resources of the given IDs from the database. Returns
+            list[fastapi.HTTPException | None].
+        stream_many(filter_parameters: dependencies.FilterParameters | None = None, batch_size: int =
+            STREAM_BATCH_SIZE): Iterates over the resources of the database matching the given filter parameters.
+            Returns collections.abc.AsyncIterator[ResourceObj].
+        rebuild_indexes(): Rebuilds the secondary indexes from the stored resources. Returns None.
+        snapshot(): Writes a snapshot of the table. Returns None.
     """
 
-    _db: typing.ClassVar[dict[ResourceId, ResourceObj]] = {}
+    tables: typing.ClassVar[dict[str, Table]] = {}
 
-    def __init__(self, _: str, table: str) -> None:
+    def __init__(
+        self,
+        _: str,
+        table: str,
+        *,
+        fields: list[FieldSpecification] | None = None,
+        snapshot_dir: str | None = None,
+        snapshot_interval: float | None = None,
+        codec: str = "json",
+    ) -> None:
         """Initialize a DefaultClient instance.
 
         Args:
             _ (str): A placeholder argument.
             table (str): The name of the table.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+            snapshot_dir (str | None): The directory of the snapshots. Defaults to None, which doesn't snapshot.
+            snapshot_interval (float | None): The number of seconds between a write and the snapshot taking it.
+                Defaults to None.
+            codec (str): The name of the codec of the snapshots. Defaults to "json".
 
         Returns:
             None
+
+        Raises:
+            ValueError: If there is no codec of that name, or the snapshot of the table is not a snapshot file.
+            ImportError: If the library of the codec is not installed.
         """
-        super().__init__(_, table)
+        super().__init__(_, table, fields=fields)
+        self.codec = get_codec(codec)
+        self.snapshot_path = pathlib.Path(snapshot_dir) / f"{table}.snapshot" if snapshot_dir is not None else None
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_task: asyncio.Task[None] | None = None
+        self._snapshot_lock = asyncio.Lock()
+        if table not in self.tables and self.snapshot_path is not None and self.snapshot_path.exists():
+            self.tables[table] = Table.restore(Snapshot(self.snapshot_path))
+        self._db = self.tables.setdefault(table, Table())
+        self._snapshot_version = self._db.version
+        for name in self.indexes:
+            self._db.add_index(name)
+
+    def _written(self) -> None:
+        """Schedules a snapshot once `snapshot_interval` seconds have passed."""
+        if self.snapshot_interval is not None and self.snapshot_path is not None and self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self._snapshot_later())
+
+    async def _snapshot_later(self) -> None:
+        """Writes a snapshot after `snapshot_interval` seconds."""
+        await asyncio.sleep(typing.cast("float", self.snapshot_interval))
+        self._snapshot_task = None
+        await self.snapshot()
+
+    def _encode(self, rows: dict[ResourceId, tuple[typing.Any, ...]], row: tuple[typing.Any, ...] | int) -> bytes:
+        """Encodes a row for a snapshot, copying the ones never decoded from the restored snapshot.
+
+        Args:
+            rows (dict[ResourceId, tuple[typing.Any, ...]]): The rows of the table.
+            row (tuple[typing.Any, ...] | int): The row, or its position in the restored snapshot.
+
+        Returns:
+            bytes: The encoded row.
+        """
+        if isinstance(row, int):
+            snapshot = typing.cast("SnapshotRows", rows).snapshot
+            data = snapshot.raw(row)
+            return data if snapshot.codec.name == self.codec.name else self.codec.encode(snapshot.codec.decode(data))
+        return self.codec.encode(self._db.unpack(row))
+
+    async def snapshot(self) -> None:
+        """Writes a snapshot of the table, without blocking the event loop but to capture its rows.
+
+        Does nothing when the client has no `snapshot_dir`.
+
+        Returns:
+            None
+        """
+        if self.snapshot_path is None:
+            return
+        async with self._snapshot_lock:
+            version = self._db.version
+            rows = self._db.rows
+            if isinstance(rows, SnapshotRows):
+                captured = rows.capture(self._db.keys)
+            else:
+                captured = [(resource_id, rows[resource_id]) for resource_id in self._db.keys]
+            await self._run(
+                write_snapshot,
+                self.snapshot_path,
+                captured,
+                self.codec,
+                functools.partial(self._encode, rows),
+            )
+            self._snapshot_version = version
+
+    async def aclose(self) -> None:
+        """Writes a snapshot of the table if it changed since the last one.
+
+        Returns:
+            None
+        """
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            self._snapshot_task = None
+        if self._db.version != self._snapshot_version:
+            await self.snapshot()
 
     def _get(self, resource_id: ResourceId) -> ResourceObj:
         """Retrieves a resource from the database based on the given resource ID.
@@ -62,7 +430,7 @@ class DefaultClient(Base):
             self.exception: If the resource is not found in the database.
         """
         try:
-            return self._db[resource_id]
+            return self._db.unpack(self._db.rows[resource_id])
         except KeyError as exception:
             raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found") from exception
 
@@ -83,6 +451,7 @@ class DefaultClient(Base):
             self._get(resource_id)
         except self.exception:
             self._db[resource_id] = resource_obj
+            self._written()
             return {"id": resource_id, **resource_obj}
         else:
             raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
@@ -128,6 +497,7 @@ class DefaultClient(Base):
         else:
             _resource_obj = resource_obj
         self._db[resource_id] = _resource_obj
+        self._written()
         return {"id": resource_id, **_resource_obj}
 
     async def delete_one(self, resource_id: ResourceId) -> None:
@@ -143,16 +513,210 @@ class DefaultClient(Base):
             self.exception: If the resource is not found in the database.
         """
         self._get(resource_id)
-        self._db.pop(resource_id, None)
+        self._db.pop(resource_id)
+        self._written()
+
+    def _candidates(self, predicates: list[dependencies.Predicate]) -> list[ResourceId]:
+        """Returns the resource IDs of the rows the predicates may match, as the indexes narrow them down.
 
-    async def select_many(self, paginate_parameters: dependencies.PaginateParameters) -> list[ResourceObj]:
-        """Retrieves multiple resources from the database based on the given pagination parameters.
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            list[ResourceId]: The resource IDs, sorted.
+        """
+        if (lookup := self._lookup(predicates)) is not None:
+            return self._db.lookup(*lookup)
+        if (field := self._range(predicates)) is not None:
+            bounds = [predicate for predicate in predicates if predicate.field == field]
+            return sorted(self._db.sorted_indexes[field].scan(bounds))
+        return self._db.keys
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        The page starts by bisecting the sorted resource IDs for the cursor. Without a filter only the rows of the
+        page are read, and with one the rows after the cursor are tested by a compiled predicate until the page is
+        full. A filter by equality on an indexed field only tests the rows the index looks up, and a range filter on
+        one only the rows in its range.
+
+        Pages ordered by an indexed field are read from its sorted index the same way. Ordered by another field, the
+        first `skip + limit` matching rows are selected with a bounded heap instead of sorting them all.
 
         Args:
             paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        predicates = self._predicates(filter_parameters)
+        order_by = self._order_by(paginate_parameters)
+        skip, limit = paginate_parameters.skip, paginate_parameters.limit
+        rows = self._db.rows
+        match = self._db.matcher(predicates)
+        if order_by is not None and (self._lookup(predicates) is not None or order_by not in self._db.sorted_indexes):
+            top = paginate_parameters.top(
+                {"id": resource_id, order_by: self._db.value(rows[resource_id], order_by)}
+                for resource_id in self._candidates(predicates)
+                if match(rows[resource_id])
+            )
+            return dependencies.Page(
+                [{"id": item["id"], **self._db.unpack(rows[item["id"]])} for item in top],
+                top.cursor,
+            )
+        if order_by is not None:
+            scan = self._db.sorted_indexes[order_by].scan(
+                [predicate for predicate in predicates if predicate.field == order_by],
+                paginate_parameters.position,
+                descending=paginate_parameters.descending,
+            )
+            page = itertools.islice(filter(lambda resource_id: match(rows[resource_id]), scan), skip, skip + limit)
+        else:
+            keys = self._candidates(predicates)
+            after = paginate_parameters.after
+            start = bisect.bisect_right(keys, after) if after else 0
+            if predicates:
+                matching = filter(lambda resource_id: match(rows[resource_id]), itertools.islice(keys, start, None))
+                page = itertools.islice(matching, skip, skip + limit)
+            else:
+                page = keys[start + skip : start + skip + limit]
+        return paginate_parameters.page(
+            [{"id": resource_id, **self._db.unpack(rows[resource_id])} for resource_id in page],
+        )
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
 
         Returns:
-            list[ResourceObj]: A list of objects representing the retrieved resources.
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        results: list[ResourceObj | fastapi.HTTPException] = []
+        for resource_id, resource_obj in resources.items():
+            if resource_id in self._db.rows:
+                results.append(self.exception(self.status.HTTP_409_CONFLICT, "conflict"))
+            else:
+                self._db[resource_id] = resource_obj
+                results.append({"id": resource_id, **resource_obj})
+        self._written()
+        return results
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return [
+            {"id": resource_id, **self._db.unpack(self._db.rows[resource_id])}
+            if resource_id in self._db.rows
+            else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            for resource_id in resource_ids
+        ]
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        results: list[ResourceObj | fastapi.HTTPException] = []
+        for resource_id, resource_obj in resources.items():
+            if resource_id not in self._db.rows:
+                results.append(self.exception(self.status.HTTP_404_NOT_FOUND, "not found"))
+                continue
+            _resource_obj = self._get(resource_id)
+            if partial:
+                _resource_obj.update(resource_obj)
+            else:
+                _resource_obj = resource_obj
+            self._db[resource_id] = _resource_obj
+            results.append({"id": resource_id, **_resource_obj})
+        self._written()
+        return results
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        results: list[fastapi.HTTPException | None] = []
+        for resource_id in resource_ids:
+            if resource_id in self._db.rows:
+                self._db.pop(resource_id)
+                results.append(None)
+            else:
+                results.append(self.exception(self.status.HTTP_404_NOT_FOUND, "not found"))
+        self._written()
+        return results
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        The sorted resource IDs, or the ones the indexes look up, are walked lazily: every batch bisects them past
+        the last resource of the previous one, and only unpacks the matching rows of the batch.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        predicates = self._predicates(filter_parameters)
+        match = self._db.matcher(predicates) if predicates else None
+        keys = self._candidates(predicates)
+        unpack = self._db.unpack
+        start = 0
+        while batch := keys[start : start + batch_size]:
+            rows = self._db.rows
+            resource_objs = [
+                {"id": resource_id, **unpack(row)}
+                for resource_id in batch
+                if (row := rows.get(resource_id)) is not None and (match is None or match(row))
+            ]
+            for resource_obj in resource_objs:
+                yield resource_obj
+            # the keys may have changed while the batch was consumed
+            start = bisect.bisect_right(keys, batch[-1])
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the indexes of the indexed fields from the stored resources.
+
+        Returns:
+            None
         """
-        items: list[dict[str, ResourceId | ResourceObj]] = [{"id": k, **v} for k, v in self._db.items()]
-        return items[paginate_parameters.skip : paginate_parameters.skip + paginate_parameters.limit]
+        for name in self.indexes:
+            self._db.rebuild_index(name)
@@ -1,27 +1,506 @@
 """This module provides the client class for interacting with a Redis database."""
 
-from . import Base, Partial, ResourceId, ResourceObj, dependencies
+import calendar
+import collections.abc
+import datetime as dt
+import functools
+import json
+import math
+import struct
+import typing
+import uuid
+
+import fastapi
+
+from ..codecs import TextCodec, get_codec, tag
+from ..registry import registry
+from . import (
+    RANGE_OPERATORS,
+    STREAM_BATCH_SIZE,
+    Base,
+    FieldSpecification,
+    Partial,
+    ResourceId,
+    ResourceObj,
+    dependencies,
+)
+
+try:
+    import redis.asyncio
+except ImportError:  # pragma: no cover
+    redis = None
+
+MARKER = "\x00"
+_MASK = (1 << 64) - 1
+
+# adds the resource to, or removes it from, the set of its value of every indexed field, missing values being null,
+# and the sorted set of the field, by its order member kept in a hidden field of the hash
+INDEX_FUNCTION = """
+local function reindex(command, fields)
+    if #fields == 0 then return end
+    local values = redis.call("HMGET", KEYS[1], unpack(fields))
+    for i, field in ipairs(fields) do
+        redis.call(command, KEYS[2] .. ":" .. field .. ":" .. (values[i] or "null"), ARGV[1])
+        local member = redis.call("HGET", KEYS[1], "\\0" .. field)
+        if member and command == "SADD" then
+            redis.call("ZADD", KEYS[3] .. ":" .. field, 0, member)
+        elseif member then
+            redis.call("ZREM", KEYS[3] .. ":" .. field, member)
+        end
+    end
+end
+"""
+INSERT_SCRIPT = (
+    INDEX_FUNCTION
+    + """
+if redis.call("EXISTS", KEYS[1]) == 1 then return 0 end
+redis.call("HSET", KEYS[1], unpack(ARGV, 3))
+redis.call("ZADD", KEYS[2], 0, ARGV[1])
+reindex("SADD", cjson.decode(ARGV[2]))
+return 1
+"""
+)
+UPDATE_SCRIPT = (
+    INDEX_FUNCTION
+    + """
+if redis.call("EXISTS", KEYS[1]) == 0 then return 0 end
+local fields = cjson.decode(ARGV[2])
+reindex("SREM", fields)
+redis.call("DEL", KEYS[1])
+redis.call("HSET", KEYS[1], unpack(ARGV, 3))
+reindex("SADD", fields)
+return 1
+"""
+)
+UPDATE_PARTIAL_SCRIPT = (
+    INDEX_FUNCTION
+    + """
+if redis.call("EXISTS", KEYS[1]) == 0 then return false end
+local fields = cjson.decode(ARGV[2])
+reindex("SREM", fields)
+redis.call("HSET", KEYS[1], unpack(ARGV, 3))
+reindex("SADD", fields)
+return redis.call("HGETALL", KEYS[1])
+"""
+)
+DELETE_SCRIPT = (
+    INDEX_FUNCTION
+    + """
+if redis.call("EXISTS", KEYS[1]) == 0 then return 0 end
+reindex("SREM", cjson.decode(ARGV[2]))
+redis.call("DEL", KEYS[1])
+redis.call("ZREM", KEYS[2], ARGV[1])
+return 1
+"""
+)
+# tells whether the JSON encoded value of a field satisfies a predicate; the value of a comparison to a UUID, date or
+# time is sent as its tag and text, and to a datetime as its tag, UTC instant in microseconds and whether it is aware
+MATCH_FUNCTION = """
+local function instant(text)
+    local pattern = "^(%d+)-(%d+)-(%d+)T(%d+):(%d+):(%d+)(.*)$"
+    local year, month, day, hour, minute, second, rest = string.match(text, pattern)
+    if not year then return nil end
+    local microseconds = 0
+    local fraction = string.match(rest, "^%.(%d+)")
+    if fraction then
+        microseconds = tonumber(string.sub(fraction .. "000000", 1, 6))
+        rest = string.sub(rest, #fraction + 2)
+    end
+    local aware, offset = false, 0
+    local sign, hours, minutes = string.match(rest, "^([+-])(%d%d):(%d%d)")
+    if sign then
+        aware, offset = true, (tonumber(hours) * 60 + tonumber(minutes)) * 60
+        if sign == "-" then offset = -offset end
+    end
+    -- the number of days since 1970-01-01 of the proleptic Gregorian calendar
+    year, month = tonumber(year), tonumber(month)
+    if month <= 2 then year = year - 1 end
+    local era = math.floor(year / 400)
+    local year_of_era = year - era * 400
+    local day_of_year = math.floor((153 * ((month + 9) % 12) + 2) / 5) + tonumber(day) - 1
+    local days = era * 146097 + year_of_era * 365 + math.floor(year_of_era / 4) - math.floor(year_of_era / 100)
+        + day_of_year - 719468
+    local seconds = days * 86400 + tonumber(hour) * 3600 + tonumber(minute) * 60 + tonumber(second) - offset
+    return aware, seconds * 1000000 + microseconds
+end
+
+-- tells whether a decoded item equals the argument, tagged values being single key objects
+local function same(item, argument)
+    if type(item) ~= "table" or type(argument) ~= "table" then return item == argument end
+    local key = next(argument)
+    return key ~= nil and item[key] == argument[key] and next(item, next(item)) == nil
+end
+
+local function matches(raw, operator, argument)
+    if operator == "eq" and type(argument) == "string" then return raw == argument end
+    if operator == "in" then
+        for _, item in ipairs(argument) do if raw == item then return true end end
+        return false
+    end
+    local value = cjson.decode(raw)
+    if operator == "contains" then
+        if type(value) == "string" then
+            return type(argument) == "string" and string.find(value, argument, 1, true) ~= nil
+        end
+        if type(value) == "table" then
+            for _, item in ipairs(value) do if same(item, argument) then return true end end
+        end
+        return false
+    end
+    if type(argument) == "table" then
+        local text = type(value) == "table" and value[argument[1]]
+        if type(text) ~= "string" then return false end
+        value = text
+        if argument[1] == "$datetime" then
+            local aware, microseconds = instant(text)
+            if aware ~= argument[3] then return false end
+            value = microseconds
+        end
+        argument = argument[2]
+    elseif type(value) ~= type(argument) or (type(value) ~= "number" and type(value) ~= "string") then
+        return false
+    end
+    if operator == "eq" then return value == argument end
+    if operator == "lt" then return value < argument end
+    if operator == "le" then return value <= argument end
+    if operator == "gt" then return value > argument end
+    return value >= argument
+end
+"""
+FILTER_SCRIPT = (
+    MATCH_FUNCTION
+    + """
+local predicates = cjson.decode(ARGV[4])
+local skip, limit = tonumber(ARGV[2]), tonumber(ARGV[3])
+local fields = {}
+for i, predicate in ipairs(predicates) do fields[i] = predicate[1] end
+
+local matched, skipped = {}, 0
+
+-- the members are IDs, or order members, which end with the ID
+local function visit(members, first)
+    for n = first, #members do
+        local resource_id = string.sub(members[n], -36)
+        local values = redis.call("HMGET", ARGV[5] .. resource_id, unpack(fields))
+        local match = true
+        for i, predicate in ipairs(predicates) do
+            if not matches(values[i] or "null", predicate[2], predicate[3]) then
+                match = false
+                break
+            end
+        end
+        if match and skipped < skip then
+            skipped = skipped + 1
+        elseif match then
+            matched[#matched + 1] = members[n]
+            if #matched == limit then return end
+        end
+    end
+end
+
+if #ARGV > 6 then
+    -- the candidates are the union of the sets of the indexed values, sorted as the index is
+    local candidates = redis.call("SUNION", unpack(ARGV, 7))
+    table.sort(candidates)
+    local first = 1
+    if ARGV[1] ~= "-" then
+        local after = string.sub(ARGV[1], 2)
+        while first <= #candidates and candidates[first] <= after do first = first + 1 end
+    end
+    visit(candidates, first)
+    return matched
+end
+
+local bound = ARGV[1]
+while #matched < limit do
+    local members
+    if ARGV[6] == "desc" then
+        members = redis.call("ZREVRANGEBYLEX", KEYS[1], bound, "-", "LIMIT", 0, 256)
+    else
+        members = redis.call("ZRANGEBYLEX", KEYS[1], bound, "+", "LIMIT", 0, 256)
+    end
+    if #members == 0 then break end
+    visit(members, 1)
+    bound = "(" .. members[#members]
+end
+return matched
+"""
+)
+# returns the ID and the JSON encoded value of the ordered field of the first `skip + limit` matching resources past
+# the cursor, kept in a bounded sorted list, followed by those of the matching resources whose value is neither a
+# number, a string nor null, which are ordered by their JSON with sorted keys and so left to the client to compare
+ORDER_SCRIPT = (
+    MATCH_FUNCTION
+    + """
+local predicates = cjson.decode(ARGV[1])
+local count, descending = tonumber(ARGV[4]), ARGV[5] == "desc"
+local fields = {ARGV[3]}
+for i, predicate in ipairs(predicates) do fields[i + 1] = predicate[1] end
+
+-- the rank and the value of the order key of a value, the value being left out of the keys of other values
+local function rank(raw)
+    local value = cjson.decode(raw)
+    if value == cjson.null then return 3, 0 end
+    if type(value) == "number" then return 0, value end
+    if type(value) == "boolean" then return 0, value and 1 or 0 end
+    if type(value) == "string" then return 1, value end
+    return 2, nil
+end
+
+-- tells whether an item comes before another, which have no value to compare if both of them are of rank 2
+local function precedes(a, b)
+    if descending then a, b = b, a end
+    if a[1] ~= b[1] then return a[1] < b[1] end
+    if a[2] ~= b[2] then return a[2] < b[2] end
+    return a[3] < b[3]
+end
+
+local position = nil
+if ARGV[6] ~= "" then
+    position = {tonumber(ARGV[6]), ARGV[7], ARGV[8]}
+    if position[1] == 0 then position[2] = tonumber(ARGV[7]) elseif position[1] ~= 1 then position[2] = 0 end
+end
+
+local top, others = {}, {}
+
+local function insert(item)
+    local low, high = 1, #top + 1
+    while low < high do
+        local middle = math.floor((low + high) / 2)
+        if precedes(top[middle], item) then low = middle + 1 else high = middle end
+    end
+    table.insert(top, low, item)
+    if #top > count then table.remove(top) end
+end
+
+local function visit(resource_ids)
+    for _, resource_id in ipairs(resource_ids) do
+        local values = redis.call("HMGET", ARGV[2] .. resource_id, unpack(fields))
+        local match = true
+        for i, predicate in ipairs(predicates) do
+            if not matches(values[i + 1] or "null", predicate[2], predicate[3]) then
+                match = false
+                break
+            end
+        end
+        if match then
+            local raw = values[1] or "null"
+            local item = {rank(raw)}
+            item[3], item[4] = resource_id, raw
+            if item[1] == 2 then
+                if not position or position[1] == 2 or precedes(position, item) then others[#others + 1] = item end
+            elseif (not position or precedes(position, item)) and (#top < count or precedes(item, top[#top])) then
+                insert(item)
+            end
+        end
+    end
+end
+
+if #ARGV > 8 then
+    visit(redis.call("SUNION", unpack(ARGV, 9)))
+else
+    local min = "-"
+    while true do
+        local resource_ids = redis.call("ZRANGEBYLEX", KEYS[1], min, "+", "LIMIT", 0, 256)
+        if #resource_ids == 0 then break end
+        visit(resource_ids)
+        min = "(" .. resource_ids[#resource_ids]
+    end
+end
+
+local result = {}
+for _, item in ipairs(top) do
+    result[#result + 1] = item[3]
+    result[#result + 1] = item[4]
+end
+for _, item in ipairs(others) do
+    if #top < count or precedes(item, top[#top]) then
+        result[#result + 1] = item[3]
+        result[#result + 1] = item[4]
+    end
+end
+return result
+"""
+)
+
+
+def _order_member(key: tuple[int, typing.Any], resource_id: str) -> str:
+    """Encodes an order key and a resource ID as a member of the sorted set of a field, sorting as they do.
+
+    Numbers are encoded as the 16 hexadecimal digits of their double, with the bits flipped so that they sort as
+    the numbers do. Strings and JSON have NUL escaped, so that the NUL NUL separating them from the ID sorts first.
+
+    Args:
+        key (tuple[int, typing.Any]): The order key, as `order_key` returns it.
+        resource_id (str): The ID of the resource.
+
+    Returns:
+        str: The member.
+    """
+    rank, value = key
+    if rank == 0:
+        try:
+            number = float(value) + 0.0
+        except OverflowError:
+            number = math.inf if value > 0 else -math.inf
+        (bits,) = struct.unpack(">Q", struct.pack(">d", number))
+        text = f"{bits ^ _MASK if bits >> 63 else bits | 1 << 63:016x}"
+    elif rank == 3:  # noqa: PLR2004 - the rank of missing values
+        text = ""
+    else:
+        text = str(value).replace("\x00", "\x00\x01")
+    return f"{rank}{text}\x00\x00{resource_id}"
+
+
+def _order_position(member: str) -> tuple[tuple[int, typing.Any], str]:
+    """Decodes a member of the sorted set of a field into the order key and the resource ID it encodes.
+
+    Args:
+        member (str): The member, as `_order_member` returns it.
+
+    Returns:
+        tuple[tuple[int, typing.Any], str]: The order key, numbers being floats, and the ID of the resource.
+    """
+    rank, text, resource_id = int(member[0]), member[1:-38], member[-36:]
+    if rank == 0:
+        bits = int(text, 16)
+        bits = bits ^ 1 << 63 if bits >> 63 else bits ^ _MASK
+        return (rank, struct.unpack(">d", struct.pack(">Q", bits))[0]), resource_id
+    if rank == 3:  # noqa: PLR2004 - the rank of missing values
+        return (rank, 0), resource_id
+    return (rank, text.replace("\x00\x01", "\x00")), resource_id
 
 
 class RedisClient(Base):
     """A class representing a Redis client for database operations.
 
+    Each resource is a hash holding one JSON encoded value per field of the resource object, plus a marker field so
+    that empty resources exist. The resource IDs of a table are kept in a sorted set, with equal scores so it is
+    ordered by ID, from which pages are read with ZRANGEBYLEX. Writes run as Lua scripts, so each of them is a single
+    atomic round trip, and a partial update only writes the given fields. Bulk operations send the same commands in a
+    single pipeline. A filter runs as a Lua script too, which walks the sorted set reading only the filtered fields
+    of each hash until the page is full, so that only matching resources are sent back. Indexed fields have a set of
+    resource IDs per JSON encoded value, kept in step by the write scripts, and a filter by equality on one of them
+    only reads the hashes of the resources in the matching sets. Indexed fields have a sorted set too, with equal
+    scores, of order members encoding the order key of the value and the ID so that they sort as the resources do,
+    from which pages ordered by the field are read past the cursor; the hash of each resource keeps its member in a
+    hidden field, so that the write scripts can remove it. A page ordered by another field is selected by a script
+    keeping the first `skip + limit` matching resources in a bounded list, and only its hashes are read whole. Keys
+    share the table name as hash tag, so a table lives in a single cluster slot. The connection pool of a database is
+    shared by the clients of all its tables, kept in the registry of the process until the last of them is closed.
+    Requires the `redis` package, installed with the `redis` extra.
+
+    Values are encoded by a codec, which round-trips UUIDs and datetimes too. The scripts decode them, so only the
+    JSON codecs, "json" and "orjson", can be used.
+
     Args:
-        path (str): The path to the Redis database.
+        path (str): The URL of the Redis database, e.g. "redis://localhost:6379/0".
         table_name (str): The name of the table.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+        max_connections (int): The maximum number of connections in the pool. Defaults to 10.
+        codec (str): The name of the codec of the values, "json" or "orjson". Defaults to "json".
 
     Raises:
         self.exception: If the resource is not found in the database.
     """
 
-    def __init__(self, path: str, table_name: str) -> None:
+    def __init__(
+        self,
+        path: str,
+        table_name: str,
+        *,
+        fields: list[FieldSpecification] | None = None,
+        max_connections: int = 10,
+        codec: str = "json",
+    ) -> None:
         """Initialize the RedisClient class.
 
         Args:
             path (str): The path to the database.
             table_name (str): The name of the table in the database.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+            max_connections (int): The maximum number of connections in the pool. Defaults to 10.
+            codec (str): The name of the codec of the values, "json" or "orjson". Defaults to "json".
 
+        Raises:
+            ImportError: If redis, or the library of the codec, is not installed.
+            ValueError: If there is no JSON codec of that name.
         """
+        if redis is None:
+            msg = "RedisClient requires redis, install it with `pip install sthali-db[redis]`"
+            raise ImportError(msg)
+
+        super().__init__(path, table_name, fields=fields)
+        self.codec = get_codec(codec)
+        if not isinstance(self.codec, TextCodec):
+            msg = f"RedisClient stores resources as JSON, which the {codec!r} codec doesn't encode"
+            raise ValueError(msg)  # noqa: TRY004
+        self._registry_key: tuple[str, str] | None = ("redis", path)
+        self.redis = registry.acquire(
+            self._registry_key,
+            functools.partial(redis.asyncio.from_url, path, decode_responses=True, max_connections=max_connections),
+        )
+        self._index = f"{{{table_name}}}:index"
+        self._order = f"{{{table_name}}}:order"
+        self._indexed = json.dumps(self.indexes)
+        self._insert = self.redis.register_script(INSERT_SCRIPT)
+        self._update = self.redis.register_script(UPDATE_SCRIPT)
+        self._update_partial = self.redis.register_script(UPDATE_PARTIAL_SCRIPT)
+        self._delete = self.redis.register_script(DELETE_SCRIPT)
+        self._filter = self.redis.register_script(FILTER_SCRIPT)
+        self._filter_order = self.redis.register_script(ORDER_SCRIPT)
+
+    def _key(self, resource_id: ResourceId | str) -> str:
+        """Returns the key of the hash of a resource.
+
+        Args:
+            resource_id (ResourceId | str): The ID of the resource.
+
+        Returns:
+            str: The key of the hash.
+        """
+        return f"{{{self.table}}}:{resource_id}"
+
+    def _keys(self, resource_id: ResourceId | str) -> list[str]:
+        """Returns the keys the write scripts of a resource are given.
+
+        Args:
+            resource_id (ResourceId | str): The ID of the resource.
+
+        Returns:
+            list[str]: The key of the hash, and the prefixes of the keys of the sets and sorted sets of the index.
+        """
+        return [self._key(resource_id), self._index, self._order]
+
+    def _encode(self, resource_id: ResourceId, resource_obj: ResourceObj, partial: Partial = None) -> list[str]:
+        """Encodes a resource object as the field and value arguments of HSET.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+            partial (Partial): Whether the object only holds the fields to update. Defaults to None.
+
+        Returns:
+            list[str]: The marker field, the fields of the object, and a hidden field holding the order member of
+                every indexed field, or of those in the object if partial, each followed by its value.
+        """
+        items = [MARKER, "", *(item for key, value in resource_obj.items() for item in (key, self.codec.dumps(value)))]
+        for name in self.indexes:
+            if not partial or name in resource_obj:
+                key = dependencies.order_key(resource_obj.get(name))
+                items.extend((MARKER + name, _order_member(key, str(resource_id))))
+        return items
+
+    def _decode(self, mapping: dict[str, str]) -> ResourceObj:
+        """Decodes the fields and values of a hash into a resource object.
+
+        Args:
+            mapping (dict[str, str]): The fields and values of the hash.
+
+        Returns:
+            ResourceObj: The resource object.
+        """
+        return {key: self.codec.decode(value) for key, value in mapping.items() if not key.startswith(MARKER)}
 
     async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
         """Inserts a resource object in the database.
@@ -36,7 +515,10 @@ class RedisClient(Base):
         Raises:
             self.exception: If the resource already exists in the database.
         """
-        raise NotImplementedError
+        args = [str(resource_id), self._indexed, *self._encode(resource_id, resource_obj)]
+        if not await self._insert(self._keys(resource_id), args, self.redis):
+            raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+        return {"id": resource_id, **resource_obj}
 
     async def select_one(self, resource_id: ResourceId) -> ResourceObj:
         """Retrieves a resource from the database based on the given ID.
@@ -50,7 +532,10 @@ class RedisClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        mapping = await self.redis.hgetall(self._key(resource_id))
+        if not mapping:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return {"id": resource_id, **self._decode(mapping)}
 
     async def update_one(
         self,
@@ -72,7 +557,17 @@ class RedisClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        keys = self._keys(resource_id)
+        args = [str(resource_id), self._indexed, *self._encode(resource_id, resource_obj, partial)]
+        if partial:
+            items: list[str] | None = await self._update_partial(keys, args, self.redis)
+            if items is None:
+                raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            return {"id": resource_id, **self._decode(dict(zip(items[::2], items[1::2], strict=True)))}
+
+        if not await self._update(keys, args, self.redis):
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return {"id": resource_id, **resource_obj}
 
     async def delete_one(self, resource_id: ResourceId) -> None:
         """Deletes a resource from the database based on the given resource ID.
@@ -86,15 +581,366 @@ class RedisClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        if not await self._delete(self._keys(resource_id), [str(resource_id), self._indexed], self.redis):
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+
+    def _encode_predicates(self, predicates: list[dependencies.Predicate]) -> str:
+        """Encodes predicates as the argument of the filter script.
+
+        The values "eq" and "in" compare the field to are encoded by the codec as the fields of the hashes are, so
+        that they are compared without decoding the fields. UUIDs, dates and times are compared by their tagged
+        text, which sorts as they do, and datetimes by their UTC instant, only to datetimes as naive or aware as they
+        are, as Python compares them.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            str: The JSON encoded list of the field, operator and value of every predicate.
+        """
+        encoded: list[list[typing.Any]] = []
+        for predicate in predicates:
+            value = predicate.value
+            if isinstance(value, dt.datetime) and predicate.operator in RANGE_OPERATORS:
+                microseconds = calendar.timegm(value.utctimetuple()) * 1_000_000 + value.microsecond
+                value = ["$datetime", microseconds, value.utcoffset() is not None]
+            elif predicate.operator == "eq":
+                value = self.codec.dumps(value)
+            elif predicate.operator == "in":
+                value = [self.codec.dumps(item) for item in value]
+            elif isinstance(value, uuid.UUID | dt.date | dt.time):
+                ((name, text),) = tag(value).items()
+                value = {name: text} if predicate.operator == "contains" else [name, text]
+            encoded.append([predicate.field, predicate.operator, value])
+        return json.dumps(encoded)
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
 
-    async def select_many(self, paginate_parameters: dependencies.PaginateParameters) -> list[ResourceObj]:
-        """Retrieves multiple resources from the database based on the given pagination parameters.
+        Pages ordered by an indexed field are read from its sorted set, while pages ordered by another field read
+        its value from every matching resource, keeping the first `skip + limit` of them in a bounded list.
 
         Args:
             paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
 
         Returns:
-            list[ResourceObj]: A list of objects representing the retrieved resources.
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        predicates = self._predicates(filter_parameters)
+        order_by = self._order_by(paginate_parameters)
+        if not paginate_parameters.limit:
+            return paginate_parameters.page([])
+        if order_by is not None:
+            return await self._select_ordered(paginate_parameters, predicates, order_by)
+        after = str(paginate_parameters.after) if paginate_parameters.after else None
+        limit = paginate_parameters.limit
+        resource_ids = await self._select_after(after, paginate_parameters.skip, limit, predicates)
+        # the cursor is taken from the index, as resources deleted meanwhile are left out of the page
+        cursor = None
+        if len(resource_ids) == limit:
+            cursor = dependencies.encode_cursor(uuid.UUID(resource_ids[-1]))
+        return dependencies.Page(await self._select_ids(resource_ids), cursor)
+
+    async def _select_after(
+        self,
+        after: str | None,
+        skip: int,
+        limit: int,
+        predicates: list[dependencies.Predicate],
+    ) -> list[str]:
+        """Retrieves the IDs of the matching resources after the given one, from the index ordered by ID.
+
+        Args:
+            after (str | None): The ID of the resource to start after, if any.
+            skip (int): The number of matching resources to skip.
+            limit (int): The maximum number of IDs to return.
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            list[str]: The IDs of the resources, in order.
+        """
+        start = f"({after}" if after else "-"
+        if not predicates:
+            return await self.redis.zrangebylex(self._index, start, "+", start=skip, num=limit)
+        arguments = [start, skip, limit, self._encode_predicates(predicates), self._key(""), "asc"]
+        if (lookup := self._lookup(predicates)) is not None:
+            name, values = lookup
+            arguments.extend(f"{self._index}:{name}:{self.codec.dumps(value)}" for value in values)
+        return await self._filter([self._index], arguments, self.redis)
+
+    async def _select_ordered(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        order_by: str,
+    ) -> dependencies.Page:
+        """Retrieves a page ordered by a field.
+
+        A page ordered by an indexed field is read from its sorted set, past the order member of the cursor, unless a
+        filter by equality on an indexed field gives fewer candidates. Otherwise the order script keeps the first
+        `skip + limit` matching resources past the cursor in a bounded list, and only their IDs and values, and those
+        of the resources it can't compare, come back to select the page from.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            predicates (list[Predicate]): The predicates.
+            order_by (str): The name of the field the resources are ordered by.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        lookup = self._lookup(predicates)
+        if order_by in self.indexes and lookup is None:
+            return await self._select_sorted(paginate_parameters, predicates, order_by)
+
+        count = paginate_parameters.skip + paginate_parameters.limit
+        arguments = [
+            self._encode_predicates(predicates),
+            self._key(""),
+            order_by,
+            count,
+            paginate_parameters.direction,
+        ]
+        if (position := paginate_parameters.position) is not None:
+            (rank, value), resource_id = position
+            arguments.extend((rank, repr(float(value)) if rank == 0 else str(value), str(resource_id)))
+        else:
+            arguments.extend(("", "", ""))
+        if lookup is not None:
+            name, values = lookup
+            arguments.extend(f"{self._index}:{name}:{self.codec.dumps(value)}" for value in values)
+        result: list[str] = await self._filter_order([self._index], arguments, self.redis)
+        top = paginate_parameters.top(
+            {"id": uuid.UUID(resource_id), order_by: self.codec.decode(raw)}
+            for resource_id, raw in zip(result[::2], result[1::2], strict=True)
+        )
+        return dependencies.Page(await self._select_ids([str(item["id"]) for item in top]), top.cursor)
+
+    async def _select_sorted(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        order_by: str,
+    ) -> dependencies.Page:
+        """Retrieves a page ordered by an indexed field, from its sorted set.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            predicates (list[Predicate]): The predicates.
+            order_by (str): The name of the indexed field the resources are ordered by.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        key, limit = f"{self._order}:{order_by}", paginate_parameters.limit
+        descending = paginate_parameters.descending
+        if (position := paginate_parameters.position) is not None:
+            start = f"({_order_member(position[0], str(position[1]))}"
+        else:
+            start = "+" if descending else "-"
+        if predicates:
+            arguments = [start, paginate_parameters.skip, limit, self._encode_predicates(predicates), self._key("")]
+            members: list[str] = await self._filter([key], [*arguments, paginate_parameters.direction], self.redis)
+        elif descending:
+            members = await self.redis.zrevrangebylex(key, start, "-", start=paginate_parameters.skip, num=limit)
+        else:
+            members = await self.redis.zrangebylex(key, start, "+", start=paginate_parameters.skip, num=limit)
+        # the cursor is taken from the sorted set, as resources deleted meanwhile are left out of the page
+        cursor = None
+        if len(members) == limit:
+            order_key, resource_id = _order_position(members[-1])
+            cursor = dependencies.encode_cursor(uuid.UUID(resource_id), order_key)
+        return dependencies.Page(await self._select_ids([member[-36:] for member in members]), cursor)
+
+    async def _select_ids(self, resource_ids: list[str]) -> list[ResourceObj]:
+        """Retrieves the resources of the given IDs in a single pipeline, skipping the ones deleted meanwhile.
+
+        Args:
+            resource_ids (list[str]): The IDs of the resources.
+
+        Returns:
+            list[ResourceObj]: The retrieved resources, in the order of the IDs.
+        """
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for resource_id in resource_ids:
+                pipeline.hgetall(self._key(resource_id))
+            mappings: list[dict[str, str]] = await pipeline.execute()
+        return [
+            {"id": uuid.UUID(resource_id), **self._decode(mapping)}
+            for resource_id, mapping in zip(resource_ids, mappings, strict=True)
+            if mapping
+        ]
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database, in a single pipeline.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for resource_id, resource_obj in resources.items():
+                args = [str(resource_id), self._indexed, *self._encode(resource_id, resource_obj)]
+                await self._insert(self._keys(resource_id), args, pipeline)
+            inserted: list[int] = await pipeline.execute()
+        return [
+            {"id": resource_id, **resource_obj}
+            if success
+            else self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+            for (resource_id, resource_obj), success in zip(resources.items(), inserted, strict=True)
+        ]
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database, in a single pipeline.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for resource_id in resource_ids:
+                pipeline.hgetall(self._key(resource_id))
+            mappings: list[dict[str, str]] = await pipeline.execute()
+        return [
+            {"id": resource_id, **self._decode(mapping)}
+            if mapping
+            else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            for resource_id, mapping in zip(resource_ids, mappings, strict=True)
+        ]
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs, in a single pipeline.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        script = self._update_partial if partial else self._update
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for resource_id, resource_obj in resources.items():
+                args = [str(resource_id), self._indexed, *self._encode(resource_id, resource_obj, partial)]
+                await script(self._keys(resource_id), args, pipeline)
+            replies: list[typing.Any] = await pipeline.execute()
+
+        results: list[ResourceObj | fastapi.HTTPException] = []
+        for (resource_id, resource_obj), reply in zip(resources.items(), replies, strict=True):
+            if not reply:
+                results.append(self.exception(self.status.HTTP_404_NOT_FOUND, "not found"))
+            elif partial:
+                results.append({"id": resource_id, **self._decode(dict(zip(reply[::2], reply[1::2], strict=True)))})
+            else:
+                results.append({"id": resource_id, **resource_obj})
+        return results
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database, in a single pipeline.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for resource_id in resource_ids:
+                await self._delete(self._keys(resource_id), [str(resource_id), self._indexed], pipeline)
+            deleted: list[int] = await pipeline.execute()
+        return [
+            None if success else self.exception(self.status.HTTP_404_NOT_FOUND, "not found") for success in deleted
+        ]
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        Every batch reads the next `batch_size` matching IDs from the index with ZRANGEBYLEX, or the filter script,
+        past the last ID of the previous batch, and their hashes in a single pipeline.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        predicates = self._predicates(filter_parameters)
+        after = None
+        while batch_size and (resource_ids := await self._select_after(after, 0, batch_size, predicates)):
+            for resource_obj in await self._select_ids(resource_ids):
+                yield resource_obj
+            if len(resource_ids) < batch_size:
+                return
+            after = resource_ids[-1]
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the sets and sorted sets of the indexed fields from the stored hashes, dropping stale ones.
+
+        The order members kept in the hashes are rewritten too, so pages ordered by a field indexed after resources
+        were written hold them.
+        Writes made to the table while the sets are rebuilt may be left out of them.
+
+        Returns:
+            None
+        """
+        stale = [key async for key in self.redis.scan_iter(match=f"{self._index}:*")]
+        stale.extend([key async for key in self.redis.scan_iter(match=f"{self._order}:*")])
+        resource_ids: list[str] = await self.redis.zrange(self._index, 0, -1)
+        values: list[list[str | None]] = []
+        if self.indexes:
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                for resource_id in resource_ids:
+                    pipeline.hmget(self._key(resource_id), [MARKER, *self.indexes])
+                values = await pipeline.execute()
+
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            if stale:
+                pipeline.delete(*stale)
+            for resource_id, (marker, *resource_values) in zip(resource_ids, values, strict=False):
+                if marker is None:
+                    continue
+                members = {}
+                for name, value in zip(self.indexes, resource_values, strict=True):
+                    pipeline.sadd(f"{self._index}:{name}:{value or 'null'}", resource_id)
+                    key = dependencies.order_key(self.codec.decode(value) if value is not None else None)
+                    members[MARKER + name] = _order_member(key, resource_id)
+                    pipeline.zadd(f"{self._order}:{name}", {members[MARKER + name]: 0})
+                pipeline.hset(self._key(resource_id), mapping=members)
+            await pipeline.execute()
+
+    async def aclose(self) -> None:
+        """Releases the connection pool, closing it once no client of the database is left.
+
+        Returns:
+            None
         """
-        raise NotImplementedError
+        if self._registry_key is None:
+            return
+        handle = registry.release(self._registry_key)
+        self._registry_key = None
+        if handle is not None:
+            await handle.aclose()
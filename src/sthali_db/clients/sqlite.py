@@ -1,27 +1,698 @@
 """This module provides the client class for interacting with a SQLite database."""
 
-from . import Base, Partial, ResourceId, ResourceObj, dependencies
+import asyncio
+import calendar
+import collections.abc
+import concurrent.futures
+import contextlib
+import datetime as dt
+import functools
+import json
+import pathlib
+import sqlite3
+import threading
+import typing
+import uuid
+
+import fastapi
+
+from ..codecs import TextCodec, get_codec, tag
+from ..registry import registry
+from . import STREAM_BATCH_SIZE, Base, FieldSpecification, Partial, ResourceId, ResourceObj, dependencies
+
+COLUMN_TYPES: dict[typing.Any, str] = {str: "TEXT", int: "INTEGER", float: "REAL", bool: "BOOLEAN"}
+SQL_OPERATORS = {"lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+BATCH_SIZE = 500
+
+
+def _literal(text: str) -> str:
+    """Quotes a SQL string literal.
+
+    Args:
+        text (str): The text to quote.
+
+    Returns:
+        str: The quoted literal.
+    """
+    return "'{}'".format(text.replace("'", "''"))
+
+
+def _argument(value: typing.Any) -> tuple[str, typing.Any]:
+    """Returns the SQL expression and parameter of a value compared to a column or a JSON value.
+
+    Args:
+        value (typing.Any): The value.
+
+    Returns:
+        tuple[str, typing.Any]: The expression, and the parameter it takes.
+    """
+    if isinstance(value, list | dict):
+        return "json(?)", json.dumps(value)
+    return "?", value
+
+
+def _quote(identifier: str) -> str:
+    """Quotes a SQL identifier.
+
+    Args:
+        identifier (str): The identifier to quote.
+
+    Returns:
+        str: The quoted identifier.
+    """
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+@contextlib.contextmanager
+def _transaction(connection: sqlite3.Connection) -> collections.abc.Iterator[sqlite3.Connection]:
+    """Runs a block in a write transaction, rolled back if the block or the commit raises.
+
+    Args:
+        connection (sqlite3.Connection): The connection, in autocommit mode.
+
+    Yields:
+        sqlite3.Connection: The connection.
+    """
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+        connection.execute("COMMIT")
+    except BaseException:
+        # a failed commit, e.g. SQLITE_BUSY, leaves the transaction open
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+
+
+class Database:
+    """A class representing a SQLite database, with the thread pool its calls run in.
+
+    Every thread of the pool holds its own connection, opened on first use.
+
+    Attributes:
+        path (str): The path to the database.
+        executor (concurrent.futures.ThreadPoolExecutor): The thread pool.
+        memory_connection (sqlite3.Connection | None): The connection shared by the pool, for ":memory:".
+
+    Args:
+        path (str): The path to the SQLite database. Use ":memory:" for a non-persistent database.
+        pool_size (int): The number of threads, and connections, of the pool.
+        cached_statements (int): The number of prepared statements cached by each connection.
+        busy_timeout (float): The number of seconds a write waits for another write to finish.
+    """
+
+    def __init__(self, path: str, *, pool_size: int, cached_statements: int, busy_timeout: float) -> None:
+        """Initialize a Database instance.
+
+        Args:
+            path (str): The path to the SQLite database.
+            pool_size (int): The number of threads, and connections, of the pool.
+            cached_statements (int): The number of prepared statements cached by each connection.
+            busy_timeout (float): The number of seconds a write waits for another write to finish.
+        """
+        self.path = path
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # every connection to ":memory:" opens a database of its own, so the pool is reduced to one shared connection
+        self.memory_connection = self.connect() if path == ":memory:" else None
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            1 if self.memory_connection else pool_size,
+            "sthali-db-sqlite",
+        )
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a connection to the database.
+
+        Returns:
+            sqlite3.Connection: The connection, in autocommit mode.
+        """
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection of the current thread of the pool."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.memory_connection or self.connect()
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        """Waits for pending calls, then closes the thread pool and its connections."""
+        self.executor.shutdown()
+        with self._connections_lock:
+            for connection in {*self._connections, *filter(None, [self.memory_connection])}:
+                connection.close()
+            self._connections.clear()
 
 
 class SqliteClient(Base):
     """A class representing a SQLite DB client for database operations.
 
+    Each resource is a row keyed by its resource ID. Fields whose type is one of `COLUMN_TYPES` are stored in columns
+    of their own, and the rest of the resource object is stored as JSON. Columns are added when the fields
+    specification grows, moving any value already stored in the JSON into the new column. Columns hold NULL for
+    missing values, so such fields are returned as None. Indexed fields have an index on their column, or on their
+    value in the JSON, which filters by equality look the resources up in.
+
+    The table is clustered on the resource ID, so single-resource operations are one indexed lookup. Calls run in a
+    small thread pool in which every thread holds its own connection. The pool of a file database is shared by the
+    clients of all its tables, kept in the registry of the process until the last of them is closed, and opened with
+    the options of the first. File databases use WAL journal mode, so reads are not blocked by a write. Bulk writes run
+    `executemany` in a single transaction, and bulk reads select up to `BATCH_SIZE` resources per statement.
+
+    The JSON is written by a codec, which round-trips UUIDs and datetimes too. SQLite queries it, so only the JSON
+    codecs, "json" and "orjson", can be used.
+
     Args:
-        path (str): The path to the SQLite database.
+        path (str): The path to the SQLite database. Use ":memory:" for a non-persistent database.
         table_name (str): The name of the table.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+        pool_size (int): The number of threads, and connections, of the pool. Defaults to 4.
+        cached_statements (int): The number of prepared statements cached by each connection. Defaults to 128.
+        busy_timeout (float): The number of seconds a write waits for another write to finish. Defaults to 5.0.
+        codec (str): The name of the codec of the JSON, "json" or "orjson". Defaults to "json".
 
     Raises:
         self.exception: If the resource is not found in the database.
     """
 
-    def __init__(self, path: str, table_name: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str,
+        table_name: str,
+        *,
+        fields: list[FieldSpecification] | None = None,
+        pool_size: int = 4,
+        cached_statements: int = 128,
+        busy_timeout: float = 5.0,
+        codec: str = "json",
+    ) -> None:
         """Initialize the SqliteClient class.
 
         Args:
             path (str): The path to the database.
             table_name (str): The name of the table in the database.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+            pool_size (int): The number of threads, and connections, of the pool. Defaults to 4.
+            cached_statements (int): The number of prepared statements cached by each connection. Defaults to 128.
+            busy_timeout (float): The number of seconds a write waits for another write to finish. Defaults to 5.0.
+            codec (str): The name of the codec of the JSON, "json" or "orjson". Defaults to "json".
+
+        Raises:
+            ValueError: If there is no JSON codec of that name.
+            ImportError: If the library of the codec is not installed.
+        """
+        super().__init__(path, table_name, fields=fields)
+        self.codec = get_codec(codec)
+        if not isinstance(self.codec, TextCodec):
+            msg = f"SqliteClient stores resources as JSON, which the {codec!r} codec doesn't encode"
+            raise ValueError(msg)  # noqa: TRY004
+        factory = functools.partial(
+            Database,
+            path,
+            pool_size=pool_size,
+            cached_statements=cached_statements,
+            busy_timeout=busy_timeout,
+        )
+        # every ":memory:" database is a database of its own, so it isn't shared
+        self._registry_key = None if path == ":memory:" else ("sqlite", str(pathlib.Path(path).resolve()))
+        self.database = factory() if self._registry_key is None else registry.acquire(self._registry_key, factory)
+        self._closed = False
+        self.executor = self.database.executor
+        self._memory_connection = self.database.memory_connection
+
+        connection = self._memory_connection or self._connect()
+        self.columns = self._migrate(connection)
+        self._create_indexes(connection)
+        if not self._memory_connection:
+            connection.close()
+
+        table = _quote(table_name)
+        columns = "".join(f"{_quote(column)}, " for column in self.columns)
+        self._sql_insert = (
+            f"INSERT INTO {table} (resource_id, {columns}resource_obj) VALUES (?, {'?, ' * len(self.columns)}?)"
+        )
+        self._sql_select = f"SELECT {columns}resource_obj FROM {table} WHERE resource_id = ?"
+        self._sql_update = (
+            f"UPDATE {table} SET {''.join(f'{_quote(column)} = ?, ' for column in self.columns)}resource_obj = ? "
+            "WHERE resource_id = ?"
+        )
+        self._sql_update_partial = f"UPDATE {table} SET {{}} WHERE resource_id = ? RETURNING {columns}resource_obj"
+        self._sql_delete = f"DELETE FROM {table} WHERE resource_id = ?"
+        self._sql_select_ids = f"SELECT resource_id, {columns}resource_obj FROM {table} WHERE resource_id IN ({{}})"
+        self._sql_exists_ids = f"SELECT resource_id FROM {table} WHERE resource_id IN ({{}})"
+        self._sql_select_many = (
+            f"SELECT resource_id, {columns}resource_obj FROM {table} WHERE {{}}ORDER BY {{}} LIMIT ? OFFSET ?"
+        )
+        self._sql_stream = f"SELECT resource_id, {columns}resource_obj FROM {table} WHERE 1 {{}}ORDER BY resource_id"
+
+    def _migrate(self, connection: sqlite3.Connection) -> dict[str, str]:
+        """Creates the table, or adds the columns of the fields missing from it.
+
+        Args:
+            connection (sqlite3.Connection): The connection to use.
+
+        Returns:
+            dict[str, str]: The declared type of every column of the table, other than the resource ID and object.
+        """
+        table = _quote(self.table)
+        columns = {
+            field.name: COLUMN_TYPES[field.type]
+            for field in self.fields
+            if field.type in COLUMN_TYPES and field.name not in ("resource_id", "resource_obj")
+        }
+        definitions = "".join(f"{_quote(name)} {column_type}, " for name, column_type in columns.items())
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            f"(resource_id TEXT PRIMARY KEY NOT NULL, {definitions}resource_obj TEXT NOT NULL) WITHOUT ROWID",
+        )
+
+        existing = {row[1]: row[2] for row in connection.execute(f"PRAGMA table_info({table})")}
+        missing = {name: column_type for name, column_type in columns.items() if name not in existing}
+        if missing:
+            with _transaction(connection):
+                for name, column_type in missing.items():
+                    column, path = _quote(name), f'$."{name}"'
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                    connection.execute(
+                        f"UPDATE {table} SET {column} = json_extract(resource_obj, ?), "
+                        "resource_obj = json_remove(resource_obj, ?) WHERE json_type(resource_obj, ?) IS NOT NULL",
+                        (path, path, path),
+                    )
+            existing.update(missing)
+
+        del existing["resource_id"], existing["resource_obj"]
+        return existing
+
+    def _create_indexes(self, connection: sqlite3.Connection) -> None:
+        """Creates the indexes of the indexed fields missing from the table, from the rows already stored.
+
+        Fields without a column are indexed on the same JSON expression their filters compare, so that they use it.
+
+        Args:
+            connection (sqlite3.Connection): The connection to use.
+        """
+        table = _quote(self.table)
+        for name in self.indexes:
+            if name in self.columns:
+                expression = _quote(name)
+            else:
+                path = _literal(f'$."{name}"')
+                expression = f"json_extract(resource_obj, {path})"
+            index = _quote(f"{self.table}_{name}_index")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({expression})")
+
+    def _rebuild_indexes(self) -> None:
+        self._connection.execute(f"REINDEX {_quote(self.table)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a connection to the database.
+
+        Returns:
+            sqlite3.Connection: The connection, in autocommit mode.
+        """
+        return self.database.connect()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """The connection of the current thread of the pool."""
+        return self.database.connection
+
+    def _to_row(self, resource_obj: ResourceObj) -> tuple[typing.Any, ...]:
+        """Splits a resource object into its column values and the JSON of the remaining fields.
+
+        Args:
+            resource_obj (ResourceObj): The resource object.
+
+        Returns:
+            tuple[typing.Any, ...]: The column values, followed by the JSON.
+        """
+        rest = {key: value for key, value in resource_obj.items() if key not in self.columns}
+        return (*(resource_obj.get(column) for column in self.columns), self.codec.dumps(rest))
+
+    def _from_row(self, row: typing.Sequence[typing.Any]) -> ResourceObj:
+        """Joins the column values and the JSON of the remaining fields into a resource object.
+
+        Args:
+            row (typing.Sequence[typing.Any]): The column values, followed by the JSON.
+
+        Returns:
+            ResourceObj: The resource object.
+        """
+        resource_obj = {
+            column: bool(value) if column_type == "BOOLEAN" and value is not None else value
+            for (column, column_type), value in zip(self.columns.items(), row, strict=False)
+        }
+        resource_obj.update(self.codec.decode(row[-1]))
+        return resource_obj
+
+    def _insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        try:
+            self._connection.execute(self._sql_insert, (str(resource_id), *self._to_row(resource_obj)))
+        except sqlite3.IntegrityError as exception:
+            raise self.exception(self.status.HTTP_409_CONFLICT, "conflict") from exception
+        return {"id": resource_id, **resource_obj}
+
+    def _select_one(self, resource_id: ResourceId) -> ResourceObj:
+        row = self._connection.execute(self._sql_select, (str(resource_id),)).fetchone()
+        if row is None:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return {"id": resource_id, **self._from_row(row)}
+
+    def _update_one(self, resource_id: ResourceId, resource_obj: ResourceObj, partial: Partial) -> ResourceObj:
+        connection = self._connection
+        if not partial:
+            cursor = connection.execute(self._sql_update, (*self._to_row(resource_obj), str(resource_id)))
+            if not cursor.rowcount:
+                raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            return {"id": resource_id, **resource_obj}
+
+        if not resource_obj:
+            return self._select_one(resource_id)
+        rest = {key: value for key, value in resource_obj.items() if key not in self.columns}
+        if any('"' in key for key in rest):
+            # such keys can't be expressed as a JSON path, so the object is merged here instead
+            with _transaction(connection):
+                _resource_obj = self._select_one(resource_id)
+                del _resource_obj["id"]
+                _resource_obj.update(resource_obj)
+                connection.execute(self._sql_update, (*self._to_row(_resource_obj), str(resource_id)))
+            return {"id": resource_id, **_resource_obj}
+
+        # only the given columns, and the given keys of the JSON, are written
+        assignments = [f"{_quote(key)} = ?" for key in resource_obj if key in self.columns]
+        parameters: list[typing.Any] = [value for key, value in resource_obj.items() if key in self.columns]
+        if rest:
+            assignments.append(f"resource_obj = json_set(resource_obj, {', '.join('?, json(?)' for _ in rest)})")
+            parameters.extend(value for key, item in rest.items() for value in (f'$."{key}"', self.codec.dumps(item)))
+        sql = self._sql_update_partial.format(", ".join(assignments))
+        rows = connection.execute(sql, (*parameters, str(resource_id))).fetchall()
+        if not rows:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return {"id": resource_id, **self._from_row(rows[0])}
+
+    def _delete_one(self, resource_id: ResourceId) -> None:
+        cursor = self._connection.execute(self._sql_delete, (str(resource_id),))
+        if not cursor.rowcount:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+
+    @staticmethod
+    def _fetch_ids(connection: sqlite3.Connection, sql: str, keys: list[str]) -> dict[str, tuple[typing.Any, ...]]:
+        """Runs a statement selecting rows by resource ID, in batches of `BATCH_SIZE` IDs.
+
+        Args:
+            connection (sqlite3.Connection): The connection to use.
+            sql (str): The statement, with a placeholder for the parameters of the IDs.
+            keys (list[str]): The resource IDs.
+
+        Returns:
+            dict[str, tuple[typing.Any, ...]]: The rest of every selected row, by resource ID.
+        """
+        rows: dict[str, tuple[typing.Any, ...]] = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start : start + BATCH_SIZE]
+            cursor = connection.execute(sql.format(", ".join("?" * len(batch))), batch)
+            rows.update((row[0], row[1:]) for row in cursor)
+        return rows
 
+    def _insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        keys = [str(resource_id) for resource_id in resources]
+        with _transaction(self._connection) as connection:
+            existing = self._fetch_ids(connection, self._sql_exists_ids, keys)
+            connection.executemany(
+                self._sql_insert,
+                (
+                    (key, *self._to_row(resource_obj))
+                    for key, resource_obj in zip(keys, resources.values(), strict=True)
+                    if key not in existing
+                ),
+            )
+        return [
+            self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+            if key in existing
+            else {"id": resource_id, **resource_obj}
+            for key, (resource_id, resource_obj) in zip(keys, resources.items(), strict=True)
+        ]
+
+    def _select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        keys = [str(resource_id) for resource_id in resource_ids]
+        rows = self._fetch_ids(self._connection, self._sql_select_ids, keys)
+        return [
+            {"id": resource_id, **self._from_row(rows[key])}
+            if key in rows
+            else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            for key, resource_id in zip(keys, resource_ids, strict=True)
+        ]
+
+    def _update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        keys = [str(resource_id) for resource_id in resources]
+        updated: dict[str, ResourceObj] = {}
+        with _transaction(self._connection) as connection:
+            if partial:
+                rows = self._fetch_ids(connection, self._sql_select_ids, keys)
+                for key, resource_obj in zip(keys, resources.values(), strict=True):
+                    if key in rows:
+                        updated[key] = {**self._from_row(rows[key]), **resource_obj}
+            else:
+                existing = self._fetch_ids(connection, self._sql_exists_ids, keys)
+                updated = {
+                    key: resource_obj
+                    for key, resource_obj in zip(keys, resources.values(), strict=True)
+                    if key in existing
+                }
+            connection.executemany(
+                self._sql_update,
+                ((*self._to_row(resource_obj), key) for key, resource_obj in updated.items()),
+            )
+        return [
+            {"id": resource_id, **updated[key]}
+            if key in updated
+            else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            for key, resource_id in zip(keys, resources, strict=True)
+        ]
+
+    def _delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        keys = [str(resource_id) for resource_id in resource_ids]
+        with _transaction(self._connection) as connection:
+            existing = self._fetch_ids(connection, self._sql_exists_ids, keys)
+            connection.executemany(self._sql_delete, ((key,) for key in existing))
+        # popped, so that a resource given twice is only reported as deleted once
+        return [
+            self.exception(self.status.HTTP_404_NOT_FOUND, "not found") if existing.pop(key, None) is None else None
+            for key in keys
+        ]
+
+    def _where(self, predicates: list[dependencies.Predicate]) -> tuple[str, list[typing.Any]]:
+        """Compiles predicates into SQL conditions.
+
+        Fields with a column of their own are compared by column, and the rest by their value in the JSON. Ordering
+        comparisons only hold between values of the same type, as in Python.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            tuple[str, list[typing.Any]]: The conditions, each preceded by AND, and their parameters.
         """
+        conditions: list[str] = []
+        parameters: list[typing.Any] = []
+        for predicate in predicates:
+            condition, condition_parameters = self._condition(predicate)
+            conditions.append(f"AND {condition} ")
+            parameters.extend(condition_parameters)
+        return "".join(conditions), parameters
+
+    def _field(self, name: str) -> tuple[str, str]:
+        """Returns the SQL expressions of the value of a field, and of its type.
+
+        Args:
+            name (str): The name of the field.
+
+        Returns:
+            tuple[str, str]: The column of the field, or its value in the JSON, and the expression of its type.
+        """
+        if name in self.columns:
+            field = _quote(name)
+            return field, f"typeof({field})"
+        path = _literal(f'$."{name}"')
+        return f"json_extract(resource_obj, {path})", f"json_type(resource_obj, {path})"
+
+    def _condition(self, predicate: dependencies.Predicate) -> tuple[str, list[typing.Any]]:
+        """Compiles a predicate into a SQL condition.
+
+        Values are compared to the JSON tagged as the codec stores them, so that UUIDs and datetimes match.
+
+        Args:
+            predicate (Predicate): The predicate.
+
+        Returns:
+            tuple[str, list[typing.Any]]: The condition, and its parameters.
+        """
+        operator, value = predicate.operator, tag(predicate.value)
+        field, _ = self._field(predicate.field)
+
+        if operator == "eq" and not isinstance(predicate.value, dt.datetime):
+            if value is None:
+                return f"{field} IS NULL", []
+            argument, parameter = _argument(value)
+            return f"{field} = {argument}", [parameter]
+        if operator == "in":
+            arguments = [_argument(item) for item in value if item is not None]
+            condition = f"{field} IN ({', '.join(argument for argument, _ in arguments)})"
+            if None in value:
+                condition = f"({condition} OR {field} IS NULL)"
+            return condition, [parameter for _, parameter in arguments]
+        if operator == "contains":
+            return self._contains(predicate.field, value)
+        return self._compare(predicate.field, operator, predicate.value)
+
+    def _compare(self, name: str, operator: str, value: typing.Any) -> tuple[str, list[typing.Any]]:
+        """Compiles the comparison of a field to a value into a SQL condition.
+
+        Numbers and strings are only compared to values of their type. UUIDs, dates and times are compared by the text
+        of their tagged value, which sorts as they do, and datetimes, equality included, by their UTC instant in
+        microseconds, only to datetimes as naive or aware as the value, as Python compares them.
+
+        Args:
+            name (str): The name of the field.
+            operator (str): The operator, "lt", "le", "gt" or "ge", or "eq" for a datetime.
+            value (typing.Any): The value.
+
+        Returns:
+            tuple[str, list[typing.Any]]: The condition, and its parameters.
+        """
+        sql_operator = SQL_OPERATORS.get(operator, "=")
+        if isinstance(value, int | float | str):
+            field, field_type = self._field(name)
+            types = "'text'" if isinstance(value, str) else "'integer', 'real'"
+            return f"{field_type} IN ({types}) AND {field} {sql_operator} ?", [value]
+        if not isinstance(value, uuid.UUID | dt.date | dt.time) or name in self.columns:
+            return "0", []
+
+        ((tag_name, text),) = tag(value).items()
+        path = _literal(f'$."{name}"."{tag_name}"')
+        field, condition = f"json_extract(resource_obj, {path})", f"json_type(resource_obj, {path}) = 'text' AND "
+        if not isinstance(value, dt.datetime):
+            return f"{condition}{field} {sql_operator} ?", [text]
+        # ISO datetimes have 19 characters before their microseconds, and end with their offset if aware
+        instant = (
+            f"CAST(strftime('%s', {field}) AS INTEGER) * 1000000 "
+            f"+ CASE WHEN substr({field}, 20, 1) = '.' THEN CAST(substr({field}, 21, 6) AS INTEGER) ELSE 0 END"
+        )
+        aware = f"substr({field}, -6, 1) IN ('+', '-')"
+        microseconds = calendar.timegm(value.utctimetuple()) * 1_000_000 + value.microsecond
+        return f"{condition}{aware} = ? AND {instant} {sql_operator} ?", [value.utcoffset() is not None, microseconds]
+
+    def _contains(self, name: str, value: typing.Any) -> tuple[str, list[typing.Any]]:
+        """Compiles a "contains" predicate into a SQL condition.
+
+        Args:
+            name (str): The name of the field.
+            value (typing.Any): The value the field contains.
+
+        Returns:
+            tuple[str, list[typing.Any]]: The condition, and its parameters.
+        """
+        if name in self.columns:
+            field = _quote(name)
+            if isinstance(value, str):
+                return f"typeof({field}) = 'text' AND instr({field}, ?) > 0", [value]
+            return "0", []
+
+        path = _literal(f'$."{name}"')
+        argument, parameter = _argument(value)
+        array = f"EXISTS (SELECT 1 FROM json_each(resource_obj, {path}) WHERE value IS {argument})"
+        if isinstance(value, str):
+            text = f"instr(json_extract(resource_obj, {path}), ?) > 0"
+            condition = f"CASE json_type(resource_obj, {path}) WHEN 'text' THEN {text} WHEN 'array' THEN {array} END"
+            return condition, [value, parameter]
+        return f"json_type(resource_obj, {path}) = 'array' AND {array}", [parameter]
+
+    def _order(self, paginate_parameters: dependencies.PaginateParameters) -> tuple[str, str, list[typing.Any]]:
+        """Compiles the order of a page, and the position it starts after, into SQL.
+
+        Missing values sort last, and descending order is the exact reverse, so the index of the field gives the order
+        either way. Numbers sort before strings as `order_key` ranks them; values of other types sort as SQLite
+        compares them.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters, ordered by a field.
+
+        Returns:
+            tuple[str, str, list[typing.Any]]: The condition of the position, if any, the ORDER BY clause, and the
+                parameters of the condition.
+        """
+        field, _ = self._field(typing.cast("str", paginate_parameters.order_by))
+        if paginate_parameters.descending:
+            order = f"{field} DESC NULLS FIRST, resource_id DESC"
+        else:
+            order = f"{field} NULLS LAST, resource_id"
+        if (position := paginate_parameters.position) is None:
+            return "1 ", order, []
+        (rank, value), resource_id = position
+        if rank == dependencies.order_key(None)[0]:
+            if paginate_parameters.descending:
+                return f"({field} IS NOT NULL OR resource_id < ?) ", order, [str(resource_id)]
+            return f"({field} IS NULL AND resource_id > ?) ", order, [str(resource_id)]
+        comparison, missing = ("<", "") if paginate_parameters.descending else (">", f" OR {field} IS NULL")
+        seek = f"({field} {comparison} ? OR ({field} = ? AND resource_id {comparison} ?){missing}) "
+        return seek, order, [value, value, str(resource_id)]
+
+    def _select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+    ) -> dependencies.Page:
+        conditions, parameters = self._where(predicates)
+        if paginate_parameters.order_by is None:
+            # every resource ID sorts after the empty string, so the first page seeks from it
+            after = paginate_parameters.after
+            seek, order, seek_parameters = "resource_id > ? ", "resource_id", [str(after) if after else ""]
+        else:
+            seek, order, seek_parameters = self._order(paginate_parameters)
+        rows = self._connection.execute(
+            self._sql_select_many.format(seek + conditions, order),
+            (*seek_parameters, *parameters, paginate_parameters.limit, paginate_parameters.skip),
+        ).fetchall()
+        return paginate_parameters.page([{"id": uuid.UUID(row[0]), **self._from_row(row[1:])} for row in rows])
+
+    def _stream_open(self, sql: str, parameters: list[typing.Any]) -> sqlite3.Cursor:
+        # a file database is read on a connection of its own, so that the statement isn't shared by the pool
+        connection = self._memory_connection or self._connect()
+        try:
+            return connection.execute(sql, parameters)
+        except BaseException:
+            if connection is not self._memory_connection:
+                connection.close()
+            raise
+
+    def _stream_fetch(self, cursor: sqlite3.Cursor, batch_size: int) -> list[ResourceObj]:
+        return [{"id": uuid.UUID(row[0]), **self._from_row(row[1:])} for row in cursor.fetchmany(batch_size)]
+
+    def _stream_close(self, cursor: sqlite3.Cursor) -> None:
+        cursor.close()
+        if cursor.connection is not self._memory_connection:
+            cursor.connection.close()
 
     async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
         """Inserts a resource object in the database.
@@ -36,7 +707,7 @@ class SqliteClient(Base):
         Raises:
             self.exception: If the resource already exists in the database.
         """
-        raise NotImplementedError
+        return await self._run(self._insert_one, resource_id, resource_obj)
 
     async def select_one(self, resource_id: ResourceId) -> ResourceObj:
         """Retrieves a resource from the database based on the given ID.
@@ -50,7 +721,7 @@ class SqliteClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        return await self._run(self._select_one, resource_id)
 
     async def update_one(
         self,
@@ -72,7 +743,7 @@ class SqliteClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        return await self._run(self._update_one, resource_id, resource_obj, partial)
 
     async def delete_one(self, resource_id: ResourceId) -> None:
         """Deletes a resource from the database based on the given resource ID.
@@ -86,15 +757,128 @@ class SqliteClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        raise NotImplementedError
+        await self._run(self._delete_one, resource_id)
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
 
-    async def select_many(self, paginate_parameters: dependencies.PaginateParameters) -> list[ResourceObj]:
-        """Retrieves multiple resources from the database based on the given pagination parameters.
+        The filter is compiled into the WHERE clause of the query, and the order into its ORDER BY clause, which the
+        index of an indexed field gives.
 
         Args:
             paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        predicates = self._predicates(filter_parameters)
+        self._order_by(paginate_parameters)
+        return await self._run(self._select_many, paginate_parameters, predicates)
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database, in a single transaction.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        return await self._run(self._insert_many, resources)
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return await self._run(self._select_by_ids, resource_ids)
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs, in a single transaction.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        return await self._run(self._update_many, resources, partial)
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database, in a single transaction.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        return await self._run(self._delete_many, resource_ids)
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        A single statement is run, and its rows are read `batch_size` at a time with `fetchmany`, in the thread pool.
+        On a file database it runs on a connection of its own, opened for the iteration, and reads the snapshot of
+        the database it started on.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        conditions, parameters = self._where(self._predicates(filter_parameters))
+        cursor = await self._run(self._stream_open, self._sql_stream.format(conditions), parameters)
+        try:
+            while resource_objs := await self._run(self._stream_fetch, cursor, batch_size):
+                for resource_obj in resource_objs:
+                    yield resource_obj
+        finally:
+            await self._run(self._stream_close, cursor)
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the indexes of the table from the stored rows.
 
         Returns:
-            list[ResourceObj]: A list of objects representing the retrieved resources.
+            None
+        """
+        await self._run(self._rebuild_indexes)
+
+    async def aclose(self) -> None:
+        """Releases the database, closing its thread pool and connections once no client of its tables is left.
+
+        Returns:
+            None
         """
-        raise NotImplementedError
+        if self._closed:
+            return
+        self._closed = True
+        database = self.database if self._registry_key is None else registry.release(self._registry_key)
+        if database is not None:
+            await asyncio.get_running_loop().run_in_executor(None, database.close)
@@ -1,36 +1,389 @@
 """This module provides the client class for interacting with a TinyDB database."""
 
+import asyncio
+import atexit
+import bisect
+import collections.abc
+import concurrent.futures
+import functools
+import itertools
+import os
+import pathlib
+import threading
+import typing
+import uuid
+
+import fastapi
 import tinydb
+import tinydb.middlewares
+import tinydb.queries
+import tinydb.storages
 import tinydb.table
 
-from . import Base, Partial, ResourceId, ResourceObj, dependencies
+from ..codecs import Codec, get_codec
+from ..registry import registry
+from . import (
+    STREAM_BATCH_SIZE,
+    Base,
+    FieldSpecification,
+    Partial,
+    ResourceId,
+    ResourceObj,
+    SortedIndex,
+    dependencies,
+    index_key,
+)
+
+_file_locks: dict[str, threading.Lock] = {}
+
+
+def _key(path: str) -> str:
+    """Returns the key identifying a database file.
+
+    Args:
+        path (str): The path to the database.
+
+    Returns:
+        str: The resolved path to the database.
+    """
+    return str(pathlib.Path(path).resolve())
+
+
+class CodecStorage(tinydb.storages.Storage):
+    """A class representing a TinyDB storage writing the whole database to a file with a codec.
+
+    Args:
+        path (str): The path to the database file, created if it doesn't exist.
+        codec (Codec): The codec of the file.
+    """
+
+    def __init__(self, path: str, codec: Codec) -> None:
+        """Initialize a CodecStorage instance.
+
+        Args:
+            path (str): The path to the database file, created if it doesn't exist.
+            codec (Codec): The codec of the file.
+        """
+        pathlib.Path(path).touch()
+        self.codec = codec
+        self._handle = pathlib.Path(path).open("r+b")  # noqa: SIM115
+
+    def read(self) -> dict[str, dict[str, typing.Any]] | None:
+        """Reads and decodes the database file.
+
+        Returns:
+            dict[str, dict[str, typing.Any]] | None: The tables of the database, or None if the file is empty.
+        """
+        self._handle.seek(0)
+        data = self._handle.read()
+        return self.codec.decode(data) if data else None
+
+    def write(self, data: dict[str, dict[str, typing.Any]]) -> None:
+        """Encodes and writes the database file.
+
+        Args:
+            data (dict[str, dict[str, typing.Any]]): The tables of the database.
+        """
+        self._handle.seek(0)
+        self._handle.write(self.codec.encode(data))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.truncate()
+
+    def close(self) -> None:
+        """Closes the database file."""
+        self._handle.close()
+
+
+def _open(path: str, *, buffered: bool, write_cache_size: int, codec: Codec) -> tinydb.TinyDB:
+    """Opens a database file.
+
+    Buffered databases hold a cached copy of the whole file, so every table of a file must share one instance or a
+    flush from one table would overwrite the writes of another. Unbuffered ones are shared too, so that the file is
+    opened once.
+
+    Args:
+        path (str): The path to the database.
+        buffered (bool): Whether to buffer writes in memory.
+        write_cache_size (int): The number of writes buffered before the cache is flushed to the file.
+        codec (Codec): The codec of the file.
+
+    Returns:
+        tinydb.TinyDB: The database.
+    """
+    if not buffered:
+        return tinydb.TinyDB(path, codec, storage=CodecStorage)
+    storage = tinydb.middlewares.CachingMiddleware(CodecStorage)
+    storage.WRITE_CACHE_SIZE = write_cache_size
+    return tinydb.TinyDB(path, codec, storage=storage)
+
+
+class TableIndex:
+    """A class representing the in-memory indexes of a table, shared by every client of the table.
+
+    Attributes:
+        doc_ids (dict[str, int]): The TinyDB document ID of every resource, by resource ID.
+        keys (list[str]): The resource IDs, sorted.
+        values (dict[str, dict[typing.Any, set[str]]]): The IDs of the resources holding every value of an indexed
+            field, by field.
+        sorted (dict[str, SortedIndex[str]]): The sorted values of every indexed field, by field.
+
+    Args:
+        table (tinydb.table.Table): The table.
+    """
+
+    def __init__(self, table: tinydb.table.Table) -> None:
+        """Initialize a TableIndex instance, indexing the documents of the table.
+
+        Args:
+            table (tinydb.table.Table): The table.
+        """
+        self.doc_ids: dict[str, int] = {document["resource_id"]: document.doc_id for document in table}
+        self.keys = sorted(self.doc_ids)
+        self.values: dict[str, dict[typing.Any, set[str]]] = {}
+        self.sorted: dict[str, SortedIndex[str]] = {}
+
+
+@atexit.register
+def _flush_buffered() -> None:
+    """Flushes every buffered database on interpreter exit."""
+    for db in registry.handles("tinydb"):
+        if isinstance(db.storage, tinydb.middlewares.CachingMiddleware):
+            db.storage.flush()
 
 
 class TinydbClient(Base):
     """A class representing a TinyDB client for database operations.
 
+    The client keeps an in-memory index from resource ID to TinyDB document ID, and the sorted resource IDs, built when
+    the table is opened and kept in step with every write, so single-resource operations never scan the table and a
+    page is found by bisecting the sorted IDs. Indexed fields have an in-memory hash index too, from each of their
+    values to the IDs of the resources holding it, so a filter by equality on them only reads the matching documents,
+    and a sorted index of their values, so a range filter on them, or a page ordered by them, only reads the documents
+    in range. The indexes are shared by every client of a table in the process, kept in its registry with the TinyDB
+    instance, so that a write through one client is seen by the others; they assume no other process writes the file.
+
+    By default every write rewrites the whole JSON file. In buffered mode writes are applied to an in-memory cache of
+    the file, shared by every table of that file, and written out once `write_cache_size` writes have accumulated,
+    `flush_interval` seconds after the first unflushed write, on `flush()`, on `aclose()` and on interpreter exit.
+    A crash therefore loses at most the writes of the last `flush_interval` seconds, and never more than
+    `write_cache_size` writes.
+
+    The file is written with a codec, JSON by default, which round-trips UUIDs and datetimes too; the "orjson" codec
+    encodes it faster, and the "msgpack" one makes it smaller.
+
+    The tables of a database file share one TinyDB instance, and its file handle, kept in the registry of the process
+    until the last of their clients is closed, so the file is opened and parsed once. The first client of a file
+    decides whether it is buffered, and its codec.
+
+    TinyDB parses and writes JSON synchronously, so every operation runs in a thread pool to keep the event loop free.
+    Operations on the same database file are serialised by a lock shared by every table of that file.
+
     Args:
-        path (str): The path to the TinyDB database file.
+        path (str): The path to the TinyDB database file. Use ":memory:" for a non-persistent database.
         table_name (str): The name of the table in the database.
+        fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+        buffered (bool): Whether to buffer writes in memory. Defaults to False.
+        write_cache_size (int): The number of writes buffered before flushing. Defaults to 1000.
+        flush_interval (float): The maximum number of seconds a write stays buffered. Defaults to 1.0.
+        max_workers (int | None): The size of the client's thread pool. Defaults to None, which uses the event loop's
+            default executor.
+        codec (str): The name of the codec of the file, one of "json", "orjson" and "msgpack". Defaults to "json".
 
     Attributes:
         table (tinydb.table.Table): The name of the table in the database.
     """
 
     table: tinydb.table.Table
+    _doc_ids: dict[str, int]
+    _keys: list[str]
+    _values: dict[str, dict[typing.Any, set[str]]]
+    _sorted: dict[str, SortedIndex[str]]
 
-    def __init__(self, path: str, table_name: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str,
+        table_name: str,
+        *,
+        fields: list[FieldSpecification] | None = None,
+        buffered: bool = False,
+        write_cache_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_workers: int | None = None,
+        codec: str = "json",
+    ) -> None:
         """Initialize the TinydbClient class.
 
         Args:
             path (str): The path to the database.
             table_name (str): The name of the table in the database.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
+            buffered (bool): Whether to buffer writes in memory. Defaults to False.
+            write_cache_size (int): The number of writes buffered before flushing. Defaults to 1000.
+            flush_interval (float): The maximum number of seconds a write stays buffered. Defaults to 1.0.
+            max_workers (int | None): The size of the client's thread pool. Defaults to None, which uses the event
+                loop's default executor.
+            codec (str): The name of the codec of the file. Defaults to "json".
 
+        Raises:
+            ValueError: If there is no codec of that name.
+            ImportError: If the library of the codec is not installed.
         """
-        db = tinydb.TinyDB(path)
+        super().__init__(path, table_name, fields=fields)
+        self.flush_interval = flush_interval
+        self._flush_task: asyncio.Task[None] | None = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers, "sthali-db-tinydb") if max_workers else None
+
+        self._registry_key: tuple[str, str] | None = None
+        self._index_key: tuple[str, str, str] | None = None
+        self._closed = False
+        if path == ":memory:":
+            db = tinydb.TinyDB(storage=tinydb.storages.MemoryStorage)
+        else:
+            self._registry_key = ("tinydb", _key(path))
+            db = registry.acquire(
+                self._registry_key,
+                functools.partial(
+                    _open,
+                    path,
+                    buffered=buffered,
+                    write_cache_size=write_cache_size,
+                    codec=get_codec(codec),
+                ),
+            )
+        self.buffered = isinstance(db.storage, tinydb.middlewares.CachingMiddleware)
         table = db.table(table_name)  # type: ignore
 
+        self.db = db
         self.table = table
+        self._lock = threading.Lock() if path == ":memory:" else _file_locks.setdefault(_key(path), threading.Lock())
+        with self._lock:
+            if path == ":memory:":
+                shared = TableIndex(table)
+            else:
+                self._index_key = ("tinydb-index", _key(path), table_name)
+                shared = registry.acquire(self._index_key, functools.partial(TableIndex, table))
+            # the indexes are mutated in place, never replaced, so these are the ones every client of the table holds
+            self._doc_ids = shared.doc_ids
+            self._keys = shared.keys
+            self._values = shared.values
+            self._sorted = shared.sorted
+            # the fields indexed by this client and not by the previous clients of the table are indexed now
+            if missing := [name for name in self.indexes if name not in self._values]:
+                self._values.update({name: {} for name in missing})
+                self._sorted.update({name: SortedIndex() for name in missing})
+                for document in table:
+                    self._index_fields(document["resource_id"], document["resource_obj"], missing)
+
+    def _written(self) -> None:
+        """Schedules a flush of the buffered writes once `flush_interval` seconds have passed."""
+        if self.buffered and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Flushes the buffered writes after `flush_interval` seconds."""
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self._run(self._flush)
+
+    def _flush(self) -> None:
+        """Writes the buffered writes to the database file."""
+        with self._lock:
+            self.db.storage.flush()  # type: ignore
+
+    async def flush(self) -> None:
+        """Writes the buffered writes to the database file. Does nothing when the client is not buffered.
+
+        Returns:
+            None
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self.buffered:
+            await self._run(self._flush)
+
+    async def aclose(self) -> None:
+        """Flushes the buffered writes and releases the database file and the client's thread pool.
+
+        Returns:
+            None
+        """
+        await self.flush()
+        if self._closed:
+            return
+        self._closed = True
+        self.buffered = False
+        if self._index_key is not None:
+            registry.release(self._index_key)
+        db = self.db if self._registry_key is None else registry.release(self._registry_key)
+        if db is not None:
+            await self._run(db.close)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def _index(self, key: str, doc_id: int) -> None:
+        """Adds a resource to the index.
+
+        Args:
+            key (str): The ID of the resource.
+            doc_id (int): The ID of its document.
+        """
+        self._doc_ids[key] = doc_id
+        bisect.insort(self._keys, key)
+
+    def _unindex(self, key: str) -> int | None:
+        """Removes a resource from the index.
+
+        Args:
+            key (str): The ID of the resource.
+
+        Returns:
+            int | None: The ID of its document, or None if it wasn't indexed.
+        """
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        return doc_id
+
+    def _index_fields(self, key: str, resource_obj: ResourceObj, names: list[str] | None = None) -> None:
+        """Adds a resource to the indexes of the indexed fields.
+
+        Args:
+            key (str): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+            names (list[str] | None): The fields. Defaults to None, every indexed field of the table.
+        """
+        for name in self._values if names is None else names:
+            self._values[name].setdefault(index_key(resource_obj.get(name)), set()).add(key)
+            self._sorted[name].add(resource_obj.get(name), key)
+
+    def _unindex_fields(self, key: str, resource_obj: ResourceObj) -> None:
+        """Removes a resource from the indexes of the indexed fields.
+
+        Args:
+            key (str): The ID of the resource.
+            resource_obj (ResourceObj): The resource object.
+        """
+        for name, index in self._values.items():
+            value = index_key(resource_obj.get(name))
+            keys = index.get(value, set())
+            keys.discard(key)
+            if not keys:
+                index.pop(value, None)
+            self._sorted[name].discard(resource_obj.get(name), key)
+
+    def _rebuild_indexes(self) -> None:
+        """Builds the indexes of the indexed fields of the table from its documents."""
+        with self._lock:
+            names = [*self._values, *(name for name in self.indexes if name not in self._values)]
+            self._values.clear()
+            self._values.update({name: {} for name in names})
+            self._sorted.clear()
+            self._sorted.update({name: SortedIndex() for name in names})
+            if self._values:
+                for document in self.table:
+                    self._index_fields(document["resource_id"], document["resource_obj"])
 
     def _get(self, resource_id: ResourceId) -> ResourceObj:
         """Retrieves a resource from the database based on the given resource ID.
@@ -45,11 +398,284 @@ class TinydbClient(Base):
             self.exception: If the resource is not found in the database.
         """
         try:
-            result = self.table.search(tinydb.Query().resource_id == str(resource_id))
-            return result[0]["resource_obj"]  # type: ignore
-        except (KeyError, IndexError) as exception:
+            document = self.table.get(doc_id=self._doc_ids[str(resource_id)])
+            return document["resource_obj"]  # type: ignore
+        except (KeyError, TypeError) as exception:
             raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found") from exception
 
+    def _documents(self, keys: list[str]) -> dict[str, ResourceObj]:
+        """Retrieves the resources of the given IDs with a single read of the table, skipping the ones not found.
+
+        Args:
+            keys (list[str]): The IDs of the resources.
+
+        Returns:
+            dict[str, ResourceObj]: The retrieved resources, by resource ID.
+        """
+        doc_ids = [self._doc_ids[key] for key in keys if key in self._doc_ids]
+        if not doc_ids:
+            return {}
+        return {document["resource_id"]: document["resource_obj"] for document in self.table.get(doc_ids=doc_ids)}  # type: ignore
+
+    def _insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        with self._lock:
+            try:
+                self._get(resource_id)
+            except self.exception:
+                doc_id = self.table.insert({"resource_id": str(resource_id), "resource_obj": resource_obj})  # type: ignore
+                self._index(str(resource_id), doc_id)
+                self._index_fields(str(resource_id), resource_obj)
+                return {"id": resource_id, **resource_obj}
+            else:
+                raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+
+    def _select_one(self, resource_id: ResourceId) -> ResourceObj:
+        with self._lock:
+            result = self._get(resource_id)
+            return {"id": resource_id, **result}
+
+    def _update_one(self, resource_id: ResourceId, resource_obj: ResourceObj, partial: Partial) -> ResourceObj:
+        with self._lock:
+            _resource_obj = self._get(resource_id)
+            self._unindex_fields(str(resource_id), _resource_obj)
+            if partial:
+                _resource_obj.update(resource_obj)
+            else:
+                _resource_obj = resource_obj
+            self.table.update({"resource_obj": _resource_obj}, doc_ids=[self._doc_ids[str(resource_id)]])  # type: ignore
+            self._index_fields(str(resource_id), _resource_obj)
+            return {"id": resource_id, **_resource_obj}
+
+    def _delete_one(self, resource_id: ResourceId) -> None:
+        with self._lock:
+            self._unindex_fields(str(resource_id), self._get(resource_id))
+            self.table.remove(doc_ids=[self._unindex(str(resource_id))])
+
+    def _insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            new = {str(resource_id): resource_obj for resource_id, resource_obj in resources.items()}
+            new = {key: resource_obj for key, resource_obj in new.items() if key not in self._doc_ids}
+            doc_ids = self.table.insert_multiple(
+                {"resource_id": key, "resource_obj": resource_obj} for key, resource_obj in new.items()
+            )
+            for key, doc_id in zip(new, doc_ids, strict=True):
+                self._index(key, doc_id)
+                self._index_fields(key, new[key])
+            return [
+                {"id": resource_id, **resource_obj}
+                if str(resource_id) in new
+                else self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+                for resource_id, resource_obj in resources.items()
+            ]
+
+    def _select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            documents = self._documents([str(resource_id) for resource_id in resource_ids])
+            return [
+                {"id": resource_id, **documents[str(resource_id)]}
+                if str(resource_id) in documents
+                else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for resource_id in resource_ids
+            ]
+
+    def _update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        with self._lock:
+            found = {str(resource_id): resource_obj for resource_id, resource_obj in resources.items()}
+            found = {key: resource_obj for key, resource_obj in found.items() if key in self._doc_ids}
+            updated: dict[str, ResourceObj] = {}
+
+            def update(document: dict) -> None:
+                self._unindex_fields(document["resource_id"], document["resource_obj"])
+                if partial:
+                    document["resource_obj"].update(found[document["resource_id"]])
+                else:
+                    document["resource_obj"] = found[document["resource_id"]]
+                updated[document["resource_id"]] = document["resource_obj"]
+                self._index_fields(document["resource_id"], document["resource_obj"])
+
+            # every document is updated by a single write of the table
+            self.table.update(update, doc_ids=[self._doc_ids[key] for key in found])
+            return [
+                {"id": resource_id, **updated[str(resource_id)]}
+                if str(resource_id) in updated
+                else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for resource_id in resources
+            ]
+
+    def _delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        with self._lock:
+            keys = [str(resource_id) for resource_id in resource_ids]
+            if self._values:
+                for key, resource_obj in self._documents(keys).items():
+                    self._unindex_fields(key, resource_obj)
+            doc_ids = [self._unindex(key) for key in keys]
+            self.table.remove(doc_ids=[doc_id for doc_id in doc_ids if doc_id is not None])
+            return [
+                None if doc_id is not None else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+                for doc_id in doc_ids
+            ]
+
+    @staticmethod
+    def _matcher(predicates: list[dependencies.Predicate]) -> collections.abc.Callable[[ResourceObj], bool]:
+        """Compiles predicates into a function telling whether a resource object satisfies all of them.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            collections.abc.Callable[[ResourceObj], bool]: The function, which takes a resource object.
+        """
+        checks = [
+            (predicate.field, dependencies.OPERATORS[predicate.operator], predicate.value) for predicate in predicates
+        ]
+
+        def match(resource_obj: ResourceObj) -> bool:
+            return all(evaluate(resource_obj.get(field), argument) for field, evaluate, argument in checks)
+
+        return match
+
+    def _query(self, predicates: list[dependencies.Predicate], after: ResourceId | None) -> tinydb.queries.QueryLike:
+        """Compiles predicates, and the position of a page, into a TinyDB query.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+            after (ResourceId | None): The ID of the resource the page starts after, if any.
+
+        Returns:
+            tinydb.queries.QueryLike: The query.
+        """
+        query = tinydb.Query()
+        condition = query.resource_obj.test(self._matcher(predicates))
+        return condition & (query.resource_id > str(after)) if after else condition
+
+    def _candidates(self, predicates: list[dependencies.Predicate]) -> list[str] | None:
+        """Returns the IDs of the resources the predicates may match, as the indexes narrow them down.
+
+        Args:
+            predicates (list[Predicate]): The predicates.
+
+        Returns:
+            list[str] | None: The resource IDs, sorted, or None if no index narrows them down.
+        """
+        if (lookup := self._lookup(predicates)) is not None:
+            name, values = lookup
+            index = self._values[name]
+            return sorted(set().union(*(index.get(index_key(value), ()) for value in values)))
+        if (name := self._range(predicates)) is not None:
+            return sorted(self._sorted[name].scan([predicate for predicate in predicates if predicate.field == name]))
+        return None
+
+    def _lookup_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        keys: list[str],
+    ) -> dependencies.Page:
+        after = paginate_parameters.after
+        documents = self._documents(keys[bisect.bisect_right(keys, str(after)) if after else 0 :])
+        match = self._matcher(predicates)
+        matching = [key for key in sorted(documents) if match(documents[key])]
+        page = matching[paginate_parameters.skip : paginate_parameters.skip + paginate_parameters.limit]
+        return paginate_parameters.page([{"id": uuid.UUID(key), **documents[key]} for key in page])
+
+    def _top_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+        keys: list[str] | None,
+    ) -> dependencies.Page:
+        order_by = typing.cast("str", paginate_parameters.order_by)
+        if keys is None:
+            documents = {document["resource_id"]: document["resource_obj"] for document in self.table}
+        else:
+            documents = self._documents(keys)
+        match = self._matcher(predicates)
+        top = paginate_parameters.top(
+            {"id": uuid.UUID(key), order_by: resource_obj.get(order_by)}
+            for key, resource_obj in documents.items()
+            if match(resource_obj)
+        )
+        return dependencies.Page([{"id": item["id"], **documents[str(item["id"])]} for item in top], top.cursor)
+
+    def _scan_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+    ) -> dependencies.Page:
+        order_by = typing.cast("str", paginate_parameters.order_by)
+        skip, limit = paginate_parameters.skip, paginate_parameters.limit
+        position = paginate_parameters.position
+        scan = self._sorted[order_by].scan(
+            [predicate for predicate in predicates if predicate.field == order_by],
+            (position[0], str(position[1])) if position is not None else None,
+            descending=paginate_parameters.descending,
+        )
+        match = self._matcher(predicates)
+        matching: list[tuple[str, ResourceObj]] = []
+        # the documents are read in batches, until the page is full or the range is exhausted
+        while len(matching) < skip + limit and (keys := list(itertools.islice(scan, max(skip + limit, 64)))):
+            documents = self._documents(keys)
+            matching.extend((key, documents[key]) for key in keys if match(documents[key]))
+        return paginate_parameters.page(
+            [{"id": uuid.UUID(key), **resource_obj} for key, resource_obj in matching[skip : skip + limit]],
+        )
+
+    def _stream_keys(self, predicates: list[dependencies.Predicate]) -> list[str] | None:
+        with self._lock:
+            return self._candidates(predicates)
+
+    def _stream_batch(
+        self,
+        keys: list[str] | None,
+        after: str | None,
+        batch_size: int,
+        match: collections.abc.Callable[[ResourceObj], bool],
+    ) -> tuple[list[ResourceObj], str | None]:
+        with self._lock:
+            keys = self._keys if keys is None else keys
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            batch = keys[start : start + batch_size]
+            documents = self._documents(batch)
+        resource_objs = [
+            {"id": uuid.UUID(key), **documents[key]} for key in batch if key in documents and match(documents[key])
+        ]
+        return resource_objs, batch[-1] if batch else None
+
+    def _select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        predicates: list[dependencies.Predicate],
+    ) -> dependencies.Page:
+        skip, limit = paginate_parameters.skip, paginate_parameters.limit
+        with self._lock:
+            order_by = paginate_parameters.order_by
+            if order_by is not None and self._lookup(predicates) is None and order_by in self._sorted:
+                return self._scan_many(paginate_parameters, predicates)
+            keys = self._candidates(predicates)
+            if order_by is not None:
+                return self._top_many(paginate_parameters, predicates, keys)
+            if keys is not None:
+                return self._lookup_many(paginate_parameters, predicates, keys)
+            if predicates:
+                documents = self.table.search(self._query(predicates, paginate_parameters.after))
+                documents.sort(key=lambda document: document["resource_id"])
+                return paginate_parameters.page(
+                    [
+                        {"id": uuid.UUID(document["resource_id"]), **document["resource_obj"]}
+                        for document in documents[skip : skip + limit]
+                    ],
+                )
+
+            after = paginate_parameters.after
+            start = (bisect.bisect_right(self._keys, str(after)) if after else 0) + skip
+            keys = self._keys[start : start + limit]
+            documents = self._documents(keys)
+            return paginate_parameters.page([{"id": uuid.UUID(key), **documents[key]} for key in keys])
+
     async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
         """Inserts a resource object in the database.
 
@@ -63,13 +689,9 @@ class TinydbClient(Base):
         Raises:
             self.exception: If the resource already exists in the database.
         """
-        try:
-            self._get(resource_id)
-        except self.exception:
-            self.table.insert({"resource_id": str(resource_id), "resource_obj": resource_obj})  # type: ignore
-            return {"id": resource_id, **resource_obj}
-        else:
-            raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+        result = await self._run(self._insert_one, resource_id, resource_obj)
+        self._written()
+        return result
 
     async def select_one(self, resource_id: ResourceId) -> ResourceObj:
         """Retrieves a resource from the database based on the given ID.
@@ -83,8 +705,7 @@ class TinydbClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        result = self._get(resource_id)
-        return {"id": resource_id, **result}
+        return await self._run(self._select_one, resource_id)
 
     async def update_one(
         self,
@@ -106,13 +727,9 @@ class TinydbClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        _resource_obj = self._get(resource_id)
-        if partial:
-            _resource_obj.update(resource_obj)
-        else:
-            _resource_obj = resource_obj
-        self.table.update({"resource_obj": _resource_obj}, tinydb.Query().resource_id == str(resource_id))  # type: ignore
-        return {"id": resource_id, **_resource_obj}
+        result = await self._run(self._update_one, resource_id, resource_obj, partial)
+        self._written()
+        return result
 
     async def delete_one(self, resource_id: ResourceId) -> None:
         """Deletes a resource from the database based on the given resource ID.
@@ -126,18 +743,127 @@ class TinydbClient(Base):
         Raises:
             self.exception: If the resource is not found in the database.
         """
-        self._get(resource_id)
-        self.table.remove(tinydb.Query().resource_id == str(resource_id))
+        await self._run(self._delete_one, resource_id)
+        self._written()
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        The filter is compiled into a TinyDB query, evaluated by a single search of the table, unless it filters an
+        indexed field by equality or range, in which case only the documents the indexes look up are read.
 
-    async def select_many(self, paginate_parameters: dependencies.PaginateParameters) -> list[ResourceObj]:
-        """Retrieves multiple resources from the database based on the given pagination parameters.
+        Pages ordered by an indexed field are read from its sorted index. Ordered by another field, the first
+        `skip + limit` matching documents are selected with a bounded heap instead of sorting them all.
 
         Args:
             paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
 
         Returns:
-            list[ResourceObj]: A list of objects representing the retrieved resources.
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        predicates = self._predicates(filter_parameters)
+        self._order_by(paginate_parameters)
+        return await self._run(self._select_many, paginate_parameters, predicates)
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database, with a single write of the table.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        result = await self._run(self._insert_many, resources)
+        self._written()
+        return result
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database, with a single read of the table.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return await self._run(self._select_by_ids, resource_ids)
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs, with a single write of the table.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        result = await self._run(self._update_many, resources, partial)
+        self._written()
+        return result
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database, with a single write of the table.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        result = await self._run(self._delete_many, resource_ids)
+        self._written()
+        return result
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, ordered by ID.
+
+        The sorted resource IDs, or the ones the indexes look up, are walked lazily: every batch bisects them past
+        the last resource of the previous one, and reads only the documents of the batch. Unless the client is
+        buffered, that read parses the database file, so large batches suit file databases best.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        predicates = self._predicates(filter_parameters)
+        match = self._matcher(predicates)
+        keys = await self._run(self._stream_keys, predicates)
+        after = None
+        while True:
+            resource_objs, after = await self._run(self._stream_batch, keys, after, batch_size, match)
+            if after is None:
+                return
+            for resource_obj in resource_objs:
+                yield resource_obj
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the indexes of the indexed fields from the documents of the table.
+
+        Returns:
+            None
         """
-        return [{"id": result["resource_id"], **result["resource_obj"]} for result in self.table.all()][
-            paginate_parameters.skip : paginate_parameters.limit
-        ]  # type: ignore
+        await self._run(self._rebuild_indexes)
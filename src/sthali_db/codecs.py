@@ -0,0 +1,361 @@
+"""This module provides the codecs encoding the resources stored by the database clients.
+
+Classes:
+    Codec: A class representing the encoding of stored values as bytes.
+    TextCodec: A class representing the encoding of stored values as JSON text.
+    JsonCodec: A class representing the encoding of stored values as JSON, with the standard library.
+    OrjsonCodec: A class representing the encoding of stored values as JSON, with orjson.
+    MsgpackCodec: A class representing the encoding of stored values as MessagePack.
+
+Functions:
+    get_codec(name: str) -> Codec: Returns the codec of the given name.
+    tag(value: typing.Any) -> typing.Any: Returns a value as the JSON codecs store it, with its UUIDs and datetimes
+        tagged.
+
+Constants:
+    CODECS (dict[str, type[Codec]]): The codecs, by name.
+"""
+
+import collections.abc
+import datetime as dt
+import json
+import typing
+import uuid
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# JSON has no UUID nor datetime: they are stored as single key objects tagged with their type
+_TAGS: dict[type, tuple[str, collections.abc.Callable[[typing.Any], str]]] = {
+    uuid.UUID: ("$uuid", str),
+    dt.datetime: ("$datetime", dt.datetime.isoformat),
+    dt.date: ("$date", dt.date.isoformat),
+    dt.time: ("$time", dt.time.isoformat),
+}
+_UNTAGS: dict[str, collections.abc.Callable[[str], typing.Any]] = {
+    "$uuid": uuid.UUID,
+    "$datetime": dt.datetime.fromisoformat,
+    "$date": dt.date.fromisoformat,
+    "$time": dt.time.fromisoformat,
+}
+
+
+def _tag(value: typing.Any) -> dict[str, str]:
+    tag = _TAGS.get(type(value))
+    if tag is None:
+        msg = f"Object of type {type(value).__name__} is not serializable"
+        raise TypeError(msg)
+    name, encode = tag
+    return {name: encode(value)}
+
+
+def _untag(value: dict[str, typing.Any]) -> typing.Any:
+    if len(value) == 1:
+        ((name, item),) = value.items()
+        untag = _UNTAGS.get(name)
+        if untag is not None and isinstance(item, str):
+            return untag(item)
+    return value
+
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+def _tag_all(value: typing.Any) -> typing.Any:
+    # copies only the containers holding a value to tag, the others are returned as they are
+    if isinstance(value, dict):
+        tagged = None
+        for key, item in value.items():
+            if type(item) not in _SCALARS and (new := _tag_all(item)) is not item:
+                tagged = tagged or dict(value)
+                tagged[key] = new
+        return value if tagged is None else tagged
+    if isinstance(value, list | tuple):
+        tagged = None
+        for position, item in enumerate(value):
+            if type(item) not in _SCALARS and (new := _tag_all(item)) is not item:
+                tagged = tagged or list(value)
+                tagged[position] = new
+        return value if tagged is None else tagged
+    if type(value) in _TAGS:
+        return _tag(value)
+    return value
+
+
+def _untag_all(value: typing.Any) -> typing.Any:
+    # untags in place, the value being a freshly decoded one
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, dict | list):
+                value[key] = _untag_all(item)
+        return _untag(value)
+    if isinstance(value, list):
+        for position, item in enumerate(value):
+            if isinstance(item, dict | list):
+                value[position] = _untag_all(item)
+    return value
+
+
+class Codec:
+    """A class representing the encoding of stored values as bytes.
+
+    Every codec round-trips the JSON types, the values of the types in `Types.TypeEnum` among them, and `uuid.UUID`,
+    `datetime.datetime`, `datetime.date` and `datetime.time` values, nested at any depth. Tuples are decoded as lists.
+
+    Attributes:
+        name (str): The name of the codec.
+    """
+
+    name: typing.ClassVar[str]
+
+    def encode(self, value: typing.Any) -> bytes:
+        """Encodes a value.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            bytes: The encoded value.
+        """
+        raise NotImplementedError
+
+    def decode(self, data: bytes | str) -> typing.Any:
+        """Decodes a value.
+
+        Args:
+            data (bytes | str): The encoded value.
+
+        Returns:
+            typing.Any: The value.
+        """
+        raise NotImplementedError
+
+
+class TextCodec(Codec):
+    """A class representing the encoding of stored values as JSON text.
+
+    Values that JSON lacks are stored as single key objects tagged with their type, e.g. `{"$uuid": "..."}`, so the
+    stored text can still be queried by databases that parse JSON. Objects of a single key among "$uuid",
+    "$datetime", "$date" and "$time" are therefore reserved.
+    """
+
+    def dumps(self, value: typing.Any) -> str:
+        """Encodes a value as text.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            str: The encoded value.
+        """
+        raise NotImplementedError
+
+    def encode(self, value: typing.Any) -> bytes:
+        """Encodes a value.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            bytes: The encoded value.
+        """
+        return self.dumps(value).encode()
+
+
+class JsonCodec(TextCodec):
+    """A class representing the encoding of stored values as JSON, with the standard library.
+
+    The values are written as `json.dumps` writes them by default, so the text stored by earlier versions is unchanged.
+    """
+
+    name = "json"
+
+    def dumps(self, value: typing.Any) -> str:
+        """Encodes a value as text.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            str: The encoded value.
+        """
+        return json.dumps(value, default=_tag)
+
+    def decode(self, data: bytes | str) -> typing.Any:
+        """Decodes a value.
+
+        Args:
+            data (bytes | str): The encoded value.
+
+        Returns:
+            typing.Any: The value.
+        """
+        return json.loads(data, object_hook=_untag)
+
+
+class OrjsonCodec(TextCodec):
+    """A class representing the encoding of stored values as JSON, with orjson.
+
+    orjson writes UUIDs as plain strings, so they are tagged before the value is encoded.
+
+    Raises:
+        ImportError: If orjson is not installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        """Initialize an OrjsonCodec instance.
+
+        Raises:
+            ImportError: If orjson is not installed.
+        """
+        if orjson is None:
+            msg = "OrjsonCodec requires orjson, install it with `pip install sthali-db[orjson]`"
+            raise ImportError(msg)
+
+    def encode(self, value: typing.Any) -> bytes:
+        """Encodes a value.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            bytes: The encoded value.
+        """
+        return orjson.dumps(_tag_all(value), default=_tag, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    def dumps(self, value: typing.Any) -> str:
+        """Encodes a value as text.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            str: The encoded value.
+        """
+        return self.encode(value).decode()
+
+    def decode(self, data: bytes | str) -> typing.Any:
+        """Decodes a value.
+
+        Args:
+            data (bytes | str): The encoded value.
+
+        Returns:
+            typing.Any: The value.
+        """
+        value = orjson.loads(data)
+        # only text holding a key starting with "$" can hold a tagged value
+        return _untag_all(value) if ('"$' if isinstance(data, str) else b'"$') in data else value
+
+
+class MsgpackCodec(Codec):
+    """A class representing the encoding of stored values as MessagePack.
+
+    UUIDs are stored as 16 bytes, and datetimes as their ISO 8601 text, in extension types. The encoded values are
+    binary, so the clients querying the stored JSON can't use this codec.
+
+    Raises:
+        ImportError: If msgpack is not installed.
+    """
+
+    name = "msgpack"
+    _ext_types: typing.ClassVar[dict[type, int]] = {
+        uuid.UUID: 1,
+        dt.datetime: 2,
+        dt.date: 3,
+        dt.time: 4,
+    }
+
+    def __init__(self) -> None:
+        """Initialize a MsgpackCodec instance.
+
+        Raises:
+            ImportError: If msgpack is not installed.
+        """
+        if msgpack is None:
+            msg = "MsgpackCodec requires msgpack, install it with `pip install sthali-db[msgpack]`"
+            raise ImportError(msg)
+
+    def _default(self, value: typing.Any) -> typing.Any:
+        code = self._ext_types.get(type(value))
+        if code is None:
+            msg = f"Object of type {type(value).__name__} is not serializable"
+            raise TypeError(msg)
+        data = value.bytes if code == 1 else value.isoformat().encode()
+        return msgpack.ExtType(code, data)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> typing.Any:
+        if code == 1:
+            return uuid.UUID(bytes=data)
+        decoders = {2: dt.datetime, 3: dt.date, 4: dt.time}
+        if code in decoders:
+            return decoders[code].fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def encode(self, value: typing.Any) -> bytes:
+        """Encodes a value.
+
+        Args:
+            value (typing.Any): The value.
+
+        Returns:
+            bytes: The encoded value.
+        """
+        return msgpack.packb(value, default=self._default, use_bin_type=True, datetime=False)
+
+    def decode(self, data: bytes | str) -> typing.Any:
+        """Decodes a value.
+
+        Args:
+            data (bytes | str): The encoded value.
+
+        Returns:
+            typing.Any: The value.
+        """
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+CODECS: dict[str, type[Codec]] = {codec.name: codec for codec in (JsonCodec, OrjsonCodec, MsgpackCodec)}
+
+
+def get_codec(name: str) -> Codec:
+    """Returns the codec of the given name.
+
+    Args:
+        name (str): The name of the codec, one of "json", "orjson" and "msgpack".
+
+    Returns:
+        Codec: The codec.
+
+    Raises:
+        ValueError: If there is no codec of that name.
+        ImportError: If the library of the codec is not installed.
+    """
+    if name not in CODECS:
+        msg = f"Unknown codec {name!r}, expected one of {', '.join(map(repr, CODECS))}"
+        raise ValueError(msg)
+    return CODECS[name]()
+
+
+def tag(value: typing.Any) -> typing.Any:
+    """Returns a value as the JSON codecs store it, with its UUIDs and datetimes tagged.
+
+    Databases querying the stored JSON compare it to values tagged this way.
+
+    Args:
+        value (typing.Any): The value.
+
+    Returns:
+        typing.Any: The value, or a copy of it with its UUIDs and datetimes replaced by single key tagged objects.
+    """
+    return _tag_all(value)
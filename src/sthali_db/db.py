@@ -4,7 +4,10 @@ Classes:
     DB: Represents a database client adapter.
 
 Dataclasses:
+    CacheSpecification: Represents the specification for the read-through cache of a database connection.
     DBSpecification: Represents the specification for a database connection.
+    MetricsSpecification: Represents the specification for the metrics of the operations of a database connection.
+    WriteBehindSpecification: Represents the specification for the write-behind buffer of a database connection.
 """
 
 import pathlib
@@ -13,8 +16,13 @@ import typing
 import pydantic
 import sthali_core
 
+from .cache import CachedClient
+from .metrics import InstrumentedClient, registry
+from .write_behind import WriteBehindClient
+
 if typing.TYPE_CHECKING:
     from .clients import Base
+    from .models import FieldSpecification
 
 
 parent_path = pathlib.Path(__file__).parent
@@ -22,6 +30,81 @@ enum_clients_config = sthali_core.enum_clients.Clients(parent_path)
 ClientEnum = enum_clients_config.enum
 
 
+@pydantic.dataclasses.dataclass
+class CacheSpecification:
+    """Represents the specification for the read-through cache of a database connection.
+
+    Attributes:
+        max_size (pydantic.NonNegativeInt): The maximum number of cached resources.
+            The least recently used resources are evicted past it. Defaults to 1024.
+        ttl (pydantic.PositiveFloat | None): The number of seconds a resource stays cached.
+            None keeps resources until they are written or evicted. Defaults to 60.
+    """
+
+    max_size: typing.Annotated[
+        pydantic.NonNegativeInt,
+        pydantic.Field(default=1024, description="The maximum number of cached resources"),
+    ]
+    ttl: typing.Annotated[
+        pydantic.PositiveFloat | None,
+        pydantic.Field(default=60.0, description="The number of seconds a resource stays cached"),
+    ]
+
+
+@pydantic.dataclasses.dataclass
+class WriteBehindSpecification:
+    """Represents the specification for the write-behind buffer of a database connection.
+
+    Attributes:
+        max_batch_size (pydantic.PositiveInt): The maximum number of resources written at once.
+            A full batch is written without waiting for `max_delay`. Defaults to 500.
+        max_delay (pydantic.NonNegativeFloat): The maximum number of seconds a write stays buffered.
+            Defaults to 0.05.
+        max_pending (pydantic.PositiveInt): The maximum number of buffered resources.
+            Writes past it wait for the buffer to be written. Defaults to 10000.
+        max_attempts (pydantic.PositiveInt): The number of times a write is attempted before it is dropped.
+            Failed writes are retried `max_delay` seconds later. Defaults to 3.
+    """
+
+    max_batch_size: typing.Annotated[
+        pydantic.PositiveInt,
+        pydantic.Field(default=500, description="The maximum number of resources written at once"),
+    ]
+    max_delay: typing.Annotated[
+        pydantic.NonNegativeFloat,
+        pydantic.Field(default=0.05, description="The maximum number of seconds a write stays buffered"),
+    ]
+    max_pending: typing.Annotated[
+        pydantic.PositiveInt,
+        pydantic.Field(default=10_000, description="The maximum number of buffered resources"),
+    ]
+    max_attempts: typing.Annotated[
+        pydantic.PositiveInt,
+        pydantic.Field(default=3, description="The number of times a write is attempted before it is dropped"),
+    ]
+
+
+@pydantic.dataclasses.dataclass
+class MetricsSpecification:
+    """Represents the specification for the metrics of the operations of a database connection.
+
+    Attributes:
+        registry (bool): Whether to record the operations in the in-process registry, `sthali_db.metrics.registry`.
+            Its `render()` returns them in the Prometheus text format. Defaults to True.
+        slow_threshold (pydantic.NonNegativeFloat | None): The number of seconds from which an operation is logged.
+            Defaults to None, which logs none.
+    """
+
+    registry: typing.Annotated[
+        bool,
+        pydantic.Field(default=True, description="Whether to record the operations in the in-process registry"),
+    ]
+    slow_threshold: typing.Annotated[
+        pydantic.NonNegativeFloat | None,
+        pydantic.Field(default=None, description="The number of seconds from which an operation is logged"),
+    ]
+
+
 @pydantic.dataclasses.dataclass
 class DBSpecification:
     """Represents the specification for a database connection.
@@ -31,36 +114,137 @@ class DBSpecification:
             This field specifies the path to the database file or server.
         client (str): One of available database clients.
             This field specifies the database client to be used for the connection.
-            The available options are "Default", "Postgres", "Redis", "SQLite", and "TinyDB".
+            The available options are "Bitcask", "Default", "Postgres", "Redis", "SQLite", and "TinyDB".
             Defaults to "Default".
+        options (dict[str, typing.Any]): Client specific options.
+            This field is forwarded as keyword arguments to the database client, e.g. `{"buffered": True}` for TinyDB.
+            Defaults to an empty dict.
+        cache (CacheSpecification | None): The read-through cache of the resources.
+            This field puts a cache of `select_one` and `select_by_ids` in front of the database client.
+            Defaults to None, which caches nothing.
+        write_behind (WriteBehindSpecification | None): The write-behind buffer of the writes.
+            This field makes single and bulk writes return once they are buffered, and writes them in batches.
+            Defaults to None, which writes them as they are made.
+        codec (str | None): The codec of the stored resources, one of "json", "orjson" and "msgpack".
+            This field is forwarded to every client, of which SQLite, Redis and Postgres don't take "msgpack". The
+            Default client encodes its snapshots with it.
+            Defaults to None, which uses the client's default, JSON.
+        metrics (MetricsSpecification | None): The metrics of the operations.
+            This field times every operation, recording its latency and errors by table and operation.
+            Defaults to None, which records nothing and costs nothing.
     """
 
     path: typing.Annotated[str, pydantic.Field(description="Path to the database")]
     client: typing.Annotated[ClientEnum, pydantic.Field(description="One of available database clients")]
+    options: typing.Annotated[
+        dict[str, typing.Any],
+        pydantic.Field(default_factory=dict, description="Client specific options"),
+    ]
+    cache: typing.Annotated[
+        CacheSpecification | None,
+        pydantic.Field(default=None, description="The read-through cache of the resources"),
+    ]
+    write_behind: typing.Annotated[
+        WriteBehindSpecification | None,
+        pydantic.Field(default=None, description="The write-behind buffer of the writes"),
+    ]
+    codec: typing.Annotated[
+        typing.Literal["json", "orjson", "msgpack"] | None,
+        pydantic.Field(default=None, description="The codec of the stored resources"),
+    ]
+    metrics: typing.Annotated[
+        MetricsSpecification | None,
+        pydantic.Field(default=None, description="The metrics of the operations"),
+    ]
 
 
 class DB:
     """Represents a database client adapter.
 
+    The clients of the tables of a database share its file handle, connection or connection pool, which is closed
+    when the last of them is closed. A DB is closed with `aclose()`, or by using it as an async context manager, e.g.
+    in the lifespan of a FastAPI application:
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: fastapi.FastAPI) -> collections.abc.AsyncIterator[None]:
+            async with DB(db_spec, "users") as users, DB(db_spec, "orders") as orders:
+                app.state.users, app.state.orders = users, orders
+                yield
+
     Args:
         db_spec (DBSpecification): The specification for the database connection.
         table (str): The name of the table to interact with.
+        fields (list[FieldSpecification] | None): The fields specification of the resources, used by clients that
+            derive a schema from it. Defaults to None.
+
+    Attributes:
+        cache (CachedClient | None): The read-through cache in front of the client, with its counters, if the
+            specification has one.
+        write_behind (WriteBehindClient | None): The write-behind buffer in front of the client, behind the cache,
+            if the specification has one.
+        metrics (InstrumentedClient | None): The client timing the operations, in front of the cache, if the
+            specification has metrics. More sinks, e.g. callbacks, can be appended to its `sinks`.
     """
 
-    def __init__(self, db_spec: DBSpecification, table: str) -> None:
+    def __init__(
+        self,
+        db_spec: DBSpecification,
+        table: str,
+        fields: "list[FieldSpecification] | None" = None,
+    ) -> None:
         """Initialize the DB instance.
 
         Args:
             db_spec (DBSpecification): The specification for the database connection.
             table (str): The name of the table to interact with.
+            fields (list[FieldSpecification] | None): The fields specification of the resources. Defaults to None.
         """
         client_name = str(db_spec.client.value)
         client_module = enum_clients_config.clients_map[client_name]
         client_class: type[Base] = getattr(client_module, f"{client_name.title()}Client")
-        client = client_class(db_spec.path, table)
+        options = db_spec.options if db_spec.codec is None else {"codec": db_spec.codec, **db_spec.options}
+        client = client_class(db_spec.path, table, fields=fields, **options)
+        self.write_behind: WriteBehindClient | None = None
+        if db_spec.write_behind is not None:
+            client = self.write_behind = WriteBehindClient(
+                client,
+                max_batch_size=db_spec.write_behind.max_batch_size,
+                max_delay=db_spec.write_behind.max_delay,
+                max_pending=db_spec.write_behind.max_pending,
+                max_attempts=db_spec.write_behind.max_attempts,
+            )
+        self.cache: CachedClient | None = None
+        if db_spec.cache is not None:
+            client = self.cache = CachedClient(client, max_size=db_spec.cache.max_size, ttl=db_spec.cache.ttl)
+        self.metrics: InstrumentedClient | None = None
+        if db_spec.metrics is not None:
+            client = self.metrics = InstrumentedClient(
+                client,
+                sinks=[registry.observe] if db_spec.metrics.registry else [],
+                slow_threshold=db_spec.metrics.slow_threshold,
+            )
 
         self.insert_one = client.insert_one
         self.select_one = client.select_one
         self.update_one = client.update_one
         self.delete_one = client.delete_one
         self.select_many = client.select_many
+        self.insert_many = client.insert_many
+        self.select_by_ids = client.select_by_ids
+        self.update_many = client.update_many
+        self.delete_many = client.delete_many
+        self.stream_many = client.stream_many
+        self.rebuild_indexes = client.rebuild_indexes
+        self.aclose = client.aclose
+
+    async def __aenter__(self) -> "DB":  # noqa: PYI034
+        """Enters the runtime context of the DB, which closes it on exit.
+
+        Returns:
+            DB: The DB instance.
+        """
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Closes the DB, writing out anything still buffered and releasing the handle to the database."""
+        await self.aclose()
@@ -1,28 +1,320 @@
 """This module provides the dependencies for sthali-db usage.
 
+Constants:
+    Operator(str): One of the operators of a predicate.
+    OPERATORS(dict[Operator, collections.abc.Callable[[typing.Any, typing.Any], bool]]): The evaluation of every
+        operator in Python.
+    Direction(str): The direction items are ordered in.
+
 Classes:
+    Predicate: Represents a condition on a field of the items.
+    FilterParameters: Represents the parameters for filtering items.
+    Page: Represents a page of retrieved items.
     PaginateParameters: Represents the parameters for retrieving items.
 
 Functions:
-    filter_parameters: Not implemented. Raises NotImplementedError.
+    filter_parameters: Parses the `filter` query parameters into FilterParameters.
+    order_key: Returns the key items are ordered by their value of a field.
+    encode_cursor: Encodes the position after an item as a cursor.
+    decode_cursor: Decodes a cursor into the position it encodes.
 """
 
+import base64
+import binascii
+import collections.abc
+import contextlib
+import heapq
+import http
+import json
+import operator
 import typing
+import uuid
 
+import fastapi
 import pydantic
 
+if typing.TYPE_CHECKING:
+    from .models import FieldSpecification
+
+Operator = typing.Literal["eq", "lt", "le", "gt", "ge", "in", "contains"]
+Direction = typing.Literal["asc", "desc"]
+
+
+def _safe(function: collections.abc.Callable[[typing.Any, typing.Any], bool]) -> collections.abc.Callable[..., bool]:
+    """Wraps an operator so that None, and values of another type, don't satisfy it instead of raising.
+
+    Args:
+        function (collections.abc.Callable[[typing.Any, typing.Any], bool]): The operator.
+
+    Returns:
+        collections.abc.Callable[..., bool]: The wrapped operator.
+    """
+
+    def safe(value: typing.Any, argument: typing.Any) -> bool:
+        try:
+            return value is not None and bool(function(value, argument))
+        except TypeError:
+            return False
+
+    return safe
+
+
+OPERATORS: dict[str, collections.abc.Callable[[typing.Any, typing.Any], bool]] = {
+    "eq": operator.eq,
+    "lt": _safe(operator.lt),
+    "le": _safe(operator.le),
+    "gt": _safe(operator.gt),
+    "ge": _safe(operator.ge),
+    "in": lambda value, argument: value in argument,
+    "contains": _safe(lambda value, argument: isinstance(value, str | list) and argument in value),
+}
+
+
+class Predicate(pydantic.BaseModel):
+    """Represents a condition on a field of the items.
+
+    A missing field is taken as None, which is only equal to None and doesn't satisfy any other operator.
+
+    Attributes:
+        field (str): The name of the field.
+        operator (Operator): One of "eq", "lt", "le", "gt", "ge", "in" and "contains". "in" takes a list of values,
+            and "contains" holds for a string containing the value, or for a list having it as an item.
+        value (typing.Any): The value the field is compared to.
+    """
+
+    field: typing.Annotated[str, pydantic.Field(description="The name of the field")]
+    operator: typing.Annotated[Operator, pydantic.Field(description="The operator")]
+    value: typing.Annotated[typing.Any, pydantic.Field(description="The value the field is compared to")]
+
+
+class FilterParameters(pydantic.BaseModel):
+    """Represents the parameters for filtering items.
+
+    Attributes:
+        predicates (list[Predicate]): The conditions every retrieved item satisfies. Defaults to no conditions.
+    """
+
+    predicates: typing.Annotated[
+        list[Predicate],
+        pydantic.Field(default_factory=list, description="The conditions every retrieved item satisfies"),
+    ]
+
+    def bind(self, fields: "list[FieldSpecification]") -> list[Predicate]:
+        """Checks the predicates against the fields specification, converting their values to the type of the field.
+
+        Values given as strings, as in query parameters, are also parsed as JSON when they aren't valid as they are.
+
+        Args:
+            fields (list[FieldSpecification]): The fields specification of the items.
+
+        Returns:
+            list[Predicate]: The predicates, with converted values.
+
+        Raises:
+            ValueError: If a field is not in the fields specification, or a value is not valid for its field.
+        """
+        types = {field.name: field.type for field in fields}
+        predicates = []
+        for predicate in self.predicates:
+            if predicate.field not in types:
+                msg = f"unknown field {predicate.field!r}"
+                raise ValueError(msg)
+            field_type = types[predicate.field]
+            if predicate.operator == "contains":
+                field_type = str if field_type is str else next(iter(typing.get_args(field_type)), typing.Any)
+            adapter = pydantic.TypeAdapter(field_type | None)
+            values = predicate.value if predicate.operator == "in" else [predicate.value]
+            if not isinstance(values, list):
+                msg = f"{predicate.field!r} in takes a list of values"
+                raise ValueError(msg)  # noqa: TRY004
+            values = [self._validate(adapter, predicate.field, value) for value in values]
+            value = values if predicate.operator == "in" else values[0]
+            predicates.append(Predicate(field=predicate.field, operator=predicate.operator, value=value))
+        return predicates
+
+    @staticmethod
+    def _validate(adapter: pydantic.TypeAdapter, field: str, value: typing.Any) -> typing.Any:
+        """Validates a value with the adapter of its field, then as JSON if it is a string.
+
+        Args:
+            adapter (pydantic.TypeAdapter): The adapter of the type of the field.
+            field (str): The name of the field.
+            value (typing.Any): The value.
+
+        Returns:
+            typing.Any: The validated value.
+
+        Raises:
+            ValueError: If the value is not valid.
+        """
+        try:
+            return adapter.validate_python(value)
+        except pydantic.ValidationError:
+            if isinstance(value, str):
+                with contextlib.suppress(pydantic.ValidationError):
+                    return adapter.validate_json(value)
+        msg = f"invalid value {value!r} for {field!r}"
+        raise ValueError(msg)
+
+
+def _parse_condition(condition: str) -> Predicate:
+    """Parses a "field:operator:value" condition into a predicate.
+
+    Args:
+        condition (str): The condition.
+
+    Returns:
+        Predicate: The predicate.
+
+    Raises:
+        fastapi.HTTPException: If the condition is malformed.
+    """
+    try:
+        field, operator_, value = condition.split(":", 2)
+        values = value.split(",") if operator_ == "in" else value
+        return Predicate(field=field, operator=operator_, value=values)  # type: ignore
+    except (ValueError, pydantic.ValidationError) as exception:
+        detail = f"invalid filter {condition!r}"
+        raise fastapi.HTTPException(http.HTTPStatus.UNPROCESSABLE_ENTITY, detail) from exception
+
+
+async def filter_parameters(
+    filters: typing.Annotated[
+        list[str] | None,
+        fastapi.Query(
+            alias="filter",
+            description='Conditions as "field:operator:value", e.g. "age:ge:18" or "name:in:alice,bob"',
+        ),
+    ] = None,
+) -> FilterParameters:
+    """Parses the `filter` query parameters into FilterParameters.
+
+    Every parameter is a "field:operator:value" condition, where the values of "in" are separated by commas.
+
+    Args:
+        filters (list[str] | None): The conditions. Defaults to None.
+
+    Returns:
+        FilterParameters: The filter parameters.
+
+    Raises:
+        fastapi.HTTPException: If a condition is malformed.
+    """
+    predicates = [_parse_condition(condition) for condition in filters or []]
+    return FilterParameters(predicates=predicates)
+
+
+def order_key(value: typing.Any) -> tuple[int, typing.Any]:
+    """Returns the key items are ordered by their value of a field.
 
-async def filter_parameters() -> typing.NoReturn:
-    """Not implemented."""
-    raise NotImplementedError
+    Numbers sort before strings, and both before other values, which are compared by their JSON. Missing values sort
+    last.
+
+    Args:
+        value (typing.Any): The value of the field.
+
+    Returns:
+        tuple[int, typing.Any]: The rank of the type of the value, and the value it is compared by.
+    """
+    if value is None:
+        return (3, 0)
+    if isinstance(value, int | float):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, json.dumps(value, sort_keys=True, default=str))
+
+
+def encode_cursor(resource_id: uuid.UUID, key: tuple[int, typing.Any] | None = None) -> str:
+    """Encodes the position after an item as a cursor.
+
+    Args:
+        resource_id (uuid.UUID): The ID of the item.
+        key (tuple[int, typing.Any] | None): The order key of the item, if items are ordered by a field.
+            Defaults to None.
+
+    Returns:
+        str: The cursor, an URL safe string.
+    """
+    position: dict[str, typing.Any] = {"id": str(resource_id)}
+    if key is not None:
+        position["key"] = key
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).rstrip(b"=").decode()
+
+
+def _decode_position(cursor: str) -> tuple[uuid.UUID, tuple[int, typing.Any] | None]:
+    """Decodes a cursor into the ID and order key of the item it is after.
+
+    Args:
+        cursor (str): The cursor, as returned by `encode_cursor`.
+
+    Returns:
+        tuple[uuid.UUID, tuple[int, typing.Any] | None]: The ID, and the order key if the cursor has one.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key = position.get("key")
+        if key is not None:
+            rank, value = key
+            key = (int(rank), value)
+        return uuid.UUID(position["id"]), key
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as exception:
+        msg = "invalid cursor"
+        raise ValueError(msg) from exception
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    """Decodes a cursor into the position it encodes.
+
+    Args:
+        cursor (str): The cursor, as returned by `encode_cursor`.
+
+    Returns:
+        uuid.UUID: The ID of the item the position is after.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    return _decode_position(cursor)[0]
+
+
+class Page(list):
+    """Represents a page of retrieved items.
+
+    A list of the items, which also holds the cursor of the next page.
+
+    Attributes:
+        cursor (str | None): The cursor of the next page, or None if this is the last page.
+    """
+
+    def __init__(self, items: typing.Iterable[typing.Any] = (), cursor: str | None = None) -> None:
+        """Initialize the Page instance.
+
+        Args:
+            items (typing.Iterable[typing.Any]): The items of the page. Defaults to no items.
+            cursor (str | None): The cursor of the next page. Defaults to None.
+        """
+        super().__init__(items)
+        self.cursor = cursor
 
 
 class PaginateParameters(pydantic.BaseModel):
     """Represents the parameters for retrieving items.
 
+    Items are ordered by ID or, given `order_by`, by their value of that field as `order_key` ranks it, then by ID.
+    Descending order is the exact reverse, so missing values come first. A page either starts at the first item or,
+    given a cursor, right after the last item of the page the cursor was returned with, so that clients seek to it
+    instead of counting the items before it. `skip` counts from that start.
+
     Attributes:
         skip (pydantic.NonNegativeInt): The number of items to skip. Defaults to 0.
         limit (pydantic.NonNegativeInt): The maximum number of items to return. Defaults to 100.
+        cursor (str | None): The cursor returned with the previous page. Defaults to None.
+        order_by (str | None): The field items are ordered by, before their ID. Defaults to None.
+        direction (Direction): The direction items are ordered in, "asc" or "desc". Defaults to "asc".
     """
 
     skip: typing.Annotated[
@@ -33,3 +325,94 @@ class PaginateParameters(pydantic.BaseModel):
         pydantic.NonNegativeInt,
         pydantic.Field(default=100, description="The maximum number of items to return"),
     ]
+    cursor: typing.Annotated[
+        str | None,
+        pydantic.Field(default=None, description="The cursor returned with the previous page"),
+    ]
+    order_by: typing.Annotated[
+        str | None,
+        pydantic.Field(default=None, description="The field items are ordered by, before their ID"),
+    ]
+    direction: typing.Annotated[
+        Direction,
+        pydantic.Field(default="asc", description="The direction items are ordered in"),
+    ]
+
+    @pydantic.field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, cursor: str | None) -> str | None:
+        """Validates that the cursor can be decoded.
+
+        Args:
+            cursor (str | None): The cursor.
+
+        Returns:
+            str | None: The cursor.
+        """
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
+
+    @property
+    def after(self) -> uuid.UUID | None:
+        """The ID of the item the page starts after, or None if it starts at the first item."""
+        return decode_cursor(self.cursor) if self.cursor is not None else None
+
+    @property
+    def position(self) -> tuple[tuple[int, typing.Any], uuid.UUID] | None:
+        """The order key and ID of the item an ordered page starts after, or None if it starts at the first item.
+
+        A cursor returned without ordering is taken as being after the items missing the field.
+        """
+        if self.cursor is None:
+            return None
+        resource_id, key = _decode_position(self.cursor)
+        return (key or order_key(None), resource_id)
+
+    @property
+    def descending(self) -> bool:
+        """Whether items are ordered in descending order."""
+        return self.direction == "desc"
+
+    def sort_key(self, item: dict[str, typing.Any]) -> tuple[tuple[int, typing.Any], typing.Any]:
+        """Returns the key an item is ordered by.
+
+        Args:
+            item (dict[str, typing.Any]): The item, with an "id".
+
+        Returns:
+            tuple[tuple[int, typing.Any], typing.Any]: The order key of its value of `order_by`, and its ID.
+        """
+        return (order_key(item.get(self.order_by) if self.order_by else None), item["id"])
+
+    def top(self, items: collections.abc.Iterable[dict[str, typing.Any]]) -> Page:
+        """Builds the page of unordered items, keeping only the first `skip + limit` of them in a bounded heap.
+
+        Args:
+            items (collections.abc.Iterable[dict[str, typing.Any]]): The items, each with an "id" of the type of the
+                IDs in the cursor.
+
+        Returns:
+            Page: The page.
+        """
+        key = self.sort_key
+        if (position := self.position) is not None:
+            items = (item for item in items if (key(item) < position if self.descending else key(item) > position))
+        select = heapq.nlargest if self.descending else heapq.nsmallest
+        return self.page(select(self.skip + self.limit, items, key=key)[self.skip :])
+
+    def page(self, items: list[typing.Any]) -> Page:
+        """Builds the page of the retrieved items, with the cursor of the next page.
+
+        Args:
+            items (list[typing.Any]): The retrieved items, each with an "id".
+
+        Returns:
+            Page: The page, whose cursor is None if fewer than `limit` items were retrieved.
+        """
+        cursor = None
+        if items and len(items) == self.limit:
+            last = items[-1]
+            key = order_key(last.get(self.order_by)) if self.order_by else None
+            cursor = encode_cursor(last["id"], key)
+        return Page(items, cursor)
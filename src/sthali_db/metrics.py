@@ -0,0 +1,428 @@
+"""This module provides the metrics of the operations of a database client.
+
+Classes:
+    InstrumentedClient(client: Base): A class representing a database client timing its operations.
+    MetricsRegistry(buckets: collections.abc.Iterable[float]): A class representing in-process metrics of operations.
+    Observation: A named tuple representing a call of an operation of a database client.
+
+Attributes:
+    registry (MetricsRegistry): The in-process registry the operations are recorded in by default.
+"""
+
+import bisect
+import collections
+import collections.abc
+import logging
+import time
+import typing
+
+import fastapi
+
+from . import dependencies
+from .clients import STREAM_BATCH_SIZE, Base, Partial, ResourceId, ResourceObj
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+T = typing.TypeVar("T")
+
+
+class Observation(typing.NamedTuple):
+    """A named tuple representing a call of an operation of a database client.
+
+    Attributes:
+        table (str): The name of the table.
+        operation (str): The name of the operation, e.g. "select_one".
+        seconds (float): The duration of the call.
+        status (int | None): The status code of the exception raised by the call, 500 if it isn't an HTTP exception,
+            or None if it returned.
+        item_statuses (tuple[int, ...]): The status codes of the exceptions returned by a bulk call for some of its
+            resources, e.g. 409 for the resources `insert_many` found in the database.
+    """
+
+    table: str
+    operation: str
+    seconds: float
+    status: int | None
+    item_statuses: tuple[int, ...] = ()
+
+
+Sink = collections.abc.Callable[[Observation], None]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """A class representing in-process metrics of operations, by table and operation.
+
+    Its `observe` method is a sink, and `render()` returns the metrics in the Prometheus text format, e.g. for a
+    `/metrics` route:
+
+        @app.get("/metrics", response_class=fastapi.responses.PlainTextResponse)
+        async def metrics() -> str:
+            return sthali_db.metrics.registry.render()
+
+    Attributes:
+        buckets (tuple[float, ...]): The upper bounds of the buckets of the latency histograms, in seconds.
+        calls (collections.Counter[tuple[str, str]]): The number of calls, by table and operation.
+        errors (collections.Counter[tuple[str, str, int]]): The number of errors, by table, operation and status
+            code, counting both raised exceptions and the ones returned for resources of bulk calls.
+        histograms (dict[tuple[str, str], list[int]]): The number of calls in every bucket, the last one past the
+            largest bound, by table and operation.
+        sums (collections.defaultdict[tuple[str, str], float]): The total duration of the calls, by table and
+            operation.
+
+    Args:
+        buckets (collections.abc.Iterable[float]): The upper bounds of the buckets of the latency histograms, in
+            seconds. Defaults to `DEFAULT_BUCKETS`, from 0.5 ms to 10 s.
+    """
+
+    def __init__(self, buckets: collections.abc.Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize a MetricsRegistry instance.
+
+        Args:
+            buckets (collections.abc.Iterable[float]): The upper bounds of the buckets of the latency histograms, in
+                seconds. Defaults to `DEFAULT_BUCKETS`, from 0.5 ms to 10 s.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.calls: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.errors: collections.Counter[tuple[str, str, int]] = collections.Counter()
+        self.histograms: dict[tuple[str, str], list[int]] = {}
+        self.sums: collections.defaultdict[tuple[str, str], float] = collections.defaultdict(float)
+
+    def observe(self, observation: Observation) -> None:
+        """Records a call of an operation.
+
+        Args:
+            observation (Observation): The call.
+        """
+        key = (observation.table, observation.operation)
+        self.calls[key] += 1
+        self.sums[key] += observation.seconds
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * (len(self.buckets) + 1)
+        histogram[bisect.bisect_left(self.buckets, observation.seconds)] += 1
+        if observation.status is not None:
+            self.errors[(*key, observation.status)] += 1
+        for status in observation.item_statuses:
+            self.errors[(*key, status)] += 1
+
+    def clear(self) -> None:
+        """Drops every recorded call."""
+        self.calls.clear()
+        self.errors.clear()
+        self.histograms.clear()
+        self.sums.clear()
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The `sthali_db_calls_total` and `sthali_db_errors_total` counters, and the
+                `sthali_db_duration_seconds` histogram, labelled by table and operation.
+        """
+        lines = [
+            "# HELP sthali_db_calls_total The number of calls of an operation.",
+            "# TYPE sthali_db_calls_total counter",
+        ]
+        labels = {key: f'table="{_escape(key[0])}",operation="{_escape(key[1])}"' for key in self.calls}
+        lines.extend(f"sthali_db_calls_total{{{labels[key]}}} {count}" for key, count in sorted(self.calls.items()))
+        lines += [
+            "# HELP sthali_db_errors_total The number of errors of an operation, by status code.",
+            "# TYPE sthali_db_errors_total counter",
+        ]
+        lines.extend(
+            f'sthali_db_errors_total{{{labels[table, operation]},status="{status}"}} {count}'
+            for (table, operation, status), count in sorted(self.errors.items())
+        )
+        lines += [
+            "# HELP sthali_db_duration_seconds The duration of the calls of an operation.",
+            "# TYPE sthali_db_duration_seconds histogram",
+        ]
+        for key, histogram in sorted(self.histograms.items()):
+            total = 0
+            for bound, count in zip([*map(repr, self.buckets), "+Inf"], histogram, strict=True):
+                total += count
+                lines.append(f'sthali_db_duration_seconds_bucket{{{labels[key]},le="{bound}"}} {total}')
+            lines.append(f"sthali_db_duration_seconds_sum{{{labels[key]}}} {self.sums[key]!r}")
+            lines.append(f"sthali_db_duration_seconds_count{{{labels[key]}}} {total}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentedClient(Base):
+    """A class representing a database client timing its operations.
+
+    Every call is timed and recorded, as an `Observation`, by each of the `sinks`, e.g. `registry.observe` or a
+    callback of one's own; a sink raising is logged and doesn't fail the call. Calls lasting at least
+    `slow_threshold` seconds are also logged as warnings, with their table, operation and status.
+
+    `stream_many` isn't timed, as its duration is the one of its consumer; every other call is timed and forwarded to
+    the client as it is.
+
+    Attributes:
+        client (Base): The client timed.
+        sinks (list[Sink]): The callables every call is recorded by.
+        slow_threshold (float | None): The number of seconds from which a call is logged, or None if none is.
+
+    Args:
+        client (Base): The client timed.
+        sinks (collections.abc.Iterable[Sink]): The callables every call is recorded by. Defaults to none.
+        slow_threshold (float | None): The number of seconds from which a call is logged. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        client: Base,
+        *,
+        sinks: collections.abc.Iterable[Sink] = (),
+        slow_threshold: float | None = None,
+    ) -> None:
+        """Initialize an InstrumentedClient instance.
+
+        Args:
+            client (Base): The client timed.
+            sinks (collections.abc.Iterable[Sink]): The callables every call is recorded by. Defaults to none.
+            slow_threshold (float | None): The number of seconds from which a call is logged. Defaults to None.
+        """
+        super().__init__(client.path, client.table, fields=client.fields)
+        self.client = client
+        self.sinks = list(sinks)
+        self.slow_threshold = slow_threshold
+
+    @staticmethod
+    def _send(sink: Sink, observation: Observation) -> None:
+        """Records a call with a sink, logging the exception it raises if any.
+
+        Args:
+            sink (Sink): The sink.
+            observation (Observation): The call.
+        """
+        try:
+            sink(observation)
+        except Exception:
+            logger.exception("recording %s of %s with %r failed", observation.operation, observation.table, sink)
+
+    def _record(self, operation: str, start: float, status: int | None, item_statuses: tuple[int, ...] = ()) -> None:
+        """Records a call with every sink, and logs it if it is slow.
+
+        Args:
+            operation (str): The name of the operation.
+            start (float): The `time.perf_counter()` when the call started.
+            status (int | None): The status code of the exception raised by the call, or None if it returned.
+            item_statuses (tuple[int, ...]): The status codes of the exceptions returned by a bulk call.
+                Defaults to none.
+        """
+        observation = Observation(self.table, operation, time.perf_counter() - start, status, item_statuses)
+        for sink in self.sinks:
+            self._send(sink, observation)
+        if self.slow_threshold is not None and observation.seconds >= self.slow_threshold:
+            logger.warning(
+                "slow %s of %s: %.3f s, status %s",
+                operation,
+                self.table,
+                observation.seconds,
+                status or "ok",
+            )
+
+    async def _timed(self, operation: str, call: collections.abc.Awaitable[T], *, bulk: bool = False) -> T:
+        """Awaits a call of the client, recording it.
+
+        Args:
+            operation (str): The name of the operation.
+            call (collections.abc.Awaitable[T]): The call.
+            bulk (bool): Whether the call returns a result for every resource, of which the exceptions are recorded.
+                Defaults to False.
+
+        Returns:
+            T: The result of the call.
+        """
+        start = time.perf_counter()
+        try:
+            result = await call
+        except fastapi.HTTPException as exception:
+            self._record(operation, start, exception.status_code)
+            raise
+        except Exception:
+            self._record(operation, start, fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR)
+            raise
+        item_statuses = ()
+        if bulk:
+            item_statuses = tuple(item.status_code for item in result if isinstance(item, fastapi.HTTPException))  # type: ignore[attr-defined]
+        self._record(operation, start, None, item_statuses)
+        return result
+
+    async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        """Inserts a resource object in the database.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be inserted.
+            resource_obj (ResourceObj): The resource object to be inserted.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource already exists in the database.
+        """
+        return await self._timed("insert_one", self.client.insert_one(resource_id, resource_obj))
+
+    async def select_one(self, resource_id: ResourceId) -> ResourceObj:
+        """Retrieves a resource from the database based on the given ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be retrieved.
+
+        Returns:
+            ResourceObj: The retrieved resource object.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        return await self._timed("select_one", self.client.select_one(resource_id))
+
+    async def update_one(
+        self,
+        resource_id: ResourceId,
+        resource_obj: ResourceObj,
+        partial: Partial = None,
+    ) -> ResourceObj:
+        """Updates a resource in the database based on the given ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be updated.
+            resource_obj (ResourceObj): The resource object to be updated.
+            partial (Partial): Whether to perform a partial update or replace the entire resource object.
+                Defaults to None.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        return await self._timed("update_one", self.client.update_one(resource_id, resource_obj, partial))
+
+    async def delete_one(self, resource_id: ResourceId) -> None:
+        """Deletes a resource from the database based on the given resource ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be deleted.
+
+        Returns:
+            None
+
+        Raises:
+            self.exception: If the resource is not found in the database.
+        """
+        await self._timed("delete_one", self.client.delete_one(resource_id))
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Retrieves multiple resources from the database based on the given pagination and filter parameters.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        return await self._timed("select_many", self.client.select_many(paginate_parameters, filter_parameters))
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Inserts resource objects in the database.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists in the database.
+        """
+        return await self._timed("insert_many", self.client.insert_many(resources), bulk=True)
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found in the database.
+        """
+        return await self._timed("select_by_ids", self.client.select_by_ids(resource_ids), bulk=True)
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Updates resources in the database based on the given IDs.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found in the database.
+        """
+        return await self._timed("update_many", self.client.update_many(resources, partial), bulk=True)
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Deletes the resources of the given IDs from the database.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found in the
+                database.
+        """
+        return await self._timed("delete_many", self.client.delete_many(resource_ids), bulk=True)
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Iterates over the resources of the database matching the given filter parameters, untimed.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        async for resource_obj in self.client.stream_many(filter_parameters, batch_size=batch_size):
+            yield resource_obj
+
+    async def rebuild_indexes(self) -> None:
+        """Rebuilds the secondary indexes of the client from the stored resources.
+
+        Returns:
+            None
+        """
+        await self._timed("rebuild_indexes", self.client.rebuild_indexes())
+
+    async def aclose(self) -> None:
+        """Releases the resources held by the client.
+
+        Returns:
+            None
+        """
+        await self.client.aclose()
@@ -5,14 +5,27 @@ Classes:
 
 Dataclasses:
     FieldSpecification: Represents a field with its metadata.
+
+Constants:
+    MODELS_CACHE_SIZE (int): The maximum number of generated models kept for reuse.
 """
 
+import collections
 import collections.abc
+import functools
+import threading
 import typing
 import uuid
 
 import pydantic
 
+MODELS_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=MODELS_CACHE_SIZE)
+def _list_adapter(model: type[pydantic.BaseModel]) -> pydantic.TypeAdapter[list[typing.Any]]:
+    return pydantic.TypeAdapter(list[model])  # type: ignore
+
 
 @pydantic.dataclasses.dataclass
 class FieldSpecification:
@@ -25,6 +38,8 @@ class FieldSpecification:
         description (str | None): Description of the field. Defaults to None.
         optional (bool | None): Indicates if the field accepts None. Defaults to None.
         title (str | None): Title of the field. Defaults to None.
+        index (bool | None): Indicates if the clients keep a secondary index of the field, so that filtering it by
+            equality doesn't scan the table. Defaults to None.
     """
 
     @pydantic.dataclasses.dataclass
@@ -60,6 +75,10 @@ class FieldSpecification:
         pydantic.Field(default=None, description="Indicates if the field accepts None"),
     ]
     title: typing.Annotated[str | None, pydantic.Field(default=None, description="Title of the field")]
+    index: typing.Annotated[
+        bool | None,
+        pydantic.Field(default=None, description="Indicates if the clients keep a secondary index of the field"),
+    ]
 
     @property
     def _metadata(self) -> dict[str, typing.Any]:
@@ -74,6 +93,12 @@ class FieldSpecification:
                 result["default"] = self.default.value
         return result
 
+    @property
+    def _signature(self) -> tuple[typing.Any, ...]:
+        # the type of the value tells apart defaults that compare equal, such as 1 and True
+        default = (self.default.factory, type(self.default.value), self.default.value) if self.default else None
+        return (self.name, self.type, default, self.description, bool(self.optional), self.title)
+
     @property
     def type_annotated(self) -> typing.Annotated[typing.Any, pydantic.Field]:
         """Returns the type annotation of the field.
@@ -91,8 +116,17 @@ class Models:
     This class is responsible for creating and managing models dynamically based on the provided fields.
     It provides methods to create different types of models such as create, response, and update models.
 
+    Generating a model compiles its schema, so the generated models are kept, by name and fields, in a least recently
+    used cache of at most `MODELS_CACHE_SIZE` models shared by every instance: collections of the same name and fields
+    reuse the same model classes. The response and update models are generated on first access.
+
+    Batches are validated and dumped by `validate_many` and `dump_many` in a single call into pydantic-core, through a
+    cached type adapter of a list of the model, and rows read back from the database are turned into response models
+    without validation by `construct_many`.
+
     Attributes:
         name (str): The name of the collection of models.
+        fields (list[FieldSpecification]): The list of fields specification for the models.
         create_model (type[Base]): The dynamically created model for creating new instances.
         response_model (type[BaseWithId]): The dynamically created model for response payloads.
         update_model (type[Base]): The dynamically created model for updating existing instances.
@@ -106,6 +140,11 @@ class Models:
 
         id: typing.Annotated[uuid.UUID, pydantic.Field(description="Resource identifier")]
 
+    _cache: typing.ClassVar[collections.OrderedDict[typing.Hashable, type[pydantic.BaseModel]]] = (
+        collections.OrderedDict()
+    )
+    _cache_lock: typing.ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(self, name: str, fields: list[FieldSpecification]) -> None:
         """Initialize the Models class.
 
@@ -114,15 +153,138 @@ class Models:
             fields (list[FieldSpecification]): The list of fields specification for the models.
         """
         self.name = name
+        self.fields = fields
         self.create_model = self._factory(self.Base, f"Create{name.title()}", fields)
-        self.response_model = self._factory(self.BaseWithId, f"Response{name.title()}", fields)
-        self.update_model = self._factory(self.Base, f"Update{name.title()}", fields)
 
-    @staticmethod
+    @functools.cached_property
+    def response_model(self) -> type[BaseWithId]:
+        """Returns the model for response payloads, generating it on first access.
+
+        Returns:
+            type[BaseWithId]: The model.
+        """
+        return self._factory(self.BaseWithId, f"Response{self.name.title()}", self.fields)
+
+    @functools.cached_property
+    def update_model(self) -> type[Base]:
+        """Returns the model for updating existing instances, generating it on first access.
+
+        Returns:
+            type[Base]: The model.
+        """
+        return self._factory(self.Base, f"Update{self.name.title()}", self.fields)
+
+    @classmethod
     def _factory(
+        cls,
         base: type[pydantic.main.ModelT],
         name: str,
         fields: list[FieldSpecification],
     ) -> type[pydantic.main.ModelT]:
+        key = (base, name, tuple(field._signature for field in fields))  # noqa: SLF001
+        try:
+            hash(key)
+        except TypeError:
+            # an unhashable default value or type, which can't be told apart from others: the model isn't cached
+            key = None
+        if key is not None:
+            with cls._cache_lock:
+                model = cls._cache.get(key)
+                if model is not None:
+                    cls._cache.move_to_end(key)
+                    return model  # type: ignore
         fields_constructor = {field.name: field.type_annotated for field in fields}
-        return pydantic.create_model(name, __base__=base, **fields_constructor)
+        model = pydantic.create_model(name, __base__=base, **fields_constructor)
+        if key is not None:
+            with cls._cache_lock:
+                model = cls._cache.setdefault(key, model)  # type: ignore
+                cls._cache.move_to_end(key)
+                while len(cls._cache) > MODELS_CACHE_SIZE:
+                    cls._cache.popitem(last=False)
+        return model
+
+    def validate_many(
+        self,
+        payloads: collections.abc.Sequence[typing.Any] | str | bytes,
+        model: type[pydantic.main.ModelT] | None = None,
+    ) -> list[pydantic.main.ModelT]:
+        """Validates a batch of payloads at once.
+
+        Args:
+            payloads (collections.abc.Sequence[typing.Any] | str | bytes): The payloads to be validated, or a JSON
+                array of them, which is parsed and validated in the same call.
+            model (type[pydantic.main.ModelT] | None): The model of the payloads. Defaults to None, which is the
+                create model.
+
+        Returns:
+            list[pydantic.main.ModelT]: The validated instances, in the order of the payloads.
+
+        Raises:
+            pydantic.ValidationError: If any payload is invalid, with the position of the payload leading the
+                location of every error.
+        """
+        adapter = _list_adapter(model or self.create_model)
+        if isinstance(payloads, str | bytes):
+            return adapter.validate_json(payloads)
+        return adapter.validate_python(payloads)
+
+    def dump_many(
+        self,
+        instances: collections.abc.Sequence[pydantic.BaseModel],
+        *,
+        mode: typing.Literal["python", "json"] = "python",
+        exclude_unset: bool = False,
+    ) -> list[dict[str, typing.Any]]:
+        """Dumps a batch of instances of the same model at once.
+
+        Args:
+            instances (collections.abc.Sequence[pydantic.BaseModel]): The instances to be dumped.
+            mode (typing.Literal["python", "json"]): Whether the values are dumped as Python or JSON compatible
+                objects. Defaults to "python".
+            exclude_unset (bool): Whether the fields not explicitly set are left out, as for a partial update.
+                Defaults to False.
+
+        Returns:
+            list[dict[str, typing.Any]]: The dumped instances, in the order of the instances.
+        """
+        if not instances:
+            return []
+        adapter = _list_adapter(type(instances[0]))
+        return adapter.dump_python(instances, mode=mode, exclude_unset=exclude_unset)  # type: ignore
+
+    def construct_many(self, rows: collections.abc.Iterable[dict[str, typing.Any]]) -> list[BaseWithId]:
+        """Builds response models from resources read from the database, without validating them.
+
+        Only rows written through validated models are to be trusted this way: their values are kept as they are. The
+        instances are built as `model_construct` builds them, missing fields getting their default and unknown ones
+        being dropped, without its per field loop.
+
+        Args:
+            rows (collections.abc.Iterable[dict[str, typing.Any]]): The resource objects containing their ID.
+
+        Returns:
+            list[BaseWithId]: The response models, in the order of the rows.
+        """
+        model = self.response_model
+        if model.__private_attributes__ or model.__pydantic_post_init__:
+            return [model.model_construct(**row) for row in rows]
+        model_fields = model.model_fields
+        # the values are kept in the order the fields are declared, as `model_construct` keeps them
+        names = tuple(model_fields)
+        result = []
+        for row in rows:
+            if tuple(row) == names:
+                values, fields_set = dict(row), set(names)
+            else:
+                values = {
+                    name: row[name] if name in row else model_fields[name].get_default(call_default_factory=True)
+                    for name in names
+                }
+                fields_set = {name for name in names if name in row}
+            instance = model.__new__(model)
+            object.__setattr__(instance, "__dict__", values)
+            object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+            object.__setattr__(instance, "__pydantic_extra__", None)
+            object.__setattr__(instance, "__pydantic_private__", None)
+            result.append(instance)
+        return result
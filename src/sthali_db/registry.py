@@ -0,0 +1,95 @@
+"""This module provides the registry of the database handles shared by the clients of a process.
+
+Classes:
+    Registry: A class representing the database handles shared by the clients of a process, with their users.
+
+Constants:
+    registry(Registry): The registry of the process.
+"""
+
+import collections.abc
+import threading
+import typing
+
+T = typing.TypeVar("T")
+Key = tuple[str, ...]
+
+
+class Registry:
+    """A class representing the database handles shared by the clients of a process, with their users.
+
+    A handle is a file handle, a connection or a connection pool, opened by the first client of a database and kept
+    by the registry, by client name and path, for the clients of the other tables of that database. Every client
+    acquires the handle when it is created and releases it when it is closed, and the last one to release it closes
+    it, so a database is opened once however many tables are used.
+
+    State shared by the clients of one table, e.g. its in-memory indexes, is kept the same way, under a key naming
+    the table too.
+
+    The handle is opened with the options of the first client.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty Registry instance."""
+        self._handles: dict[Key, tuple[typing.Any, int]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Key, factory: collections.abc.Callable[[], T]) -> T:
+        """Returns the handle of a database, opening it if it has no user.
+
+        Args:
+            key (Key): The name of the client and the path to the database, and the table if the handle is a table's.
+            factory (collections.abc.Callable[[], T]): The callable opening the handle.
+
+        Returns:
+            T: The handle.
+        """
+        with self._lock:
+            handle, users = self._handles.get(key, (None, 0))
+            if not users:
+                handle = factory()
+            self._handles[key] = (handle, users + 1)
+            return handle
+
+    def release(self, key: Key) -> typing.Any | None:
+        """Releases one user of the handle of a database.
+
+        Args:
+            key (Key): The name of the client and the path to the database, and the table if the handle is a table's.
+
+        Returns:
+            typing.Any | None: The handle if no user is left, which the caller is to close, or None.
+        """
+        with self._lock:
+            handle, users = self._handles.pop(key)
+            if users > 1:
+                self._handles[key] = (handle, users - 1)
+                return None
+            return handle
+
+    def users(self, key: Key) -> int:
+        """Returns the number of users of the handle of a database.
+
+        Args:
+            key (Key): The name of the client and the path to the database, and the table if the handle is a table's.
+
+        Returns:
+            int: The number of users, 0 if the database is not open.
+        """
+        with self._lock:
+            return self._handles.get(key, (None, 0))[1]
+
+    def handles(self, client: str) -> list[typing.Any]:
+        """Returns the open handles of the databases of a client.
+
+        Args:
+            client (str): The name of the client.
+
+        Returns:
+            list[typing.Any]: The handles.
+        """
+        with self._lock:
+            return [handle for (name, *_), (handle, _) in self._handles.items() if name == client]
+
+
+registry = Registry()
@@ -0,0 +1,260 @@
+"""This module provides the snapshot files of in-memory tables, memory-mapped and decoded lazily when restored.
+
+Classes:
+    Snapshot(path: pathlib.Path): A class representing a memory-mapped snapshot file.
+    SnapshotRows(snapshot: Snapshot, decode: collections.abc.Callable[[bytes], typing.Any]): A class representing the
+        rows of a table restored from a snapshot, decoded on first access.
+
+Functions:
+    write_snapshot: Writes a snapshot file atomically.
+"""
+
+import array
+import bisect
+import collections.abc
+import mmap
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+import typing
+import uuid
+
+from .codecs import Codec, get_codec
+
+MAGIC = b"STHSNAP1"
+# the magic, the number of rows and the name of the codec, then the sorted row IDs, the offsets of the rows, the rows
+_HEADER = struct.Struct("<8sQ8s")
+_OFFSETS = struct.Struct("<QQ")
+_KEY = struct.Struct(">QQ")
+
+
+class Snapshot:
+    """A class representing a memory-mapped snapshot file.
+
+    The file is mapped rather than read, so opening it only reads its header and the row IDs, and a row is read by
+    the operating system when it is first decoded.
+
+    Attributes:
+        keys (list[uuid.UUID]): The IDs of the rows, sorted.
+        ints (list[int]): The IDs of the rows as integers, sorted.
+        codec (Codec): The codec of the rows.
+
+    Args:
+        path (pathlib.Path): The path to the snapshot file.
+
+    Raises:
+        ValueError: If the file is not a snapshot file.
+    """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """Initialize a Snapshot instance.
+
+        Args:
+            path (pathlib.Path): The path to the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot file.
+        """
+        with path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, codec = _HEADER.unpack_from(self._map) if len(self._map) >= _HEADER.size else (b"", 0, b"")
+        if magic != MAGIC:
+            self._map.close()
+            msg = f"{path} is not a snapshot file"
+            raise ValueError(msg)
+        self.codec = get_codec(codec.rstrip(b"\0").decode())
+        # the IDs as integers too, which compare in C, unlike UUIDs
+        keys = self._map[_HEADER.size : _HEADER.size + 16 * count]
+        self.ints = [high << 64 | low for high, low in _KEY.iter_unpack(keys)]
+        self.keys = [uuid.UUID(int=value) for value in self.ints]
+        self._offsets = _HEADER.size + 16 * count
+        self._data = self._offsets + 8 * (count + 1)
+
+    def raw(self, position: int) -> bytes:
+        """Returns the encoded row at a position.
+
+        Args:
+            position (int): The position of the row among the sorted row IDs.
+
+        Returns:
+            bytes: The encoded row.
+        """
+        start, end = _OFFSETS.unpack_from(self._map, self._offsets + 8 * position)
+        return self._map[self._data + start : self._data + end]
+
+
+class SnapshotRows(dict):
+    """A class representing the rows of a table restored from a snapshot, decoded on first access.
+
+    Rows are kept in the dict once decoded or written, and read from the snapshot otherwise, so reading a decoded row
+    costs what reading a dict does. Iterating over the rows, e.g. to rebuild an index, decodes all of them.
+
+    Args:
+        snapshot (Snapshot): The snapshot.
+        decode (collections.abc.Callable[[bytes], typing.Any]): The function decoding an encoded row.
+    """
+
+    def __init__(self, snapshot: Snapshot, decode: collections.abc.Callable[[bytes], typing.Any]) -> None:
+        """Initialize a SnapshotRows instance.
+
+        Args:
+            snapshot (Snapshot): The snapshot.
+            decode (collections.abc.Callable[[bytes], typing.Any]): The function decoding an encoded row.
+        """
+        super().__init__()
+        self.snapshot = snapshot
+        self._decode = decode
+        # the IDs of the rows of the snapshot already decoded, written or removed, which it no longer holds
+        self._gone: set[uuid.UUID] = set()
+
+    def _position(self, key: uuid.UUID) -> int | None:
+        ints = self.snapshot.ints
+        position = bisect.bisect_left(ints, key.int)
+        if position < len(ints) and ints[position] == key.int and key not in self._gone:
+            return position
+        return None
+
+    def __missing__(self, key: uuid.UUID) -> typing.Any:
+        """Decodes a row of the snapshot, and keeps it.
+
+        Args:
+            key (uuid.UUID): The ID of the row.
+
+        Returns:
+            typing.Any: The row.
+
+        Raises:
+            KeyError: If the snapshot doesn't hold the row.
+        """
+        position = self._position(key)
+        if position is None:
+            raise KeyError(key)
+        row = self._decode(self.snapshot.raw(position))
+        self._gone.add(key)
+        dict.__setitem__(self, key, row)
+        return row
+
+    def __contains__(self, key: object) -> bool:
+        """Tells whether a row is held, decoded or not."""
+        return dict.__contains__(self, key) or (isinstance(key, uuid.UUID) and self._position(key) is not None)
+
+    def __len__(self) -> int:
+        """Returns the number of rows, decoded or not."""
+        return dict.__len__(self) + len(self.snapshot.keys) - len(self._gone)
+
+    def __setitem__(self, key: uuid.UUID, row: typing.Any) -> None:
+        """Stores a row, replacing the one of the snapshot."""
+        if self._position(key) is not None:
+            self._gone.add(key)
+        dict.__setitem__(self, key, row)
+
+    def __delitem__(self, key: uuid.UUID) -> None:
+        """Removes a row."""
+        self.pop(key)
+
+    def __iter__(self) -> collections.abc.Iterator[uuid.UUID]:
+        """Iterates over the row IDs, decoding every row."""
+        self.load()
+        return dict.__iter__(self)
+
+    def get(self, key: uuid.UUID, default: typing.Any = None) -> typing.Any:
+        """Returns a row, decoding it if needed, or the default if it isn't held."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: uuid.UUID, *default: typing.Any) -> typing.Any:
+        """Removes a row and returns it, or the default if it isn't held."""
+        if key in self:
+            row = self[key]
+            dict.pop(self, key)
+            return row
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def keys(self) -> typing.Any:
+        """Returns the row IDs, decoding every row."""
+        self.load()
+        return dict.keys(self)
+
+    def values(self) -> typing.Any:
+        """Returns the rows, decoding every row."""
+        self.load()
+        return dict.values(self)
+
+    def items(self) -> typing.Any:
+        """Returns the row IDs and rows, decoding every row."""
+        self.load()
+        return dict.items(self)
+
+    def load(self) -> None:
+        """Decodes every row of the snapshot not decoded yet."""
+        for position, key in enumerate(self.snapshot.keys):
+            if key not in self._gone:
+                self._gone.add(key)
+                dict.__setitem__(self, key, self._decode(self.snapshot.raw(position)))
+
+    def capture(self, keys: list[uuid.UUID]) -> list[tuple[uuid.UUID, typing.Any]]:
+        """Returns the rows of the given IDs, the ones not decoded as their position in the snapshot.
+
+        Args:
+            keys (list[uuid.UUID]): The IDs of the rows, sorted.
+
+        Returns:
+            list[tuple[uuid.UUID, typing.Any]]: The row IDs, with their row or position.
+        """
+        ints = self.snapshot.ints
+        position = 0
+        captured = []
+        for key in keys:
+            if dict.__contains__(self, key):
+                captured.append((key, dict.__getitem__(self, key)))
+                continue
+            # both lists are sorted, so the position of the next row is past the one of the previous row
+            while ints[position] < key.int:
+                position += 1
+            captured.append((key, position))
+        return captured
+
+
+def write_snapshot(
+    path: pathlib.Path,
+    rows: list[tuple[uuid.UUID, typing.Any]],
+    codec: Codec,
+    encode: collections.abc.Callable[[typing.Any], bytes],
+) -> None:
+    """Writes a snapshot file atomically, to a temporary file renamed over it once written and flushed to the disk.
+
+    Args:
+        path (pathlib.Path): The path to the snapshot file.
+        rows (list[tuple[uuid.UUID, typing.Any]]): The row IDs, sorted, with their rows.
+        codec (Codec): The codec `encode` encodes the rows with.
+        encode (collections.abc.Callable[[typing.Any], bytes]): The function encoding a row.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    offsets = array.array("Q", [0])
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as handle:
+        try:
+            handle.write(_HEADER.pack(MAGIC, len(rows), codec.name.encode()))
+            handle.write(b"".join(key.bytes for key, _ in rows))
+            start = handle.tell()
+            handle.seek(start + 8 * (len(rows) + 1))
+            for _, row in rows:
+                data = encode(row)
+                handle.write(data)
+                offsets.append(offsets[-1] + len(data))
+            if sys.byteorder == "big":  # pragma: no cover
+                offsets.byteswap()
+            handle.seek(start)
+            handle.write(offsets.tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+        except BaseException:
+            handle.close()
+            pathlib.Path(handle.name).unlink()
+            raise
+    pathlib.Path(handle.name).replace(path)
@@ -0,0 +1,73 @@
+"""This module provides the streaming of resources as HTTP responses.
+
+Constants:
+    NDJSON_MEDIA_TYPE(str): The media type of newline delimited JSON.
+
+Functions:
+    ndjson_response: Returns a streaming response writing resources as newline delimited JSON.
+"""
+
+import collections.abc
+import typing
+
+import fastapi.responses
+import pydantic_core
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _ndjson_lines(
+    resources: collections.abc.AsyncIterable[dict[str, typing.Any]],
+    buffer_size: int,
+) -> collections.abc.AsyncIterator[bytes]:
+    """Encodes resources as JSON lines, joined into chunks of about `buffer_size` bytes.
+
+    Args:
+        resources (collections.abc.AsyncIterable[dict[str, typing.Any]]): The resources.
+        buffer_size (int): The number of bytes a chunk is sent at.
+
+    Yields:
+        bytes: The chunks of lines.
+    """
+    lines: list[bytes] = []
+    size = 0
+    async for resource in resources:
+        line = pydantic_core.to_json(resource) + b"\n"
+        lines.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield b"".join(lines)
+            lines.clear()
+            size = 0
+    if lines:
+        yield b"".join(lines)
+
+
+def ndjson_response(
+    resources: collections.abc.AsyncIterable[dict[str, typing.Any]],
+    *,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+    buffer_size: int = 65_536,
+) -> fastapi.responses.StreamingResponse:
+    """Returns a streaming response writing resources as newline delimited JSON, one resource per line.
+
+    Resources are encoded as they are iterated over, e.g. from `DB.stream_many`, so a whole table is sent with
+    constant memory. Lines are sent in chunks of about `buffer_size` bytes, rather than one by one. Values JSON has
+    no type for, such as UUIDs and datetimes, are encoded as pydantic encodes them.
+
+    Args:
+        resources (collections.abc.AsyncIterable[dict[str, typing.Any]]): The resources.
+        status_code (int): The status code of the response. Defaults to 200.
+        headers (dict[str, str] | None): The headers of the response. Defaults to None.
+        buffer_size (int): The number of bytes lines are sent in chunks of. Defaults to 65536.
+
+    Returns:
+        fastapi.responses.StreamingResponse: The response.
+    """
+    return fastapi.responses.StreamingResponse(
+        _ndjson_lines(resources, buffer_size),
+        status_code=status_code,
+        headers=headers,
+        media_type=NDJSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,562 @@
+"""This module provides a write-behind buffer in front of a database client.
+
+Classes:
+    WriteBehindClient(client: Base): A class representing a write-behind buffer in front of a database client.
+"""
+
+import asyncio
+import collections.abc
+import contextlib
+import copy
+import itertools
+import logging
+import typing
+
+import fastapi
+
+from . import dependencies
+from .clients import STREAM_BATCH_SIZE, Base, Partial, ResourceId, ResourceObj
+
+logger = logging.getLogger(__name__)
+
+DELETED = None
+
+
+class WriteBehindClient(Base):
+    """A class representing a write-behind buffer in front of a database client.
+
+    `insert_one`, `update_one` and `delete_one` return once the write is buffered. A background task writes the
+    buffered writes to the client in batches of at most `max_batch_size` resources, once a batch is full or
+    `max_delay` seconds after the first buffered write. Writes to the same resource are coalesced, so only its last
+    state is written: resources left are written with `update_many`, falling back to `insert_many` for the ones not in
+    the database yet, and deleted resources with `delete_many`.
+
+    The checks the client would make are made when the write is buffered, against the buffered state of the resource
+    or, if it has none, the database, so that conflicts and missing resources raise as they would unbuffered. Reads
+    see the buffered writes: `select_one` and `select_by_ids` read the buffered state of a resource first, and
+    `select_many` writes the buffered writes before reading.
+
+    A write waits for the buffer to be written once `max_pending` resources are buffered. `flush()` writes the
+    buffered writes, and `aclose()` writes them before closing the client. A batch the client fails to write is kept
+    buffered, unless its resources were written again meanwhile, and retried `max_delay` seconds later, by the
+    background task or, on close, by `aclose()` until none is left; a write that failed `max_attempts` times is
+    dropped, so that a batch the client can never write doesn't make every flush raise, nor closing hang.
+
+    Writes are acknowledged before they are written, so a write the client rejects, e.g. with a 409 because another
+    client inserted the resource meanwhile, or drops after its last attempt, can't raise to its caller. It is counted
+    in `rejected` or `dropped`, logged, and passed to `on_rejected` with the exception that lost it.
+
+    Attributes:
+        client (Base): The client the buffer is in front of.
+        max_batch_size (int): The maximum number of resources written at once.
+        max_delay (float): The maximum number of seconds a write stays buffered before it is written.
+        max_pending (int): The number of buffered resources past which writes wait for the buffer to be written.
+        max_attempts (int): The number of times a write is attempted before it is dropped.
+        on_rejected (collections.abc.Callable[[ResourceId, Exception], None] | None): The function called with the
+            ID of every resource whose write is lost, and the exception that lost it.
+        rejected (int): The number of acknowledged writes the client rejected.
+        dropped (int): The number of acknowledged writes dropped after `max_attempts` failed attempts.
+
+    Args:
+        client (Base): The client the buffer is in front of.
+        max_batch_size (int): The maximum number of resources written at once. Defaults to 500.
+        max_delay (float): The maximum number of seconds a write stays buffered. Defaults to 0.05.
+        max_pending (int): The maximum number of buffered resources. Defaults to 10000.
+        max_attempts (int): The number of times a write is attempted before it is dropped. Defaults to 3.
+        on_rejected (collections.abc.Callable[[ResourceId, Exception], None] | None): The function called with the
+            ID of every resource whose write is lost, and the exception that lost it. Defaults to None.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: Base,
+        *,
+        max_batch_size: int = 500,
+        max_delay: float = 0.05,
+        max_pending: int = 10_000,
+        max_attempts: int = 3,
+        on_rejected: collections.abc.Callable[[ResourceId, Exception], None] | None = None,
+    ) -> None:
+        """Initialize a WriteBehindClient instance.
+
+        Args:
+            client (Base): The client the buffer is in front of.
+            max_batch_size (int): The maximum number of resources written at once. Defaults to 500.
+            max_delay (float): The maximum number of seconds a write stays buffered. Defaults to 0.05.
+            max_pending (int): The maximum number of buffered resources. Defaults to 10000.
+            max_attempts (int): The number of times a write is attempted before it is dropped. Defaults to 3.
+            on_rejected (collections.abc.Callable[[ResourceId, Exception], None] | None): The function called with
+                the ID of every resource whose write is lost, and the exception that lost it. Defaults to None.
+        """
+        super().__init__(client.path, client.table, fields=client.fields)
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.on_rejected = on_rejected
+        self.rejected = 0
+        self.dropped = 0
+        # the number of failed attempts of the buffered resources whose write failed
+        self._attempts: dict[ResourceId, int] = {}
+        # the last state of every buffered resource, its resource object or DELETED, in the order they were written
+        self._pending: dict[ResourceId, ResourceObj | None] = {}
+        # the states being written, visible to reads until the client has them
+        self._writing: dict[ResourceId, ResourceObj | None] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._wake = asyncio.Event()
+        self._full = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        """The number of buffered resources."""
+        return len(self._pending)
+
+    def _state(self, resource_id: ResourceId) -> ResourceObj | typing.Literal[False] | None:
+        """Returns the buffered state of a resource.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+
+        Returns:
+            ResourceObj | typing.Literal[False] | None: The buffered resource object, DELETED if it is deleted, or
+                False if it has no buffered state.
+        """
+        if resource_id in self._pending:
+            return self._pending[resource_id]
+        return self._writing.get(resource_id, False)
+
+    async def _current(self, resource_id: ResourceId) -> ResourceObj | None:
+        """Returns a copy of the current state of a resource, buffered or in the database.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+
+        Returns:
+            ResourceObj | None: The resource object, without its ID, or None if it doesn't exist.
+        """
+        return (await self._currents([resource_id]))[resource_id]
+
+    async def _currents(self, resource_ids: list[ResourceId]) -> dict[ResourceId, ResourceObj | None]:
+        """Returns copies of the current states of resources, reading the ones not buffered from the database at once.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources.
+
+        Returns:
+            dict[ResourceId, ResourceObj | None]: The resource objects, without their IDs, or None for the resources
+                that don't exist, by resource ID.
+        """
+        states = {resource_id: self._state(resource_id) for resource_id in resource_ids}
+        unknown = [resource_id for resource_id, state in states.items() if state is False]
+        stored = dict(zip(unknown, await self.client.select_by_ids(unknown), strict=True)) if unknown else {}
+        currents: dict[ResourceId, ResourceObj | None] = {}
+        for resource_id, previous in states.items():
+            # a write buffered while the database was read is more recent, and one written meanwhile is what it holds
+            state = self._state(resource_id)
+            if state is False:
+                state = previous
+            if state is not False:
+                currents[resource_id] = copy.deepcopy(state)
+                continue
+            result = stored[resource_id]
+            if isinstance(result, fastapi.HTTPException):
+                if result.status_code != self.status.HTTP_404_NOT_FOUND:
+                    raise result
+                currents[resource_id] = None
+            else:
+                currents[resource_id] = {key: value for key, value in result.items() if key != "id"}
+        return currents
+
+    def _buffer(self, resource_id: ResourceId, state: ResourceObj | None) -> None:
+        """Buffers the state of a resource, replacing the one it had.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            state (ResourceObj | None): The resource object, or DELETED.
+        """
+        self._pending.pop(resource_id, None)
+        self._pending[resource_id] = state
+        self._attempts.pop(resource_id, None)
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+        self._wake.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+
+    async def _backpressure(self) -> None:
+        """Waits for the buffer to be written if it is full."""
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+
+    async def _drain(self) -> None:
+        """Writes the buffered writes in the background, once a batch is full or `max_delay` seconds have passed."""
+        while True:
+            await self._wake.wait()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.max_delay)
+            self._wake.clear()
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("writing the buffered writes of %s failed", self.table)
+                # the writes kept are retried `max_delay` seconds later
+                if self._pending:
+                    self._wake.set()
+
+    def _lose(self, resource_id: ResourceId, exception: Exception) -> None:
+        """Reports an acknowledged write that won't be written, to `on_rejected` if set.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource.
+            exception (Exception): The exception that lost the write.
+        """
+        if self.on_rejected is None:
+            return
+        try:
+            self.on_rejected(resource_id, exception)
+        except Exception:
+            logger.exception("reporting a lost write of %s with %r failed", self.table, self.on_rejected)
+
+    def _keep(self, batch: dict[ResourceId, ResourceObj | None], exception: BaseException) -> None:
+        """Buffers again a batch the client failed to write, dropping the writes that failed their last attempt.
+
+        Args:
+            batch (dict[ResourceId, ResourceObj | None]): The states, by resource ID.
+            exception (BaseException): The exception the batch failed with.
+        """
+        for resource_id, state in batch.items():
+            # a write buffered meanwhile is more recent, and is attempted afresh
+            if resource_id in self._pending:
+                continue
+            if not isinstance(exception, Exception):
+                self._pending[resource_id] = state
+                continue
+            attempts = self._attempts.get(resource_id, 0) + 1
+            if attempts < self.max_attempts:
+                self._pending[resource_id] = state
+                self._attempts[resource_id] = attempts
+                continue
+            self._attempts.pop(resource_id, None)
+            self.dropped += 1
+            logger.error("a buffered write of %s was dropped after %d attempts", self.table, attempts)
+            self._lose(resource_id, exception)
+
+    async def _write(self, batch: dict[ResourceId, ResourceObj | None]) -> None:
+        """Writes a batch of buffered states to the client.
+
+        Args:
+            batch (dict[ResourceId, ResourceObj | None]): The states, by resource ID.
+        """
+        deleted = [resource_id for resource_id, state in batch.items() if state is DELETED]
+        written = {resource_id: state for resource_id, state in batch.items() if state is not DELETED}
+        failures: list[tuple[ResourceId, fastapi.HTTPException]] = []
+        if deleted:
+            results = await self.client.delete_many(deleted)
+            failures.extend(
+                (resource_id, result)
+                for resource_id, result in zip(deleted, results, strict=True)
+                if result and result.status_code != self.status.HTTP_404_NOT_FOUND
+            )
+        if written:
+            results = await self.client.update_many(written)
+            missing = {
+                resource_id: written[resource_id]
+                for resource_id, result in zip(written, results, strict=True)
+                if isinstance(result, fastapi.HTTPException) and result.status_code == self.status.HTTP_404_NOT_FOUND
+            }
+            failures.extend(
+                (resource_id, result)
+                for resource_id, result in zip(written, results, strict=True)
+                if isinstance(result, fastapi.HTTPException) and result.status_code != self.status.HTTP_404_NOT_FOUND
+            )
+            if missing:
+                results = await self.client.insert_many(missing)
+                failures.extend(
+                    (resource_id, result)
+                    for resource_id, result in zip(missing, results, strict=True)
+                    if isinstance(result, fastapi.HTTPException)
+                )
+        for resource_id, failure in failures:
+            self.rejected += 1
+            logger.warning("a buffered write of %s was rejected: %s", self.table, failure.detail)
+            self._lose(resource_id, failure)
+
+    async def flush(self) -> None:
+        """Writes the buffered writes to the client, in batches of at most `max_batch_size` resources.
+
+        Returns:
+            None
+        """
+        async with self._flush_lock:
+            while self._pending:
+                batch = dict(itertools.islice(self._pending.items(), self.max_batch_size))
+                for resource_id in batch:
+                    del self._pending[resource_id]
+                self._writing = batch
+                try:
+                    await self._write(batch)
+                except BaseException as exception:
+                    self._keep(batch, exception)
+                    raise
+                finally:
+                    self._writing = {}
+                for resource_id in batch:
+                    self._attempts.pop(resource_id, None)
+
+    async def insert_one(self, resource_id: ResourceId, resource_obj: ResourceObj) -> ResourceObj:
+        """Buffers the insertion of a resource object.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be inserted.
+            resource_obj (ResourceObj): The resource object to be inserted.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource already exists, buffered or in the database.
+        """
+        if await self._current(resource_id) is not None:
+            raise self.exception(self.status.HTTP_409_CONFLICT, "conflict")
+        self._buffer(resource_id, copy.deepcopy(resource_obj))
+        await self._backpressure()
+        return {"id": resource_id, **resource_obj}
+
+    async def select_one(self, resource_id: ResourceId) -> ResourceObj:
+        """Retrieves a resource, buffered or from the database, based on the given ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be retrieved.
+
+        Returns:
+            ResourceObj: The retrieved resource object.
+
+        Raises:
+            self.exception: If the resource is not found.
+        """
+        resource_obj = await self._current(resource_id)
+        if resource_obj is None:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        return {"id": resource_id, **resource_obj}
+
+    async def update_one(
+        self,
+        resource_id: ResourceId,
+        resource_obj: ResourceObj,
+        partial: Partial = None,
+    ) -> ResourceObj:
+        """Buffers the update of a resource based on the given ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be updated.
+            resource_obj (ResourceObj): The resource object to be updated.
+            partial (Partial): Whether to perform a partial update or replace the entire resource object.
+                Defaults to None.
+
+        Returns:
+            ResourceObj: The resource object containing the ID.
+
+        Raises:
+            self.exception: If the resource is not found.
+        """
+        _resource_obj = await self._current(resource_id)
+        if _resource_obj is None:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        if partial:
+            _resource_obj.update(copy.deepcopy(resource_obj))
+        else:
+            _resource_obj = copy.deepcopy(resource_obj)
+        self._buffer(resource_id, _resource_obj)
+        await self._backpressure()
+        return {"id": resource_id, **copy.deepcopy(_resource_obj)}
+
+    async def delete_one(self, resource_id: ResourceId) -> None:
+        """Buffers the deletion of a resource based on the given resource ID.
+
+        Args:
+            resource_id (ResourceId): The ID of the resource to be deleted.
+
+        Returns:
+            None
+
+        Raises:
+            self.exception: If the resource is not found.
+        """
+        if await self._current(resource_id) is None:
+            raise self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+        self._buffer(resource_id, DELETED)
+        await self._backpressure()
+
+    async def select_many(
+        self,
+        paginate_parameters: dependencies.PaginateParameters,
+        filter_parameters: dependencies.FilterParameters | None = None,
+    ) -> dependencies.Page:
+        """Writes the buffered writes, then retrieves multiple resources from the database.
+
+        Args:
+            paginate_parameters (PaginateParameters): The pagination parameters.
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+
+        Returns:
+            Page: A list of objects representing the retrieved resources, with the cursor of the next page.
+        """
+        await self.flush()
+        return await self.client.select_many(paginate_parameters, filter_parameters)
+
+    async def insert_many(self, resources: dict[ResourceId, ResourceObj]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Buffers the insertion of resource objects, checking the ones not buffered against the database at once.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be inserted, by resource ID.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it already exists.
+        """
+        currents = await self._currents(list(resources))
+        results: list[ResourceObj | fastapi.HTTPException] = []
+        for resource_id, resource_obj in resources.items():
+            if currents[resource_id] is not None:
+                results.append(self.exception(self.status.HTTP_409_CONFLICT, "conflict"))
+                continue
+            self._buffer(resource_id, copy.deepcopy(resource_obj))
+            results.append({"id": resource_id, **resource_obj})
+        await self._backpressure()
+        return results
+
+    async def select_by_ids(self, resource_ids: list[ResourceId]) -> list[ResourceObj | fastapi.HTTPException]:
+        """Retrieves the resources of the given IDs, reading the ones not buffered from the database at once.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be retrieved.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every ID, the retrieved resource object, or the exception
+                raised if it is not found.
+        """
+        currents = await self._currents(resource_ids)
+        return [
+            {"id": resource_id, **resource_obj}
+            if (resource_obj := currents[resource_id]) is not None
+            else self.exception(self.status.HTTP_404_NOT_FOUND, "not found")
+            for resource_id in resource_ids
+        ]
+
+    async def update_many(
+        self,
+        resources: dict[ResourceId, ResourceObj],
+        partial: Partial = None,
+    ) -> list[ResourceObj | fastapi.HTTPException]:
+        """Buffers the update of resources, reading the ones not buffered from the database at once.
+
+        Args:
+            resources (dict[ResourceId, ResourceObj]): The resource objects to be updated, by resource ID.
+            partial (Partial): Whether to perform partial updates or replace the entire resource objects.
+                Defaults to None.
+
+        Returns:
+            list[ResourceObj | fastapi.HTTPException]: For every resource, the resource object containing the ID, or
+                the exception raised if it is not found.
+        """
+        currents = await self._currents(list(resources))
+        results: list[ResourceObj | fastapi.HTTPException] = []
+        for resource_id, resource_obj in resources.items():
+            _resource_obj = currents[resource_id]
+            if _resource_obj is None:
+                results.append(self.exception(self.status.HTTP_404_NOT_FOUND, "not found"))
+                continue
+            if partial:
+                _resource_obj.update(copy.deepcopy(resource_obj))
+            else:
+                _resource_obj = copy.deepcopy(resource_obj)
+            self._buffer(resource_id, _resource_obj)
+            results.append({"id": resource_id, **copy.deepcopy(_resource_obj)})
+        await self._backpressure()
+        return results
+
+    async def delete_many(self, resource_ids: list[ResourceId]) -> list[fastapi.HTTPException | None]:
+        """Buffers the deletion of the resources of the given IDs, checking the ones not buffered at once.
+
+        Args:
+            resource_ids (list[ResourceId]): The IDs of the resources to be deleted.
+
+        Returns:
+            list[fastapi.HTTPException | None]: For every ID, None, or the exception raised if it is not found.
+        """
+        currents = await self._currents(resource_ids)
+        results: list[fastapi.HTTPException | None] = []
+        for resource_id in resource_ids:
+            if currents[resource_id] is None:
+                results.append(self.exception(self.status.HTTP_404_NOT_FOUND, "not found"))
+                continue
+            currents[resource_id] = DELETED
+            self._buffer(resource_id, DELETED)
+            results.append(None)
+        await self._backpressure()
+        return results
+
+    async def stream_many(
+        self,
+        filter_parameters: dependencies.FilterParameters | None = None,
+        *,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> collections.abc.AsyncIterator[ResourceObj]:
+        """Writes the buffered writes, then iterates over the resources of the database matching the filter.
+
+        Args:
+            filter_parameters (FilterParameters | None): The filter parameters. Defaults to None.
+            batch_size (int): The number of resources read at once. Defaults to `STREAM_BATCH_SIZE`.
+
+        Yields:
+            ResourceObj: The resource objects containing their ID.
+        """
+        await self.flush()
+        async for resource_obj in self.client.stream_many(filter_parameters, batch_size=batch_size):
+            yield resource_obj
+
+    async def rebuild_indexes(self) -> None:
+        """Writes the buffered writes, then rebuilds the secondary indexes of the client.
+
+        Returns:
+            None
+        """
+        await self.flush()
+        await self.client.rebuild_indexes()
+
+    async def aclose(self) -> None:
+        """Stops the background task, writes the buffered writes and releases the resources held by the client.
+
+        A failed write is retried `max_delay` seconds later, until every write is written or dropped after its last
+        attempt. Writes still buffered if closing is interrupted are dropped too, and the client is released anyway.
+
+        Returns:
+            None
+        """
+        try:
+            if self._task is not None:
+                self._task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._task
+                self._task = None
+            while self._pending:
+                try:
+                    await self.flush()
+                # every failure spends an attempt of the writes kept, so the loop ends
+                except Exception:  # noqa: PERF203
+                    logger.exception("writing the buffered writes of %s failed", self.table)
+                    if self._pending:
+                        await asyncio.sleep(self.max_delay)
+        finally:
+            if self._pending:
+                logger.error("%d buffered writes of %s were dropped on close", len(self._pending), self.table)
+                exception = RuntimeError(f"{self.table} was closed before the write was written")
+                for resource_id in self._pending:
+                    self.dropped += 1
+                    self._lose(resource_id, exception)
+                self._pending.clear()
+                self._attempts.clear()
+            await self.client.aclose()
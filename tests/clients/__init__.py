@@ -1,18 +1,22 @@
 import unittest
+import unittest.mock
+import uuid
 
 import sthali_db.clients
 
 module = sthali_db.clients
 
+
 class TestBase(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
         base = module.Base("test_path", "test_table")
         self.base = base
-        self.resource_id: module.ResourceId  = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
 
     async def test_return_default(self) -> None:
         self.assertEqual(self.base.exception, module.Base.exception)
         self.assertEqual(self.base.status, module.Base.status)
+        self.assertEqual(self.base.fields, [])
 
     async def test_insert_one_not_implemented(self) -> None:
         with self.assertRaises(NotImplementedError):
@@ -35,3 +39,81 @@ class TestBase(unittest.IsolatedAsyncioTestCase):
 
         with self.assertRaises(NotImplementedError):
             await self.base.select_many(paginate_parameters)
+
+    async def test_predicates(self) -> None:
+        self.base.fields = [sthali_db.models.FieldSpecification("age", int)]  # type: ignore
+        filter_parameters = sthali_db.dependencies.FilterParameters(
+            predicates=[
+                sthali_db.dependencies.Predicate(field="age", operator="ge", value="18"),
+            ]
+        )
+
+        result = self.base._predicates(filter_parameters)  # noqa: SLF001 - the clients share this coercion
+
+        self.assertEqual(result, [sthali_db.dependencies.Predicate(field="age", operator="ge", value=18)])
+        self.assertEqual(self.base._predicates(None), [])  # noqa: SLF001 - the clients share this coercion
+
+    async def test_predicates_raise_exception(self) -> None:
+        filter_parameters = sthali_db.dependencies.FilterParameters(
+            predicates=[
+                sthali_db.dependencies.Predicate(field="unknown", operator="eq", value=1),
+            ]
+        )
+
+        with self.assertRaises(self.base.exception) as context:
+            self.base._predicates(filter_parameters)  # noqa: SLF001 - the clients share this coercion
+
+        self.assertEqual(context.exception.status_code, 422)
+
+
+class TestBaseBulk(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.base = module.Base("test_path", "test_table")
+        self.resource_ids = [uuid.uuid4(), uuid.uuid4()]
+        self.not_found = self.base.exception(self.base.status.HTTP_404_NOT_FOUND, "not found")
+
+    async def test_insert_many(self) -> None:
+        conflict = self.base.exception(self.base.status.HTTP_409_CONFLICT, "conflict")
+        self.base.insert_one = unittest.mock.AsyncMock(side_effect=[{"id": self.resource_ids[0]}, conflict])
+
+        result = await self.base.insert_many({resource_id: {} for resource_id in self.resource_ids})
+
+        self.assertEqual(result, [{"id": self.resource_ids[0]}, conflict])
+
+    async def test_select_by_ids(self) -> None:
+        self.base.select_one = unittest.mock.AsyncMock(side_effect=[self.not_found, {"id": self.resource_ids[1]}])
+
+        result = await self.base.select_by_ids(self.resource_ids)
+
+        self.assertEqual(result, [self.not_found, {"id": self.resource_ids[1]}])
+
+    async def test_update_many(self) -> None:
+        self.base.update_one = unittest.mock.AsyncMock(side_effect=[{"id": self.resource_ids[0]}, self.not_found])
+
+        result = await self.base.update_many({resource_id: {} for resource_id in self.resource_ids}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_ids[0]}, self.not_found])
+        # update_many passes partial positionally, as the wrappers of the clients do
+        self.base.update_one.assert_awaited_with(self.resource_ids[1], {}, True)  # noqa: FBT003
+
+    async def test_delete_many(self) -> None:
+        self.base.delete_one = unittest.mock.AsyncMock(side_effect=[None, self.not_found])
+
+        result = await self.base.delete_many(self.resource_ids)
+
+        self.assertEqual(result, [None, self.not_found])
+
+    async def test_stream_many(self) -> None:
+        pages = [
+            sthali_db.dependencies.Page([{"id": self.resource_ids[0]}], "cursor"),
+            sthali_db.dependencies.Page([{"id": self.resource_ids[1]}]),
+        ]
+        self.base.select_many = unittest.mock.AsyncMock(side_effect=pages)
+        filter_parameters = sthali_db.dependencies.FilterParameters()
+
+        with unittest.mock.patch.object(sthali_db.dependencies, "PaginateParameters") as paginate_parameters:
+            result = [resource_obj async for resource_obj in self.base.stream_many(filter_parameters, batch_size=1)]
+
+        self.assertEqual(result, [{"id": resource_id} for resource_id in self.resource_ids])
+        paginate_parameters.assert_called_with(limit=1, cursor="cursor")
+        self.base.select_many.assert_awaited_with(paginate_parameters.return_value, filter_parameters)
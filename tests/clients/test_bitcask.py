@@ -0,0 +1,465 @@
+import datetime as dt
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+import uuid
+
+import sthali_db.clients.bitcask
+import sthali_db.registry
+
+module = sthali_db.clients.bitcask
+
+
+class TestBitcaskClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+        self.client = self.open()
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+
+    def open(self, **options: object) -> module.BitcaskClient:
+        client = module.BitcaskClient(self.path, "test_table", **options)  # type: ignore
+        self.addAsyncCleanup(client.aclose)
+        return client
+
+    async def test_insert_one(self) -> None:
+        result = await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_insert_one_raise_exception(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.insert_one(self.resource_id, {"field_1": "value_2"})
+
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_409_CONFLICT)
+
+    async def test_select_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_one(self.resource_id)
+
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_update_one(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1", "field_2": "value_2"})
+
+        result = await self.client.update_one(self.resource_id, {"field_1": "new_value_1"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_update_one_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1", "field_2": "value_2"})
+
+        result = await self.client.update_one(self.resource_id, {"field_1": "new_value_1"}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "new_value_1", "field_2": "value_2"})
+
+    async def test_update_one_raise_exception(self) -> None:
+        for partial in [False, True]:
+            with self.subTest(partial=partial), self.assertRaises(self.client.exception) as context:
+                await self.client.update_one(self.resource_id, {"field_1": "value_1"}, partial)
+
+            self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_delete_one(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        await self.client.delete_one(self.resource_id)
+
+        self.assertNotIn(self.resource_id, self.client.store.keydir)
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.delete_one(self.resource_id)
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_one_write_per_mutation(self) -> None:
+        store = self.client.store
+        with unittest.mock.patch.object(store, "write", wraps=store.write) as mocked_write:
+            await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+            await self.client.update_one(self.resource_id, {"field_1": "value_2"}, partial=True)
+            await self.client.insert_many({uuid.uuid4(): {}, uuid.uuid4(): {}})
+            await self.client.delete_one(self.resource_id)
+
+        self.assertEqual(mocked_write.call_count, 4)
+
+    async def test_select_one_reads_once(self) -> None:
+        await self.client.insert_many({uuid.uuid4(): {"field_1": index} for index in range(10)})
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        with unittest.mock.patch("sthali_db.clients.bitcask.os.pread", wraps=module.os.pread) as mocked_pread:
+            await self.client.select_one(self.resource_id)
+
+        mocked_pread.assert_called_once()
+
+    async def test_select_many(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        await self.client.insert_many(
+            {resource_id: {"index": index} for index, resource_id in enumerate(resource_ids)}
+        )
+        await self.client.delete_one(resource_ids[2])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual([[resource_obj["index"] for resource_obj in page] for page in pages], [[0, 1], [3, 4], []])
+
+    async def test_bulk(self) -> None:
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        await self.client.insert_many({resource_ids[0]: {"name": "alice"}, resource_ids[1]: {"name": "bob"}})
+
+        inserted = await self.client.insert_many({resource_ids[1]: {}, resource_ids[2]: {"name": "carol"}})
+        updated = await self.client.update_many({resource_ids[0]: {"age": 30}, uuid.uuid4(): {}}, partial=True)
+        deleted = await self.client.delete_many([resource_ids[1], uuid.uuid4()])
+        selected = await self.client.select_by_ids([resource_ids[0], resource_ids[1], resource_ids[2]])
+
+        self.assertEqual(inserted[0].status_code, 409)  # type: ignore
+        self.assertEqual(updated[0], {"id": resource_ids[0], "name": "alice", "age": 30})
+        self.assertEqual(updated[1].status_code, 404)  # type: ignore
+        self.assertEqual([result is None for result in deleted], [True, False])
+        self.assertEqual(selected[0], {"id": resource_ids[0], "name": "alice", "age": 30})
+        self.assertEqual(selected[1].status_code, 404)  # type: ignore
+        self.assertEqual(selected[2], {"id": resource_ids[2], "name": "carol"})
+
+
+class TestBitcaskClientQuery(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        self.resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+
+    async def open(self, *, index: bool) -> module.BitcaskClient:
+        fields = [
+            module.FieldSpecification("name", str, index=index),  # type: ignore
+            module.FieldSpecification("age", int | None, index=index),  # type: ignore
+        ]
+        client = module.BitcaskClient(self.directory.name, f"test_table_{index}", fields=fields)
+        self.addAsyncCleanup(client.aclose)
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+        return client
+
+    async def test_select_many_filter(self) -> None:
+        cases = [
+            (["age:ge:30"], [0, 3, 4]),
+            (["age:eq:null"], [2]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for index in [False, True]:
+            client = await self.open(index=index)
+            for filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                pages = [await client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [self.resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_ordered(self) -> None:
+        cases = [
+            ("asc", None, [1, 0, 3, 4, 2]),
+            ("desc", None, [2, 4, 3, 0, 1]),
+            ("asc", ["age:ge:25"], [0, 3, 4]),
+            ("desc", ["name:in:alice,bob"], [2, 4, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            client = await self.open(index=index)
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=2,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=2,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [self.resource_ids[i] for i in expected],
+                    )
+
+    async def test_indexes_follow_writes(self) -> None:
+        client = await self.open(index=True)
+
+        await client.update_one(self.resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({self.resource_ids[0]: {"name": "dave"}})
+        await client.delete_many([self.resource_ids[2]])
+
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+        for filters, expected in [
+            (["name:eq:alice"], [1]),
+            (["name:eq:dave"], [0]),
+            (["age:eq:null"], [0]),
+            (["age:ge:20"], [1, 3, 4]),
+        ]:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            with self.subTest(filters=filters):
+                result = await client.select_many(paginate_parameters, filter_parameters)
+                self.assertEqual(
+                    [resource_obj["id"] for resource_obj in result], [self.resource_ids[i] for i in expected]
+                )
+
+    async def test_clients_of_a_table_share_indexes(self) -> None:
+        client = await self.open(index=True)
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        other = module.BitcaskClient(self.directory.name, "test_table_True", fields=fields)
+        self.addAsyncCleanup(other.aclose)
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+        filter_parameters = await module.dependencies.filter_parameters(["name:eq:dave"])
+        resource_id = uuid.uuid4()
+
+        await client.insert_one(resource_id, {"name": "dave"})
+        dave = [await reader.select_many(paginate_parameters, filter_parameters) for reader in (client, other)]
+        await other.update_one(resource_id, {"name": "erin"})
+        await other.delete_one(self.resource_ids[1])
+
+        self.assertEqual(dave, [[{"id": resource_id, "name": "dave"}]] * 2)
+        for name, expected in [("dave", []), ("erin", [resource_id]), ("bob", [self.resource_ids[4]])]:
+            filter_parameters = await module.dependencies.filter_parameters([f"name:eq:{name}"])
+            for reader in (client, other):
+                with self.subTest(name=name, reader=reader):
+                    result = await reader.select_many(paginate_parameters, filter_parameters)
+                    self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+    async def test_stream_many(self) -> None:
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+        ]
+
+        for index in [False, True]:
+            client = await self.open(index=index)
+            for filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+                with self.subTest(index=index, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for resource_obj in result], [self.resource_ids[i] for i in expected]
+                    )
+
+
+class TestBitcaskClientStorage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+        self.table = pathlib.Path(self.path).resolve() / "test_table"
+
+    def open(self, **options: object) -> module.BitcaskClient:
+        client = module.BitcaskClient(self.path, "test_table", **options)  # type: ignore
+        self.addAsyncCleanup(client.aclose)
+        return client
+
+    async def test_reopen(self) -> None:
+        client = self.open()
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        await client.insert_many({resource_id: {"index": index} for index, resource_id in enumerate(resource_ids)})
+        await client.update_one(resource_ids[0], {"index": 10})
+        await client.delete_one(resource_ids[1])
+        await client.aclose()
+
+        with unittest.mock.patch.object(module.Store, "_replay") as mocked_replay:
+            client = self.open()
+            result = await client.select_by_ids(resource_ids)
+
+        mocked_replay.assert_not_called()
+        self.assertEqual(result[0], {"id": resource_ids[0], "index": 10})
+        self.assertEqual(result[1].status_code, 404)  # type: ignore
+        self.assertEqual(result[2], {"id": resource_ids[2], "index": 2})
+
+    async def test_reopen_without_hints(self) -> None:
+        client = self.open()
+        await client.insert_one(uuid.uuid4(), {"index": 0})
+        await client.aclose()
+        for path in self.table.glob("*.hint"):
+            path.unlink()
+
+        client = self.open()
+
+        self.assertEqual(len(client.store.keydir), 1)
+        self.assertEqual(len(list(self.table.glob("*.hint"))), 1)
+
+    async def test_torn_write(self) -> None:
+        client = self.open()
+        resource_ids = [uuid.uuid4() for _ in range(2)]
+        await client.insert_one(resource_ids[0], {"index": 0})
+        await client.insert_one(resource_ids[1], {"index": 1})
+        (path,) = self.table.glob("*.data")
+        size = path.stat().st_size
+        await client.aclose()
+        # a crash: the hints of the active segment are never written, and its last record is cut short
+        path.with_suffix(".hint").unlink()
+        os.truncate(path, size - 3)
+
+        client = self.open()
+
+        self.assertEqual(list(client.store.keydir), [resource_ids[0]])
+        self.assertEqual(await client.select_one(resource_ids[0]), {"id": resource_ids[0], "index": 0})
+        self.assertLess(path.stat().st_size, size - 3)
+
+    async def test_segments_roll_over(self) -> None:
+        client = self.open(max_segment_size=256, compact_ratio=1.0)
+        resource_ids = [uuid.uuid4() for _ in range(20)]
+
+        for index, resource_id in enumerate(resource_ids):
+            await client.insert_one(resource_id, {"index": index, "padding": "x" * 32})
+
+        self.assertGreater(len(client.store.files), 2)
+        self.assertEqual(len(list(self.table.glob("*.hint"))), len(client.store.files) - 1)
+        result = await client.select_by_ids(resource_ids)
+        self.assertEqual([resource_obj["index"] for resource_obj in result], list(range(20)))  # type: ignore
+
+    async def test_compact(self) -> None:
+        client = self.open(max_segment_size=256, compact_ratio=1.0)
+        resource_ids = [uuid.uuid4() for _ in range(10)]
+        for version in range(5):
+            for resource_id in resource_ids:
+                if version:
+                    await client.update_one(resource_id, {"version": version})
+                else:
+                    await client.insert_one(resource_id, {"version": version})
+        await client.delete_many(resource_ids[:3])
+        segments = len(client.store.files)
+
+        await client.compact()
+
+        self.assertLess(len(client.store.files), segments)
+        closed = [segment for segment in client.store.files if segment != client.store.active]
+        self.assertEqual(sum(client.store.stale[segment] for segment in closed), 0)
+        result = await client.select_by_ids(resource_ids)
+        self.assertEqual([getattr(item, "status_code", None) for item in result[:3]], [404] * 3)
+        self.assertEqual([item["version"] for item in result[3:]], [4] * 7)  # type: ignore
+        await client.aclose()
+
+        client = self.open()
+
+        self.assertEqual(sorted(client.store.keydir), sorted(resource_ids[3:]))
+        result = await client.select_by_ids(resource_ids[3:])
+        self.assertEqual([item["version"] for item in result], [4] * 7)  # type: ignore
+
+    async def test_compact_in_background(self) -> None:
+        client = self.open(max_segment_size=256, compact_ratio=0.5)
+        resource_id = uuid.uuid4()
+        await client.insert_one(resource_id, {"version": 0})
+
+        for version in range(1, 50):
+            await client.update_one(resource_id, {"version": version, "padding": "x" * 32})
+        client.store.executor.submit(lambda: None).result()
+
+        self.assertLess(len(client.store.files), 10)
+        self.assertEqual(
+            await client.select_one(resource_id),
+            {
+                "id": resource_id,
+                "version": 49,
+                "padding": "x" * 32,
+            },
+        )
+
+    async def test_compact_in_background_failure_is_logged(self) -> None:
+        client = self.open(max_segment_size=256, compact_ratio=0.5)
+        resource_id = uuid.uuid4()
+        await client.insert_one(resource_id, {"version": 0})
+
+        with (
+            unittest.mock.patch.object(client.store, "_compact", side_effect=OSError),
+            self.assertLogs(module.logger, "ERROR"),
+        ):
+            for version in range(1, 10):
+                await client.update_one(resource_id, {"version": version, "padding": "x" * 32})
+            client.store.executor.submit(lambda: None).result()
+
+        self.assertEqual((await client.select_one(resource_id))["version"], 9)
+
+    async def test_iter_many(self) -> None:
+        client = self.open()
+        resource_ids = [uuid.uuid4() for _ in range(5)]
+        await client.insert_many({resource_id: {} for resource_id in resource_ids})
+
+        with unittest.mock.patch.object(client.store, "get_many", wraps=client.store.get_many) as get_many:
+            result = dict(client.store.iter_many([*resource_ids, uuid.uuid4()], 2))
+
+        self.assertEqual(result, {resource_id: {} for resource_id in resource_ids})
+        self.assertEqual([len(call.args[0]) for call in get_many.call_args_list], [2, 2, 2])
+
+    async def test_compact_keeps_concurrent_writes(self) -> None:
+        client = self.open(max_segment_size=64, compact_ratio=1.0)
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        for resource_id in resource_ids:
+            await client.insert_one(resource_id, {"version": 0})
+        store = client.store
+        write_hints = store._write_hints  # noqa: SLF001 - the race is between the copy and its hints
+
+        def write_during_copy(segment: module.Segment, hints: bytes) -> None:
+            # runs after the values are copied, before the keydir is updated
+            if segment[1]:
+                store.write([(resource_ids[0], {"version": 1}), (resource_ids[1], None)])
+            write_hints(segment, hints)
+
+        with unittest.mock.patch.object(store, "_write_hints", write_during_copy):
+            await client.compact()
+        await client.aclose()
+        client = self.open()
+
+        result = await client.select_by_ids(resource_ids)
+        self.assertEqual(result[0], {"id": resource_ids[0], "version": 1})
+        self.assertEqual(result[1].status_code, 404)  # type: ignore
+        self.assertEqual(result[2], {"id": resource_ids[2], "version": 0})
+
+    async def test_codec(self) -> None:
+        client = self.open(codec="orjson")
+        resource_obj = {"owner": uuid.uuid4(), "created": dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc)}
+
+        await client.insert_one(uuid.UUID(int=1), resource_obj)
+
+        self.assertEqual(await client.select_one(uuid.UUID(int=1)), {"id": uuid.UUID(int=1), **resource_obj})
+
+    async def test_unknown_codec(self) -> None:
+        with self.assertRaises(ValueError):
+            module.BitcaskClient(self.path, "test_table", codec="unknown")
+
+    async def test_clients_share_store(self) -> None:
+        client = self.open()
+        other = self.open()
+        key = ("bitcask", str(self.table))
+
+        await client.insert_one(uuid.UUID(int=1), {})
+
+        self.assertIs(client.store, other.store)
+        self.assertEqual(sthali_db.registry.registry.users(key), 2)
+        self.assertEqual(await other.select_one(uuid.UUID(int=1)), {"id": uuid.UUID(int=1)})
+        await client.aclose()
+        await client.aclose()
+        self.assertEqual(sthali_db.registry.registry.users(key), 1)
+        await other.aclose()
+        self.assertEqual(sthali_db.registry.registry.users(key), 0)
@@ -1,14 +1,22 @@
+import asyncio
+import datetime as dt
+import os
+import pathlib
+import tempfile
 import unittest
 import unittest.mock
+import uuid
 
 import sthali_db.clients.default
 
 module = sthali_db.clients.default
 
+
 class TestDefaultClient(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.client = module.DefaultClient("", "test_table")
-        self.resource_id: module.ResourceId  = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.client = module.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(module.DefaultClient.tables.pop, self.client.table, None)
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
 
     @unittest.mock.patch("sthali_db.clients.default.DefaultClient._get")
     async def test_insert_one(self, mocked_get: unittest.mock.MagicMock) -> None:
@@ -85,24 +93,540 @@ class TestDefaultClient(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
 
-    @unittest.mock.patch("sthali_db.clients.default.DefaultClient._db")
-    async def test_select_many(self, mocked_db: unittest.mock.MagicMock) -> None:
-        mocked_db.items.return_value = {self.resource_id: {"field_1": "value_1", "field_2": "value_2"}}.items()
+    async def test_select_many(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1", "field_2": "value_2"})
         paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
 
         result = await self.client.select_many(paginate_parameters)
 
         self.assertEqual(result, [{"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"}])
 
-    @unittest.mock.patch("sthali_db.clients.default.DefaultClient._db")
-    async def test_select_many_paginated(self, mocked_db: unittest.mock.MagicMock) -> None:
-        mocked_db.items.return_value = {
-            1: {"field_1": "value_1"},
-            2: {"field_1": "value_2"},
-            3: {"field_1": "value_3"},
-        }.items()
+    async def test_select_many_paginated(self) -> None:
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        for index, resource_id in enumerate(resource_ids):
+            await self.client.insert_one(resource_id, {"field_1": f"value_{index}"})
+        resource_ids.sort()
         paginate_parameters = module.dependencies.PaginateParameters(skip=1, limit=1)
 
         result = await self.client.select_many(paginate_parameters)
 
-        self.assertEqual(result, [{"id": 2, "field_1": "value_2"}])
+        self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[1]])
+
+    async def test_select_many_cursor(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                resource_ids[0:2],
+                resource_ids[2:4],
+                resource_ids[4:5],
+            ],
+        )
+
+
+class TestDefaultClientTables(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.client = module.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(module.DefaultClient.tables.pop, self.client.table)
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_obj: module.ResourceObj = {"field_1": "value_1", "field_2": "value_2"}
+
+    async def test_select_many_filter_tagged(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("owner", uuid.UUID | None),  # type: ignore
+            module.FieldSpecification("at", dt.datetime),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        owners = sorted(uuid.uuid4() for _ in range(3))
+        resource_objs = [
+            {"owner": owners[0], "at": dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)},
+            {"owner": owners[1], "at": dt.datetime(2024, 1, 1, 0, 0, 0, 500000, tzinfo=dt.timezone.utc)},
+            {"owner": owners[2], "at": dt.datetime(2024, 1, 1, 2, tzinfo=dt.timezone(dt.timedelta(hours=1)))},
+            {"at": dt.datetime(2024, 6, 1)},  # noqa: DTZ001
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            ([f"owner:eq:{owners[1]}"], [1]),
+            ([f"owner:in:{owners[0]},{owners[2]}"], [0, 2]),
+            ([f"owner:gt:{owners[0]}"], [1, 2]),
+            (["at:gt:2024-01-01T00:00:00Z"], [1, 2]),
+            (["at:le:2024-01-01T01:00:00Z"], [0, 1, 2]),
+            (["at:eq:2024-01-01T01:00:00Z"], [2]),
+            (["at:lt:2025-01-01T00:00:00"], [3]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+    async def test_select_many_filter(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("name", str),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+            module.FieldSpecification("tags", list[str]),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"name": "bob", "age": 20, "tags": ["b"]},
+            {"name": "carol", "age": None, "tags": []},
+            {"name": "dave", "tags": ["a"]},
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            (["age:ge:20"], [0, 1]),
+            (["age:eq:null"], [2, 3]),
+            (["name:in:bob,dave"], [1, 3]),
+            (["name:contains:o"], [1, 2]),
+            (["tags:contains:b"], [0, 1]),
+            (["tags:contains:a", "age:lt:40"], [0]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+        filter_parameters = await module.dependencies.filter_parameters(["tags:contains:a"])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters, filter_parameters))
+
+        names = [[resource_obj["name"] for resource_obj in page] for page in pages]
+        self.assertEqual(names, [["alice"], ["dave"], []])
+
+    async def test_select_many_indexed(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int),  # type: ignore
+        ]
+        client = module.DefaultClient("", self.client.table, fields=fields)
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await client.insert_one(resource_ids[0], {"name": "alice", "age": 30})
+        await client.insert_one(resource_ids[1], {"name": "bob", "age": 20})
+        await client.insert_many({resource_ids[2]: {"name": "alice", "age": 20}, resource_ids[3]: {"age": 40}})
+        await client.update_one(resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({resource_ids[0]: {"name": "carol"}})
+        await client.delete_one(resource_ids[2])
+        cases = [
+            ([("name", "eq", "alice")], [resource_ids[1]]),
+            ([("name", "in", ["carol", "alice"])], [resource_ids[0], resource_ids[1]]),
+            ([("name", "eq", None)], [resource_ids[3]]),
+            ([("name", "eq", "bob")], []),
+            ([("name", "in", ["alice", None]), ("age", "ge", 20)], [resource_ids[1], resource_ids[3]]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, expected in cases:
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[
+                    module.dependencies.Predicate(field=field, operator=operator, value=value)
+                    for field, operator, value in filters
+                ]
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:in:alice,carol"])
+        pages = [await client.select_many(module.dependencies.PaginateParameters(limit=2), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                [resource_ids[0], resource_ids[1]],
+                [],
+            ],
+        )
+
+    async def test_rebuild_indexes(self) -> None:
+        await self.client.insert_one(self.resource_id, {"name": "alice"})
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client = module.DefaultClient("", self.client.table, fields=fields)
+        table = module.DefaultClient.tables[self.client.table]
+        self.assertEqual(table.indexes, {"name": {"alice": {self.resource_id}}})
+
+        table.indexes["name"].clear()
+        await client.rebuild_indexes()
+        self.assertEqual(table.indexes, {"name": {"alice": {self.resource_id}}})
+
+        await client.delete_one(self.resource_id)
+        self.assertEqual(table.indexes, {"name": {}})
+
+    async def test_select_many_filter_unknown_field(self) -> None:
+        filter_parameters = await module.dependencies.filter_parameters(["unknown:eq:1"])
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_select_many_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "carol"},
+            {"name": "dave", "age": 20},
+        ]
+        cases = [
+            ("asc", None, [1, 3, 0, 2]),
+            ("desc", None, [2, 0, 3, 1]),
+            ("asc", ["age:ge:25"], [0]),
+            ("desc", ["name:in:alice,bob,carol"], [2, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("name", str),  # type: ignore
+                module.FieldSpecification("age", int | None, index=index),  # type: ignore
+            ]
+            client = module.DefaultClient("", f"test_table_{uuid.uuid4().hex}", fields=fields)
+            self.addCleanup(module.DefaultClient.tables.pop, client.table)
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=1,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=1,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_order_by_unknown_field(self) -> None:
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="unknown")  # type: ignore
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_stream_many(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+        ]
+        client = module.DefaultClient("", f"test_table_{uuid.uuid4().hex}", fields=fields)
+        self.addCleanup(module.DefaultClient.tables.pop, client.table)
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+        await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+                self.assertEqual(result[0]["name"], resource_objs[indexes[0]]["name"])
+
+    async def test_stream_many_concurrent_writes(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await self.client.insert_many({resource_id: {} for resource_id in resource_ids})
+        last = uuid.UUID(int=2**128 - 1)
+
+        result = []
+        async for resource_obj in self.client.stream_many(batch_size=2):
+            if not result:
+                await self.client.delete_one(resource_ids[2])
+                await self.client.insert_one(last, {})
+            result.append(resource_obj["id"])
+
+        self.assertEqual(result, [resource_ids[0], resource_ids[1], resource_ids[3], last])
+
+    async def test_tables_are_isolated(self) -> None:
+        other_client = module.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(module.DefaultClient.tables.pop, other_client.table)
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        with self.assertRaises(other_client.exception) as context:
+            await other_client.select_one(self.resource_id)
+
+        self.assertEqual(context.exception.status_code, other_client.status.HTTP_404_NOT_FOUND)
+
+    async def test_clients_of_a_table_share_the_store(self) -> None:
+        other_client = module.DefaultClient("", self.client.table)
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        result = await other_client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1"})
+
+    async def test_rows_share_the_columns(self) -> None:
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        await self.client.insert_one(resource_ids[0], {"field_1": "value_1", "field_2": "value_2"})
+        await self.client.insert_one(resource_ids[1], {"field_2": "value_2"})
+        await self.client.insert_one(resource_ids[2], {"field_1": None})
+
+        table = module.DefaultClient.tables[self.client.table]
+
+        self.assertEqual(table.columns, ["field_1", "field_2"])
+        self.assertEqual(table.rows[resource_ids[0]], ("value_1", "value_2"))
+        self.assertEqual(table.rows[resource_ids[1]], (module.MISSING, "value_2"))
+        self.assertEqual(table.rows[resource_ids[2]], (None,))
+
+    async def test_update_one_partial_keeps_missing_fields_out(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+        await self.client.insert_one(uuid.uuid4(), {"field_2": "value_2"})
+
+        result = await self.client.update_one(self.resource_id, {"field_3": "value_3"}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_3": "value_3"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_delete_one_removes_the_key(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        await self.client.delete_one(self.resource_id)
+
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+        self.assertEqual(await self.client.select_many(paginate_parameters), [])
+
+    async def test_insert_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.insert_many({self.resource_id: {}, resource_id: self.resource_obj})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_409_CONFLICT)  # type: ignore
+        self.assertEqual(result[1], {"id": resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(self.resource_id), {"id": self.resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(resource_id), {"id": resource_id, **self.resource_obj})
+
+    async def test_select_by_ids(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_by_ids([resource_id, self.resource_id])
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, **self.resource_obj})
+
+    async def test_update_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({resource_id: {}, self.resource_id: {"field_1": "new_value_1"}})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result[1])
+
+    async def test_update_many_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({self.resource_id: {"field_1": "new_value_1"}}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_id, **self.resource_obj, "field_1": "new_value_1"}])
+        self.assertEqual(await self.client.select_one(self.resource_id), result[0])
+
+    async def test_delete_many(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_many([self.resource_id, uuid.uuid4(), self.resource_id])
+
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[2].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+
+
+class TestDefaultClientSnapshot(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.table = f"test_table_{uuid.uuid4().hex}"
+        self.addCleanup(module.DefaultClient.tables.pop, self.table, None)
+        self.resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        self.resource_objs = [
+            {"name": "alice", "created": dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc)},
+            {"name": "bob", "tags": ["a", "b"]},
+            {"name": "carol", "owner": uuid.UUID(int=1)},
+            {"name": "dave"},
+        ]
+
+    def open(self, **options: object) -> module.DefaultClient:
+        client = module.DefaultClient("", self.table, snapshot_dir=self.directory, **options)  # type: ignore
+        self.addAsyncCleanup(client.aclose)
+        return client
+
+    def rows(self) -> dict[uuid.UUID, tuple]:
+        return module.DefaultClient.tables[self.table].rows
+
+    async def restart(self, client: module.DefaultClient, **options: object) -> module.DefaultClient:
+        await client.aclose()
+        module.DefaultClient.tables.pop(self.table)
+        return self.open(**options)
+
+    async def test_restore(self) -> None:
+        client = self.open()
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+        await client.delete_one(self.resource_ids[3])
+
+        client = await self.restart(client)
+
+        self.assertIsInstance(self.rows(), module.SnapshotRows)
+        self.assertEqual(dict.__len__(self.rows()), 0)
+        result = await client.select_by_ids(self.resource_ids)
+        self.assertEqual(
+            result[:3],
+            [
+                {"id": resource_id, **resource_obj}
+                for resource_id, resource_obj in zip(self.resource_ids[:3], self.resource_objs, strict=False)
+            ],
+        )
+        self.assertEqual(result[3].status_code, 404)  # type: ignore
+
+    async def test_restore_decodes_lazily(self) -> None:
+        client = self.open()
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+
+        client = await self.restart(client)
+        await client.select_one(self.resource_ids[1])
+        page = await client.select_many(module.dependencies.PaginateParameters(limit=1))
+
+        self.assertEqual(set(dict.keys(self.rows())), {self.resource_ids[0], self.resource_ids[1]})
+        self.assertEqual(page[0], {"id": self.resource_ids[0], **self.resource_objs[0]})
+
+    async def test_writes_after_restore(self) -> None:
+        client = self.open(codec="orjson")
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+
+        client = await self.restart(client)
+        await client.update_one(self.resource_ids[0], {"name": "erin"}, partial=True)
+        await client.delete_one(self.resource_ids[1])
+        await client.insert_one(uuid.UUID(int=0), {"name": "frank"})
+        client = await self.restart(client)
+        result = [resource_obj async for resource_obj in client.stream_many()]
+
+        self.assertEqual(
+            result,
+            [
+                {"id": uuid.UUID(int=0), "name": "frank"},
+                {"id": self.resource_ids[0], **self.resource_objs[0], "name": "erin"},
+                {"id": self.resource_ids[2], **self.resource_objs[2]},
+                {"id": self.resource_ids[3], **self.resource_objs[3]},
+            ],
+        )
+
+    async def test_snapshot_copies_undecoded_rows(self) -> None:
+        client = self.open()
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+        client = await self.restart(client)
+
+        await client.insert_one(uuid.UUID(int=0), {})
+        await client.snapshot()
+
+        self.assertEqual(dict.__len__(self.rows()), 1)
+        client = await self.restart(client)
+        self.assertEqual(len(await client.select_many(module.dependencies.PaginateParameters())), 5)
+
+    async def test_snapshot_changes_codec(self) -> None:
+        client = self.open()
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+        client = await self.restart(client, codec="orjson")
+
+        await client.insert_one(uuid.UUID(int=0), {})
+        client = await self.restart(client)
+
+        self.assertEqual(self.rows().snapshot.codec.name, "orjson")  # type: ignore
+        self.assertEqual(
+            await client.select_one(self.resource_ids[0]),
+            {
+                "id": self.resource_ids[0],
+                **self.resource_objs[0],
+            },
+        )
+
+    async def test_restore_indexed(self) -> None:
+        client = self.open()
+        await client.insert_many(dict(zip(self.resource_ids, self.resource_objs, strict=True)))
+        await client.aclose()
+        module.DefaultClient.tables.pop(self.table)
+
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client = self.open(fields=fields)
+        filter_parameters = await module.dependencies.filter_parameters(["name:eq:carol"])
+        result = await client.select_many(module.dependencies.PaginateParameters(), filter_parameters)
+
+        self.assertEqual([resource_obj["id"] for resource_obj in result], [self.resource_ids[2]])
+
+    async def test_snapshot_interval(self) -> None:
+        client = self.open(snapshot_interval=0.01)
+        path = pathlib.Path(self.directory) / f"{self.table}.snapshot"
+
+        await client.insert_one(self.resource_ids[0], self.resource_objs[0])
+        self.assertFalse(path.exists())
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(module.Snapshot(path).keys, [self.resource_ids[0]])
+        # every write after a snapshot schedules the next one
+        await client.insert_one(self.resource_ids[1], self.resource_objs[1])
+        await asyncio.sleep(0.1)
+        self.assertEqual(module.Snapshot(path).keys, self.resource_ids[:2])
+
+    async def test_aclose_skips_unchanged(self) -> None:
+        client = self.open()
+        path = pathlib.Path(self.directory) / f"{self.table}.snapshot"
+
+        await client.aclose()
+
+        self.assertFalse(path.exists())
+
+    async def test_no_snapshot_dir(self) -> None:
+        client = module.DefaultClient("", self.table)
+        await client.insert_one(self.resource_ids[0], {})
+
+        await client.snapshot()
+        await client.aclose()
+
+        self.assertEqual(await asyncio.to_thread(os.listdir, self.directory), [])
@@ -1,33 +1,439 @@
+import datetime as dt
+import os
+import pathlib
+import shutil
+import socket
+import subprocess
+import tempfile
 import unittest
+import unittest.mock
+import uuid
 
 import sthali_db.clients.postgres
 
 module = sthali_db.clients.postgres
 
+
+def find_binary(name: str) -> str | None:
+    """Returns the path of a PostgreSQL binary, on the PATH or in the directory pg_config reports, if any."""
+    if path := shutil.which(name):
+        return path
+    if pg_config := shutil.which("pg_config"):
+        # the command is the pg_config found on the PATH
+        process = subprocess.run([pg_config, "--bindir"], capture_output=True, text=True, check=True)  # noqa: S603
+        bindir = process.stdout.strip()
+        path = pathlib.Path(bindir) / name
+        return str(path) if path.exists() else None
+    return None
+
+
+class TestPostgresClientDependency(unittest.IsolatedAsyncioTestCase):
+    async def test_raise_exception_without_asyncpg(self) -> None:
+        with unittest.mock.patch.object(module, "asyncpg", None), self.assertRaises(ImportError):
+            module.PostgresClient("test_path", "test_table")
+
+
+@unittest.skipIf(module.asyncpg is None, "asyncpg is not installed")
+class TestPostgresClientRegistry(unittest.IsolatedAsyncioTestCase):
+    async def test_tables_share_connection_pool(self) -> None:
+        dsn = "postgresql://localhost/test_registry"
+        client_1 = module.PostgresClient(dsn, "test_table_1", max_size=2)
+        client_2 = module.PostgresClient(dsn, "test_table_2")
+        key = ("postgres", dsn)
+
+        # the pool is private
+        self.assertIs(client_1._shared_pool, client_2._shared_pool)  # noqa: SLF001
+        self.assertEqual(client_2._shared_pool.options["max_size"], 2)  # noqa: SLF001
+        await client_1.aclose()
+        await client_1.aclose()
+        self.assertEqual(module.registry.users(key), 1)
+        await client_2.aclose()
+        self.assertEqual(module.registry.users(key), 0)
+
+    async def test_codec(self) -> None:
+        dsn = "postgresql://localhost/test_codec"
+        client = module.PostgresClient(dsn, "test_table", codec="orjson")
+        self.addAsyncCleanup(client.aclose)
+        connection = unittest.mock.AsyncMock()
+        resource_obj = {"field_1": uuid.uuid4(), "field_2": dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)}
+
+        await module._init_connection(connection, client.codec)  # noqa: SLF001 - no public hook runs the pool's init
+
+        self.assertIs(client._shared_pool.codec, client.codec)  # noqa: SLF001 - the pool isn't public
+        kwargs = connection.set_type_codec.await_args.kwargs
+        self.assertEqual(kwargs["decoder"](kwargs["encoder"](resource_obj)), resource_obj)
+        with self.assertRaises(ValueError):
+            module.PostgresClient(dsn, "test_table", codec="msgpack")
+
+
 class TestPostgresClient(unittest.IsolatedAsyncioTestCase):
-    def setUp(self) -> None:
-        self.client = module.PostgresClient("test_path", "test_table")
+    directory: tempfile.TemporaryDirectory
+    dsn: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        initdb, pg_ctl = find_binary("initdb"), find_binary("pg_ctl")
+        if module.asyncpg is None or initdb is None or pg_ctl is None:
+            msg = "asyncpg or a local postgres server is not available"
+            raise unittest.SkipTest(msg)
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            msg = "postgres can't be run as root"
+            raise unittest.SkipTest(msg)
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        cls.directory = tempfile.TemporaryDirectory()
+        data = pathlib.Path(cls.directory.name) / "data"
+        # the commands are the PostgreSQL binaries found by find_binary, run on a temporary directory
+        subprocess.run([initdb, "-D", data, "-U", "postgres", "-A", "trust"], capture_output=True, check=True)  # noqa: S603
+        subprocess.run(  # noqa: S603
+            [pg_ctl, "-D", data, "-l", data / "log", "-w", "-o", f"-p {port} -k {cls.directory.name}", "start"],
+            capture_output=True,
+            check=True,
+        )
+        cls.pg_ctl, cls.data = pg_ctl, data
+        cls.dsn = f"postgresql://postgres@127.0.0.1:{port}/postgres"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        subprocess.run([cls.pg_ctl, "-D", cls.data, "-m", "immediate", "stop"], capture_output=True, check=False)  # noqa: S603
+        cls.directory.cleanup()
+
+    async def asyncSetUp(self) -> None:
+        self.client = module.PostgresClient(self.dsn, f"test_table_{uuid.uuid4().hex}", max_size=2)
+        self.addAsyncCleanup(self.client.aclose)
         self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
-        self.resource_obj: module.ResourceObj = {}
+        self.resource_obj: module.ResourceObj = {"field_1": "value_1", "field_2": "value_2"}
 
     async def test_insert_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        result = await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+
+    async def test_insert_one_raise_exception(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.insert_one(self.resource_id, self.resource_obj)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_409_CONFLICT)
+
     async def test_select_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+
+    async def test_select_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_one(self.resource_id)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
     async def test_update_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
-            await self.client.update_one(self.resource_id, self.resource_obj)
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"field_1": "new_value_1"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "new_value_1"})
+
+    async def test_update_one_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"field_1": None}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": None, "field_2": "value_2"})
+
+    async def test_update_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.update_one(self.resource_id, {"field_1": "new_value_1"})
+
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
 
     async def test_delete_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_one(self.resource_id)
+
+        self.assertIsNone(result)
+
+    async def test_delete_one_not_found(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.delete_one(self.resource_id)
 
-    async def test_select_many(self) -> None:
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_select_many_paginated(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(3))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        paginate_parameters = module.dependencies.PaginateParameters(skip=1, limit=1)
+
+        result = await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(result, [{"id": resource_ids[1]}])
+
+    async def test_select_many_cursor(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                resource_ids[0:2],
+                resource_ids[2:4],
+                resource_ids[4:5],
+            ],
+        )
+
+    async def test_select_many_filter(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("name", str),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+            module.FieldSpecification("tags", list[str]),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"name": "bob", "age": 20, "tags": ["b"]},
+            {"name": "carol", "age": None, "tags": []},
+            {"name": "dave", "tags": ["a"]},
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            (["age:ge:20"], [0, 1]),
+            (["age:eq:null"], [2, 3]),
+            (["name:in:bob,dave"], [1, 3]),
+            (["name:contains:o"], [1, 2]),
+            (["tags:contains:b"], [0, 1]),
+            (["tags:contains:a", "age:lt:40"], [0]),
+        ]
         paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
 
-        with self.assertRaises(NotImplementedError):
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+        filter_parameters = await module.dependencies.filter_parameters(["tags:contains:a"])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["name"] for resource_obj in page] for page in pages], [["alice"], ["dave"], []]
+        )
+
+    async def test_select_many_indexed(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int),  # type: ignore
+        ]
+        client = module.PostgresClient(self.dsn, f"test_table_{uuid.uuid4().hex}", fields=fields, max_size=2)
+        self.addAsyncCleanup(client.aclose)
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await client.insert_one(resource_ids[0], {"name": "alice", "age": 30})
+        await client.insert_one(resource_ids[1], {"name": "bob", "age": 20})
+        await client.insert_many({resource_ids[2]: {"name": "alice", "age": 20}, resource_ids[3]: {"age": 40}})
+        await client.update_one(resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({resource_ids[0]: {"name": "carol"}})
+        await client.delete_one(resource_ids[2])
+        cases = [
+            ([("name", "eq", "alice")], [resource_ids[1]]),
+            ([("name", "in", ["carol", "alice"])], [resource_ids[0], resource_ids[1]]),
+            ([("name", "eq", None)], [resource_ids[3]]),
+            ([("name", "eq", "bob")], []),
+            ([("name", "in", ["alice", None]), ("age", "ge", 20)], [resource_ids[1], resource_ids[3]]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, expected in cases:
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[
+                    module.dependencies.Predicate(field=field, operator=operator, value=value)
+                    for field, operator, value in filters
+                ]
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:in:alice,carol"])
+        pages = [await client.select_many(module.dependencies.PaginateParameters(limit=2), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                [resource_ids[0], resource_ids[1]],
+                [],
+            ],
+        )
+
+    async def test_rebuild_indexes(self) -> None:
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client = module.PostgresClient(self.dsn, f"test_table_{uuid.uuid4().hex}", fields=fields, max_size=2)
+        self.addAsyncCleanup(client.aclose)
+        await client.insert_one(self.resource_id, {"name": "alice"})
+
+        await client.rebuild_indexes()
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:eq:alice"])
+        result = await client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+        self.assertEqual(result, [{"id": self.resource_id, "name": "alice"}])
+
+    async def test_select_many_filter_unknown_field(self) -> None:
+        filter_parameters = await module.dependencies.filter_parameters(["unknown:eq:1"])
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_select_many_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "carol"},
+            {"name": "dave", "age": 20},
+        ]
+        cases = [
+            ("asc", None, [1, 3, 0, 2]),
+            ("desc", None, [2, 0, 3, 1]),
+            ("asc", ["age:ge:25"], [0]),
+            ("desc", ["name:in:alice,bob,carol"], [2, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("name", str),  # type: ignore
+                module.FieldSpecification("age", int | None, index=index),  # type: ignore
+            ]
+            client = module.PostgresClient(self.dsn, f"test_table_{uuid.uuid4().hex}", fields=fields, max_size=2)
+            self.addAsyncCleanup(client.aclose)
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=1,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=1,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_order_by_unknown_field(self) -> None:
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="unknown")  # type: ignore
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_stream_many(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+        ]
+        client = module.PostgresClient(self.dsn, f"test_table_{uuid.uuid4().hex}", fields=fields, max_size=2)
+        self.addAsyncCleanup(client.aclose)
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+        await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+                self.assertEqual(result[0]["name"], resource_objs[indexes[0]]["name"])
+
+    async def test_insert_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.insert_many({self.resource_id: {}, resource_id: self.resource_obj})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_409_CONFLICT)  # type: ignore
+        self.assertEqual(result[1], {"id": resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(self.resource_id), {"id": self.resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(resource_id), {"id": resource_id, **self.resource_obj})
+
+    async def test_select_by_ids(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_by_ids([resource_id, self.resource_id])
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, **self.resource_obj})
+
+    async def test_update_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({resource_id: {}, self.resource_id: {"field_1": "new_value_1"}})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result[1])
+
+    async def test_update_many_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({self.resource_id: {"field_1": "new_value_1"}}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_id, **self.resource_obj, "field_1": "new_value_1"}])
+        self.assertEqual(await self.client.select_one(self.resource_id), result[0])
+
+    async def test_delete_many(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_many([self.resource_id, uuid.uuid4(), self.resource_id])
+
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[2].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
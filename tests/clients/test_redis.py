@@ -1,33 +1,528 @@
+import datetime as dt
+import typing
 import unittest
+import unittest.mock
+import uuid
 
 import sthali_db.clients.redis
+import sthali_db.codecs
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
 
 module = sthali_db.clients.redis
 
+
+class TestRedisClientDependency(unittest.IsolatedAsyncioTestCase):
+    async def test_raise_exception_without_redis(self) -> None:
+        with unittest.mock.patch.object(module, "redis", None), self.assertRaises(ImportError):
+            module.RedisClient("redis://localhost", "test_table")
+
+
+@unittest.skipIf(module.redis is None, "redis is not installed")
+class TestRedisClientRegistry(unittest.IsolatedAsyncioTestCase):
+    async def test_tables_share_connection_pool(self) -> None:
+        client_1 = module.RedisClient("redis://localhost/15", "test_table_1")
+        client_2 = module.RedisClient("redis://localhost/15", "test_table_2")
+        key = ("redis", "redis://localhost/15")
+
+        self.assertIs(client_1.redis, client_2.redis)
+        await client_1.aclose()
+        await client_1.aclose()
+        self.assertEqual(module.registry.users(key), 1)
+        await client_2.aclose()
+        self.assertEqual(module.registry.users(key), 0)
+
+
+@unittest.skipIf(module.redis is None or fakeredis is None, "redis or fakeredis is not installed")
 class TestRedisClient(unittest.IsolatedAsyncioTestCase):
-    def setUp(self) -> None:
-        self.client = module.RedisClient("test_path", "test_table")
+    async def asyncSetUp(self) -> None:
+        self.client = module.RedisClient("redis://localhost", "test_table")
+        self.client.redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        self.addAsyncCleanup(self.client.aclose)
         self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
-        self.resource_obj: module.ResourceObj = {}
+        self.resource_obj: module.ResourceObj = {"field_1": "value_1", "field_2": 2}
 
     async def test_insert_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        result = await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": 2})
+        self.assertEqual(await self.client.redis.zrange("{test_table}:index", 0, -1), [str(self.resource_id)])
+
+    async def test_insert_one_empty(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id})
+
+    async def test_insert_one_raise_exception(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.insert_one(self.resource_id, self.resource_obj)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_409_CONFLICT)
+
     async def test_select_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, {**self.resource_obj, "field_3": [1, None, {"a": True}]})
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj, "field_3": [1, None, {"a": True}]})
+
+    async def test_select_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_one(self.resource_id)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
     async def test_update_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
-            await self.client.update_one(self.resource_id, self.resource_obj)
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"field_1": "new_value_1"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_update_one_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"field_1": None}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": None, "field_2": 2})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_update_one_raise_exception(self) -> None:
+        for partial in (None, True):
+            with self.subTest(partial=partial), self.assertRaises(self.client.exception) as context:
+                await self.client.update_one(self.resource_id, {"field_1": "new_value_1"}, partial)
+
+            self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
 
     async def test_delete_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_one(self.resource_id)
+
+        self.assertIsNone(result)
+        self.assertEqual(await self.client.redis.zrange("{test_table}:index", 0, -1), [])
+
+    async def test_delete_one_not_found(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.delete_one(self.resource_id)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
     async def test_select_many(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(3))
+        for index, resource_id in enumerate(reversed(resource_ids)):
+            await self.client.insert_one(resource_id, {"field_1": index})
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        result = await self.client.select_many(paginate_parameters)
+
+        self.assertEqual([item["id"] for item in result], resource_ids)
+
+    async def test_select_many_paginated(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(3))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        paginate_parameters = module.dependencies.PaginateParameters(skip=1, limit=1)
+
+        result = await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(result, [{"id": resource_ids[1]}])
+
+    async def test_select_many_cursor(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                resource_ids[0:2],
+                resource_ids[2:4],
+                resource_ids[4:5],
+            ],
+        )
+
+    async def test_select_many_filter(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("name", str),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+            module.FieldSpecification("tags", list[str]),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"name": "bob", "age": 20, "tags": ["b"]},
+            {"name": "carol", "age": None, "tags": []},
+            {"name": "dave", "tags": ["a"]},
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            (["age:ge:20"], [0, 1]),
+            (["age:eq:null"], [2, 3]),
+            (["name:in:bob,dave"], [1, 3]),
+            (["name:contains:o"], [1, 2]),
+            (["tags:contains:b"], [0, 1]),
+            (["tags:contains:a", "age:lt:40"], [0]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+        filter_parameters = await module.dependencies.filter_parameters(["tags:contains:a"])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["name"] for resource_obj in page] for page in pages], [["alice"], ["dave"], []]
+        )
+
+    async def test_select_many_filter_tagged(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("owner", uuid.UUID | None),  # type: ignore
+            module.FieldSpecification("at", dt.datetime),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        owners = sorted(uuid.uuid4() for _ in range(3))
+        resource_objs = [
+            {"owner": owners[0], "at": dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)},
+            {"owner": owners[1], "at": dt.datetime(2024, 1, 1, 0, 0, 0, 500000, tzinfo=dt.timezone.utc)},
+            {"owner": owners[2], "at": dt.datetime(2024, 1, 1, 2, tzinfo=dt.timezone(dt.timedelta(hours=1)))},
+            {"at": dt.datetime(2024, 6, 1)},  # noqa: DTZ001
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            ([f"owner:eq:{owners[1]}"], [1]),
+            ([f"owner:in:{owners[0]},{owners[2]}"], [0, 2]),
+            ([f"owner:gt:{owners[0]}"], [1, 2]),
+            (["at:gt:2024-01-01T00:00:00Z"], [1, 2]),
+            (["at:le:2024-01-01T01:00:00Z"], [0, 1, 2]),
+            (["at:eq:2024-01-01T01:00:00Z"], [2]),
+            (["at:lt:2025-01-01T00:00:00"], [3]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+    async def test_select_many_indexed(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int),  # type: ignore
+        ]
+        client = module.RedisClient("redis://localhost", "test_table", fields=fields)
+        client.redis = self.client.redis
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await client.insert_one(resource_ids[0], {"name": "alice", "age": 30})
+        await client.insert_one(resource_ids[1], {"name": "bob", "age": 20})
+        await client.insert_many({resource_ids[2]: {"name": "alice", "age": 20}, resource_ids[3]: {"age": 40}})
+        await client.update_one(resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({resource_ids[0]: {"name": "carol"}})
+        await client.delete_one(resource_ids[2])
+        cases = [
+            ([("name", "eq", "alice")], [resource_ids[1]]),
+            ([("name", "in", ["carol", "alice"])], [resource_ids[0], resource_ids[1]]),
+            ([("name", "eq", None)], [resource_ids[3]]),
+            ([("name", "eq", "bob")], []),
+            ([("name", "in", ["alice", None]), ("age", "ge", 20)], [resource_ids[1], resource_ids[3]]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, expected in cases:
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[
+                    module.dependencies.Predicate(field=field, operator=operator, value=value)
+                    for field, operator, value in filters
+                ]
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:in:alice,carol"])
+        pages = [await client.select_many(module.dependencies.PaginateParameters(limit=2), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                [resource_ids[0], resource_ids[1]],
+                [],
+            ],
+        )
+
+    @unittest.skipIf(sthali_db.codecs.orjson is None, "orjson is not installed")
+    async def test_codec(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("owner", uuid.UUID),  # type: ignore
+        ]
+        client = module.RedisClient("redis://localhost", "test_table", fields=fields, codec="orjson")
+        client.redis = self.client.redis
+        resource_obj = {"name": "é", "owner": uuid.uuid4(), "created": dt.datetime.now(dt.timezone.utc)}
+        await client.insert_one(self.resource_id, resource_obj)
         paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
 
-        with self.assertRaises(NotImplementedError):
+        for field, value in (("name", "é"), ("owner", resource_obj["owner"])):
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[module.dependencies.Predicate(field=field, operator="eq", value=value)],
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(field=field):
+                self.assertEqual(list(result), [{"id": self.resource_id, **resource_obj}])
+
+    async def test_codec_not_json(self) -> None:
+        with (
+            unittest.mock.patch.dict(sthali_db.codecs.CODECS, {"binary": sthali_db.codecs.Codec}),
+            self.assertRaises(ValueError),
+        ):
+            module.RedisClient("redis://localhost", "test_table", codec="binary")
+
+    async def test_rebuild_indexes(self) -> None:
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client = module.RedisClient("redis://localhost", "test_table", fields=fields)
+        client.redis = self.client.redis
+        await self.client.insert_one(self.resource_id, {"name": "alice"})
+        await self.client.redis.sadd("{test_table}:index:other:1", "stale")
+
+        await client.rebuild_indexes()
+
+        self.assertEqual(await client.redis.smembers('{test_table}:index:name:"alice"'), {str(self.resource_id)})
+        self.assertFalse(await client.redis.exists("{test_table}:index:other:1"))
+        await client.delete_one(self.resource_id)
+        self.assertFalse(await client.redis.exists('{test_table}:index:name:"alice"'))
+
+    async def test_select_many_filter_unknown_field(self) -> None:
+        filter_parameters = await module.dependencies.filter_parameters(["unknown:eq:1"])
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_select_many_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "carol"},
+            {"name": "dave", "age": 20},
+        ]
+        cases = [
+            ("asc", None, [1, 3, 0, 2]),
+            ("desc", None, [2, 0, 3, 1]),
+            ("asc", ["age:ge:25"], [0]),
+            ("desc", ["name:in:alice,bob,carol"], [2, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("name", str),  # type: ignore
+                module.FieldSpecification("age", int | None, index=index),  # type: ignore
+            ]
+            client = module.RedisClient("redis://localhost", f"test_table_{uuid.uuid4().hex}", fields=fields)
+            client.redis = self.client.redis
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=1,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=1,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_ordered_mixed(self) -> None:
+        values = [3, 1.5, "b", "a\x00", "a", None, [1, 2], {"key": 1}, True, -2, 1e300, "a"]
+        resource_ids = [uuid.uuid4() for _ in values]
+        resource_objs = [{"rank": value, "deleted": False} for value in values]
+        resource_objs[5] = {"deleted": False}
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("rank", typing.Any, index=index),  # type: ignore
+                module.FieldSpecification("deleted", bool),  # type: ignore
+            ]
+            client = module.RedisClient("redis://localhost", f"test_table_{uuid.uuid4().hex}", fields=fields)
+            client.redis = self.client.redis
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            await client.update_one(resource_ids[0], {"rank": 0.5}, partial=True)
+            await client.update_one(resource_ids[1], {"rank": "c", "deleted": False})
+            await client.delete_one(resource_ids[2])
+            expected = [
+                {"id": resource_id, **resource_obj}
+                for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True)
+                if resource_id != resource_ids[2]
+            ]
+            expected[0]["rank"], expected[1]["rank"] = 0.5, "c"
+            for direction, filters in [("asc", None), ("desc", None), ("desc", ["deleted:eq:false"])]:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=3,
+                    order_by="rank",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=3,
+                        order_by="rank",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+                skipped = await client.select_many(
+                    module.dependencies.PaginateParameters(skip=2, limit=3, order_by="rank", direction=direction),
+                    filter_parameters,
+                )
+                ordered = sorted(expected, key=paginate_parameters.sort_key, reverse=direction == "desc")
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual([resource_obj for page in pages for resource_obj in page], ordered)
+                    self.assertEqual(list(skipped), ordered[2:5])
+
+    async def test_rebuild_indexes_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(3))
+        await self.client.insert_many(dict(zip(resource_ids, [{"age": 30}, {"age": 10}, {}], strict=True)))
+        fields = [module.FieldSpecification("age", int | None, index=True)]  # type: ignore
+        client = module.RedisClient("redis://localhost", "test_table", fields=fields)
+        client.redis = self.client.redis
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="age")  # type: ignore
+
+        self.assertEqual(list(await client.select_many(paginate_parameters)), [])
+        await client.rebuild_indexes()
+
+        result = await client.select_many(paginate_parameters)
+
+        self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in [1, 0, 2]])
+        self.assertEqual(result[0], {"id": resource_ids[1], "age": 10})
+
+    async def test_select_many_order_by_unknown_field(self) -> None:
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="unknown")  # type: ignore
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_stream_many(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+        ]
+        client = module.RedisClient("redis://localhost", "test_table", fields=fields)
+        client.redis = self.client.redis
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+        await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+                self.assertEqual(result[0]["name"], resource_objs[indexes[0]]["name"])
+
+    async def test_insert_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.insert_many({self.resource_id: {}, resource_id: self.resource_obj})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_409_CONFLICT)  # type: ignore
+        self.assertEqual(result[1], {"id": resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(self.resource_id), {"id": self.resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(resource_id), {"id": resource_id, **self.resource_obj})
+
+    async def test_select_by_ids(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_by_ids([resource_id, self.resource_id])
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, **self.resource_obj})
+
+    async def test_update_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({resource_id: {}, self.resource_id: {"field_1": "new_value_1"}})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result[1])
+
+    async def test_update_many_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({self.resource_id: {"field_1": "new_value_1"}}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_id, **self.resource_obj, "field_1": "new_value_1"}])
+        self.assertEqual(await self.client.select_one(self.resource_id), result[0])
+
+    async def test_delete_many(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_many([self.resource_id, uuid.uuid4(), self.resource_id])
+
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[2].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
@@ -1,33 +1,678 @@
+import asyncio
+import datetime as dt
+import pathlib
+import sqlite3
+import tempfile
+import typing
 import unittest
+import unittest.mock
+import uuid
 
 import sthali_db.clients.sqlite
+import sthali_db.codecs
 
 module = sthali_db.clients.sqlite
 
-class TestsqliteClient(unittest.IsolatedAsyncioTestCase):
+
+async def _query(client: module.SqliteClient, sql: str, parameters: tuple = ()) -> list[tuple]:
+    # the tests read the table as SQLite stores it, through the connection the client keeps private
+    return await client._run(lambda: client._connection.execute(sql, parameters).fetchall())  # noqa: SLF001
+
+
+class TestTransaction(unittest.TestCase):
     def setUp(self) -> None:
-        self.client = module.SqliteClient("test_path", "test_table")
+        self.connection = sqlite3.connect(":memory:", isolation_level=None)
+        self.addCleanup(self.connection.close)
+        self.connection.execute("CREATE TABLE test_table (value INTEGER)")
+
+    def test_commit(self) -> None:
+        with module._transaction(self.connection):  # noqa: SLF001 - the helper is private
+            self.connection.execute("INSERT INTO test_table VALUES (1)")
+
+        self.assertEqual(self.connection.execute("SELECT value FROM test_table").fetchall(), [(1,)])
+
+    def test_rollback(self) -> None:
+        with self.assertRaises(RuntimeError), module._transaction(self.connection):  # noqa: SLF001
+            self.connection.execute("INSERT INTO test_table VALUES (1)")
+            raise RuntimeError
+
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.connection.execute("SELECT value FROM test_table").fetchall(), [])
+
+    def test_rollback_failed_commit(self) -> None:
+        connection = unittest.mock.MagicMock(in_transaction=True)
+        busy = sqlite3.OperationalError("database is locked")
+        connection.execute.side_effect = [None, busy, None]
+
+        with self.assertRaises(sqlite3.OperationalError), module._transaction(connection):  # noqa: SLF001
+            pass
+
+        self.assertEqual(
+            [call.args[0] for call in connection.execute.call_args_list],
+            ["BEGIN IMMEDIATE", "COMMIT", "ROLLBACK"],
+        )
+
+
+class TestSqliteClient(unittest.IsolatedAsyncioTestCase):
+    path = ":memory:"
+
+    async def asyncSetUp(self) -> None:
+        self.client = module.SqliteClient(self.path, "test_table")
+        self.addAsyncCleanup(self.client.aclose)
         self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
-        self.resource_obj: module.ResourceObj = {}
+        self.resource_obj: module.ResourceObj = {"field_1": "value_1", "field_2": "value_2"}
 
     async def test_insert_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        result = await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+
+    async def test_insert_one_raise_exception(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.insert_one(self.resource_id, self.resource_obj)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_409_CONFLICT)
+
     async def test_select_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+
+    async def test_select_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_one(self.resource_id)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_memory_databases_are_not_shared(self) -> None:
+        client = module.SqliteClient(":memory:", "test_table")
+        self.addAsyncCleanup(client.aclose)
+
+        self.assertIsNot(client.database, self.client.database)
+
     async def test_update_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
-            await self.client.update_one(self.resource_id, self.resource_obj)
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"field_1": "new_value_1"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_update_one_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+        resource_obj = {"field_1": None, "field_3": [1, {"a": 2}]}
+
+        result = await self.client.update_one(self.resource_id, resource_obj, partial=True)
+
+        expected = {"id": self.resource_id, "field_1": None, "field_2": "value_2", "field_3": [1, {"a": 2}]}
+        self.assertEqual(result, expected)
+        self.assertEqual(await self.client.select_one(self.resource_id), expected)
+
+    async def test_update_one_partial_quoted_key(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {'field "3"': "value_3"}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj, 'field "3"': "value_3"})
+
+    async def test_update_one_partial_quoted_key_rolls_back(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        with self.assertRaises(TypeError):
+            await self.client.update_one(self.resource_id, {'field "3"': object()}, partial=True)
+
+        result = await self.client.update_one(self.resource_id, {'field "3"': "value_3"}, partial=True)
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj, 'field "3"': "value_3"})
+
+    async def test_update_one_raise_exception(self) -> None:
+        for partial in (None, True):
+            with self.subTest(partial=partial), self.assertRaises(self.client.exception) as context:
+                await self.client.update_one(self.resource_id, {"field_1": "new_value_1"}, partial)
+
+            self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
 
     async def test_delete_one(self) -> None:
-        with self.assertRaises(NotImplementedError):
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_one(self.resource_id)
+
+        self.assertIsNone(result)
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+
+    async def test_delete_one_not_found(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
             await self.client.delete_one(self.resource_id)
 
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
     async def test_select_many(self) -> None:
+        resource_ids = sorted(module.uuid.uuid4() for _ in range(3))
+        for index, resource_id in enumerate(reversed(resource_ids)):
+            await self.client.insert_one(resource_id, {"field_1": index})
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        result = await self.client.select_many(paginate_parameters)
+
+        self.assertEqual([item["id"] for item in result], resource_ids)
+
+    async def test_select_many_paginated(self) -> None:
+        resource_ids = sorted(module.uuid.uuid4() for _ in range(3))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        paginate_parameters = module.dependencies.PaginateParameters(skip=1, limit=1)
+
+        result = await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(result, [{"id": resource_ids[1]}])
+
+    async def test_select_many_cursor(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                resource_ids[0:2],
+                resource_ids[2:4],
+                resource_ids[4:5],
+            ],
+        )
+
+    async def test_select_many_filter(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("name", str),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+            module.FieldSpecification("tags", list[str]),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"name": "bob", "age": 20, "tags": ["b"]},
+            {"name": "carol", "age": None, "tags": []},
+            {"name": "dave", "tags": ["a"]},
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            (["age:ge:20"], [0, 1]),
+            (["age:eq:null"], [2, 3]),
+            (["name:in:bob,dave"], [1, 3]),
+            (["name:contains:o"], [1, 2]),
+            (["tags:contains:b"], [0, 1]),
+            (["tags:contains:a", "age:lt:40"], [0]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+        filter_parameters = await module.dependencies.filter_parameters(["tags:contains:a"])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["name"] for resource_obj in page] for page in pages], [["alice"], ["dave"], []]
+        )
+
+    async def test_select_many_filter_tagged(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("owner", uuid.UUID | None),  # type: ignore
+            module.FieldSpecification("at", dt.datetime),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        owners = sorted(uuid.uuid4() for _ in range(3))
+        resource_objs = [
+            {"owner": owners[0], "at": dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)},
+            {"owner": owners[1], "at": dt.datetime(2024, 1, 1, 0, 0, 0, 500000, tzinfo=dt.timezone.utc)},
+            {"owner": owners[2], "at": dt.datetime(2024, 1, 1, 2, tzinfo=dt.timezone(dt.timedelta(hours=1)))},
+            {"at": dt.datetime(2024, 6, 1)},  # noqa: DTZ001
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            ([f"owner:eq:{owners[1]}"], [1]),
+            ([f"owner:in:{owners[0]},{owners[2]}"], [0, 2]),
+            ([f"owner:gt:{owners[0]}"], [1, 2]),
+            (["at:gt:2024-01-01T00:00:00Z"], [1, 2]),
+            (["at:le:2024-01-01T01:00:00Z"], [0, 1, 2]),
+            (["at:eq:2024-01-01T01:00:00Z"], [2]),
+            (["at:lt:2025-01-01T00:00:00"], [3]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+    async def test_select_many_indexed(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int),  # type: ignore
+        ]
+        client = module.SqliteClient(self.path, "test_table_indexed", fields=fields)
+        self.addAsyncCleanup(client.aclose)
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await client.insert_one(resource_ids[0], {"name": "alice", "age": 30})
+        await client.insert_one(resource_ids[1], {"name": "bob", "age": 20})
+        await client.insert_many({resource_ids[2]: {"name": "alice", "age": 20}, resource_ids[3]: {"age": 40}})
+        await client.update_one(resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({resource_ids[0]: {"name": "carol"}})
+        await client.delete_one(resource_ids[2])
+        cases = [
+            ([("name", "eq", "alice")], [resource_ids[1]]),
+            ([("name", "in", ["carol", "alice"])], [resource_ids[0], resource_ids[1]]),
+            ([("name", "eq", None)], [resource_ids[3]]),
+            ([("name", "eq", "bob")], []),
+            ([("name", "in", ["alice", None]), ("age", "ge", 20)], [resource_ids[1], resource_ids[3]]),
+        ]
         paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
 
-        with self.assertRaises(NotImplementedError):
+        for filters, expected in cases:
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[
+                    module.dependencies.Predicate(field=field, operator=operator, value=value)
+                    for field, operator, value in filters
+                ]
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:in:alice,carol"])
+        pages = [await client.select_many(module.dependencies.PaginateParameters(limit=2), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                [resource_ids[0], resource_ids[1]],
+                [],
+            ],
+        )
+
+    async def test_rebuild_indexes(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("tags", list, index=True),  # type: ignore
+        ]
+        client = module.SqliteClient(self.path, "test_table_indexed", fields=fields)
+        self.addAsyncCleanup(client.aclose)
+
+        await client.rebuild_indexes()
+
+        sql = 'PRAGMA index_list("test_table_indexed")'
+        rows = await _query(client, sql)
+        self.assertEqual(
+            sorted(row[1] for row in rows if row[3] == "c"),
+            ["test_table_indexed_name_index", "test_table_indexed_tags_index"],
+        )
+
+    async def test_select_many_filter_unknown_field(self) -> None:
+        filter_parameters = await module.dependencies.filter_parameters(["unknown:eq:1"])
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_select_many_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "carol"},
+            {"name": "dave", "age": 20},
+        ]
+        cases = [
+            ("asc", None, [1, 3, 0, 2]),
+            ("desc", None, [2, 0, 3, 1]),
+            ("asc", ["age:ge:25"], [0]),
+            ("desc", ["name:in:alice,bob,carol"], [2, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("name", str),  # type: ignore
+                module.FieldSpecification("age", int | None, index=index),  # type: ignore
+            ]
+            client = module.SqliteClient(self.path, f"test_table_{uuid.uuid4().hex}", fields=fields)
+            self.addAsyncCleanup(client.aclose)
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=1,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=1,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_order_by_unknown_field(self) -> None:
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="unknown")  # type: ignore
+
+        with self.assertRaises(self.client.exception) as context:
             await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_stream_many(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+        ]
+        client = module.SqliteClient(self.path, "test_table_stream", fields=fields)
+        self.addAsyncCleanup(client.aclose)
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+        await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+                self.assertEqual(result[0]["name"], resource_objs[indexes[0]]["name"])
+
+    async def test_insert_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.insert_many({self.resource_id: {}, resource_id: self.resource_obj})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_409_CONFLICT)  # type: ignore
+        self.assertEqual(result[1], {"id": resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(self.resource_id), {"id": self.resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(resource_id), {"id": resource_id, **self.resource_obj})
+
+    async def test_select_by_ids(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_by_ids([resource_id, self.resource_id])
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, **self.resource_obj})
+
+    async def test_update_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({resource_id: {}, self.resource_id: {"field_1": "new_value_1"}})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result[1])
+
+    async def test_update_many_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({self.resource_id: {"field_1": "new_value_1"}}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_id, **self.resource_obj, "field_1": "new_value_1"}])
+        self.assertEqual(await self.client.select_one(self.resource_id), result[0])
+
+    async def test_delete_many(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_many([self.resource_id, uuid.uuid4(), self.resource_id])
+
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[2].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+
+    async def test_select_by_ids_in_batches(self) -> None:
+        resources = {uuid.uuid4(): {"field_1": index} for index in range(module.BATCH_SIZE * 2 + 1)}
+        await self.client.insert_many(resources)
+
+        result = await self.client.select_by_ids(list(resources))
+
+        expected = [{"id": resource_id, **resource_obj} for resource_id, resource_obj in resources.items()]
+        self.assertEqual(result, expected)
+
+    @unittest.skipIf(sthali_db.codecs.orjson is None, "orjson is not installed")
+    async def test_codec(self) -> None:
+        client = module.SqliteClient(self.path, "test_table_codec", codec="orjson")
+        self.addAsyncCleanup(client.aclose)
+        resource_obj = {"owner": uuid.uuid4(), "created": dt.datetime.now(dt.timezone.utc), "name": "é"}
+        await client.insert_one(self.resource_id, resource_obj)
+        await client.update_one(self.resource_id, {"tags": [uuid.UUID(int=1)]}, partial=True)
+
+        result = await client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, **resource_obj, "tags": [uuid.UUID(int=1)]})
+
+    async def test_codec_not_json(self) -> None:
+        with (
+            unittest.mock.patch.dict(sthali_db.codecs.CODECS, {"binary": sthali_db.codecs.Codec}),
+            self.assertRaises(ValueError),
+        ):
+            module.SqliteClient(self.path, "test_table_codec", codec="binary")
+
+
+class TestSqliteClientFile(TestSqliteClient):
+    async def asyncSetUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(pathlib.Path(directory.name) / "test_db.sqlite")
+        await super().asyncSetUp()
+
+    async def test_wal_journal_mode(self) -> None:
+        result = await _query(self.client, "PRAGMA journal_mode")
+
+        self.assertEqual(result, [("wal",)])
+
+    async def test_select_one_uses_primary_key(self) -> None:
+        sql = f"EXPLAIN QUERY PLAN {self.client._sql_select}"  # noqa: SLF001 - the statement is private
+
+        result = await _query(self.client, sql, ("",))
+
+        self.assertIn("USING PRIMARY KEY", result[0][-1])
+
+    async def test_tables_share_database(self) -> None:
+        client = module.SqliteClient(self.path, "test_table_2", pool_size=1)
+        key = ("sqlite", str(await asyncio.to_thread(pathlib.Path(self.path).resolve)))
+
+        self.assertIs(client.database, self.client.database)
+        self.assertIs(client.executor, self.client.executor)
+        self.assertEqual(module.registry.users(key), 2)
+        await client.aclose()
+        await client.aclose()
+        self.assertEqual(module.registry.users(key), 1)
+        self.assertEqual(await self.client.insert_one(self.resource_id, {}), {"id": self.resource_id})
+
+    async def test_persisted_across_clients(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+        await self.client.aclose()
+
+        client = module.SqliteClient(self.path, "test_table")
+        self.addAsyncCleanup(client.aclose)
+        result = await client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+
+
+class TestSqliteClientColumns(unittest.IsolatedAsyncioTestCase):
+    fields: typing.ClassVar[list[module.FieldSpecification]] = [
+        module.FieldSpecification("name", str),  # type: ignore
+        module.FieldSpecification("age", int),  # type: ignore
+        module.FieldSpecification("score", float),  # type: ignore
+        module.FieldSpecification("active", bool),  # type: ignore
+        module.FieldSpecification("tags", list),  # type: ignore
+    ]
+
+    async def asyncSetUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(pathlib.Path(directory.name) / "test_db.sqlite")
+        self.client = module.SqliteClient(self.path, "test_table", fields=self.fields)
+        self.addAsyncCleanup(self.client.aclose)
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_obj: module.ResourceObj = {
+            "name": "name_1",
+            "age": 1,
+            "score": 0.5,
+            "active": True,
+            "tags": ["tag_1"],
+            "extra": {"a": 1},
+        }
+
+    async def query(self, sql: str) -> list[tuple]:
+        return await _query(self.client, sql)
+
+    async def test_columns(self) -> None:
+        result = await self.query('PRAGMA table_info("test_table")')
+
+        self.assertEqual(
+            [(row[1], row[2]) for row in result],
+            [
+                ("resource_id", "TEXT"),
+                ("name", "TEXT"),
+                ("age", "INTEGER"),
+                ("score", "REAL"),
+                ("active", "BOOLEAN"),
+                ("resource_obj", "TEXT"),
+            ],
+        )
+
+    async def test_insert_one(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.query('SELECT name, age, score, active, resource_obj FROM "test_table"')
+
+        self.assertEqual(result, [("name_1", 1, 0.5, 1, '{"tags": ["tag_1"], "extra": {"a": 1}}')])
+
+    async def test_select_one(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj})
+        self.assertIsInstance(result["active"], bool)
+
+    async def test_select_one_missing_column_value(self) -> None:
+        await self.client.insert_one(self.resource_id, {"name": "name_1"})
+
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(
+            result, {"id": self.resource_id, "name": "name_1", "age": None, "score": None, "active": None}
+        )
+
+    async def test_update_one_partial_column(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"age": 2, "active": False}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj, "age": 2, "active": False})
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+
+    async def test_update_one_partial_column_and_json(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_one(self.resource_id, {"name": "name_2", "tags": []}, partial=True)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj, "name": "name_2", "tags": []})
+
+    async def test_update_one(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        await self.client.update_one(self.resource_id, {"name": "name_2"})
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(
+            result, {"id": self.resource_id, "name": "name_2", "age": None, "score": None, "active": None}
+        )
+
+    async def test_add_column_when_fields_grow(self) -> None:
+        client = module.SqliteClient(self.path, "test_table_2", fields=self.fields[:1])
+        await client.insert_one(self.resource_id, {"name": "name_1", "age": 1})
+        await client.aclose()
+
+        client = module.SqliteClient(self.path, "test_table_2", fields=self.fields[:2])
+        self.addAsyncCleanup(client.aclose)
+        sql = 'SELECT age, resource_obj FROM "test_table_2"'
+        rows = await _query(client, sql)
+        result = await client.select_one(self.resource_id)
+
+        self.assertEqual(rows, [(1, "{}")])
+        self.assertEqual(result, {"id": self.resource_id, "name": "name_1", "age": 1})
+
+    async def test_columns_kept_when_fields_shrink(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+        await self.client.aclose()
+
+        client = module.SqliteClient(self.path, "test_table")
+        self.addAsyncCleanup(client.aclose)
+        result = await client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, **self.resource_obj})
+
+    async def test_select_many_filter_columns(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+        await self.client.insert_one(resource_id, {"name": "name_2", "age": 2, "active": False, "tags": []})
+        cases = [
+            (["age:gt:1"], [resource_id]),
+            (["score:eq:null"], [resource_id]),
+            (["active:eq:true"], [self.resource_id]),
+            (["name:contains:_1", "tags:contains:tag_1"], [self.resource_id]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, resource_ids in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], resource_ids)
@@ -1,7 +1,15 @@
+import asyncio
+import datetime as dt
+import json
+import pathlib
+import tempfile
+import threading
 import unittest
 import unittest.mock
+import uuid
 
 import sthali_db.clients.tinydb
+import sthali_db.codecs
 
 module = sthali_db.clients.tinydb
 
@@ -10,9 +18,11 @@ class TestTinydbClient(unittest.IsolatedAsyncioTestCase):
     @unittest.mock.patch("sthali_db.clients.tinydb.tinydb.TinyDB")
     def setUp(self, mocked_tinydb: unittest.mock.MagicMock) -> None:
         mocked_tinydb.return_value = unittest.mock.MagicMock()
-        self.resource_id: module.ResourceId  = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
         client = module.TinydbClient(path="test_db.json", table_name="test_table")
+        client._index(str(self.resource_id), 1)  # noqa: SLF001 - seeds the index of the mocked table
         self.client = client
+        self.addAsyncCleanup(client.aclose)
 
     @unittest.mock.patch("sthali_db.clients.tinydb.TinydbClient._get")
     async def test_insert_one(self, mocked_get: unittest.mock.MagicMock) -> None:
@@ -91,9 +101,9 @@ class TestTinydbClient(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
 
     async def test_select_many(self) -> None:
-        self.client.table.all = unittest.mock.MagicMock(
+        self.client.table.get = unittest.mock.MagicMock(
             return_value=[
-                {"resource_id": self.resource_id, "resource_obj": {"field_1": "value_1", "field_2": "value_2"}}
+                {"resource_id": str(self.resource_id), "resource_obj": {"field_1": "value_1", "field_2": "value_2"}}
             ]
         )
         paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
@@ -101,15 +111,529 @@ class TestTinydbClient(unittest.IsolatedAsyncioTestCase):
         result = await self.client.select_many(paginate_parameters)
 
         self.assertEqual(result, [{"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"}])
+        self.client.table.get.assert_called_once_with(doc_ids=[1])
 
     async def test_select_many_paginated(self) -> None:
-        self.client.table.all = unittest.mock.MagicMock(
-            return_value=[
-                {"resource_id": self.resource_id, "resource_obj": {"field_1": "value_1", "field_2": "value_2"}}
-            ]
-        )
+        self.client.table.get = unittest.mock.MagicMock()
         paginate_parameters = module.dependencies.PaginateParameters(skip=1, limit=1)
 
         result = await self.client.select_many(paginate_parameters)
 
         self.assertEqual(result, [])
+        self.client.table.get.assert_not_called()
+
+
+class TestTinydbClientIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.client = module.TinydbClient(path=":memory:", table_name="test_table")
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_obj: module.ResourceObj = {"field_1": "value_1", "field_2": "value_2"}
+
+    async def test_insert_one_indexes_resource(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        doc_id = self.client._doc_ids[str(self.resource_id)]  # noqa: SLF001 - the index is private
+        self.assertEqual(self.client.table.get(doc_id=doc_id)["resource_id"], str(self.resource_id))  # type: ignore
+
+    async def test_update_one_uses_index(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+        self.client.table.search = unittest.mock.MagicMock()
+
+        await self.client.update_one(self.resource_id, {"field_2": "value_2"}, partial=True)
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1", "field_2": "value_2"})
+        self.client.table.search.assert_not_called()
+
+    async def test_delete_one_drops_index_entry(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        await self.client.delete_one(self.resource_id)
+
+        self.assertNotIn(str(self.resource_id), self.client._doc_ids)  # noqa: SLF001 - the index is private
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_one(self.resource_id)
+        self.assertEqual(context.exception.status_code, self.client.status.HTTP_404_NOT_FOUND)
+
+    async def test_select_many_cursor(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        for resource_id in resource_ids:
+            await self.client.insert_one(resource_id, {})
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=2))]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                resource_ids[0:2],
+                resource_ids[2:4],
+                resource_ids[4:5],
+            ],
+        )
+
+    async def test_select_many_filter(self) -> None:
+        self.client.fields = [
+            module.FieldSpecification("name", str),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+            module.FieldSpecification("tags", list[str]),  # type: ignore
+        ]
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30, "tags": ["a", "b"]},
+            {"name": "bob", "age": 20, "tags": ["b"]},
+            {"name": "carol", "age": None, "tags": []},
+            {"name": "dave", "tags": ["a"]},
+        ]
+        for resource_id, resource_obj in zip(resource_ids, resource_objs, strict=True):
+            await self.client.insert_one(resource_id, resource_obj)
+        cases = [
+            (["age:ge:20"], [0, 1]),
+            (["age:eq:null"], [2, 3]),
+            (["name:in:bob,dave"], [1, 3]),
+            (["name:contains:o"], [1, 2]),
+            (["tags:contains:b"], [0, 1]),
+            (["tags:contains:a", "age:lt:40"], [0]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = await self.client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+
+        filter_parameters = await module.dependencies.filter_parameters(["tags:contains:a"])
+        pages = [await self.client.select_many(module.dependencies.PaginateParameters(limit=1), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=1, cursor=pages[-1].cursor)
+            pages.append(await self.client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["name"] for resource_obj in page] for page in pages], [["alice"], ["dave"], []]
+        )
+
+    async def test_select_many_indexed(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int),  # type: ignore
+        ]
+        client = module.TinydbClient(":memory:", "test_table", fields=fields)
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        await client.insert_one(resource_ids[0], {"name": "alice", "age": 30})
+        await client.insert_one(resource_ids[1], {"name": "bob", "age": 20})
+        await client.insert_many({resource_ids[2]: {"name": "alice", "age": 20}, resource_ids[3]: {"age": 40}})
+        await client.update_one(resource_ids[1], {"name": "alice"}, partial=True)
+        await client.update_many({resource_ids[0]: {"name": "carol"}})
+        await client.delete_one(resource_ids[2])
+        cases = [
+            ([("name", "eq", "alice")], [resource_ids[1]]),
+            ([("name", "in", ["carol", "alice"])], [resource_ids[0], resource_ids[1]]),
+            ([("name", "eq", None)], [resource_ids[3]]),
+            ([("name", "eq", "bob")], []),
+            ([("name", "in", ["alice", None]), ("age", "ge", 20)], [resource_ids[1], resource_ids[3]]),
+        ]
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        for filters, expected in cases:
+            filter_parameters = module.dependencies.FilterParameters(
+                predicates=[
+                    module.dependencies.Predicate(field=field, operator=operator, value=value)
+                    for field, operator, value in filters
+                ]
+            )
+            result = await client.select_many(paginate_parameters, filter_parameters)
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], expected)
+
+        filter_parameters = await module.dependencies.filter_parameters(["name:in:alice,carol"])
+        pages = [await client.select_many(module.dependencies.PaginateParameters(limit=2), filter_parameters)]
+        while pages[-1].cursor:
+            paginate_parameters = module.dependencies.PaginateParameters(limit=2, cursor=pages[-1].cursor)
+            pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+        self.assertEqual(
+            [[resource_obj["id"] for resource_obj in page] for page in pages],
+            [
+                [resource_ids[0], resource_ids[1]],
+                [],
+            ],
+        )
+
+    async def test_rebuild_indexes(self) -> None:
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client = module.TinydbClient(":memory:", "test_table", fields=fields)
+        client.table.insert({"resource_id": str(self.resource_id), "resource_obj": {"name": "alice"}})
+
+        await client.rebuild_indexes()
+
+        # the rebuilt index is private
+        self.assertEqual(client._values, {"name": {"alice": {str(self.resource_id)}}})  # noqa: SLF001
+
+    async def test_select_many_filter_unknown_field(self) -> None:
+        filter_parameters = await module.dependencies.filter_parameters(["unknown:eq:1"])
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(module.dependencies.PaginateParameters(), filter_parameters)  # type: ignore
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_select_many_ordered(self) -> None:
+        resource_ids = sorted(uuid.uuid4() for _ in range(4))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "carol"},
+            {"name": "dave", "age": 20},
+        ]
+        cases = [
+            ("asc", None, [1, 3, 0, 2]),
+            ("desc", None, [2, 0, 3, 1]),
+            ("asc", ["age:ge:25"], [0]),
+            ("desc", ["name:in:alice,bob,carol"], [2, 0, 1]),
+        ]
+
+        for index in [False, True]:
+            fields = [
+                module.FieldSpecification("name", str),  # type: ignore
+                module.FieldSpecification("age", int | None, index=index),  # type: ignore
+            ]
+            client = module.TinydbClient(":memory:", "test_table", fields=fields)
+            await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+            for direction, filters, expected in cases:
+                filter_parameters = await module.dependencies.filter_parameters(filters)
+                paginate_parameters = module.dependencies.PaginateParameters(
+                    limit=1,
+                    order_by="age",
+                    direction=direction,
+                )
+                pages = [await client.select_many(paginate_parameters, filter_parameters)]
+                while pages[-1].cursor:
+                    paginate_parameters = module.dependencies.PaginateParameters(
+                        limit=1,
+                        order_by="age",
+                        direction=direction,
+                        cursor=pages[-1].cursor,
+                    )
+                    pages.append(await client.select_many(paginate_parameters, filter_parameters))
+
+                with self.subTest(index=index, direction=direction, filters=filters):
+                    self.assertEqual(
+                        [resource_obj["id"] for page in pages for resource_obj in page],
+                        [resource_ids[i] for i in expected],
+                    )
+
+    async def test_select_many_order_by_unknown_field(self) -> None:
+        paginate_parameters = module.dependencies.PaginateParameters(order_by="unknown")  # type: ignore
+
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_many(paginate_parameters)
+
+        self.assertEqual(context.exception.status_code, 422)
+
+    async def test_stream_many(self) -> None:
+        fields = [
+            module.FieldSpecification("name", str, index=True),  # type: ignore
+            module.FieldSpecification("age", int | None),  # type: ignore
+        ]
+        client = module.TinydbClient(":memory:", "test_table", fields=fields)
+        resource_ids = sorted(uuid.uuid4() for _ in range(5))
+        resource_objs = [
+            {"name": "alice", "age": 30},
+            {"name": "bob", "age": 20},
+            {"name": "alice"},
+            {"name": "carol", "age": 40},
+            {"name": "bob", "age": 50},
+        ]
+        await client.insert_many(dict(zip(resource_ids, resource_objs, strict=True)))
+        cases = [
+            ([], [0, 1, 2, 3, 4]),
+            (["age:ge:30"], [0, 3, 4]),
+            (["name:eq:bob"], [1, 4]),
+            (["name:in:alice,carol", "age:lt:40"], [0]),
+        ]
+
+        for filters, indexes in cases:
+            filter_parameters = await module.dependencies.filter_parameters(filters)
+            result = [resource_obj async for resource_obj in client.stream_many(filter_parameters, batch_size=2)]
+
+            with self.subTest(filters=filters):
+                self.assertEqual([resource_obj["id"] for resource_obj in result], [resource_ids[i] for i in indexes])
+                self.assertEqual(result[0]["name"], resource_objs[indexes[0]]["name"])
+
+    async def test_index_built_on_open(self) -> None:
+        self.client.table.insert({"resource_id": str(self.resource_id), "resource_obj": {"field_1": "value_1"}})
+
+        with unittest.mock.patch("sthali_db.clients.tinydb.tinydb.TinyDB") as mocked_tinydb:
+            mocked_tinydb.return_value.table.return_value = self.client.table
+            client = module.TinydbClient(path="test_db.json", table_name="test_table")
+
+        result = await client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field_1": "value_1"})
+
+    async def test_insert_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.insert_many({self.resource_id: {}, resource_id: self.resource_obj})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_409_CONFLICT)  # type: ignore
+        self.assertEqual(result[1], {"id": resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(self.resource_id), {"id": self.resource_id, **self.resource_obj})
+        self.assertEqual(await self.client.select_one(resource_id), {"id": resource_id, **self.resource_obj})
+
+    async def test_select_by_ids(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.select_by_ids([resource_id, self.resource_id])
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, **self.resource_obj})
+
+    async def test_update_many(self) -> None:
+        resource_id = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({resource_id: {}, self.resource_id: {"field_1": "new_value_1"}})
+
+        self.assertEqual(result[0].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field_1": "new_value_1"})
+        self.assertEqual(await self.client.select_one(self.resource_id), result[1])
+
+    async def test_update_many_partial(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.update_many({self.resource_id: {"field_1": "new_value_1"}}, partial=True)
+
+        self.assertEqual(result, [{"id": self.resource_id, **self.resource_obj, "field_1": "new_value_1"}])
+        self.assertEqual(await self.client.select_one(self.resource_id), result[0])
+
+    async def test_delete_many(self) -> None:
+        await self.client.insert_one(self.resource_id, self.resource_obj)
+
+        result = await self.client.delete_many([self.resource_id, uuid.uuid4(), self.resource_id])
+
+        self.assertIsNone(result[0])
+        self.assertEqual(result[1].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        self.assertEqual(result[2].status_code, self.client.status.HTTP_404_NOT_FOUND)  # type: ignore
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+
+    async def test_insert_many_writes_once(self) -> None:
+        self.client.table.insert = unittest.mock.MagicMock()
+        write = unittest.mock.Mock(wraps=self.client.db.storage.write)
+        self.client.db.storage.write = write
+
+        await self.client.insert_many({uuid.uuid4(): {} for _ in range(10)})
+
+        self.client.table.insert.assert_not_called()
+        write.assert_called_once()
+
+
+class TestTinydbClientBuffered(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = pathlib.Path(directory.name) / "test_db.json"
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+
+    def stored(self, table_name: str = "test_table") -> dict[str, dict]:
+        if not self.path.read_text():
+            return {}
+        return json.loads(self.path.read_text()).get(table_name, {})
+
+    async def test_writes_buffered_until_flush(self) -> None:
+        client = module.TinydbClient(str(self.path), "test_table", buffered=True, flush_interval=60)
+        self.addAsyncCleanup(client.aclose)
+
+        await client.insert_one(self.resource_id, {"field_1": "value_1"})
+
+        self.assertEqual(self.stored(), {})
+        self.assertEqual(await client.select_one(self.resource_id), {"id": self.resource_id, "field_1": "value_1"})
+        await client.flush()
+        self.assertEqual(len(self.stored()), 1)
+
+    async def test_flush_on_write_cache_size(self) -> None:
+        client = module.TinydbClient(
+            str(self.path),
+            "test_table",
+            buffered=True,
+            write_cache_size=2,
+            flush_interval=60,
+        )
+        self.addAsyncCleanup(client.aclose)
+
+        await client.insert_one(self.resource_id, {"field_1": "value_1"})
+        await client.update_one(self.resource_id, {"field_1": "value_2"})
+
+        self.assertEqual(next(iter(self.stored().values()))["resource_obj"], {"field_1": "value_2"})
+
+    async def test_flush_on_flush_interval(self) -> None:
+        client = module.TinydbClient(str(self.path), "test_table", buffered=True, flush_interval=0.01)
+        self.addAsyncCleanup(client.aclose)
+
+        await client.insert_one(self.resource_id, {"field_1": "value_1"})
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(len(self.stored()), 1)
+
+    async def test_flush_on_aclose(self) -> None:
+        client = module.TinydbClient(str(self.path), "test_table", buffered=True, flush_interval=60)
+
+        await client.insert_one(self.resource_id, {"field_1": "value_1"})
+        await client.aclose()
+
+        self.assertEqual(len(self.stored()), 1)
+        key = ("tinydb", module._key(str(self.path)))  # noqa: SLF001 - the registry key of the file
+        self.assertEqual(module.registry.users(key), 0)
+
+    async def test_tables_share_buffer(self) -> None:
+        client_1 = module.TinydbClient(str(self.path), "test_table_1", buffered=True, flush_interval=60)
+        client_2 = module.TinydbClient(str(self.path), "test_table_2", buffered=True, flush_interval=60)
+
+        await client_1.insert_one(self.resource_id, {"field_1": "value_1"})
+        await client_2.insert_one(self.resource_id, {"field_1": "value_1"})
+        await client_1.aclose()
+        await client_2.aclose()
+
+        self.assertEqual(len(self.stored("test_table_1")), 1)
+        self.assertEqual(len(self.stored("test_table_2")), 1)
+
+
+class TestTinydbClientExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(pathlib.Path(directory.name) / "test_db.json")
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+
+    async def test_runs_in_thread_pool(self) -> None:
+        client = module.TinydbClient(self.path, "test_table", max_workers=1)
+        self.addAsyncCleanup(client.aclose)
+
+        def get(_: str) -> dict[str, str]:
+            return {"thread": threading.current_thread().name}
+
+        with unittest.mock.patch.object(client, "_get", side_effect=get):
+            result = await client.select_one(self.resource_id)
+
+        self.assertTrue(result["thread"].startswith("sthali-db-tinydb"))
+
+    async def test_tables_of_a_file_share_lock(self) -> None:
+        client_1 = module.TinydbClient(self.path, "test_table_1")
+        client_2 = module.TinydbClient(self.path, "test_table_2")
+        client_3 = module.TinydbClient(":memory:", "test_table_1")
+        self.addAsyncCleanup(client_1.aclose)
+        self.addAsyncCleanup(client_2.aclose)
+
+        self.assertIs(client_1._lock, client_2._lock)  # noqa: SLF001 - the lock is private
+        self.assertIsNot(client_1._lock, client_3._lock)  # noqa: SLF001 - the lock is private
+
+    async def test_tables_of_a_file_share_database(self) -> None:
+        client_1 = module.TinydbClient(self.path, "test_table_1")
+        client_2 = module.TinydbClient(self.path, "test_table_2", buffered=True)
+        key = ("tinydb", module._key(self.path))  # noqa: SLF001 - the registry key of the file
+
+        self.assertIs(client_1.db, client_2.db)
+        self.assertFalse(client_2.buffered)
+        self.assertEqual(module.registry.users(key), 2)
+        await client_1.aclose()
+        await client_1.aclose()
+        self.assertEqual(module.registry.users(key), 1)
+        with unittest.mock.patch.object(client_2.db, "close", wraps=client_2.db.close) as close:
+            await client_2.aclose()
+        close.assert_called_once_with()
+        self.assertEqual(module.registry.users(key), 0)
+
+    async def test_clients_of_a_table_share_indexes(self) -> None:
+        fields = [module.FieldSpecification("name", str, index=True)]  # type: ignore
+        client_1 = module.TinydbClient(self.path, "test_table", fields=fields)
+        client_2 = module.TinydbClient(self.path, "test_table")
+        self.addAsyncCleanup(client_1.aclose)
+        self.addAsyncCleanup(client_2.aclose)
+        filter_parameters = await module.dependencies.filter_parameters(["name:eq:alice"])
+        paginate_parameters = module.dependencies.PaginateParameters()  # type: ignore
+
+        await client_1.insert_one(self.resource_id, {"name": "alice"})
+
+        self.assertEqual(await client_2.select_one(self.resource_id), {"id": self.resource_id, "name": "alice"})
+        with self.assertRaises(client_2.exception) as context:
+            await client_2.insert_one(self.resource_id, {"name": "bob"})
+        self.assertEqual(context.exception.status_code, 409)
+        self.assertEqual(await client_2.select_many(paginate_parameters), [{"id": self.resource_id, "name": "alice"}])
+
+        await client_2.update_one(self.resource_id, {"name": "bob"})
+
+        self.assertEqual(await client_1.select_many(paginate_parameters, filter_parameters), [])
+        await client_2.delete_one(self.resource_id)
+        with self.assertRaises(client_1.exception):
+            await client_1.select_one(self.resource_id)
+        self.assertEqual(len(json.loads(await asyncio.to_thread(pathlib.Path(self.path).read_text))["test_table"]), 0)
+
+    async def test_concurrent_writes(self) -> None:
+        client_1 = module.TinydbClient(self.path, "test_table_1")
+        client_2 = module.TinydbClient(self.path, "test_table_2")
+        self.addAsyncCleanup(client_1.aclose)
+        self.addAsyncCleanup(client_2.aclose)
+        resource_ids = [module.ResourceId.__metadata__[0].default_factory() for _ in range(20)]  # type: ignore
+
+        await asyncio.gather(
+            *(client.insert_one(resource_id, {}) for resource_id in resource_ids for client in (client_1, client_2))
+        )
+
+        stored = json.loads(await asyncio.to_thread(pathlib.Path(self.path).read_text))
+        self.assertEqual(len(stored["test_table_1"]), 20)
+        self.assertEqual(len(stored["test_table_2"]), 20)
+
+
+class TestTinydbClientCodec(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(pathlib.Path(directory.name) / "test_db")
+        self.resource_id: module.ResourceId = module.ResourceId.__metadata__[0].default_factory()  # type: ignore
+        self.resource_obj: module.ResourceObj = {
+            "owner": uuid.uuid4(),
+            "created": dt.datetime.now(dt.timezone.utc),
+            "tags": ["tag_1"],
+        }
+
+    async def test_round_trip(self) -> None:
+        codecs = ["json"]
+        codecs += ["orjson"] if sthali_db.codecs.orjson is not None else []
+        codecs += ["msgpack"] if sthali_db.codecs.msgpack is not None else []
+
+        for codec in codecs:
+            with self.subTest(codec=codec):
+                path = f"{self.path}.{codec}"
+                client = module.TinydbClient(path, "test_table", codec=codec)
+                await client.insert_one(self.resource_id, self.resource_obj)
+                await client.aclose()
+
+                client = module.TinydbClient(path, "test_table", codec=codec)
+                self.addAsyncCleanup(client.aclose)
+                result = await client.select_one(self.resource_id)
+
+                self.assertEqual(result, {"id": self.resource_id, **self.resource_obj})
+
+    async def test_json_file(self) -> None:
+        client = module.TinydbClient(self.path, "test_table", buffered=True)
+        self.addAsyncCleanup(client.aclose)
+        await client.insert_one(self.resource_id, {"field": "value"})
+        await client.flush()
+
+        result = json.loads(await asyncio.to_thread(pathlib.Path(self.path).read_text))
+
+        self.assertEqual(
+            result,
+            {"test_table": {"1": {"resource_id": str(self.resource_id), "resource_obj": {"field": "value"}}}},
+        )
+
+    async def test_unknown_codec(self) -> None:
+        with self.assertRaises(ValueError):
+            module.TinydbClient(self.path, "test_table", codec="pickle")
@@ -0,0 +1,140 @@
+import unittest
+import unittest.mock
+import uuid
+
+import sthali_db.cache
+import sthali_db.clients.default
+
+module = sthali_db.cache
+
+
+class TestCachedClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        client = sthali_db.clients.default.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(sthali_db.clients.default.DefaultClient.tables.pop, client.table)
+        self.client = module.CachedClient(client, max_size=2)
+        self.resource_id = uuid.uuid4()
+
+    async def test_select_one(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        first = await self.client.select_one(self.resource_id)
+        second = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(first, {"id": self.resource_id, "field": "value"})
+        self.assertEqual(second, first)
+        self.assertEqual((self.client.hits, self.client.misses), (1, 1))
+
+    async def test_select_one_copy_safe(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": ["value"]})
+
+        (await self.client.select_one(self.resource_id))["field"].append("mutated")
+        (await self.client.select_one(self.resource_id))["field"].append("mutated")
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field": ["value"]})
+
+    async def test_select_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.select_one(self.resource_id)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(self.client.misses, 1)
+
+    async def test_update_one_invalidates(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+        await self.client.select_one(self.resource_id)
+
+        await self.client.update_one(self.resource_id, {"field": "updated"})
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field": "updated"})
+
+    async def test_delete_one_invalidates(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+        await self.client.select_one(self.resource_id)
+
+        await self.client.delete_one(self.resource_id)
+
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+
+    async def test_read_during_write_is_not_cached(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+        select_one = self.client.client.select_one
+
+        async def select_then_write(resource_id: uuid.UUID) -> dict:
+            result = await select_one(resource_id)
+            await self.client.client.update_one(resource_id, {"field": "updated"})
+            self.client.invalidate([resource_id])
+            return result
+
+        with unittest.mock.patch.object(self.client.client, "select_one", select_then_write):
+            await self.client.select_one(self.resource_id)
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, {"id": self.resource_id, "field": "updated"})
+
+    async def test_eviction(self) -> None:
+        resource_ids = [uuid.uuid4() for _ in range(3)]
+        await self.client.insert_many({resource_id: {} for resource_id in resource_ids})
+
+        for resource_id in resource_ids:
+            await self.client.select_one(resource_id)
+        await self.client.select_one(resource_ids[0])
+
+        self.assertEqual(self.client.evictions, 2)
+        self.assertEqual((self.client.hits, self.client.misses), (0, 4))
+
+    async def test_ttl(self) -> None:
+        self.client.ttl = 10
+        await self.client.insert_one(self.resource_id, {})
+
+        with unittest.mock.patch("time.monotonic", return_value=0):
+            await self.client.select_one(self.resource_id)
+        with unittest.mock.patch("time.monotonic", return_value=5):
+            await self.client.select_one(self.resource_id)
+        with unittest.mock.patch("time.monotonic", return_value=11):
+            await self.client.select_one(self.resource_id)
+
+        self.assertEqual((self.client.hits, self.client.misses), (1, 2))
+
+    async def test_select_by_ids(self) -> None:
+        missing = uuid.uuid4()
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+        await self.client.select_one(self.resource_id)
+
+        result = await self.client.select_by_ids([missing, self.resource_id])
+
+        self.assertEqual(result[0].status_code, 404)  # type: ignore
+        self.assertEqual(result[1], {"id": self.resource_id, "field": "value"})
+        self.assertEqual((self.client.hits, self.client.misses), (1, 2))
+
+    async def test_update_many_and_delete_many_invalidate(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+        await self.client.select_one(self.resource_id)
+
+        await self.client.update_many({self.resource_id: {"field": "updated"}})
+        updated = await self.client.select_one(self.resource_id)
+        await self.client.delete_many([self.resource_id])
+        deleted = await self.client.select_by_ids([self.resource_id])
+
+        self.assertEqual(updated, {"id": self.resource_id, "field": "updated"})
+        self.assertEqual(deleted[0].status_code, 404)  # type: ignore
+
+    async def test_stream_many(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        result = [resource_obj async for resource_obj in self.client.stream_many(batch_size=1)]
+
+        self.assertEqual(result, [{"id": self.resource_id, "field": "value"}])
+        self.assertEqual((self.client.hits, self.client.misses), (0, 0))
+
+    async def test_aclose(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+        await self.client.select_one(self.resource_id)
+
+        await self.client.aclose()
+        await self.client.select_one(self.resource_id)
+
+        self.assertEqual((self.client.hits, self.client.misses), (0, 2))
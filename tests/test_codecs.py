@@ -0,0 +1,89 @@
+import datetime as dt
+import json
+import unittest
+import unittest.mock
+import uuid
+
+import sthali_db.codecs
+
+module = sthali_db.codecs
+
+VALUE = {
+    "none": None,
+    "bool": [True, False],
+    "str": "välue",
+    "int": 1,
+    "float": 1.5,
+    "list": [1, "2", [3.0]],
+    "dict": {"nested": {"id": uuid.UUID(int=1)}},
+    "id": uuid.UUID(int=2),
+    "datetime": dt.datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=dt.timezone(dt.timedelta(hours=5, minutes=30))),
+    "naive_datetime": dt.datetime(2024, 1, 2, 3, 4, 5),  # noqa: DTZ001
+    "date": dt.date(2024, 1, 2),
+    "time": dt.time(3, 4, 5, 6),
+    "dollar": {"$key": "value"},
+    "tags": [{"$uuid": 1}, {"$unknown": "value"}],
+}
+
+
+class TestCodecs(unittest.IsolatedAsyncioTestCase):
+    def codecs(self) -> list[module.Codec]:
+        return [
+            codec()
+            for name, codec in module.CODECS.items()
+            if {"orjson": module.orjson, "msgpack": module.msgpack}.get(name, True) is not None
+        ]
+
+    async def test_round_trip(self) -> None:
+        for codec in self.codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.decode(codec.encode(VALUE)), VALUE)
+
+    async def test_round_trip_text(self) -> None:
+        for codec in self.codecs():
+            if isinstance(codec, module.TextCodec):
+                with self.subTest(codec=codec.name):
+                    self.assertEqual(codec.decode(codec.dumps(VALUE)), VALUE)
+                    self.assertEqual(codec.dumps(VALUE).encode(), codec.encode(VALUE))
+
+    async def test_tuple_decoded_as_list(self) -> None:
+        for codec in self.codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.decode(codec.encode({"tuple": (1, 2)})), {"tuple": [1, 2]})
+
+    async def test_unknown_type(self) -> None:
+        for codec in self.codecs():
+            with self.subTest(codec=codec.name), self.assertRaises(TypeError):
+                codec.encode({"set": {1}})
+
+    async def test_json_unchanged(self) -> None:
+        value = {"str": "välue", "list": [1, 2.5, None, True]}
+
+        self.assertEqual(module.JsonCodec().dumps(value), json.dumps(value))
+
+    async def test_json_tags(self) -> None:
+        result = json.loads(module.JsonCodec().dumps({"id": uuid.UUID(int=1), "date": dt.date(2024, 1, 2)}))
+
+        self.assertEqual(result, {"id": {"$uuid": str(uuid.UUID(int=1))}, "date": {"$date": "2024-01-02"}})
+
+    @unittest.skipIf(module.orjson is None, "orjson is not installed")
+    async def test_json_codecs_interoperate(self) -> None:
+        json_codec, orjson_codec = module.JsonCodec(), module.OrjsonCodec()
+
+        self.assertEqual(json_codec.decode(orjson_codec.encode(VALUE)), VALUE)
+        self.assertEqual(orjson_codec.decode(json_codec.encode(VALUE)), VALUE)
+
+    async def test_raise_exception_without_library(self) -> None:
+        for name, attribute in (("orjson", "orjson"), ("msgpack", "msgpack")):
+            with self.subTest(codec=name), unittest.mock.patch.object(module, attribute, None):
+                self.assertRaises(ImportError, module.get_codec, name)
+
+    async def test_get_codec(self) -> None:
+        self.assertIsInstance(module.get_codec("json"), module.JsonCodec)
+        self.assertRaises(ValueError, module.get_codec, "pickle")
+
+    async def test_tag(self) -> None:
+        value = {"id": uuid.UUID(int=1), "list": [dt.date(2024, 1, 2), 1]}
+
+        self.assertEqual(module.tag(value), json.loads(module.JsonCodec().dumps(value)))
+        self.assertIs(module.tag(VALUE["list"]), VALUE["list"])
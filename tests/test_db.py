@@ -1,7 +1,16 @@
+import tempfile
 import unittest
 import unittest.mock
+import uuid
 
+import fastapi
+
+import sthali_db.clients.postgres
+import sthali_db.clients.tinydb
 import sthali_db.db
+import sthali_db.metrics
+import sthali_db.models
+import sthali_db.registry
 
 module = sthali_db.db
 
@@ -12,6 +21,39 @@ class TestDBSpecification(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(db_spec.path, "test_path")
         self.assertEqual(db_spec.client.name, "tinydb")
+        self.assertEqual(db_spec.options, {})
+        self.assertIsNone(db_spec.cache)
+        self.assertIsNone(db_spec.write_behind)
+        self.assertIsNone(db_spec.codec)
+        self.assertIsNone(db_spec.metrics)
+
+    async def test_return_cache(self) -> None:
+        db_spec = module.DBSpecification(path="test_path", client="tinydb", cache={"ttl": None})  # type: ignore
+
+        self.assertEqual(db_spec.cache, module.CacheSpecification(max_size=1024, ttl=None))
+
+    async def test_return_write_behind(self) -> None:
+        db_spec = module.DBSpecification(path="test_path", client="tinydb", write_behind={})  # type: ignore
+
+        self.assertEqual(
+            db_spec.write_behind,
+            module.WriteBehindSpecification(max_batch_size=500, max_delay=0.05, max_pending=10_000),
+        )
+
+    async def test_return_metrics(self) -> None:
+        metrics = {"slow_threshold": 1}
+        db_spec = module.DBSpecification(path="test_path", client="tinydb", metrics=metrics)  # type: ignore
+
+        self.assertEqual(db_spec.metrics, module.MetricsSpecification(registry=True, slow_threshold=1.0))
+
+    async def test_return_codec(self) -> None:
+        db_spec = module.DBSpecification(path="test_path", client="tinydb", codec="orjson")  # type: ignore
+
+        self.assertEqual(db_spec.codec, "orjson")
+
+    async def test_return_invalid_codec(self) -> None:
+        with self.assertRaises(module.pydantic.ValidationError):
+            module.DBSpecification(path="test_path", client="tinydb", codec="pickle")  # type: ignore
 
 
 class TestDB(unittest.IsolatedAsyncioTestCase):
@@ -21,6 +63,13 @@ class TestDB(unittest.IsolatedAsyncioTestCase):
         update_one = unittest.mock.AsyncMock(return_value="update_one")
         delete_one = unittest.mock.AsyncMock(return_value="delete_one")
         select_many = unittest.mock.AsyncMock(return_value="select_many")
+        insert_many = unittest.mock.AsyncMock(return_value="insert_many")
+        select_by_ids = unittest.mock.AsyncMock(return_value="select_by_ids")
+        update_many = unittest.mock.AsyncMock(return_value="update_many")
+        delete_many = unittest.mock.AsyncMock(return_value="delete_many")
+        stream_many = unittest.mock.MagicMock(return_value="stream_many")
+        rebuild_indexes = unittest.mock.AsyncMock(return_value=None)
+        aclose = unittest.mock.AsyncMock(return_value=None)
 
     @unittest.mock.patch("sthali_db.clients.default.DefaultClient")
     def setUp(self, mocked_client: unittest.mock.MagicMock) -> None:
@@ -56,3 +105,169 @@ class TestDB(unittest.IsolatedAsyncioTestCase):
         result = await self.db.select_many(self.paginate_parameters)
 
         self.assertEqual(result, "select_many")
+
+    async def test_insert_many(self) -> None:
+        result = await self.db.insert_many({self.resource_id: self.resource_obj})
+
+        self.assertEqual(result, "insert_many")
+
+    async def test_select_by_ids(self) -> None:
+        result = await self.db.select_by_ids([self.resource_id])
+
+        self.assertEqual(result, "select_by_ids")
+
+    async def test_update_many(self) -> None:
+        result = await self.db.update_many({self.resource_id: self.resource_obj})
+
+        self.assertEqual(result, "update_many")
+
+    async def test_delete_many(self) -> None:
+        result = await self.db.delete_many([self.resource_id])
+
+        self.assertEqual(result, "delete_many")
+
+    async def test_stream_many(self) -> None:
+        result = self.db.stream_many()
+
+        self.assertEqual(result, "stream_many")
+
+    async def test_rebuild_indexes(self) -> None:
+        result = await self.db.rebuild_indexes()
+
+        self.assertIsNone(result)
+
+    async def test_aclose(self) -> None:
+        result = await self.db.aclose()
+
+        self.assertIsNone(result)
+
+    async def test_async_context_manager(self) -> None:
+        self.db.aclose = unittest.mock.AsyncMock()
+
+        async with self.db as db:
+            self.assertIs(db, self.db)
+            self.db.aclose.assert_not_awaited()
+
+        self.db.aclose.assert_awaited_once_with()
+
+
+class TestDBOptions(unittest.IsolatedAsyncioTestCase):
+    @unittest.mock.patch("sthali_db.clients.tinydb.TinydbClient")
+    async def test_options_forwarded_to_client(self, mocked_client: unittest.mock.MagicMock) -> None:
+        db_spec = module.DBSpecification("test_path", "tinydb", {"buffered": True})  # type: ignore
+
+        module.DB(db_spec, "table")
+
+        mocked_client.assert_called_once_with("test_path", "table", fields=None, buffered=True)
+
+    @unittest.mock.patch("sthali_db.clients.tinydb.TinydbClient")
+    async def test_codec_forwarded_to_client(self, mocked_client: unittest.mock.MagicMock) -> None:
+        db_spec = module.DBSpecification("test_path", "tinydb", {"buffered": True}, codec="msgpack")  # type: ignore
+
+        module.DB(db_spec, "table")
+
+        mocked_client.assert_called_once_with("test_path", "table", fields=None, codec="msgpack", buffered=True)
+
+    @unittest.mock.patch("sthali_db.clients.sqlite.SqliteClient")
+    async def test_fields_forwarded_to_client(self, mocked_client: unittest.mock.MagicMock) -> None:
+        db_spec = module.DBSpecification("test_path", "sqlite")  # type: ignore
+        fields = [sthali_db.models.FieldSpecification("field_1", str)]  # type: ignore
+
+        module.DB(db_spec, "table", fields)
+
+        mocked_client.assert_called_once_with("test_path", "table", fields=fields)
+
+    async def test_cache(self) -> None:
+        db_spec = module.DBSpecification("", "default", cache=module.CacheSpecification(max_size=10))  # type: ignore
+        db = module.DB(db_spec, "test_table_cache")
+        self.addCleanup(module.enum_clients_config.clients_map["default"].DefaultClient.tables.pop, "test_table_cache")
+        resource = await db.insert_one(uuid.uuid4(), {"field": "value"})
+
+        await db.select_one(resource["id"])
+        await db.select_one(resource["id"])
+
+        self.assertIsNotNone(db.cache)
+        self.assertEqual((db.cache.max_size, db.cache.hits, db.cache.misses), (10, 1, 1))  # type: ignore
+
+    async def test_write_behind(self) -> None:
+        write_behind = module.WriteBehindSpecification(max_delay=10)  # type: ignore
+        db_spec = module.DBSpecification("", "default", write_behind=write_behind)  # type: ignore
+        db = module.DB(db_spec, "test_table_write_behind")
+        tables = module.enum_clients_config.clients_map["default"].DefaultClient.tables
+        self.addCleanup(tables.pop, "test_table_write_behind")
+
+        resource = await db.insert_one(uuid.uuid4(), {"field": "value"})
+
+        self.assertIsNotNone(db.write_behind)
+        self.assertEqual(db.write_behind.pending, 1)  # type: ignore
+        self.assertEqual(await db.select_one(resource["id"]), resource)
+        await db.aclose()
+        self.assertIn(resource["id"], tables["test_table_write_behind"].rows)
+
+    async def test_metrics(self) -> None:
+        db_spec = module.DBSpecification("", "default", metrics=module.MetricsSpecification())  # type: ignore
+        db = module.DB(db_spec, "test_table_metrics")
+        tables = module.enum_clients_config.clients_map["default"].DefaultClient.tables
+        self.addCleanup(tables.pop, "test_table_metrics")
+        observations: list[sthali_db.metrics.Observation] = []
+        self.assertIsNotNone(db.metrics)
+        db.metrics.sinks.append(observations.append)  # type: ignore
+
+        with self.assertRaises(fastapi.HTTPException):
+            await db.select_one(uuid.uuid4())
+
+        self.assertEqual(
+            [(o.table, o.operation, o.status) for o in observations],
+            [
+                ("test_table_metrics", "select_one", 404),
+            ],
+        )
+        self.assertEqual(sthali_db.metrics.registry.errors["test_table_metrics", "select_one", 404], 1)
+
+    async def test_no_metrics(self) -> None:
+        db_spec = module.DBSpecification("", "default")  # type: ignore
+        db = module.DB(db_spec, "test_table_no_metrics")
+        default_client = module.enum_clients_config.clients_map["default"].DefaultClient
+        self.addCleanup(default_client.tables.pop, "test_table_no_metrics")
+
+        self.assertIsNone(db.metrics)
+        self.assertIsInstance(db.select_one.__self__, default_client)  # type: ignore
+
+    @unittest.skipIf(sthali_db.clients.postgres.asyncpg is None, "asyncpg is not installed")
+    async def test_postgres_codec(self) -> None:
+        dsn = "postgresql://localhost/test_codec"
+        db_spec = module.DBSpecification(dsn, "postgres", codec="orjson")  # type: ignore
+
+        db = module.DB(db_spec, "table")
+        self.addAsyncCleanup(db.aclose)
+
+        self.assertEqual(db.select_one.__self__.codec.name, "orjson")  # type: ignore
+        with self.assertRaises(ValueError):
+            module.DB(module.DBSpecification(dsn, "postgres", codec="msgpack"), "table")  # type: ignore
+
+    async def test_tables_share_database(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            db_spec = module.DBSpecification(f"{directory}/test_db.json", "tinydb")  # type: ignore
+            # the registry key of the file
+            key = ("tinydb", sthali_db.clients.tinydb._key(f"{directory}/test_db.json"))  # noqa: SLF001
+
+            async with module.DB(db_spec, "table_1") as db_1, module.DB(db_spec, "table_2") as db_2:
+                resource = await db_1.insert_one(uuid.uuid4(), {})
+                await db_2.insert_one(resource["id"], {})
+
+                self.assertEqual(await db_2.select_one(resource["id"]), resource)
+                self.assertEqual(sthali_db.registry.registry.users(key), 2)
+
+            self.assertEqual(sthali_db.registry.registry.users(key), 0)
+
+    async def test_bitcask_tables(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            db_spec = module.DBSpecification(directory, "bitcask", codec="orjson")  # type: ignore
+
+            async with module.DB(db_spec, "table_1") as db_1, module.DB(db_spec, "table_2") as db_2:
+                resource = await db_1.insert_one(uuid.uuid4(), {"field_1": "value_1"})
+
+                self.assertEqual(await db_1.select_one(resource["id"]), resource)
+                self.assertEqual((await db_2.select_by_ids([resource["id"]]))[0].status_code, 404)  # type: ignore
+            async with module.DB(db_spec, "table_1") as db_1:
+                self.assertEqual(await db_1.select_one(resource["id"]), resource)
@@ -1,14 +1,76 @@
 import unittest
+import uuid
+
+import fastapi
+import pydantic
 
 import sthali_db.dependencies
+import sthali_db.models
 
 module = sthali_db.dependencies
 
 
 class TestFilterParameters(unittest.IsolatedAsyncioTestCase):
-    async def test_not_implemented(self) -> None:
-        with self.assertRaises(NotImplementedError):
-            await module.filter_parameters()
+    def setUp(self) -> None:
+        self.fields = [
+            sthali_db.models.FieldSpecification(name="name", type=str),
+            sthali_db.models.FieldSpecification(name="age", type=int),
+            sthali_db.models.FieldSpecification(name="tags", type=list[str]),
+        ]
+
+    async def test_return_default(self) -> None:
+        result = await module.filter_parameters()
+
+        self.assertEqual(result.predicates, [])
+
+    async def test_parse(self) -> None:
+        result = await module.filter_parameters(["age:ge:18", "name:in:alice,bob", "name:eq:a:b"])
+
+        self.assertEqual(
+            result.predicates,
+            [
+                module.Predicate(field="age", operator="ge", value="18"),
+                module.Predicate(field="name", operator="in", value=["alice", "bob"]),
+                module.Predicate(field="name", operator="eq", value="a:b"),
+            ],
+        )
+
+    async def test_parse_invalid(self) -> None:
+        for condition in ["age", "age:ge", "age:ne:18"]:
+            with self.subTest(condition=condition), self.assertRaises(fastapi.HTTPException) as context:
+                await module.filter_parameters([condition])
+
+            self.assertEqual(context.exception.status_code, 422)
+
+    async def test_bind(self) -> None:
+        filter_parameters = await module.filter_parameters(["age:in:18,21", "tags:contains:a", "age:eq:null"])
+
+        result = filter_parameters.bind(self.fields)
+
+        self.assertEqual(
+            result,
+            [
+                module.Predicate(field="age", operator="in", value=[18, 21]),
+                module.Predicate(field="tags", operator="contains", value="a"),
+                module.Predicate(field="age", operator="eq", value=None),
+            ],
+        )
+
+    async def test_bind_invalid(self) -> None:
+        for condition in ["unknown:eq:1", "age:lt:old"]:
+            filter_parameters = await module.filter_parameters([condition])
+
+            with self.subTest(condition=condition), self.assertRaises(ValueError):
+                filter_parameters.bind(self.fields)
+
+    async def test_operators(self) -> None:
+        self.assertTrue(module.OPERATORS["eq"](None, None))
+        self.assertFalse(module.OPERATORS["lt"](None, 1))
+        self.assertFalse(module.OPERATORS["gt"]("a", 1))
+        self.assertTrue(module.OPERATORS["in"](1, [1, 2]))
+        self.assertTrue(module.OPERATORS["contains"]("alice", "li"))
+        self.assertTrue(module.OPERATORS["contains"](["a", "b"], "b"))
+        self.assertFalse(module.OPERATORS["contains"](1, 1))
 
 
 class TestPaginateParameters(unittest.IsolatedAsyncioTestCase):
@@ -17,9 +79,77 @@ class TestPaginateParameters(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(result.skip, 0)
         self.assertEqual(result.limit, 100)
+        self.assertIsNone(result.cursor)
+        self.assertIsNone(result.after)
 
     async def test_return_custom(self) -> None:
         result = module.PaginateParameters(skip=10, limit=10)
 
         self.assertEqual(result.skip, 10)
         self.assertEqual(result.limit, 10)
+
+    async def test_cursor(self) -> None:
+        resource_id = uuid.uuid4()
+
+        result = module.PaginateParameters(cursor=module.encode_cursor(resource_id))
+
+        self.assertEqual(result.after, resource_id)
+
+    async def test_cursor_invalid(self) -> None:
+        for cursor in ["not a cursor", module.encode_cursor(uuid.uuid4())[:-2], "e30"]:
+            with self.subTest(cursor=cursor), self.assertRaises(pydantic.ValidationError):
+                module.PaginateParameters(cursor=cursor)
+
+    async def test_page(self) -> None:
+        resource_ids = [uuid.uuid4(), uuid.uuid4()]
+        paginate_parameters = module.PaginateParameters(limit=2)
+
+        result = paginate_parameters.page([{"id": resource_id} for resource_id in resource_ids])
+
+        self.assertEqual(result, [{"id": resource_id} for resource_id in resource_ids])
+        self.assertEqual(module.decode_cursor(result.cursor), resource_ids[1])  # type: ignore
+
+    async def test_page_last(self) -> None:
+        paginate_parameters = module.PaginateParameters(limit=2)
+
+        result = paginate_parameters.page([{"id": uuid.uuid4()}])
+
+        self.assertIsNone(result.cursor)
+
+    async def test_order_key(self) -> None:
+        values = [None, "b", [1], 2, "a", 1.5, {"a": 1}]
+
+        result = sorted(values, key=module.order_key)
+
+        self.assertEqual(result, [1.5, 2, "a", "b", [1], {"a": 1}, None])
+
+    async def test_page_ordered(self) -> None:
+        resource_id = uuid.uuid4()
+        paginate_parameters = module.PaginateParameters(limit=1, order_by="field")
+
+        result = paginate_parameters.page([{"id": resource_id, "field": "value"}])
+        position = module.PaginateParameters(order_by="field", cursor=result.cursor).position
+
+        self.assertEqual(position, ((1, "value"), resource_id))
+
+    async def test_top(self) -> None:
+        items = [{"id": uuid.uuid4(), "field": index % 3 or None} for index in range(10)]
+        for direction in ["asc", "desc"]:
+            with self.subTest(direction=direction):
+                expected = sorted(
+                    items,
+                    key=lambda item: (module.order_key(item["field"]), item["id"]),
+                    reverse=direction == "desc",
+                )
+                paginate_parameters = module.PaginateParameters(skip=1, limit=3, order_by="field", direction=direction)
+
+                result = paginate_parameters.top(iter(items))
+                following = module.PaginateParameters(
+                    limit=3,
+                    order_by="field",
+                    direction=direction,
+                    cursor=result.cursor,
+                ).top(iter(items))
+
+                self.assertEqual(result, expected[1:4])
+                self.assertEqual(following, expected[4:7])
@@ -0,0 +1,134 @@
+import unittest
+import unittest.mock
+import uuid
+
+import sthali_db.clients.default
+import sthali_db.metrics
+
+module = sthali_db.metrics
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = module.MetricsRegistry(buckets=[0.1, 0.01])
+
+    def test_observe(self) -> None:
+        self.registry.observe(module.Observation("table", "select_one", 0.005, None))
+        self.registry.observe(module.Observation("table", "select_one", 0.01, 404))
+        self.registry.observe(module.Observation("table", "insert_many", 0.5, None, (409, 409)))
+
+        self.assertEqual(self.registry.buckets, (0.01, 0.1))
+        self.assertEqual(self.registry.calls, {("table", "select_one"): 2, ("table", "insert_many"): 1})
+        self.assertEqual(self.registry.errors, {("table", "select_one", 404): 1, ("table", "insert_many", 409): 2})
+        self.assertEqual(
+            self.registry.histograms,
+            {("table", "select_one"): [2, 0, 0], ("table", "insert_many"): [0, 0, 1]},
+        )
+        self.assertAlmostEqual(self.registry.sums["table", "select_one"], 0.015)
+
+    def test_render(self) -> None:
+        self.registry.observe(module.Observation('ta"ble', "select_one", 0.05, 404))
+
+        result = self.registry.render()
+
+        self.assertEqual(
+            result.splitlines(),
+            [
+                "# HELP sthali_db_calls_total The number of calls of an operation.",
+                "# TYPE sthali_db_calls_total counter",
+                'sthali_db_calls_total{table="ta\\"ble",operation="select_one"} 1',
+                "# HELP sthali_db_errors_total The number of errors of an operation, by status code.",
+                "# TYPE sthali_db_errors_total counter",
+                'sthali_db_errors_total{table="ta\\"ble",operation="select_one",status="404"} 1',
+                "# HELP sthali_db_duration_seconds The duration of the calls of an operation.",
+                "# TYPE sthali_db_duration_seconds histogram",
+                'sthali_db_duration_seconds_bucket{table="ta\\"ble",operation="select_one",le="0.01"} 0',
+                'sthali_db_duration_seconds_bucket{table="ta\\"ble",operation="select_one",le="0.1"} 1',
+                'sthali_db_duration_seconds_bucket{table="ta\\"ble",operation="select_one",le="+Inf"} 1',
+                'sthali_db_duration_seconds_sum{table="ta\\"ble",operation="select_one"} 0.05',
+                'sthali_db_duration_seconds_count{table="ta\\"ble",operation="select_one"} 1',
+            ],
+        )
+
+    def test_clear(self) -> None:
+        self.registry.observe(module.Observation("table", "select_one", 0.05, 404))
+
+        self.registry.clear()
+
+        self.assertEqual(self.registry.render().count("sthali_db_"), 6)
+
+
+class TestInstrumentedClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        client = sthali_db.clients.default.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(sthali_db.clients.default.DefaultClient.tables.pop, client.table)
+        self.observations: list[module.Observation] = []
+        self.client = module.InstrumentedClient(client, sinks=[self.observations.append])
+        self.resource_id = uuid.uuid4()
+
+    async def test_records_calls(self) -> None:
+        resource = await self.client.insert_one(self.resource_id, {"field": "value"})
+        result = await self.client.select_one(self.resource_id)
+
+        self.assertEqual(result, resource)
+        self.assertEqual(
+            [(o.table, o.operation, o.status) for o in self.observations],
+            [
+                (self.client.table, "insert_one", None),
+                (self.client.table, "select_one", None),
+            ],
+        )
+        self.assertTrue(all(observation.seconds >= 0 for observation in self.observations))
+
+    async def test_records_raised_status(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.delete_one(self.resource_id)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual([(o.operation, o.status) for o in self.observations], [("delete_one", 404)])
+
+    async def test_records_other_exceptions_as_500(self) -> None:
+        self.client.client.select_one = unittest.mock.AsyncMock(side_effect=RuntimeError)  # type: ignore
+
+        with self.assertRaises(RuntimeError):
+            await self.client.select_one(self.resource_id)
+
+        self.assertEqual(self.observations[0].status, 500)
+
+    async def test_records_item_statuses(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        await self.client.insert_many({self.resource_id: {}, uuid.uuid4(): {}})
+        await self.client.delete_many([uuid.uuid4()])
+
+        self.assertEqual(
+            [(o.operation, o.status, o.item_statuses) for o in self.observations[1:]],
+            [
+                ("insert_many", None, (409,)),
+                ("delete_many", None, (404,)),
+            ],
+        )
+
+    async def test_sink_failure_logged(self) -> None:
+        self.client.sinks.insert(0, unittest.mock.MagicMock(side_effect=RuntimeError))
+
+        with self.assertLogs(module.logger, "ERROR"):
+            await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        self.assertEqual(len(self.observations), 1)
+
+    async def test_slow_threshold(self) -> None:
+        self.client.slow_threshold = 0
+
+        with self.assertLogs(module.logger, "WARNING") as logs:
+            await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        self.assertIn("slow insert_one of test_table_", logs.output[0])
+
+    async def test_stream_many(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        result = [resource_obj async for resource_obj in self.client.stream_many()]
+
+        self.assertEqual(result, [{"id": self.resource_id, "field": "value"}])
+        self.assertEqual(len(self.observations), 1)
@@ -1,9 +1,11 @@
 import unittest
+import unittest.mock
 
 import sthali_db.models
 
 module = sthali_db.models
 
+
 class TestDefault(unittest.IsolatedAsyncioTestCase):
     async def test_return_default(self) -> None:
         result = module.FieldSpecification.Default()  # type: ignore
@@ -31,6 +33,7 @@ class TestFieldSpecification(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.description, None)
         self.assertEqual(result.optional, None)
         self.assertEqual(result.title, None)
+        self.assertEqual(result.index, None)
 
     async def test_return_custom(self) -> None:
         def func() -> None:
@@ -44,6 +47,7 @@ class TestFieldSpecification(unittest.IsolatedAsyncioTestCase):
             "test_field_description",
             optional,
             "test_field_title",
+            index=True,
         )
 
         self.assertEqual(result.name, "test_field_name")
@@ -53,6 +57,7 @@ class TestFieldSpecification(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.description, "test_field_description")
         self.assertEqual(result.optional, True)
         self.assertEqual(result.title, "test_field_title")
+        self.assertEqual(result.index, True)
 
     async def test_type_annotated(self) -> None:
         field_spec = module.FieldSpecification("test_field_name", str)  # type: ignore
@@ -74,9 +79,7 @@ class TestFieldSpecification(unittest.IsolatedAsyncioTestCase):
         def func() -> None:
             return
 
-        field_spec = module.FieldSpecification(
-            "test_field_name", str, {"factory": func, "value": 0}
-        )  # type: ignore
+        field_spec = module.FieldSpecification("test_field_name", str, {"factory": func, "value": 0})  # type: ignore
 
         result = field_spec.type_annotated
 
@@ -167,3 +170,152 @@ class TestModels(unittest.IsolatedAsyncioTestCase):
                 "test_field_name_5": None,
             },
         )
+
+    async def test_models_are_reused(self) -> None:
+        def fields() -> list[module.FieldSpecification]:
+            return [module.FieldSpecification("test_field_name", str, default={"value": "test"})]  # type: ignore
+
+        result_1 = module.Models("reused", fields())
+        result_2 = module.Models("reused", fields())
+
+        self.assertIs(result_1.create_model, result_2.create_model)
+        self.assertIs(result_1.response_model, result_2.response_model)
+        self.assertIs(result_1.update_model, result_2.update_model)
+        self.assertIsNot(result_1.create_model, result_1.update_model)
+
+    async def test_models_of_other_fields_are_not_reused(self) -> None:
+        field_1 = module.FieldSpecification("test_field_name", int, default={"value": 1})  # type: ignore
+        field_2 = module.FieldSpecification("test_field_name", int, default={"value": True})  # type: ignore
+        field_3 = module.FieldSpecification("test_field_name", int, optional=True)  # type: ignore
+
+        result_1 = module.Models("other", [field_1])
+        result_2 = module.Models("other", [field_2])
+        result_3 = module.Models("other", [field_3])
+
+        self.assertIsNot(result_1.create_model, result_2.create_model)
+        self.assertIsNot(result_1.create_model, result_3.create_model)
+        # True equals 1, so the default must keep its type
+        self.assertIsInstance(result_2.create_model().test_field_name, bool)  # type: ignore
+
+    async def test_models_with_unhashable_default(self) -> None:
+        fields = [module.FieldSpecification("test_field_name", list, default={"value": []})]  # type: ignore
+
+        result_1 = module.Models("unhashable", fields)
+        result_2 = module.Models("unhashable", fields)
+
+        self.assertEqual(result_1.create_model().model_dump(), {"test_field_name": []})
+        self.assertIsNot(result_1.create_model, result_2.create_model)
+
+    async def test_models_cache_is_bounded(self) -> None:
+        with unittest.mock.patch.object(module, "MODELS_CACHE_SIZE", 2):
+            first = module.Models("bounded_1", []).create_model
+            module.Models("bounded_2", [])
+            module.Models("bounded_3", [])
+
+            self.assertLessEqual(len(module.Models._cache), 2)  # noqa: SLF001 - the cache is private
+            self.assertIsNot(module.Models("bounded_1", []).create_model, first)
+
+    async def test_models_are_generated_lazily(self) -> None:
+        result = module.Models("lazy", [])
+
+        self.assertNotIn("response_model", vars(result))
+        self.assertNotIn("update_model", vars(result))
+        response_model = result.response_model
+        self.assertIn("response_model", vars(result))
+        self.assertIs(result.response_model, response_model)
+        self.assertNotIn("update_model", vars(result))
+
+
+class TestModelsBatch(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.models = module.Models(
+            "batch",
+            [
+                module.FieldSpecification("test_field_name_1", int),  # type: ignore
+                module.FieldSpecification("test_field_name_2", str, default={"value": "default"}),  # type: ignore
+            ],
+        )
+
+    async def test_validate_many(self) -> None:
+        result = self.models.validate_many([{"test_field_name_1": 1}, {"test_field_name_1": "2"}])
+
+        self.assertEqual(
+            result,
+            [
+                self.models.create_model(test_field_name_1=1),
+                self.models.create_model(test_field_name_1=2),
+            ],
+        )
+
+    async def test_validate_many_json(self) -> None:
+        result = self.models.validate_many(b'[{"test_field_name_1": 1, "test_field_name_2": "value"}]')
+
+        self.assertEqual(result, [self.models.create_model(test_field_name_1=1, test_field_name_2="value")])
+
+    async def test_validate_many_with_model(self) -> None:
+        _id = module.uuid.uuid4()
+
+        result = self.models.validate_many([{"id": str(_id), "test_field_name_1": 1}], self.models.response_model)
+
+        self.assertIsInstance(result[0], self.models.response_model)
+        self.assertEqual(result[0].id, _id)  # type: ignore
+
+    async def test_validate_many_invalid(self) -> None:
+        with self.assertRaises(module.pydantic.ValidationError) as context:
+            self.models.validate_many([{"test_field_name_1": 1}, {}, {"test_field_name_1": "invalid"}])
+
+        self.assertEqual(
+            [error["loc"] for error in context.exception.errors()],
+            [(1, "test_field_name_1"), (2, "test_field_name_1")],
+        )
+
+    async def test_dump_many(self) -> None:
+        _id = module.uuid.uuid4()
+        instances = [self.models.response_model(id=_id, test_field_name_1=1)]  # type: ignore
+
+        self.assertEqual(self.models.dump_many([]), [])
+        self.assertEqual(
+            self.models.dump_many(instances),
+            [{"id": _id, "test_field_name_1": 1, "test_field_name_2": "default"}],
+        )
+        self.assertEqual(
+            self.models.dump_many(instances, mode="json", exclude_unset=True),
+            [{"id": str(_id), "test_field_name_1": 1}],
+        )
+
+    async def test_construct_many(self) -> None:
+        _id = module.uuid.uuid4()
+
+        result = self.models.construct_many([{"id": _id, "test_field_name_1": "not validated"}])
+
+        self.assertIsInstance(result[0], self.models.response_model)
+        self.assertEqual(result[0].id, _id)
+        self.assertEqual(result[0].test_field_name_1, "not validated")  # type: ignore
+        self.assertEqual(result[0].test_field_name_2, "default")  # type: ignore
+
+    async def test_construct_many_as_model_construct(self) -> None:
+        _id = module.uuid.uuid4()
+        row = {"id": _id, "test_field_name_1": 1, "unknown": "dropped"}
+
+        result = self.models.construct_many([row])[0]
+        expected = self.models.response_model.model_construct(**row)
+
+        self.assertEqual(result.model_dump(), expected.model_dump())
+        self.assertEqual(result.model_fields_set, expected.model_fields_set)
+        result.test_field_name_2 = "value"  # type: ignore
+        self.assertEqual(result.model_fields_set, {"id", "test_field_name_1", "test_field_name_2"})
+
+    async def test_construct_many_field_order(self) -> None:
+        _id = module.uuid.uuid4()
+        rows = [
+            {"unknown": "dropped", "test_field_name_1": 1, "id": _id},
+            {"test_field_name_2": "value", "test_field_name_1": 1, "id": _id},
+        ]
+
+        for row in rows:
+            result = self.models.construct_many([row])[0]
+            expected = self.models.response_model.model_construct(**row)
+
+            with self.subTest(row=row):
+                self.assertEqual(list(result.model_dump()), list(expected.model_dump()))
+                self.assertEqual(list(result.model_dump()), list(self.models.response_model.model_fields))
@@ -0,0 +1,42 @@
+import unittest
+import unittest.mock
+
+import sthali_db.registry
+
+module = sthali_db.registry
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = module.Registry()
+        self.key = ("client", "path")
+
+    def test_acquire(self) -> None:
+        factory = unittest.mock.Mock(return_value="handle")
+
+        first = self.registry.acquire(self.key, factory)
+        second = self.registry.acquire(self.key, factory)
+
+        self.assertEqual((first, second), ("handle", "handle"))
+        factory.assert_called_once_with()
+        self.assertEqual(self.registry.users(self.key), 2)
+
+    def test_release(self) -> None:
+        self.registry.acquire(self.key, lambda: "handle")
+        self.registry.acquire(self.key, lambda: "other")
+
+        self.assertIsNone(self.registry.release(self.key))
+        self.assertEqual(self.registry.release(self.key), "handle")
+        self.assertEqual(self.registry.users(self.key), 0)
+        self.assertEqual(self.registry.acquire(self.key, lambda: "other"), "other")
+
+    def test_release_raise_exception(self) -> None:
+        with self.assertRaises(KeyError):
+            self.registry.release(self.key)
+
+    def test_handles(self) -> None:
+        self.registry.acquire(("client", "path_1"), lambda: "handle_1")
+        self.registry.acquire(("client", "path_2"), lambda: "handle_2")
+        self.registry.acquire(("other", "path_1"), lambda: "handle_3")
+
+        self.assertEqual(self.registry.handles("client"), ["handle_1", "handle_2"])
@@ -0,0 +1,114 @@
+import json
+import pathlib
+import tempfile
+import unittest
+import uuid
+
+import sthali_db.codecs
+import sthali_db.snapshot
+
+module = sthali_db.snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = pathlib.Path(directory.name) / "test.snapshot"
+        self.keys = sorted(uuid.uuid4() for _ in range(3))
+        self.codec = sthali_db.codecs.get_codec("json")
+        rows = [(key, {"index": index}) for index, key in enumerate(self.keys)]
+        module.write_snapshot(self.path, rows, self.codec, self.codec.encode)
+
+    def test_read(self) -> None:
+        snapshot = module.Snapshot(self.path)
+
+        self.assertEqual(snapshot.keys, self.keys)
+        self.assertEqual(snapshot.codec.name, "json")
+        self.assertEqual(
+            [json.loads(snapshot.raw(position)) for position in range(3)],
+            [
+                {"index": 0},
+                {"index": 1},
+                {"index": 2},
+            ],
+        )
+
+    def test_empty(self) -> None:
+        module.write_snapshot(self.path, [], self.codec, self.codec.encode)
+
+        self.assertEqual(module.Snapshot(self.path).keys, [])
+
+    def test_not_a_snapshot(self) -> None:
+        self.path.write_bytes(b"not a snapshot file")
+
+        with self.assertRaises(ValueError):
+            module.Snapshot(self.path)
+
+    def test_write_is_atomic(self) -> None:
+        def encode(_: object) -> bytes:
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            module.write_snapshot(self.path, [(uuid.uuid4(), {})], self.codec, encode)
+
+        self.assertEqual(module.Snapshot(self.path).keys, self.keys)
+        self.assertEqual([path.name for path in self.path.parent.iterdir()], [self.path.name])
+
+
+class TestSnapshotRows(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = pathlib.Path(directory.name) / "test.snapshot"
+        self.keys = sorted(uuid.uuid4() for _ in range(4))
+        codec = sthali_db.codecs.get_codec("json")
+        module.write_snapshot(path, [(key, index) for index, key in enumerate(self.keys)], codec, codec.encode)
+        self.decoded: list[bytes] = []
+        self.rows = module.SnapshotRows(module.Snapshot(path), self.decode)
+
+    def decode(self, data: bytes) -> int:
+        self.decoded.append(data)
+        return json.loads(data)
+
+    def test_decoded_on_first_access(self) -> None:
+        self.assertEqual(len(self.rows), 4)
+        self.assertIn(self.keys[1], self.rows)
+        self.assertEqual(self.decoded, [])
+
+        self.assertEqual(self.rows[self.keys[1]], 1)
+        self.assertEqual(self.rows.get(self.keys[1]), 1)
+
+        self.assertEqual(self.decoded, [b"1"])
+        self.assertEqual(len(self.rows), 4)
+
+    def test_missing(self) -> None:
+        key = uuid.uuid4()
+
+        self.assertNotIn(key, self.rows)
+        self.assertIsNone(self.rows.get(key))
+        self.assertEqual(self.rows.pop(key, None), None)
+        with self.assertRaises(KeyError):
+            self.rows[key]
+
+    def test_writes(self) -> None:
+        key = uuid.uuid4()
+
+        self.rows[key] = 10
+        self.rows[self.keys[0]] = 20
+        popped = self.rows.pop(self.keys[2])
+
+        self.assertEqual(popped, 2)
+        self.assertEqual(len(self.rows), 4)
+        self.assertNotIn(self.keys[2], self.rows)
+        self.assertEqual(self.rows[self.keys[0]], 20)
+        self.assertEqual(dict(self.rows.items()), {key: 10, self.keys[0]: 20, self.keys[1]: 1, self.keys[3]: 3})
+        self.assertEqual(self.decoded, [b"2", b"1", b"3"])
+
+    def test_capture(self) -> None:
+        self.rows[self.keys[2]] = 20
+
+        result = self.rows.capture(self.keys)
+
+        self.assertEqual(result, [(self.keys[0], 0), (self.keys[1], 1), (self.keys[2], 20), (self.keys[3], 3)])
+        self.assertEqual(self.decoded, [])
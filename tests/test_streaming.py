@@ -0,0 +1,43 @@
+import collections.abc
+import unittest
+import uuid
+
+import sthali_db.streaming
+
+module = sthali_db.streaming
+
+
+async def _iterate(resources: list[dict]) -> collections.abc.AsyncIterator[dict]:
+    for resource in resources:
+        yield resource
+
+
+class TestNdjsonResponse(unittest.IsolatedAsyncioTestCase):
+    async def test_ndjson_response(self) -> None:
+        resource_id = uuid.uuid4()
+        response = module.ndjson_response(_iterate([{"id": resource_id, "field": "value"}, {"id": resource_id}]))
+
+        chunks = [chunk async for chunk in response.body_iterator]
+
+        self.assertEqual(response.media_type, module.NDJSON_MEDIA_TYPE)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            chunks,
+            [f'{{"id":"{resource_id}","field":"value"}}\n{{"id":"{resource_id}"}}\n'.encode()],
+        )
+
+    async def test_ndjson_response_buffer_size(self) -> None:
+        response = module.ndjson_response(_iterate([{"field": index} for index in range(3)]), buffer_size=24)
+
+        chunks = [chunk async for chunk in response.body_iterator]
+
+        self.assertEqual(chunks, [b'{"field":0}\n{"field":1}\n', b'{"field":2}\n'])
+
+    async def test_ndjson_response_empty(self) -> None:
+        response = module.ndjson_response(_iterate([]), status_code=206, headers={"x-header": "value"})
+
+        chunks = [chunk async for chunk in response.body_iterator]
+
+        self.assertEqual(chunks, [])
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers["x-header"], "value")
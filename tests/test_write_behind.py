@@ -0,0 +1,272 @@
+import asyncio
+import unittest
+import unittest.mock
+import uuid
+
+import sthali_db.clients.default
+import sthali_db.dependencies
+import sthali_db.write_behind
+
+module = sthali_db.write_behind
+
+
+class TestWriteBehindClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.inner = sthali_db.clients.default.DefaultClient("", f"test_table_{uuid.uuid4().hex}")
+        self.addCleanup(sthali_db.clients.default.DefaultClient.tables.pop, self.inner.table)
+        self.client = module.WriteBehindClient(self.inner, max_delay=10)
+        self.addAsyncCleanup(self.client.aclose)
+        self.resource_id = uuid.uuid4()
+
+    async def test_insert_one(self) -> None:
+        result = await self.client.insert_one(self.resource_id, {"field": "value"})
+
+        self.assertEqual(result, {"id": self.resource_id, "field": "value"})
+        self.assertEqual(self.client.pending, 1)
+        self.assertEqual(await self.client.select_one(self.resource_id), result)
+        with self.assertRaises(self.inner.exception):
+            await self.inner.select_one(self.resource_id)
+
+        await self.client.flush()
+
+        self.assertEqual(self.client.pending, 0)
+        self.assertEqual(await self.inner.select_one(self.resource_id), result)
+
+    async def test_insert_one_raise_exception(self) -> None:
+        stored = uuid.uuid4()
+        await self.inner.insert_one(stored, {})
+        await self.client.insert_one(self.resource_id, {})
+
+        for resource_id in [stored, self.resource_id]:
+            with self.subTest(resource_id=resource_id), self.assertRaises(self.client.exception) as context:
+                await self.client.insert_one(resource_id, {})
+
+            self.assertEqual(context.exception.status_code, 409)
+
+    async def test_updates_are_coalesced(self) -> None:
+        await self.client.insert_one(self.resource_id, {"field": "value", "count": 0})
+        for count in range(1, 4):
+            await self.client.update_one(self.resource_id, {"count": count}, partial=True)
+
+        with (
+            unittest.mock.patch.object(self.inner, "update_many", wraps=self.inner.update_many) as update_many,
+            unittest.mock.patch.object(self.inner, "insert_many", wraps=self.inner.insert_many) as insert_many,
+        ):
+            await self.client.flush()
+
+        update_many.assert_awaited_once()
+        insert_many.assert_awaited_once_with({self.resource_id: {"field": "value", "count": 3}})
+        result = await self.inner.select_one(self.resource_id)
+        self.assertEqual(result, {"id": self.resource_id, "field": "value", "count": 3})
+
+    async def test_update_one_stored(self) -> None:
+        await self.inner.insert_one(self.resource_id, {"field": "value"})
+
+        result = await self.client.update_one(self.resource_id, {"other": "value"}, partial=True)
+        await self.client.flush()
+
+        self.assertEqual(result, {"id": self.resource_id, "field": "value", "other": "value"})
+        self.assertEqual(await self.inner.select_one(self.resource_id), result)
+
+    async def test_update_one_raise_exception(self) -> None:
+        with self.assertRaises(self.client.exception) as context:
+            await self.client.update_one(self.resource_id, {})
+
+        self.assertEqual(context.exception.status_code, 404)
+
+    async def test_delete_one(self) -> None:
+        await self.inner.insert_one(self.resource_id, {})
+
+        await self.client.delete_one(self.resource_id)
+
+        with self.assertRaises(self.client.exception):
+            await self.client.select_one(self.resource_id)
+        with self.assertRaises(self.client.exception):
+            await self.client.delete_one(self.resource_id)
+        await self.client.flush()
+        self.assertEqual(self.inner.tables[self.inner.table].rows, {})
+
+    async def test_insert_then_delete_writes_nothing(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+        await self.client.delete_one(self.resource_id)
+
+        await self.client.flush()
+
+        self.assertEqual(self.inner.tables[self.inner.table].rows, {})
+
+    async def test_bulk(self) -> None:
+        resource_ids = [uuid.uuid4(), uuid.uuid4()]
+        await self.inner.insert_one(resource_ids[0], {"field": "value"})
+
+        inserted = await self.client.insert_many({resource_id: {} for resource_id in resource_ids})
+        updated = await self.client.update_many({resource_ids[1]: {"field": "updated"}})
+        selected = await self.client.select_by_ids([*resource_ids, self.resource_id])
+        deleted = await self.client.delete_many([resource_ids[0], self.resource_id])
+
+        self.assertEqual(inserted[0].status_code, 409)  # type: ignore
+        self.assertEqual(updated, [{"id": resource_ids[1], "field": "updated"}])
+        self.assertEqual(selected[:2], [{"id": resource_ids[0], "field": "value"}, updated[0]])
+        self.assertEqual(selected[2].status_code, 404)  # type: ignore
+        self.assertEqual(deleted[0], None)
+        self.assertEqual(deleted[1].status_code, 404)  # type: ignore
+
+    async def test_select_many_sees_pending_writes(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        result = await self.client.select_many(sthali_db.dependencies.PaginateParameters())
+
+        self.assertEqual(result, [{"id": self.resource_id}])
+
+    async def test_stream_many_sees_pending_writes(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        result = [resource_obj async for resource_obj in self.client.stream_many()]
+
+        self.assertEqual(result, [{"id": self.resource_id}])
+        self.assertEqual(self.client.pending, 0)
+
+    async def test_max_delay(self) -> None:
+        self.client.max_delay = 0.01
+
+        await self.client.insert_one(self.resource_id, {})
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(self.client.pending, 0)
+        self.assertEqual(await self.inner.select_one(self.resource_id), {"id": self.resource_id})
+
+    async def test_max_batch_size(self) -> None:
+        self.client.max_batch_size = 2
+
+        await self.client.insert_many({uuid.uuid4(): {}, uuid.uuid4(): {}})
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        self.assertEqual(self.client.pending, 0)
+
+    async def test_max_pending(self) -> None:
+        self.client.max_pending = 2
+
+        await self.client.insert_one(uuid.uuid4(), {})
+        self.assertEqual(self.client.pending, 1)
+        await self.client.insert_one(uuid.uuid4(), {})
+
+        self.assertEqual(self.client.pending, 0)
+
+    async def test_failed_write_is_kept(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        with (
+            unittest.mock.patch.object(self.inner, "update_many", side_effect=ConnectionError),
+            self.assertRaises(ConnectionError),
+        ):
+            await self.client.flush()
+
+        self.assertEqual(self.client.pending, 1)
+        await self.client.flush()
+        self.assertEqual(await self.inner.select_one(self.resource_id), {"id": self.resource_id})
+
+    async def test_failed_write_is_retried(self) -> None:
+        self.client.max_delay = 0.01
+        update_many = unittest.mock.AsyncMock(wraps=self.inner.update_many)
+        update_many.side_effect = [ConnectionError, unittest.mock.DEFAULT]
+        await self.client.insert_one(self.resource_id, {})
+
+        with unittest.mock.patch.object(self.inner, "update_many", update_many), self.assertLogs(module.logger):
+            await asyncio.sleep(0.1)
+
+        self.assertEqual((self.client.pending, update_many.await_count), (0, 2))
+        self.assertEqual(await self.inner.select_one(self.resource_id), {"id": self.resource_id})
+
+    async def test_failed_write_is_dropped(self) -> None:
+        lost: list[tuple[uuid.UUID, Exception]] = []
+        self.client.max_attempts = 2
+        self.client.on_rejected = lambda resource_id, exception: lost.append((resource_id, exception))
+        await self.client.insert_one(self.resource_id, {})
+
+        with (
+            unittest.mock.patch.object(self.inner, "update_many", side_effect=ConnectionError),
+            self.assertLogs(module.logger, "ERROR"),
+        ):
+            for _ in range(2):
+                with self.assertRaises(ConnectionError):
+                    await self.client.flush()
+            await self.client.flush()
+
+        self.assertEqual((self.client.pending, self.client.dropped), (0, 1))
+        self.assertEqual(
+            [(resource_id, type(exception)) for resource_id, exception in lost],
+            [
+                (self.resource_id, ConnectionError),
+            ],
+        )
+
+    async def test_rejected_write(self) -> None:
+        lost: list[tuple[uuid.UUID, Exception]] = []
+        self.client.on_rejected = lambda resource_id, exception: lost.append((resource_id, exception))
+        await self.client.insert_one(self.resource_id, {})
+        # another client inserts the resource between the update and the insert of the batch
+        conflict = self.inner.exception(self.inner.status.HTTP_409_CONFLICT, "conflict")
+
+        with (
+            unittest.mock.patch.object(self.inner, "insert_many", return_value=[conflict]),
+            self.assertLogs(module.logger, "WARNING"),
+        ):
+            await self.client.flush()
+
+        self.assertEqual(self.client.rejected, 1)
+        self.assertEqual(lost, [(self.resource_id, conflict)])
+
+    async def test_aclose_retries_failed_write(self) -> None:
+        self.client.max_delay = 0.01
+        update_many = unittest.mock.AsyncMock(wraps=self.inner.update_many)
+        update_many.side_effect = [ConnectionError, unittest.mock.DEFAULT]
+        await self.client.insert_one(self.resource_id, {})
+
+        with unittest.mock.patch.object(self.inner, "update_many", update_many), self.assertLogs(module.logger):
+            await self.client.aclose()
+
+        self.assertEqual((self.client.pending, self.client.dropped, update_many.await_count), (0, 0, 2))
+        self.assertEqual(await self.inner.select_one(self.resource_id), {"id": self.resource_id})
+
+    async def test_aclose_drops_failed_write(self) -> None:
+        lost: list[tuple[uuid.UUID, Exception]] = []
+        self.client.max_delay = 0.01
+        self.client.on_rejected = lambda resource_id, exception: lost.append((resource_id, exception))
+        await self.client.insert_one(self.resource_id, {})
+
+        with (
+            unittest.mock.patch.object(self.inner, "update_many", side_effect=ConnectionError) as update_many,
+            unittest.mock.patch.object(self.inner, "aclose") as aclose,
+            self.assertLogs(module.logger, "ERROR"),
+        ):
+            await self.client.aclose()
+
+        self.assertEqual((self.client.pending, self.client.dropped, update_many.await_count), (0, 1, 3))
+        self.assertEqual([resource_id for resource_id, _ in lost], [self.resource_id])
+        aclose.assert_awaited_once_with()
+
+    async def test_aclose_interrupted(self) -> None:
+        lost: list[tuple[uuid.UUID, Exception]] = []
+        self.client.on_rejected = lambda resource_id, exception: lost.append((resource_id, exception))
+        await self.client.insert_one(self.resource_id, {})
+
+        with (
+            unittest.mock.patch.object(self.inner, "update_many", side_effect=asyncio.CancelledError),
+            unittest.mock.patch.object(self.inner, "aclose") as aclose,
+            self.assertLogs(module.logger, "ERROR"),
+            self.assertRaises(asyncio.CancelledError),
+        ):
+            await self.client.aclose()
+
+        self.assertEqual((self.client.pending, self.client.dropped), (0, 1))
+        self.assertEqual(
+            [(resource_id, type(exception)) for resource_id, exception in lost], [(self.resource_id, RuntimeError)]
+        )
+        aclose.assert_awaited_once_with()
+
+    async def test_aclose(self) -> None:
+        await self.client.insert_one(self.resource_id, {})
+
+        await self.client.aclose()
+
+        self.assertEqual(await self.inner.select_one(self.resource_id), {"id": self.resource_id})